@@ -7,8 +7,9 @@ Ce module contient les classes d'administration Django pour tous les modèles ac
 from django.contrib import admin
 from import_export.admin import ImportExportModelAdmin
 from .models import (
-    AcademicYear, Grade, ClassRoom, Class, Subject, Course, Schedule
+    AcademicYear, Grade, ClassRoom, Class, Subject, Course, Schedule, TeacherAvailability
 )
+from .resources import ScheduleResource
 
 
 @admin.register(AcademicYear)
@@ -91,8 +92,12 @@ class ClassAdmin(ImportExportModelAdmin):
     """
     Administration pour le modèle Class.
     """
-    list_display = ['name', 'code', 'grade', 'academic_year', 'capacity', 'teacher', 'is_active', 'created_at']
+    list_display = [
+        'name', 'code', 'grade', 'academic_year', 'capacity', 'get_students_count',
+        'get_available_seats', 'teacher', 'is_active', 'created_at'
+    ]
     list_filter = ['is_active', 'grade', 'academic_year', 'created_at']
+    list_select_related = ['grade', 'academic_year', 'teacher__profile']
     search_fields = ['name', 'code']
     ordering = ['academic_year', 'grade__order', 'name']
     readonly_fields = ['created_at', 'updated_at']
@@ -113,6 +118,22 @@ class ClassAdmin(ImportExportModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_queryset(self, request):
+        """Annote l'effectif et les places disponibles de chaque classe (une sous-requête)."""
+        return super().get_queryset(request).with_student_counts()
+    
+    def get_students_count(self, obj):
+        """Affiche le nombre d'élèves actifs."""
+        return obj.students_count
+    get_students_count.short_description = 'Élèves'
+    get_students_count.admin_order_field = 'students_count'
+    
+    def get_available_seats(self, obj):
+        """Affiche les places disponibles."""
+        return obj.available_seats
+    get_available_seats.short_description = 'Places disponibles'
+    get_available_seats.admin_order_field = 'available_seats'
 
 
 @admin.register(Subject)
@@ -120,7 +141,7 @@ class SubjectAdmin(ImportExportModelAdmin):
     """
     Administration pour le modèle Subject.
     """
-    list_display = ['name', 'code', 'coefficient', 'is_active', 'created_at']
+    list_display = ['name', 'code', 'coefficient', 'weekly_hours', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'code']
     ordering = ['name']
@@ -128,7 +149,7 @@ class SubjectAdmin(ImportExportModelAdmin):
     
     fieldsets = (
         ('Informations de base', {
-            'fields': ('name', 'code', 'description', 'coefficient')
+            'fields': ('name', 'code', 'description', 'coefficient', 'weekly_hours')
         }),
         ('Statut', {
             'fields': ('is_active',)
@@ -170,7 +191,11 @@ class CourseAdmin(ImportExportModelAdmin):
 class ScheduleAdmin(ImportExportModelAdmin):
     """
     Administration pour le modèle Schedule.
+    
+    Les conflits de salle, d'enseignant et de classe sont refusés à la
+    saisie (Schedule.clean) comme à l'import (ScheduleResource).
     """
+    resource_class = ScheduleResource
     list_display = ['course', 'get_day_display', 'start_time', 'end_time', 'classroom', 'is_active', 'created_at']
     list_filter = ['is_active', 'day_of_week', 'created_at']
     search_fields = ['course__subject__name', 'course__class_section__name', 'classroom__name']
@@ -196,3 +221,22 @@ class ScheduleAdmin(ImportExportModelAdmin):
         return dict(Schedule.DAY_CHOICES)[obj.day_of_week]
     get_day_display.short_description = 'Jour'
     get_day_display.admin_order_field = 'day_of_week'
+
+
+@admin.register(TeacherAvailability)
+class TeacherAvailabilityAdmin(ImportExportModelAdmin):
+    """
+    Administration pour le modèle TeacherAvailability.
+    """
+    list_display = ['teacher', 'get_day_display', 'start_time', 'end_time', 'is_active']
+    list_filter = ['is_active', 'day_of_week']
+    search_fields = ['teacher__profile__full_name', 'teacher__teacher_number']
+    ordering = ['teacher', 'day_of_week', 'start_time']
+    readonly_fields = ['created_at', 'updated_at']
+    raw_id_fields = ['teacher']
+    
+    def get_day_display(self, obj):
+        """Affiche le jour de la semaine."""
+        return dict(Schedule.DAY_CHOICES)[obj.day_of_week]
+    get_day_display.short_description = 'Jour'
+    get_day_display.admin_order_field = 'day_of_week'
@@ -0,0 +1,134 @@
+"""
+Commande de management pour mesurer le générateur d'emploi du temps.
+
+L'école est générée en mémoire (aucune écriture en base) : des classes de
+25 à 40 élèves, dix matières, des enseignants à 18 heures par semaine dont
+un sur quatre indisponible le mercredi après-midi, et une salle par classe.
+
+Usage:
+    python manage.py benchmark_timetable
+    python manage.py benchmark_timetable --classes 120 --budget 30 --seed 3
+"""
+
+import math
+import random
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from app_academic.services.schedule_conflicts import find_timetable_conflicts
+from app_academic.services.timetable import TimetableSolver, get_timetable_grid, grid_mask
+
+SUBJECT_HOURS = [5, 5, 3, 3, 2, 2, 2, 2, 1, 1]
+TEACHER_HOURS = 18
+ROOM_CAPACITIES = [30, 35, 40, 45]
+
+
+def build_school(classes, grid, seed=0):
+    """
+    Génère les cours et les salles d'une école fictive.
+    
+    Args:
+        classes: Nombre de classes
+        grid: Créneaux (voir get_timetable_grid)
+        seed: Graine du tirage aléatoire
+    
+    Returns:
+        tuple: (cours, salles) au format de TimetableSolver
+    """
+    rng = random.Random(seed)
+    rooms = [
+        {'id': room_id, 'capacity': ROOM_CAPACITIES[room_id % len(ROOM_CAPACITIES)]}
+        for room_id in range(classes)
+    ]
+    wednesday_afternoon = grid_mask(grid, 2, 12 * 60, 24 * 60)
+    courses = []
+    teacher_id = 0
+    for subject, hours in enumerate(SUBJECT_HOURS):
+        per_teacher = max(TEACHER_HOURS // hours, 1)
+        for group in range(math.ceil(classes / per_teacher)):
+            teacher_id += 1
+            available = None if teacher_id % 4 else ~wednesday_afternoon
+            for class_id in range(group * per_teacher, min((group + 1) * per_teacher, classes)):
+                courses.append({
+                    'id': len(courses) + 1,
+                    'class_id': class_id,
+                    'teacher_id': teacher_id,
+                    'hours': hours,
+                    'size': 25 + (class_id * 7 + subject) % 16 if subject else rng.randint(25, 40),
+                    'classroom_id': class_id,
+                    'available': available,
+                })
+    # L'effectif d'une classe est le même pour tous ses cours
+    sizes = {}
+    for course in courses:
+        course['size'] = sizes.setdefault(course['class_id'], course['size'])
+    return courses, rooms
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the timetable generator on a generated school'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--classes',
+            type=int,
+            default=60,
+            help='Number of generated classes (default: 60)',
+        )
+        parser.add_argument(
+            '--budget',
+            type=float,
+            default=None,
+            help='Search time budget in seconds (default: TIMETABLE_TIME_BUDGET)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed (default: 0)',
+        )
+    
+    def handle(self, *args, **options):
+        budget = options['budget'] if options['budget'] is not None else settings.TIMETABLE_TIME_BUDGET
+        grid = get_timetable_grid()
+        courses, rooms = build_school(options['classes'], grid, options['seed'])
+        teachers = len({course['teacher_id'] for course in courses})
+        self.stdout.write(
+            f"Generated school: {options['classes']} classes, {len(courses)} courses, "
+            f"{teachers} teachers, {len(rooms)} rooms, {len(grid)} weekly slots"
+        )
+        
+        solver = TimetableSolver(
+            grid, courses, rooms,
+            max_daily_hours=settings.TIMETABLE_MAX_DAILY_HOURS,
+            seed=options['seed']
+        )
+        result = solver.solve(budget)
+        
+        classes = {course['id']: course['class_id'] for course in courses}
+        teachers = {course['id']: course['teacher_id'] for course in courses}
+        conflicts = find_timetable_conflicts([
+            {
+                'id': position,
+                'year_id': 0,
+                'day': lesson['day'],
+                'start': lesson['start'],
+                'end': lesson['end'],
+                'classroom_id': lesson['classroom_id'],
+                'teacher_id': teachers[lesson['course_id']],
+                'class_id': classes[lesson['course_id']],
+            }
+            for position, lesson in enumerate(result['lessons'])
+        ])
+        if conflicts:
+            raise CommandError(f'{len(conflicts)} conflict(s) in the generated timetable')
+        
+        for constraint in result['unsatisfied']:
+            self.stdout.write(self.style.WARNING(
+                f"Course {constraint['course_id']}: {constraint['missing_hours']} hour(s) missing "
+                f"({constraint['constraint']})"
+            ))
+        style = self.style.SUCCESS if not result['unsatisfied'] else self.style.WARNING
+        self.stdout.write(style(
+            f"✓ {result['placed']}/{result['hours']} hour(s) placed without conflict "
+            f"in {result['elapsed']:.2f}s ({result['iterations']} iterations)"
+        ))
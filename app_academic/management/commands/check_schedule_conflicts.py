@@ -0,0 +1,64 @@
+"""
+Commande de management pour détecter les conflits d'emploi du temps.
+
+Usage:
+    python manage.py check_schedule_conflicts
+    python manage.py check_schedule_conflicts --year 3
+    python manage.py check_schedule_conflicts --all-years
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from app_academic.models import AcademicYear, Schedule
+from app_academic.services.schedule_conflicts import find_timetable_conflicts, load_slots
+
+RESOURCE_NAMES = {'classroom': 'Classroom', 'teacher': 'Teacher', 'class': 'Class'}
+
+
+class Command(BaseCommand):
+    help = 'Report overlapping schedules sharing a classroom, a teacher or a class'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=int,
+            dest='year_id',
+            help='Academic year id to check (default: current year)',
+        )
+        parser.add_argument(
+            '--all-years',
+            action='store_true',
+            help='Check every academic year',
+        )
+    
+    def handle(self, *args, **options):
+        schedules = Schedule.objects.all()
+        year_id = options.get('year_id')
+        if options.get('all_years'):
+            self.stdout.write('Checking schedules of all academic years...')
+        else:
+            if year_id is None:
+                current_year = AcademicYear.get_current_year()
+                if current_year is None:
+                    raise CommandError('No current academic year, use --year or --all-years')
+                year_id = current_year.id
+            elif not AcademicYear.objects.filter(id=year_id).exists():
+                raise CommandError(f'Academic year {year_id} not found')
+            schedules = schedules.filter(course__academic_year_id=year_id)
+            self.stdout.write(f'Checking schedules of academic year {year_id}...')
+        
+        slots = load_slots(schedules)
+        conflicts = find_timetable_conflicts(slots)
+        if not conflicts:
+            self.stdout.write(self.style.SUCCESS(f'✓ No conflict in {len(slots)} schedule(s)'))
+            return
+        
+        labels = Schedule.objects.select_related(
+            'course__subject', 'course__class_section', 'course__academic_year'
+        ).in_bulk({conflict['slot_id'] for conflict in conflicts} | {conflict['other_id'] for conflict in conflicts})
+        for conflict in conflicts:
+            self.stdout.write(self.style.ERROR(
+                f"{RESOURCE_NAMES[conflict['resource']]} {conflict['resource_id']}: "
+                f"#{conflict['slot_id']} {labels[conflict['slot_id']]} overlaps "
+                f"#{conflict['other_id']} {labels[conflict['other_id']]}"
+            ))
+        raise CommandError(f'{len(conflicts)} schedule conflict(s) found in {len(slots)} schedule(s)')
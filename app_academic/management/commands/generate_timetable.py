@@ -0,0 +1,104 @@
+"""
+Commande de management pour générer les emplois du temps.
+
+Usage:
+    python manage.py generate_timetable
+    python manage.py generate_timetable --year 3 --class 12 --class 13
+    python manage.py generate_timetable --budget 120 --dry-run
+    python manage.py generate_timetable --allow-partial
+    python manage.py generate_timetable --async
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from app_academic.models import AcademicYear
+from app_academic.services.timetable import generate_timetable
+from app_academic.tasks import generate_timetable_task
+
+
+class Command(BaseCommand):
+    help = 'Generate conflict-free weekly schedules for the classes of an academic year'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=int,
+            dest='year_id',
+            help='Academic year id (default: current year)',
+        )
+        parser.add_argument(
+            '--class',
+            type=int,
+            action='append',
+            dest='class_ids',
+            help='Class id to schedule, repeatable (default: every class of the year)',
+        )
+        parser.add_argument(
+            '--budget',
+            type=float,
+            default=None,
+            help='Search time budget in seconds (default: TIMETABLE_TIME_BUDGET)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed (default: 0)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solve without writing the schedules',
+        )
+        parser.add_argument(
+            '--allow-partial',
+            action='store_true',
+            help='Write the schedules even if some hours could not be placed',
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='run_async',
+            help='Queue the generation on a Celery worker',
+        )
+    
+    def handle(self, *args, **options):
+        year_id = options.get('year_id')
+        if year_id is None:
+            current_year = AcademicYear.get_current_year()
+            if current_year is None:
+                raise CommandError('No current academic year, use --year')
+            year_id = current_year.id
+        elif not AcademicYear.objects.filter(id=year_id).exists():
+            raise CommandError(f'Academic year {year_id} not found')
+        
+        if options['run_async']:
+            if options['dry_run']:
+                raise CommandError('--dry-run cannot be combined with --async')
+            result = generate_timetable_task.delay(
+                year_id, options['class_ids'], options['budget'], options['seed'], options['allow_partial']
+            )
+            self.stdout.write(self.style.SUCCESS(f'✓ Timetable generation queued (task {result.id})'))
+            return
+        
+        self.stdout.write(f'Generating timetable for academic year {year_id}...')
+        summary = generate_timetable(
+            year_id,
+            options['class_ids'],
+            time_budget=options['budget'],
+            seed=options['seed'],
+            commit=not options['dry_run'],
+            allow_partial=options['allow_partial']
+        )
+        for constraint in summary['unsatisfied']:
+            self.stdout.write(self.style.WARNING(
+                f"Course {constraint['course_id']}: {constraint['message']}"
+            ))
+        if not options['dry_run'] and not summary['committed']:
+            self.stdout.write(self.style.WARNING(
+                'Incomplete timetable, existing schedules kept (use --allow-partial to write it)'
+            ))
+        style = self.style.SUCCESS if not summary['unsatisfied'] else self.style.WARNING
+        self.stdout.write(style(
+            f"✓ {summary['placed']}/{summary['hours']} hour(s) placed for {summary['courses']} course(s) "
+            f"in {summary['elapsed']:.2f}s, {summary['written']} schedule(s) written"
+        ))
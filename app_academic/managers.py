@@ -0,0 +1,48 @@
+"""
+Managers pour les modèles de l'application app_academic.
+
+Ce module contient les QuerySets personnalisés pour les requêtes
+d'effectifs des classes.
+"""
+
+from django.db import models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+
+class ClassQuerySet(models.QuerySet):
+    """
+    QuerySet personnalisé pour le modèle Class.
+    
+    Utilisé comme manager (Class.objects), il est aussi disponible sur les
+    relations vers les classes (teacher.classes, grade.classes...).
+    """
+    
+    def with_student_counts(self):
+        """
+        Annote les classes avec leur effectif et leurs places disponibles.
+        
+        L'effectif est compté par une sous-requête corrélée : une seule
+        requête pour toutes les classes, sans regroupement de la requête
+        principale.
+        
+        Ajoute à chaque classe :
+        - students_count : nombre d'élèves actifs
+        - seat_capacity : capacité de la classe, limitée par celle de sa salle
+        - available_seats : places restantes (0 si la classe est pleine)
+        
+        Returns:
+            QuerySet: Classes annotées
+        """
+        from app_profile.models import Student
+        
+        students = Student.objects.filter(
+            class_section=OuterRef('pk'),
+            is_active=True
+        ).order_by().values('class_section').annotate(total=Count('pk')).values('total')
+        return self.annotate(
+            students_count=Coalesce(Subquery(students, output_field=IntegerField()), Value(0)),
+            seat_capacity=Least('capacity', Coalesce('classroom__capacity', 'capacity')),
+        ).annotate(
+            available_seats=Greatest(F('seat_capacity') - F('students_count'), Value(0)),
+        )
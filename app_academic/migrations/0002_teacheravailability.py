@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_academic', '0001_initial'),
+        ('app_profile', '0016_parent_children'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='weekly_hours',
+            field=models.PositiveSmallIntegerField(default=0, help_text="Nombre d'heures de cours par semaine et par classe (0 : non planifiée automatiquement)", verbose_name='Heures hebdomadaires'),
+        ),
+        migrations.CreateModel(
+            name='TeacherAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_of_week', models.IntegerField(choices=[(0, 'Lundi'), (1, 'Mardi'), (2, 'Mercredi'), (3, 'Jeudi'), (4, 'Vendredi'), (5, 'Samedi'), (6, 'Dimanche')], help_text='Jour de la semaine (0=Lundi, 6=Dimanche)', verbose_name='Jour de la semaine')),
+                ('start_time', models.TimeField(help_text='Début de la plage de disponibilité', verbose_name='Heure de début')),
+                ('end_time', models.TimeField(help_text='Fin de la plage de disponibilité', verbose_name='Heure de fin')),
+                ('is_active', models.BooleanField(default=True, help_text='Indique si la plage est active', verbose_name='Actif')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('teacher', models.ForeignKey(help_text='Enseignant concerné', on_delete=django.db.models.deletion.CASCADE, related_name='availabilities', to='app_profile.teacher', verbose_name='Enseignant')),
+            ],
+            options={
+                'verbose_name': "Disponibilité d'enseignant",
+                'verbose_name_plural': 'Disponibilités des enseignants',
+                'ordering': ['teacher', 'day_of_week', 'start_time'],
+                'indexes': [models.Index(fields=['teacher', 'is_active'], name='app_academi_teacher_ccb8ca_idx')],
+            },
+        ),
+    ]
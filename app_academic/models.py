@@ -9,12 +9,15 @@ Ce module contient les modèles Django pour la gestion académique :
 - Matières
 - Cours
 - Emploi du temps
+- Disponibilités des enseignants
 """
 
 from django.db import models
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from .managers import ClassQuerySet
 
 
 class AcademicYear(models.Model):
@@ -437,6 +440,8 @@ class Class(models.Model):
         verbose_name="Modifié par"
     )
     
+    objects = ClassQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Classe"
         verbose_name_plural = "Classes"
@@ -484,9 +489,16 @@ class Class(models.Model):
         """
         Retourne le nombre d'élèves actifs dans cette classe.
         
+        Pour afficher l'effectif de plusieurs classes, utiliser
+        Class.objects.with_student_counts() : la valeur annotée est alors
+        retournée sans requête.
+        
         Returns:
             int: Nombre d'élèves
         """
+        if hasattr(self, 'students_count'):
+            return self.students_count
+        
         from app_profile.models import Student
         return Student.objects.filter(class_section=self, is_active=True).count()
 
@@ -528,6 +540,12 @@ class Subject(models.Model):
         help_text="Coefficient pour le calcul de la moyenne"
     )
     
+    weekly_hours = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Heures hebdomadaires",
+        help_text="Nombre d'heures de cours par semaine et par classe (0 : non planifiée automatiquement)"
+    )
+    
     # Champs obligatoires
     is_active = models.BooleanField(
         default=True,
@@ -830,6 +848,31 @@ class Schedule(models.Model):
         day_name = dict(self.DAY_CHOICES)[self.day_of_week]
         return f"{day_name} {self.start_time} - {self.end_time} ({self.course})"
     
+    def clean(self):
+        """
+        Vérifie les horaires et l'absence de conflit avec les autres créneaux.
+        
+        Un créneau actif ne peut pas chevaucher, le même jour, un autre
+        créneau de la même salle, du même enseignant ou de la même classe.
+        
+        Raises:
+            ValidationError: Si l'heure de fin précède l'heure de début ou
+            en cas de conflit
+        """
+        super().clean()
+        if self.start_time is None or self.end_time is None or self.day_of_week is None:
+            return
+        if self.end_time <= self.start_time:
+            raise ValidationError({'end_time': "L'heure de fin doit être postérieure à l'heure de début."})
+        if not self.is_active or self.course_id is None:
+            return
+        
+        from .services.schedule_conflicts import find_schedule_conflicts, get_conflict_messages
+        
+        conflicts = find_schedule_conflicts(self)
+        if conflicts:
+            raise ValidationError(get_conflict_messages(conflicts))
+    
     @classmethod
     def get_schedule(cls, schedule_id):
         """
@@ -877,3 +920,76 @@ class Schedule(models.Model):
             course__teacher_id=teacher_id,
             is_active=True
         ).select_related('course', 'course__subject', 'course__class_section', 'classroom').order_by('day_of_week', 'start_time')
+
+
+class TeacherAvailability(models.Model):
+    """
+    Modèle représentant une plage de disponibilité hebdomadaire d'un enseignant.
+    
+    Un enseignant sans plage de disponibilité active est considéré comme
+    disponible sur toute la semaine par le générateur d'emploi du temps.
+    """
+    
+    teacher = models.ForeignKey(
+        'app_profile.Teacher',
+        on_delete=models.CASCADE,
+        related_name='availabilities',
+        verbose_name="Enseignant",
+        help_text="Enseignant concerné"
+    )
+    
+    day_of_week = models.IntegerField(
+        choices=Schedule.DAY_CHOICES,
+        verbose_name="Jour de la semaine",
+        help_text="Jour de la semaine (0=Lundi, 6=Dimanche)"
+    )
+    
+    start_time = models.TimeField(
+        verbose_name="Heure de début",
+        help_text="Début de la plage de disponibilité"
+    )
+    
+    end_time = models.TimeField(
+        verbose_name="Heure de fin",
+        help_text="Fin de la plage de disponibilité"
+    )
+    
+    # Champs obligatoires
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name="Actif",
+        help_text="Indique si la plage est active"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Date de modification"
+    )
+    
+    class Meta:
+        verbose_name = "Disponibilité d'enseignant"
+        verbose_name_plural = "Disponibilités des enseignants"
+        ordering = ['teacher', 'day_of_week', 'start_time']
+        indexes = [
+            models.Index(fields=['teacher', 'is_active']),
+        ]
+    
+    def __str__(self):
+        day_name = dict(Schedule.DAY_CHOICES)[self.day_of_week]
+        return f"{self.teacher} - {day_name} {self.start_time} - {self.end_time}"
+    
+    def clean(self):
+        """
+        Vérifie que la plage se termine après son début.
+        
+        Raises:
+            ValidationError: Si l'heure de fin précède l'heure de début
+        """
+        super().clean()
+        if self.start_time is not None and self.end_time is not None and self.end_time <= self.start_time:
+            raise ValidationError({'end_time': "L'heure de fin doit être postérieure à l'heure de début."})
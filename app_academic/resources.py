@@ -0,0 +1,51 @@
+"""
+Resources for import/export functionality in app_academic.
+"""
+
+from django.core.exceptions import ValidationError
+from import_export import resources
+from .models import Schedule
+from .services.schedule_conflicts import (
+    ScheduleConflictIndex, get_conflict_messages, get_slot
+)
+
+
+class ScheduleResource(resources.ModelResource):
+    """
+    Resource for importing/exporting Schedule model.
+    
+    Every imported slot is checked against an interval index of the active
+    schedules, built once before the import and updated with each saved
+    row, so conflicts with existing slots and between rows of the same file
+    are reported on the offending row.
+    """
+    
+    class Meta:
+        model = Schedule
+        fields = ('id', 'course', 'day_of_week', 'start_time', 'end_time', 'classroom', 'is_active')
+        export_order = ('id', 'course', 'day_of_week', 'start_time', 'end_time', 'classroom', 'is_active')
+        skip_unchanged = True
+        report_skipped = False
+    
+    def before_import(self, dataset, **kwargs):
+        super().before_import(dataset, **kwargs)
+        self.conflict_index = ScheduleConflictIndex.from_queryset(Schedule.objects.all())
+    
+    def validate_instance(self, instance, import_validation_errors=None, validate_unique=True):
+        errors = dict(import_validation_errors or {})
+        if instance.start_time and instance.end_time and instance.end_time <= instance.start_time:
+            errors['end_time'] = ["L'heure de fin doit être postérieure à l'heure de début."]
+        elif instance.is_active and instance.course_id and instance.day_of_week is not None:
+            conflicts = self.conflict_index.find_conflicts(get_slot(instance))
+            if conflicts:
+                errors['__all__'] = get_conflict_messages(conflicts)
+        if errors:
+            raise ValidationError(errors)
+        super().validate_instance(instance, None, validate_unique)
+    
+    def after_save_instance(self, instance, row, **kwargs):
+        super().after_save_instance(instance, row, **kwargs)
+        if instance.is_active and instance.course.is_active:
+            self.conflict_index.add(get_slot(instance))
+        else:
+            self.conflict_index.remove(instance.pk)
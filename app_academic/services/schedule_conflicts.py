@@ -0,0 +1,297 @@
+"""
+Détection des conflits d'emploi du temps.
+
+Deux créneaux actifs d'une même année scolaire sont en conflit lorsqu'ils
+se chevauchent le même jour et partagent une salle, un enseignant (via
+Course.teacher) ou une classe. Les créneaux sont rangés dans des index
+d'intervalles, un par (année, jour, ressource), triés par heure de début.
+
+Un index construit une fois (import d'un fichier) vérifie ensuite chaque
+créneau par deux recherches dichotomiques. La vérification isolée d'un
+créneau (Schedule.clean) exécute une requête puis construit l'index des
+créneaux chargés, en O(m log m) pour m créneaux. Un emploi du temps
+complet est vérifié par balayage des créneaux triés.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from django.db.models import Q
+from django.utils.dateparse import parse_time
+from ..models import Schedule
+
+
+RESOURCE_CLASSROOM = 'classroom'
+RESOURCE_TEACHER = 'teacher'
+RESOURCE_CLASS = 'class'
+
+CONFLICT_MESSAGES = {
+    RESOURCE_CLASSROOM: "La salle est déjà occupée par le créneau « {schedule} ».",
+    RESOURCE_TEACHER: "L'enseignant a déjà le créneau « {schedule} ».",
+    RESOURCE_CLASS: "La classe a déjà le créneau « {schedule} ».",
+}
+
+SLOT_FIELDS = (
+    'id', 'course__academic_year_id', 'day_of_week', 'start_time', 'end_time',
+    'classroom_id', 'course__teacher_id', 'course__class_section_id'
+)
+
+
+def to_minutes(value):
+    """Convertit une heure (time ou chaîne HH:MM[:SS]) en minutes depuis minuit."""
+    if isinstance(value, str):
+        value = parse_time(value)
+    return value.hour * 60 + value.minute
+
+
+def get_slot(schedule):
+    """
+    Retourne le créneau d'un emploi du temps sous forme de dictionnaire.
+    
+    Args:
+        schedule: Instance du modèle Schedule (son cours doit exister)
+    
+    Returns:
+        dict: id, year_id, day, start, end (en minutes), classroom_id,
+        teacher_id, class_id
+    """
+    course = schedule.course
+    return {
+        'id': schedule.pk,
+        'year_id': course.academic_year_id,
+        'day': schedule.day_of_week,
+        'start': to_minutes(schedule.start_time),
+        'end': to_minutes(schedule.end_time),
+        'classroom_id': schedule.classroom_id,
+        'teacher_id': course.teacher_id,
+        'class_id': course.class_section_id,
+    }
+
+
+def _slot_from_values(row):
+    """Construit un créneau depuis une ligne values(*SLOT_FIELDS)."""
+    return {
+        'id': row['id'],
+        'year_id': row['course__academic_year_id'],
+        'day': row['day_of_week'],
+        'start': to_minutes(row['start_time']),
+        'end': to_minutes(row['end_time']),
+        'classroom_id': row['classroom_id'],
+        'teacher_id': row['course__teacher_id'],
+        'class_id': row['course__class_section_id'],
+    }
+
+
+def load_slots(queryset):
+    """
+    Charge en une requête les créneaux actifs d'un QuerySet de Schedule.
+    
+    Args:
+        queryset: QuerySet de Schedule
+    
+    Returns:
+        list: Créneaux (voir get_slot) triés par heure de début
+    """
+    return [
+        _slot_from_values(row)
+        for row in queryset.filter(is_active=True, course__is_active=True).order_by(
+            'start_time', 'id'
+        ).values(*SLOT_FIELDS)
+    ]
+
+
+def _slot_keys(slot):
+    """Retourne les clés d'index (année, jour, ressource, id) d'un créneau."""
+    keys = [
+        (slot['year_id'], slot['day'], RESOURCE_TEACHER, slot['teacher_id']),
+        (slot['year_id'], slot['day'], RESOURCE_CLASS, slot['class_id']),
+    ]
+    if slot['classroom_id']:
+        keys.append((slot['year_id'], slot['day'], RESOURCE_CLASSROOM, slot['classroom_id']))
+    return keys
+
+
+def _conflict(key, slot_id, other_id):
+    """Décrit un conflit entre deux créneaux sur une ressource."""
+    _, day, resource, resource_id = key
+    return {
+        'resource': resource,
+        'resource_id': resource_id,
+        'day_of_week': day,
+        'slot_id': slot_id,
+        'other_id': other_id,
+    }
+
+
+class ScheduleConflictIndex:
+    """
+    Index d'intervalles des créneaux par (année, jour, ressource).
+    
+    Chaque ressource garde ses créneaux triés par heure de début, ainsi que
+    la durée du plus long d'entre eux : un créneau ne peut chevaucher que
+    ceux qui commencent entre (début - durée maximale) et sa fin, que l'on
+    trouve par deux recherches dichotomiques.
+    """
+    
+    def __init__(self, slots=()):
+        # clé -> [heures de début, (début, fin, id), durée maximale]
+        self._buckets = {}
+        self._slots = {}
+        # Triés par début, les créneaux sont ajoutés en fin de liste
+        for slot in sorted(slots, key=lambda slot: slot['start']):
+            self.add(slot)
+    
+    @classmethod
+    def from_queryset(cls, queryset):
+        """
+        Construit l'index des créneaux actifs d'un QuerySet, en une requête.
+        
+        Args:
+            queryset: QuerySet de Schedule
+        
+        Returns:
+            ScheduleConflictIndex: Index des créneaux
+        """
+        return cls(load_slots(queryset))
+    
+    def __len__(self):
+        return len(self._slots)
+    
+    def add(self, slot):
+        """
+        Ajoute un créneau à l'index.
+        
+        Args:
+            slot: Créneau (voir get_slot)
+        """
+        if slot['id'] is not None:
+            self.remove(slot['id'])
+            self._slots[slot['id']] = slot
+        for key in _slot_keys(slot):
+            bucket = self._buckets.setdefault(key, [[], [], 0])
+            starts, entries, _ = bucket
+            position = bisect_right(starts, slot['start'])
+            starts.insert(position, slot['start'])
+            entries.insert(position, (slot['start'], slot['end'], slot['id']))
+            bucket[2] = max(bucket[2], slot['end'] - slot['start'])
+    
+    def remove(self, slot_id):
+        """
+        Retire un créneau de l'index, s'il y figure.
+        
+        Args:
+            slot_id: ID du créneau
+        """
+        slot = self._slots.pop(slot_id, None)
+        if slot is None:
+            return
+        for key in _slot_keys(slot):
+            starts, entries, _ = self._buckets[key]
+            position = entries.index((slot['start'], slot['end'], slot_id))
+            del starts[position]
+            del entries[position]
+    
+    def find_conflicts(self, slot):
+        """
+        Retourne les créneaux de l'index qui chevauchent un créneau.
+        
+        Le créneau lui-même (même ID) est ignoré, ce qui permet de vérifier
+        la modification d'un créneau déjà indexé.
+        
+        Args:
+            slot: Créneau (voir get_slot)
+        
+        Returns:
+            list: Conflits (resource, resource_id, day_of_week, slot_id, other_id)
+        """
+        conflicts = []
+        for key in _slot_keys(slot):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            starts, entries, max_length = bucket
+            low = bisect_right(starts, slot['start'] - max_length)
+            high = bisect_left(starts, slot['end'])
+            for start, end, other_id in entries[low:high]:
+                if end > slot['start'] and (other_id is None or other_id != slot['id']):
+                    conflicts.append(_conflict(key, slot['id'], other_id))
+        return conflicts
+
+
+def find_timetable_conflicts(slots):
+    """
+    Retourne tous les conflits d'un ensemble de créneaux.
+    
+    Les créneaux de chaque ressource sont triés par heure de début puis
+    balayés en gardant dans un tas les créneaux encore en cours.
+    
+    Args:
+        slots: Créneaux (voir get_slot)
+    
+    Returns:
+        list: Conflits (resource, resource_id, day_of_week, slot_id, other_id),
+        un par paire de créneaux et par ressource partagée
+    """
+    buckets = {}
+    for slot in slots:
+        for key in _slot_keys(slot):
+            buckets.setdefault(key, []).append(slot)
+    
+    conflicts = []
+    for key, bucket in buckets.items():
+        bucket.sort(key=lambda slot: slot['start'])
+        running = []
+        for position, slot in enumerate(bucket):
+            while running and running[0][0] <= slot['start']:
+                heapq.heappop(running)
+            for _, _, other_id in running:
+                conflicts.append(_conflict(key, slot['id'], other_id))
+            heapq.heappush(running, (slot['end'], position, slot['id']))
+    return conflicts
+
+
+def find_schedule_conflicts(schedule):
+    """
+    Retourne les conflits d'un créneau avec les créneaux enregistrés.
+    
+    Seuls les créneaux du même jour et de la même année partageant une
+    ressource avec le créneau sont chargés (une requête). Chaque appel
+    construit leur index, en O(m log m) pour m créneaux chargés : pour
+    vérifier de nombreux créneaux, réutiliser un ScheduleConflictIndex.
+    
+    Args:
+        schedule: Instance du modèle Schedule, enregistrée ou non
+    
+    Returns:
+        list: Conflits (voir ScheduleConflictIndex.find_conflicts)
+    """
+    slot = get_slot(schedule)
+    resources = Q(course__teacher_id=slot['teacher_id']) | Q(course__class_section_id=slot['class_id'])
+    if slot['classroom_id']:
+        resources |= Q(classroom_id=slot['classroom_id'])
+    queryset = Schedule.objects.filter(
+        resources,
+        day_of_week=slot['day'],
+        course__academic_year_id=slot['year_id']
+    )
+    if schedule.pk:
+        queryset = queryset.exclude(pk=schedule.pk)
+    return ScheduleConflictIndex.from_queryset(queryset).find_conflicts(slot)
+
+
+def get_conflict_messages(conflicts):
+    """
+    Rédige un message par conflit, en une requête.
+    
+    Args:
+        conflicts: Conflits retournés par la détection
+    
+    Returns:
+        list: Messages d'erreur
+    """
+    schedules = Schedule.objects.select_related(
+        'course__subject', 'course__class_section', 'course__academic_year'
+    ).in_bulk([conflict['other_id'] for conflict in conflicts])
+    return [
+        CONFLICT_MESSAGES[conflict['resource']].format(schedule=schedules.get(conflict['other_id'], '?'))
+        for conflict in conflicts
+    ]
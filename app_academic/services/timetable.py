@@ -0,0 +1,701 @@
+"""
+Génération automatique des emplois du temps.
+
+Chaque cours actif d'une année scolaire reçoit autant d'heures par semaine
+que le volume horaire de sa matière (Subject.weekly_hours), sur la grille
+TIMETABLE_DAYS x TIMETABLE_PERIODS : sans conflit de classe, d'enseignant
+ni de salle, dans les plages de disponibilité de l'enseignant
+(TeacherAvailability), dans une salle assez grande pour la classe et sans
+dépasser TIMETABLE_MAX_DAILY_HOURS heures d'un même cours par jour.
+
+Le solveur place une heure à la fois. Les créneaux encore possibles de
+chaque cours sont des masques de bits recalculés à chaque placement
+(propagation de contraintes) ; le cours qui a le moins de marge est placé
+en premier, sur le créneau le moins demandé par les cours de la même
+classe ou du même enseignant. Lorsqu'un cours n'a plus aucun créneau, les
+heures qui le bloquent sont retirées puis replacées (liste tabou), jusqu'à
+épuisement du budget de temps.
+"""
+
+import heapq
+import random
+import time
+from bisect import bisect_left
+from datetime import time as datetime_time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from ..models import ClassRoom, Course, Schedule, TeacherAvailability
+from .schedule_conflicts import (
+    RESOURCE_CLASS, RESOURCE_CLASSROOM, RESOURCE_TEACHER, load_slots, to_minutes
+)
+
+
+CONSTRAINT_WEEKLY_HOURS = 'weekly_hours'
+CONSTRAINT_CLASSROOM_CAPACITY = 'classroom_capacity'
+CONSTRAINT_TEACHER_AVAILABILITY = 'teacher_availability'
+CONSTRAINT_CLASS_LOAD = 'class_load'
+CONSTRAINT_DAILY_LIMIT = 'daily_limit'
+CONSTRAINT_CONFLICTS = 'conflicts'
+
+CONSTRAINT_MESSAGES = {
+    CONSTRAINT_WEEKLY_HOURS: "Aucun volume horaire hebdomadaire n'est défini pour la matière.",
+    CONSTRAINT_CLASSROOM_CAPACITY: "Aucune salle ne peut accueillir les {size} élèves de la classe.",
+    CONSTRAINT_TEACHER_AVAILABILITY: "L'enseignant n'est disponible que sur {available} créneau(x) pour {hours} heure(s).",
+    CONSTRAINT_CLASS_LOAD: "La classe n'a que {available} créneau(x) libre(s) pour {hours} heure(s).",
+    CONSTRAINT_DAILY_LIMIT: "{hours} heure(s) ne tiennent pas en {days} jour(s) à {limit} heure(s) par jour.",
+    CONSTRAINT_CONFLICTS: "{missing} heure(s) n'ont pas pu être placées sans conflit dans le budget de temps.",
+}
+
+TABU_TENURE = 12
+BATCH_SIZE = 500
+
+
+def get_timetable_grid(days=None, periods=None):
+    """
+    Retourne les créneaux de la grille hebdomadaire.
+    
+    Args:
+        days: Jours de la semaine (défaut : TIMETABLE_DAYS)
+        periods: Plages (début, fin) au format HH:MM (défaut : TIMETABLE_PERIODS)
+    
+    Returns:
+        list: Créneaux (jour, début, fin), heures en minutes depuis minuit
+    """
+    days = settings.TIMETABLE_DAYS if days is None else days
+    periods = settings.TIMETABLE_PERIODS if periods is None else periods
+    return [(day, to_minutes(start), to_minutes(end)) for day in days for start, end in periods]
+
+
+def grid_mask(grid, day, start, end, contained=False):
+    """
+    Retourne le masque des créneaux de la grille touchés par une plage.
+    
+    Args:
+        grid: Créneaux (voir get_timetable_grid)
+        day: Jour de la semaine
+        start: Début de la plage en minutes
+        end: Fin de la plage en minutes
+        contained: True pour ne garder que les créneaux inclus dans la plage,
+            False pour tous ceux qui la chevauchent
+    
+    Returns:
+        int: Masque de bits (bit i : créneau i de la grille)
+    """
+    mask = 0
+    for index, (slot_day, slot_start, slot_end) in enumerate(grid):
+        if slot_day != day:
+            continue
+        if contained:
+            touched = start <= slot_start and slot_end <= end
+        else:
+            touched = slot_start < end and start < slot_end
+        if touched:
+            mask |= 1 << index
+    return mask
+
+
+def _bits(mask):
+    """Itère sur les positions des bits à 1 d'un masque."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class TimetableSolver:
+    """
+    Solveur d'emploi du temps hebdomadaire sur une grille de créneaux.
+    
+    Les données sont de simples dictionnaires, ce qui permet de l'utiliser
+    sans base de données (voir la commande benchmark_timetable).
+    
+    Args:
+        grid: Créneaux (voir get_timetable_grid)
+        courses: Cours à planifier : id, class_id, teacher_id, hours, size
+            (effectif de la classe), classroom_id (salle de la classe, optionnelle)
+            et available (masque des créneaux où l'enseignant est disponible,
+            None : toute la semaine)
+        rooms: Salles disponibles (id, capacity). Sans salle, les heures sont
+            placées sans salle.
+        busy: Masques des créneaux déjà occupés par ressource,
+            {(resource, resource_id): masque}
+        max_daily_hours: Heures d'un même cours par jour (None : sans limite)
+        seed: Graine du tirage aléatoire départageant les ex aequo
+    """
+    
+    def __init__(self, grid, courses, rooms=(), busy=None, max_daily_hours=None, seed=0):
+        self.grid = grid
+        self.full = (1 << len(grid)) - 1
+        self.slot_days = [day for day, _, _ in grid]
+        self.day_masks = {}
+        for index, day in enumerate(self.slot_days):
+            self.day_masks[day] = self.day_masks.get(day, 0) | 1 << index
+        self.max_daily_hours = max_daily_hours or len(grid)
+        self.random = random.Random(seed)
+        busy = busy or {}
+        
+        # Salles triées par capacité : le rang k donne accès aux salles k et suivantes
+        self.rooms = sorted(rooms, key=lambda room: (room['capacity'], room['id']))
+        self.use_rooms = bool(self.rooms)
+        capacities = [room['capacity'] for room in self.rooms]
+        positions = {room['id']: position for position, room in enumerate(self.rooms)}
+        self.room_busy = [busy.get((RESOURCE_CLASSROOM, room['id']), 0) for room in self.rooms]
+        self.room_free = [0] * (len(self.rooms) + 1)
+        self._refresh_rooms(len(self.rooms) - 1)
+        
+        self.courses = list(courses)
+        self.class_busy = {}
+        self.teacher_busy = {}
+        self.class_at = {}
+        self.teacher_at = {}
+        self.room_at = {}
+        self.available = []
+        self.tiers = []
+        self.home_rooms = []
+        by_class = {}
+        by_teacher = {}
+        for index, course in enumerate(self.courses):
+            class_key, teacher_key = course['class_id'], course['teacher_id']
+            self.class_busy.setdefault(class_key, busy.get((RESOURCE_CLASS, class_key), 0))
+            self.teacher_busy.setdefault(teacher_key, busy.get((RESOURCE_TEACHER, teacher_key), 0))
+            available = course.get('available')
+            self.available.append(self.full if available is None else available & self.full)
+            tier = bisect_left(capacities, course.get('size') or 0)
+            self.tiers.append(tier if tier < len(self.rooms) else None)
+            home = positions.get(course.get('classroom_id'))
+            self.home_rooms.append(home if home is not None and tier <= home else None)
+            by_class.setdefault(class_key, set()).add(index)
+            by_teacher.setdefault(teacher_key, set()).add(index)
+        self.neighbours = [
+            (by_class[course['class_id']] | by_teacher[course['teacher_id']]) - {index}
+            for index, course in enumerate(self.courses)
+        ]
+        # Créneaux libres et heures à placer par enseignant et par classe, pour le rapport
+        self.teacher_load = {
+            teacher_key: (
+                self.full & ~self.teacher_busy[teacher_key] & self._union(self.available[i] for i in indexes),
+                sum(self.courses[i]['hours'] for i in indexes),
+            )
+            for teacher_key, indexes in by_teacher.items()
+        }
+        self.class_load = {
+            class_key: (
+                self.full & ~self.class_busy[class_key],
+                sum(self.courses[i]['hours'] for i in indexes),
+            )
+            for class_key, indexes in by_class.items()
+        }
+        
+        self.placed = [{} for _ in self.courses]
+        self.day_counts = [{} for _ in self.courses]
+        self.remaining = [course['hours'] for course in self.courses]
+        self.versions = [0] * len(self.courses)
+        self.tabu = {}
+        self.heap = []
+    
+    @staticmethod
+    def _union(masks):
+        """Union de masques de créneaux."""
+        union = 0
+        for mask in masks:
+            union |= mask
+        return union
+    
+    def _refresh_rooms(self, position):
+        """Recalcule les créneaux libres des rangs de salles jusqu'à position."""
+        for rank in range(position, -1, -1):
+            self.room_free[rank] = (self.full & ~self.room_busy[rank]) | self.room_free[rank + 1]
+    
+    def _capped_days(self, index):
+        """Masque des jours où le cours a atteint sa limite quotidienne."""
+        mask = 0
+        for day, count in self.day_counts[index].items():
+            if count >= self.max_daily_hours:
+                mask |= self.day_masks[day]
+        return mask
+    
+    def domain(self, index, rooms=True):
+        """
+        Retourne les créneaux où une heure du cours peut encore être placée.
+        
+        Args:
+            index: Rang du cours
+            rooms: False pour ignorer l'occupation des salles
+        
+        Returns:
+            int: Masque des créneaux possibles
+        """
+        course = self.courses[index]
+        mask = (
+            self.available[index]
+            & ~self.class_busy[course['class_id']]
+            & ~self.teacher_busy[course['teacher_id']]
+            & ~self._capped_days(index)
+        )
+        if rooms and self.use_rooms:
+            tier = self.tiers[index]
+            mask = 0 if tier is None else mask & self.room_free[tier]
+        return mask
+    
+    def _pick_room(self, index, bit):
+        """Choisit la salle de la classe si elle est libre, sinon la plus petite salle adaptée."""
+        home = self.home_rooms[index]
+        if home is not None and not self.room_busy[home] & bit:
+            return home
+        for rank in range(self.tiers[index], len(self.rooms)):
+            if not self.room_busy[rank] & bit:
+                return rank
+        return None
+    
+    def _make_room(self, index, slot):
+        """
+        Libère une salle adaptée au cours sur un créneau, sans retirer d'heure.
+        
+        Une heure placée dans une salle assez grande pour le cours est
+        déplacée, sur le même créneau, vers une salle libre plus petite qui
+        convient encore à sa classe.
+        
+        Returns:
+            bool: True si une salle a été libérée
+        """
+        bit = 1 << slot
+        tier = self.tiers[index]
+        for rank in range(tier, len(self.rooms)):
+            other = self.room_at.get((rank, slot))
+            if other is None:
+                continue
+            for smaller in range(self.tiers[other], tier):
+                if not self.room_busy[smaller] & bit:
+                    self.room_busy[rank] &= ~bit
+                    del self.room_at[rank, slot]
+                    self.room_busy[smaller] |= bit
+                    self.room_at[smaller, slot] = other
+                    self.placed[other][slot] = smaller
+                    self._refresh_rooms(rank)
+                    return True
+        return False
+    
+    def _place(self, index, slot):
+        """Place une heure du cours sur un créneau libre."""
+        course = self.courses[index]
+        bit = 1 << slot
+        room = None
+        if self.use_rooms:
+            room = self._pick_room(index, bit)
+            self.room_busy[room] |= bit
+            self.room_at[room, slot] = index
+            self._refresh_rooms(room)
+        self.class_busy[course['class_id']] |= bit
+        self.teacher_busy[course['teacher_id']] |= bit
+        self.class_at[course['class_id'], slot] = index
+        self.teacher_at[course['teacher_id'], slot] = index
+        self.placed[index][slot] = room
+        self.remaining[index] -= 1
+        day = self.slot_days[slot]
+        self.day_counts[index][day] = self.day_counts[index].get(day, 0) + 1
+    
+    def _unplace(self, index, slot):
+        """Retire une heure placée du cours."""
+        course = self.courses[index]
+        bit = 1 << slot
+        room = self.placed[index].pop(slot)
+        if room is not None:
+            self.room_busy[room] &= ~bit
+            del self.room_at[room, slot]
+            self._refresh_rooms(room)
+        self.class_busy[course['class_id']] &= ~bit
+        self.teacher_busy[course['teacher_id']] &= ~bit
+        del self.class_at[course['class_id'], slot]
+        del self.teacher_at[course['teacher_id'], slot]
+        self.remaining[index] += 1
+        self.day_counts[index][self.slot_days[slot]] -= 1
+    
+    def _push(self, index):
+        """(Ré)inscrit un cours dans la file, classé par marge croissante."""
+        if self.remaining[index] <= 0:
+            return
+        self.versions[index] += 1
+        slack = self.domain(index).bit_count() - self.remaining[index]
+        heapq.heappush(self.heap, (
+            slack, -self.remaining[index], self.random.random(), self.versions[index], index
+        ))
+    
+    def _choose_slot(self, index, domain):
+        """
+        Choisit le créneau d'une heure parmi les créneaux possibles.
+        
+        Les heures d'un cours sont réparties sur des jours différents, puis
+        on préfère le créneau le moins demandé par les cours voisins.
+        """
+        neighbour_domains = [
+            self.domain(other) for other in self.neighbours[index] if self.remaining[other] > 0
+        ]
+        day_counts = self.day_counts[index]
+        best_key, best_slot = None, None
+        for slot in _bits(domain):
+            bit = 1 << slot
+            demand = sum(1 for mask in neighbour_domains if mask & bit)
+            key = (day_counts.get(self.slot_days[slot], 0), demand, self.random.random())
+            if best_key is None or key < best_key:
+                best_key, best_slot = key, slot
+        return best_slot
+    
+    def _blockers(self, index, slot):
+        """
+        Retourne les cours à retirer d'un créneau pour y placer le cours.
+        
+        Returns:
+            set ou None: Rangs des cours bloquants, None si le créneau est
+            occupé par un emploi du temps déjà enregistré
+        """
+        course = self.courses[index]
+        bit = 1 << slot
+        blockers = set()
+        for occupied, busy, key in (
+            (self.class_at, self.class_busy[course['class_id']], (course['class_id'], slot)),
+            (self.teacher_at, self.teacher_busy[course['teacher_id']], (course['teacher_id'], slot)),
+        ):
+            if busy & bit:
+                other = occupied.get(key)
+                if other is None:
+                    return None
+                blockers.add(other)
+        
+        if self.use_rooms and not self.room_free[self.tiers[index]] & bit:
+            tier = self.tiers[index]
+            if any(self.placed[other][slot] >= tier for other in blockers):
+                return blockers
+            for rank in range(tier, len(self.rooms)):
+                other = self.room_at.get((rank, slot))
+                if other is not None:
+                    blockers.add(other)
+                    return blockers
+            return None
+        return blockers
+    
+    def _eject(self, index, iteration):
+        """
+        Libère un créneau pour un cours sans créneau possible.
+        
+        Le créneau retenu est celui dont les heures à retirer peuvent le plus
+        souvent être replacées aussitôt, puis qui en demande le moins ;
+        les heures retirées ne peuvent pas y revenir pendant TABU_TENURE
+        itérations (sauf s'il n'existe aucun autre créneau) et sont remises
+        dans la file.
+        
+        Returns:
+            bool: False si aucun créneau ne peut être libéré
+        """
+        own = 0
+        for slot in self.placed[index]:
+            own |= 1 << slot
+        candidates = self.available[index] & ~own & ~self._capped_days(index)
+        
+        best_key, best_slot, best_blockers = None, None, None
+        for slot in _bits(candidates):
+            blockers = self._blockers(index, slot)
+            if blockers is None:
+                continue
+            tabu = self.tabu.get((index, slot), 0) > iteration
+            stuck = sum(1 for other in blockers if not self.domain(other))
+            key = (tabu, stuck, len(blockers), self.random.random())
+            if best_key is None or key < best_key:
+                best_key, best_slot, best_blockers = key, slot, blockers
+        if best_slot is None:
+            return False
+        
+        for other in best_blockers:
+            self._unplace(other, best_slot)
+            self.tabu[other, best_slot] = iteration + TABU_TENURE + self.random.randrange(TABU_TENURE)
+        self._place(index, best_slot)
+        for other in best_blockers:
+            self._push(other)
+            for neighbour in self.neighbours[other]:
+                self._push(neighbour)
+        return True
+    
+    def _unsatisfied(self, index, missing):
+        """Décrit la contrainte qui empêche de placer les heures restantes d'un cours."""
+        course = self.courses[index]
+        hours = course['hours']
+        days = len(self.day_masks)
+        teacher_free, teacher_hours = self.teacher_load[course['teacher_id']]
+        class_free, class_hours = self.class_load[course['class_id']]
+        if self.use_rooms and self.tiers[index] is None:
+            constraint, values = CONSTRAINT_CLASSROOM_CAPACITY, {'size': course.get('size') or 0}
+        elif (self.available[index] & teacher_free).bit_count() < hours or teacher_free.bit_count() < teacher_hours:
+            constraint, values = CONSTRAINT_TEACHER_AVAILABILITY, {
+                'available': teacher_free.bit_count(), 'hours': max(hours, teacher_hours)
+            }
+        elif class_free.bit_count() < class_hours:
+            constraint, values = CONSTRAINT_CLASS_LOAD, {'available': class_free.bit_count(), 'hours': class_hours}
+        elif hours > days * self.max_daily_hours:
+            constraint, values = CONSTRAINT_DAILY_LIMIT, {'hours': hours, 'days': days, 'limit': self.max_daily_hours}
+        else:
+            constraint, values = CONSTRAINT_CONFLICTS, {'missing': missing}
+        return {
+            'course_id': course['id'],
+            'constraint': constraint,
+            'missing_hours': missing,
+            'message': CONSTRAINT_MESSAGES[constraint].format(**values),
+        }
+    
+    def solve(self, time_budget=None, max_iterations=None):
+        """
+        Place les heures de tous les cours.
+        
+        Les retraits d'heures pouvant faire reculer la solution, la meilleure
+        affectation rencontrée est conservée et retournée.
+        
+        Args:
+            time_budget: Durée maximale de la recherche en secondes (None : sans limite)
+            max_iterations: Nombre maximal d'itérations (défaut : 50 par heure à placer)
+        
+        Returns:
+            dict: lessons (course_id, day, start, end, classroom_id), unsatisfied
+            (une entrée par cours incomplet), placed, hours, iterations,
+            elapsed (secondes) et timed_out
+        """
+        started = time.monotonic()
+        deadline = started + time_budget if time_budget else None
+        hours = sum(self.remaining)
+        if max_iterations is None:
+            max_iterations = 50 * hours + 100
+        failed = set()
+        for index in range(len(self.courses)):
+            if self.use_rooms and self.tiers[index] is None:
+                failed.add(index)
+            else:
+                self._push(index)
+        
+        best, best_count = None, 0
+        stuck = {}
+        iteration = 0
+        timed_out = False
+        while self.heap or stuck:
+            if self.heap:
+                _, _, _, version, index = heapq.heappop(self.heap)
+                if version != self.versions[index]:
+                    continue
+                repair = False
+            else:
+                # Plus aucun cours plaçable : réparation des cours bloqués, dans l'ordre
+                index = next(iter(stuck))
+                del stuck[index]
+                repair = True
+            if self.remaining[index] <= 0 or index in failed:
+                continue
+            iteration += 1
+            if iteration > max_iterations or (
+                deadline is not None and iteration % 32 == 0 and time.monotonic() > deadline
+            ):
+                timed_out = True
+                break
+            domain = self.domain(index)
+            if not domain and self.use_rooms:
+                for slot in _bits(self.domain(index, rooms=False)):
+                    if self._make_room(index, slot):
+                        domain = 1 << slot
+                        break
+            if domain:
+                self._place(index, self._choose_slot(index, domain))
+            elif not repair:
+                stuck[index] = True
+                continue
+            else:
+                placed_count = hours - sum(self.remaining)
+                if placed_count > best_count:
+                    best, best_count = [dict(placed) for placed in self.placed], placed_count
+                if not self._eject(index, iteration):
+                    failed.add(index)
+                    continue
+            self._push(index)
+            for neighbour in self.neighbours[index]:
+                self._push(neighbour)
+        
+        if best is None or hours - sum(self.remaining) >= best_count:
+            best = self.placed
+        lessons = []
+        for index, placed in enumerate(best):
+            for slot, room in sorted(placed.items()):
+                day, start, end = self.grid[slot]
+                lessons.append({
+                    'course_id': self.courses[index]['id'],
+                    'day': day,
+                    'start': start,
+                    'end': end,
+                    'classroom_id': self.rooms[room]['id'] if room is not None else None,
+                })
+        return {
+            'lessons': lessons,
+            'unsatisfied': [
+                self._unsatisfied(index, course['hours'] - len(best[index]))
+                for index, course in enumerate(self.courses) if len(best[index]) < course['hours']
+            ],
+            'placed': len(lessons),
+            'hours': hours,
+            'iterations': iteration,
+            'elapsed': round(time.monotonic() - started, 3),
+            'timed_out': timed_out,
+        }
+
+
+def _as_time(minutes):
+    """Convertit des minutes depuis minuit en heure."""
+    return datetime_time(minutes // 60, minutes % 60)
+
+
+def load_timetable_problem(academic_year_id, class_ids=None, grid=None):
+    """
+    Charge les données du solveur pour une année scolaire (quatre requêtes).
+    
+    Les cours des classes actives dont la matière a un volume horaire sont
+    à planifier. L'effectif d'une classe est son nombre d'élèves actifs, ou
+    sa capacité si aucun élève n'y est encore inscrit. Les créneaux actifs
+    des autres cours de l'année sont conservés et occupent leurs ressources.
+    
+    Args:
+        academic_year_id: ID de l'année scolaire
+        class_ids: IDs des classes à planifier (None : toutes les classes)
+        grid: Créneaux (défaut : get_timetable_grid())
+    
+    Returns:
+        dict: grid, courses, rooms, busy (voir TimetableSolver) et skipped
+        (IDs des cours sans volume horaire)
+    """
+    grid = get_timetable_grid() if grid is None else grid
+    queryset = Course.objects.filter(
+        academic_year_id=academic_year_id,
+        is_active=True,
+        class_section__is_active=True,
+        subject__is_active=True
+    )
+    if class_ids is not None:
+        queryset = queryset.filter(class_section_id__in=class_ids)
+    rows = queryset.annotate(
+        students_count=Count('class_section__students', filter=Q(class_section__students__is_active=True))
+    ).values(
+        'id', 'class_section_id', 'teacher_id', 'subject__weekly_hours',
+        'class_section__capacity', 'class_section__classroom_id', 'students_count'
+    ).order_by('class_section_id', 'id')
+    
+    courses = []
+    skipped = []
+    for row in rows:
+        if not row['subject__weekly_hours']:
+            skipped.append(row['id'])
+            continue
+        courses.append({
+            'id': row['id'],
+            'class_id': row['class_section_id'],
+            'teacher_id': row['teacher_id'],
+            'hours': row['subject__weekly_hours'],
+            'size': row['students_count'] or row['class_section__capacity'],
+            'classroom_id': row['class_section__classroom_id'],
+            'available': None,
+        })
+    
+    availability = {}
+    for teacher_id, day, start, end in TeacherAvailability.objects.filter(
+        teacher_id__in={course['teacher_id'] for course in courses},
+        is_active=True
+    ).values_list('teacher_id', 'day_of_week', 'start_time', 'end_time'):
+        availability[teacher_id] = availability.get(teacher_id, 0) | grid_mask(
+            grid, day, to_minutes(start), to_minutes(end), contained=True
+        )
+    for course in courses:
+        course['available'] = availability.get(course['teacher_id'])
+    
+    busy = {}
+    fixed = Schedule.objects.filter(course__academic_year_id=academic_year_id).exclude(
+        course_id__in=[course['id'] for course in courses]
+    )
+    for slot in load_slots(fixed):
+        mask = grid_mask(grid, slot['day'], slot['start'], slot['end'])
+        keys = [(RESOURCE_TEACHER, slot['teacher_id']), (RESOURCE_CLASS, slot['class_id'])]
+        if slot['classroom_id']:
+            keys.append((RESOURCE_CLASSROOM, slot['classroom_id']))
+        for key in keys:
+            busy[key] = busy.get(key, 0) | mask
+    
+    rooms = list(ClassRoom.objects.filter(is_active=True).values('id', 'capacity'))
+    return {'grid': grid, 'courses': courses, 'rooms': rooms, 'busy': busy, 'skipped': skipped}
+
+
+def generate_timetable(academic_year_id, class_ids=None, time_budget=None, seed=0, commit=True,
+                       allow_partial=False):
+    """
+    Génère l'emploi du temps hebdomadaire d'une année scolaire.
+    
+    Les créneaux des cours planifiés sont remplacés en une transaction :
+    suppression puis insertion par lots (bulk_create, sans Schedule.clean :
+    le solveur ne produit aucun conflit). Les heures qui n'ont pas pu être
+    placées sont signalées dans unsatisfied.
+    
+    Si des heures n'ont pas pu être placées ou si le budget de temps est
+    épuisé, rien n'est enregistré (committed vaut False) : l'emploi du temps
+    existant est conservé, sauf avec allow_partial.
+    
+    Args:
+        academic_year_id: ID de l'année scolaire
+        class_ids: IDs des classes à planifier (None : toute l'école)
+        time_budget: Durée maximale de la recherche en secondes
+            (défaut : TIMETABLE_TIME_BUDGET)
+        seed: Graine du tirage aléatoire
+        commit: False pour calculer l'emploi du temps sans l'enregistrer
+        allow_partial: True pour enregistrer un emploi du temps incomplet
+    
+    Returns:
+        dict: courses, hours, placed, written, committed, unsatisfied,
+        iterations, elapsed et timed_out
+    """
+    if time_budget is None:
+        time_budget = settings.TIMETABLE_TIME_BUDGET
+    problem = load_timetable_problem(academic_year_id, class_ids)
+    solver = TimetableSolver(
+        problem['grid'],
+        problem['courses'],
+        problem['rooms'],
+        busy=problem['busy'],
+        max_daily_hours=settings.TIMETABLE_MAX_DAILY_HOURS,
+        seed=seed
+    )
+    result = solver.solve(time_budget)
+    
+    written = 0
+    committed = commit and (allow_partial or not (result['unsatisfied'] or result['timed_out']))
+    if committed:
+        with transaction.atomic():
+            Schedule.objects.filter(course_id__in=[course['id'] for course in problem['courses']]).delete()
+            written = len(Schedule.objects.bulk_create([
+                Schedule(
+                    course_id=lesson['course_id'],
+                    day_of_week=lesson['day'],
+                    start_time=_as_time(lesson['start']),
+                    end_time=_as_time(lesson['end']),
+                    classroom_id=lesson['classroom_id'],
+                )
+                for lesson in result['lessons']
+            ], batch_size=BATCH_SIZE))
+    
+    unsatisfied = [
+        {
+            'course_id': course_id,
+            'constraint': CONSTRAINT_WEEKLY_HOURS,
+            'missing_hours': 0,
+            'message': CONSTRAINT_MESSAGES[CONSTRAINT_WEEKLY_HOURS],
+        }
+        for course_id in problem['skipped']
+    ] + result['unsatisfied']
+    return {
+        'courses': len(problem['courses']),
+        'hours': result['hours'],
+        'placed': result['placed'],
+        'written': written,
+        'committed': committed,
+        'unsatisfied': unsatisfied,
+        'iterations': result['iterations'],
+        'elapsed': result['elapsed'],
+        'timed_out': result['timed_out'],
+    }
@@ -0,0 +1,39 @@
+"""
+Tâches Celery pour l'application app_academic.
+
+Ce module contient la génération automatique des emplois du temps, exécutée
+par un worker avec un budget de temps (TIMETABLE_TIME_BUDGET).
+"""
+
+from celery import shared_task
+from django.db import DatabaseError
+from .services.timetable import generate_timetable
+
+
+@shared_task(
+    name='app_academic.generate_timetable',
+    acks_late=True,
+    autoretry_for=(DatabaseError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def generate_timetable_task(academic_year_id, class_ids=None, time_budget=None, seed=0, allow_partial=False):
+    """
+    Génère et enregistre l'emploi du temps d'une année scolaire.
+    
+    Les créneaux des cours planifiés sont remplacés en une transaction : la
+    tâche peut être relancée après l'arrêt d'un worker. Un emploi du temps
+    incomplet n'est enregistré qu'avec allow_partial.
+    
+    Args:
+        academic_year_id (int): ID de l'année scolaire
+        class_ids (list): IDs des classes à planifier (None : toute l'école)
+        time_budget (float): Durée maximale de la recherche en secondes
+            (défaut : TIMETABLE_TIME_BUDGET)
+        seed (int): Graine du tirage aléatoire
+        allow_partial (bool): Enregistrer même si des heures n'ont pas été placées
+    
+    Returns:
+        dict: Résumé de la génération, dont les contraintes non satisfaites
+    """
+    return generate_timetable(academic_year_id, class_ids, time_budget, seed, allow_partial=allow_partial)
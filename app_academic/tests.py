@@ -5,13 +5,18 @@ Ce module contient les tests pour tous les modèles académiques.
 """
 
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
 from django.utils import timezone
 from datetime import date, timedelta
+from app_config.permissions import assign_permission
+from app_config.models import Permission
 from .models import (
     AcademicYear, Grade, ClassRoom, Class, Subject, Course, Schedule
 )
-from app_profile.models import Profile, Teacher
+from app_profile.models import Profile, Student, Teacher
 
 
 class AcademicYearTestCase(TestCase):
@@ -244,6 +249,79 @@ class ClassTestCase(TestCase):
         
         count = self.class_section.get_students_count()
         self.assertEqual(count, 1)
+    
+    def create_students(self, class_section, count, is_active=True):
+        """Inscrit des élèves dans une classe."""
+        for _ in range(count):
+            user = User.objects.create_user(
+                username=f'student{Student.objects.count()}', password='testpass123'
+            )
+            Student.objects.create(
+                profile=Profile.objects.get(user=user),
+                class_section=class_section,
+                academic_year=self.academic_year,
+                is_active=is_active
+            )
+    
+    def create_class(self, code, capacity, classroom=None):
+        """Crée une classe active de l'année de test."""
+        return Class.objects.create(
+            name=code, code=code, grade=self.grade, academic_year=self.academic_year,
+            classroom=classroom, capacity=capacity, is_active=True
+        )
+    
+    def test_with_student_counts(self):
+        """Test l'effectif et les places disponibles annotés en une requête."""
+        self.create_students(self.class_section, 2)
+        self.create_students(self.class_section, 1, is_active=False)
+        # Salle plus petite que la classe, classe sans salle, classe surchargée
+        small_room = ClassRoom.objects.create(name='Salle 102', capacity=20, is_active=True)
+        self.create_students(self.create_class('6B', 25, small_room), 3)
+        self.create_class('6C', 28)
+        self.create_students(self.create_class('6D', 1), 2)
+        
+        with self.assertNumQueries(1):
+            classes = {
+                class_obj.code: (class_obj.students_count, class_obj.seat_capacity, class_obj.available_seats)
+                for class_obj in Class.objects.with_student_counts()
+            }
+        self.assertEqual(classes, {
+            '6A-2024': (2, 30, 28),
+            '6B': (3, 20, 17),
+            '6C': (0, 28, 28),
+            '6D': (2, 1, 0),
+        })
+        
+        class_obj = Class.objects.with_student_counts().get(pk=self.class_section.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(class_obj.get_students_count(), 2)
+    
+    def test_views_and_admin_use_student_counts(self):
+        """Test que la liste, le détail et l'administration ne comptent pas les élèves classe par classe."""
+        Permission.objects.create(name='view_class', codename='view_class', resource='app_academic', action='view')
+        assign_permission(self.user.profile, 'view_class')
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.create_students(self.class_section, 2)
+        urls = [reverse('app_academic:class_list'), reverse('admin:app_academic_class_changelist')]
+        
+        def count_queries(url):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+        
+        # Premier passage : mise en cache des permissions
+        for url in urls:
+            count_queries(url)
+        counts = [count_queries(url) for url in urls]
+        for code in ('6B', '6C', '6D'):
+            self.create_students(self.create_class(code, 25, self.classroom), 1)
+        self.assertEqual([count_queries(url) for url in urls], counts)
+        
+        response = self.client.get(reverse('app_academic:class_detail', kwargs={'pk': self.class_section.pk}))
+        self.assertContains(response, '<td>28 / 30</td>', html=True)
 
 
 class SubjectTestCase(TestCase):
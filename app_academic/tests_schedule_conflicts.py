@@ -0,0 +1,253 @@
+"""
+Tests unitaires pour la détection des conflits d'emploi du temps.
+
+Ce module vérifie l'index d'intervalles par ressource, le balayage d'un
+emploi du temps complet, la validation des créneaux dans les vues, l'import
+de l'administration et la commande check_schedule_conflicts.
+"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from datetime import date, time
+from io import StringIO
+from random import Random
+from tablib import Dataset
+from app_config.permissions import assign_permission
+from app_config.models import Permission
+from .models import AcademicYear, Grade, ClassRoom, Class, Subject, Course, Schedule
+from .resources import ScheduleResource
+from .services.schedule_conflicts import (
+    ScheduleConflictIndex, find_schedule_conflicts, find_timetable_conflicts, load_slots
+)
+from app_profile.models import Profile, Teacher
+
+
+def brute_force_conflicts(slots):
+    """Paires de créneaux en conflit, comparées deux à deux."""
+    pairs = set()
+    for i, slot in enumerate(slots):
+        for other in slots[:i]:
+            if slot['year_id'] != other['year_id'] or slot['day'] != other['day']:
+                continue
+            if not (slot['start'] < other['end'] and other['start'] < slot['end']):
+                continue
+            shared = [
+                resource for resource, field in (
+                    ('teacher', 'teacher_id'), ('class', 'class_id'), ('classroom', 'classroom_id')
+                )
+                if slot[field] and slot[field] == other[field]
+            ]
+            for resource in shared:
+                pairs.add((resource, frozenset((slot['id'], other['id']))))
+    return pairs
+
+
+class ScheduleConflictTestCase(TestCase):
+    """Tests pour la détection des conflits d'emploi du temps."""
+    
+    def setUp(self):
+        """Préparation des données de test."""
+        self.academic_year = AcademicYear.objects.create(
+            name='2024-2025',
+            start_date=date(2024, 9, 1),
+            end_date=date(2025, 6, 30),
+            is_current=True,
+            is_active=True
+        )
+        self.grade = Grade.objects.create(name='6ème', code='6EME', order=6, is_active=True)
+        self.classes = [
+            Class.objects.create(
+                name=code, code=code, grade=self.grade,
+                academic_year=self.academic_year, capacity=30, is_active=True
+            )
+            for code in ('6A', '6B')
+        ]
+        self.teachers = [self.create_teacher(f'teacher{i}') for i in range(2)]
+        self.rooms = [ClassRoom.objects.create(name=f'Salle {i}', capacity=30, is_active=True) for i in range(2)]
+        math = Subject.objects.create(name='Mathématiques', code='MATH', coefficient=3.0, is_active=True)
+        french = Subject.objects.create(name='Français', code='FR', coefficient=2.0, is_active=True)
+        # Cours : 6A maths (enseignant 0), 6A français (enseignant 1), 6B maths (enseignant 0)
+        self.math_a = self.create_course(math, self.classes[0], self.teachers[0])
+        self.french_a = self.create_course(french, self.classes[0], self.teachers[1])
+        self.math_b = self.create_course(math, self.classes[1], self.teachers[0])
+        self.monday = self.create_schedule(self.math_a, 0, '08:00', '10:00', self.rooms[0])
+    
+    def create_teacher(self, username):
+        """Crée un enseignant actif."""
+        user = User.objects.create_user(username=username, password='testpass123')
+        profile = Profile.objects.get(user=user)
+        profile.full_name = username.capitalize()
+        profile.save()
+        return Teacher.objects.create(profile=profile, is_active=True)
+    
+    def create_course(self, subject, class_section, teacher):
+        """Crée un cours de l'année de test."""
+        return Course.objects.create(
+            subject=subject, class_section=class_section, teacher=teacher,
+            academic_year=self.academic_year, is_active=True
+        )
+    
+    def create_schedule(self, course, day, start, end, classroom=None):
+        """Enregistre un créneau sans validation."""
+        return Schedule.objects.create(
+            course=course, day_of_week=day, start_time=start, end_time=end, classroom=classroom
+        )
+    
+    def conflicts_for(self, course, day, start, end, classroom=None):
+        """Ressources en conflit pour un nouveau créneau."""
+        schedule = Schedule(
+            course=course, day_of_week=day, start_time=time.fromisoformat(start),
+            end_time=time.fromisoformat(end), classroom=classroom
+        )
+        return sorted(conflict['resource'] for conflict in find_schedule_conflicts(schedule))
+    
+    def test_single_slot_conflicts(self):
+        """Test les conflits de salle, d'enseignant et de classe d'un créneau."""
+        # Même classe et même enseignant
+        self.assertEqual(self.conflicts_for(self.math_a, 0, '09:00', '10:00'), ['class', 'teacher'])
+        # Même classe, autre enseignant, même salle
+        self.assertEqual(self.conflicts_for(self.french_a, 0, '09:30', '11:00', self.rooms[0]), ['class', 'classroom'])
+        # Même enseignant dans une autre classe
+        self.assertEqual(self.conflicts_for(self.math_b, 0, '07:00', '08:30', self.rooms[1]), ['teacher'])
+        # Créneaux contigus, autre jour, autre salle
+        self.assertEqual(self.conflicts_for(self.math_a, 0, '10:00', '11:00', self.rooms[0]), [])
+        self.assertEqual(self.conflicts_for(self.math_a, 1, '08:00', '10:00', self.rooms[0]), [])
+        self.assertEqual(self.conflicts_for(self.french_a, 0, '06:00', '08:00', self.rooms[0]), [])
+        
+        # Un créneau ne se gêne pas lui-même, et un créneau inactif ne gêne personne
+        self.assertEqual(find_schedule_conflicts(self.monday), [])
+        self.monday.is_active = False
+        self.monday.save()
+        self.assertEqual(self.conflicts_for(self.math_a, 0, '09:00', '10:00'), [])
+        
+        schedule = Schedule(course=self.math_a, day_of_week=0, start_time=time(8), end_time=time(9))
+        with self.assertNumQueries(1):
+            find_schedule_conflicts(schedule)
+    
+    def test_index_matches_brute_force(self):
+        """Test que l'index et le balayage trouvent les mêmes conflits qu'une comparaison exhaustive."""
+        rng = Random(7)
+        slots = []
+        for slot_id in range(400):
+            start = rng.randrange(7 * 60, 17 * 60, 15)
+            slots.append({
+                'id': slot_id,
+                'year_id': 1,
+                'day': rng.randrange(5),
+                'start': start,
+                'end': start + rng.choice([30, 60, 60, 120]),
+                'classroom_id': rng.choice([None, 1, 2, 3, 4]),
+                'teacher_id': rng.randrange(1, 12),
+                'class_id': rng.randrange(1, 8),
+            })
+        expected = brute_force_conflicts(slots)
+        
+        swept = {
+            (conflict['resource'], frozenset((conflict['slot_id'], conflict['other_id'])))
+            for conflict in find_timetable_conflicts(slots)
+        }
+        self.assertEqual(swept, expected)
+        
+        # Insertion un à un : chaque conflit est détecté par le second créneau ajouté
+        index = ScheduleConflictIndex()
+        indexed = set()
+        for slot in slots:
+            for conflict in index.find_conflicts(slot):
+                indexed.add((conflict['resource'], frozenset((conflict['slot_id'], conflict['other_id']))))
+            index.add(slot)
+        self.assertEqual(indexed, expected)
+        self.assertEqual(len(index), 400)
+        
+        # Retrait puis modification d'un créneau déjà indexé
+        index.remove(slots[0]['id'])
+        self.assertEqual(len(index), 399)
+        self.assertNotIn(0, {conflict['other_id'] for conflict in index.find_conflicts(dict(slots[0], id=None))})
+    
+    def test_model_validation(self):
+        """Test que full_clean refuse les créneaux en conflit ou aux horaires invertis."""
+        schedule = Schedule(
+            course=self.math_b, day_of_week=0, start_time=time(9), end_time=time(11), classroom=self.rooms[1]
+        )
+        with self.assertRaises(ValidationError) as error:
+            schedule.full_clean()
+        self.assertIn("L'enseignant a déjà le créneau", error.exception.messages[0])
+        
+        schedule.start_time = time(12)
+        with self.assertRaises(ValidationError) as error:
+            schedule.full_clean()
+        self.assertIn('end_time', error.exception.message_dict)
+        
+        schedule.end_time = time(13)
+        schedule.full_clean()
+    
+    def test_create_and_update_views(self):
+        """Test que les vues de création et de modification refusent les conflits."""
+        user = User.objects.create_user(username='admin', password='testpass123')
+        for codename in ('create_schedule', 'edit_schedule'):
+            Permission.objects.create(name=codename, codename=codename, resource='app_academic', action='create')
+            assign_permission(user.profile, codename)
+        self.client.force_login(user)
+        
+        payload = {
+            'course': self.french_a.id, 'day_of_week': 0, 'start_time': '09:00',
+            'end_time': '10:00', 'classroom': self.rooms[1].id, 'is_active': 'on'
+        }
+        response = self.client.post(reverse('app_academic:schedule_create'), payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'La classe a déjà le créneau')
+        self.assertEqual(Schedule.objects.count(), 1)
+        
+        payload['start_time'], payload['end_time'] = '10:00', '11:00'
+        response = self.client.post(reverse('app_academic:schedule_create'), payload)
+        self.assertEqual(response.status_code, 302)
+        
+        # Décaler le créneau existant sur lui-même est accepté, pas sur le nouveau
+        url = reverse('app_academic:schedule_update', kwargs={'pk': self.monday.pk})
+        payload = {
+            'course': self.math_a.id, 'day_of_week': 0, 'start_time': '08:30',
+            'end_time': '10:00', 'classroom': self.rooms[0].id, 'is_active': 'on'
+        }
+        self.assertEqual(self.client.post(url, payload).status_code, 302)
+        payload['end_time'] = '10:30'
+        self.assertContains(self.client.post(url, payload), 'La classe a déjà le créneau')
+    
+    def test_admin_import(self):
+        """Test que l'import signale les conflits avec la base et entre lignes du fichier."""
+        dataset = Dataset(headers=['id', 'course', 'day_of_week', 'start_time', 'end_time', 'classroom', 'is_active'])
+        dataset.append(['', self.math_b.id, 0, '09:00', '10:00', self.rooms[1].id, 1])
+        dataset.append(['', self.math_b.id, 1, '09:00', '10:00', self.rooms[1].id, 1])
+        dataset.append(['', self.french_a.id, 1, '09:30', '10:30', self.rooms[1].id, 1])
+        dataset.append(['', self.french_a.id, 1, '10:30', '11:30', self.rooms[1].id, 1])
+        
+        # Étape de prévisualisation de l'import de l'administration
+        result = ScheduleResource().import_data(dataset, dry_run=True)
+        
+        self.assertEqual([row.number for row in result.invalid_rows], [1, 3])
+        self.assertIn("L'enseignant a déjà le créneau", str(result.invalid_rows[0].error))
+        self.assertIn('La salle est déjà occupée', str(result.invalid_rows[1].error))
+        self.assertEqual(Schedule.objects.count(), 1)
+        
+        del dataset[2]
+        del dataset[0]
+        result = ScheduleResource().import_data(dataset, dry_run=False)
+        self.assertFalse(result.has_validation_errors())
+        self.assertEqual(Schedule.objects.count(), 3)
+    
+    def test_check_command(self):
+        """Test que la commande signale les conflits de l'année courante."""
+        out = StringIO()
+        call_command('check_schedule_conflicts', stdout=out)
+        self.assertIn('✓ No conflict in 1 schedule(s)', out.getvalue())
+        
+        self.create_schedule(self.french_a, 0, '09:00', '10:00', self.rooms[0])
+        out = StringIO()
+        with self.assertRaises(CommandError) as error:
+            call_command('check_schedule_conflicts', stdout=out)
+        self.assertEqual(str(error.exception), '2 schedule conflict(s) found in 2 schedule(s)')
+        self.assertIn('Classroom', out.getvalue())
+        self.assertIn('Class ', out.getvalue())
+        self.assertEqual(len(load_slots(Schedule.objects.all())), 2)
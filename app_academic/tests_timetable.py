@@ -0,0 +1,203 @@
+"""
+Tests unitaires pour la génération automatique des emplois du temps.
+
+Ce module vérifie le solveur sur une école générée de 60 classes, la
+génération d'une année en base (disponibilités, capacité des salles,
+limite quotidienne, créneaux existants conservés), le rapport des
+contraintes non satisfaites, la tâche Celery et la commande.
+"""
+
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from datetime import date, time
+from io import StringIO
+from .models import AcademicYear, Grade, ClassRoom, Class, Subject, Course, Schedule, TeacherAvailability
+from .services.schedule_conflicts import find_timetable_conflicts, load_slots
+from .services.timetable import (
+    CONSTRAINT_CLASSROOM_CAPACITY, CONSTRAINT_TEACHER_AVAILABILITY, CONSTRAINT_WEEKLY_HOURS,
+    TimetableSolver, generate_timetable, get_timetable_grid
+)
+from .tasks import generate_timetable_task
+from app_profile.models import Profile, Teacher
+
+
+class TimetableSolverTestCase(TestCase):
+    """Tests pour le solveur d'emploi du temps, sans base de données."""
+    
+    def test_generated_school_benchmark(self):
+        """Test que l'école générée de 60 classes est planifiée entièrement et sans conflit."""
+        out = StringIO()
+        call_command('benchmark_timetable', '--classes', '60', '--budget', '30', stdout=out)
+        self.assertIn('60 classes, 600 courses', out.getvalue())
+        self.assertIn('✓ 1560/1560 hour(s) placed without conflict', out.getvalue())
+    
+    def test_repairs_dead_ends(self):
+        """Test que les heures bloquantes sont déplacées quand un cours n'a plus de créneau."""
+        grid = get_timetable_grid(days=[0, 1], periods=[('08:00', '09:00'), ('09:00', '10:00')])
+        # Classe 1 : quatre heures sur quatre créneaux ; l'enseignant 2 n'est libre que le mardi
+        courses = [
+            {'id': 1, 'class_id': 1, 'teacher_id': 1, 'hours': 2, 'size': 20},
+            {'id': 2, 'class_id': 1, 'teacher_id': 2, 'hours': 2, 'size': 20, 'available': 0b1100},
+            {'id': 3, 'class_id': 2, 'teacher_id': 1, 'hours': 2, 'size': 20},
+        ]
+        rooms = [{'id': 1, 'capacity': 20}, {'id': 2, 'capacity': 30}]
+        for seed in range(10):
+            solver = TimetableSolver(grid, courses, rooms, max_daily_hours=2, seed=seed)
+            # Une heure du cours 1 le mardi à 8h bloque le cours 2 : elle doit être déplacée
+            solver._place(0, 2)
+            result = solver.solve()
+            self.assertEqual(result['placed'], 6)
+            self.assertEqual(result['unsatisfied'], [])
+            tuesday = {lesson['start'] for lesson in result['lessons'] if lesson['course_id'] == 2 and lesson['day'] == 1}
+            self.assertEqual(len(tuesday), 2)
+
+
+class GenerateTimetableTestCase(TestCase):
+    """Tests pour la génération de l'emploi du temps d'une année scolaire."""
+    
+    def setUp(self):
+        """Préparation des données de test."""
+        self.academic_year = AcademicYear.objects.create(
+            name='2024-2025',
+            start_date=date(2024, 9, 1),
+            end_date=date(2025, 6, 30),
+            is_current=True,
+            is_active=True
+        )
+        grade = Grade.objects.create(name='6ème', code='6EME', order=6, is_active=True)
+        self.small_room = ClassRoom.objects.create(name='Salle 1', capacity=20, is_active=True)
+        self.large_room = ClassRoom.objects.create(name='Salle 2', capacity=40, is_active=True)
+        self.classes = [
+            Class.objects.create(
+                name=code, code=code, grade=grade, academic_year=self.academic_year,
+                capacity=capacity, classroom=self.small_room, is_active=True
+            )
+            for code, capacity in (('6A', 35), ('6B', 18))
+        ]
+        self.teachers = [self.create_teacher(f'teacher{i}') for i in range(2)]
+        self.math = Subject.objects.create(name='Mathématiques', code='MATH', weekly_hours=4, is_active=True)
+        self.french = Subject.objects.create(name='Français', code='FR', weekly_hours=3, is_active=True)
+        self.music = Subject.objects.create(name='Musique', code='MUS', is_active=True)
+        # Maths et musique : enseignant 0 ; français : enseignant 1
+        self.courses = {}
+        for class_section in self.classes:
+            for subject, teacher in ((self.math, 0), (self.french, 1), (self.music, 0)):
+                self.courses[class_section.code, subject.code] = Course.objects.create(
+                    subject=subject, class_section=class_section, teacher=self.teachers[teacher],
+                    academic_year=self.academic_year, is_active=True
+                )
+        # L'enseignant 1 n'est disponible que le lundi et le mardi matin
+        for day in (0, 1):
+            TeacherAvailability.objects.create(
+                teacher=self.teachers[1], day_of_week=day, start_time=time(8), end_time=time(12)
+            )
+    
+    def create_teacher(self, username):
+        """Crée un enseignant actif."""
+        user = User.objects.create_user(username=username, password='testpass123')
+        profile = Profile.objects.get(user=user)
+        profile.full_name = username.capitalize()
+        profile.save()
+        return Teacher.objects.create(profile=profile, is_active=True)
+    
+    def test_generates_conflict_free_timetable(self):
+        """Test un emploi du temps complet, sans conflit et conforme aux contraintes."""
+        Schedule.objects.create(
+            course=self.courses['6A', 'MATH'], day_of_week=4, start_time=time(16), end_time=time(17)
+        )
+        
+        # Cours, disponibilités, créneaux conservés, salles, puis suppression et insertion
+        with self.assertNumQueries(8):
+            summary = generate_timetable(self.academic_year.id, time_budget=10)
+        
+        self.assertEqual((summary['courses'], summary['hours'], summary['placed'], summary['written']), (4, 14, 14, 14))
+        self.assertTrue(summary['committed'])
+        self.assertEqual(
+            [(row['course_id'], row['constraint']) for row in summary['unsatisfied']],
+            [(self.courses['6A', 'MUS'].id, CONSTRAINT_WEEKLY_HOURS), (self.courses['6B', 'MUS'].id, CONSTRAINT_WEEKLY_HOURS)]
+        )
+        self.assertEqual(find_timetable_conflicts(load_slots(Schedule.objects.all())), [])
+        
+        schedules = Schedule.objects.select_related('course', 'classroom')
+        for schedule in schedules:
+            # La salle de 6A (35 élèves) est trop petite : la grande salle est utilisée
+            expected_room = self.large_room if schedule.course.class_section_id == self.classes[0].id else self.small_room
+            self.assertEqual(schedule.classroom, expected_room)
+            if schedule.course.teacher_id == self.teachers[1].id:
+                self.assertIn(schedule.day_of_week, (0, 1))
+                self.assertLess(schedule.start_time, time(12))
+        for course in self.courses.values():
+            days = list(schedules.filter(course=course).values_list('day_of_week', flat=True))
+            self.assertTrue(all(days.count(day) <= 2 for day in days))
+        self.assertEqual(schedules.filter(course=self.courses['6A', 'MATH']).count(), 4)
+    
+    def test_other_classes_are_kept(self):
+        """Test que les créneaux des classes non planifiées sont conservés et respectés."""
+        kept = Schedule.objects.create(
+            course=self.courses['6B', 'FR'], day_of_week=0, start_time=time(8), end_time=time(10),
+            classroom=self.large_room
+        )
+        
+        summary = generate_timetable(self.academic_year.id, class_ids=[self.classes[0].id], time_budget=10)
+        
+        self.assertEqual(summary['placed'], 7)
+        self.assertTrue(Schedule.objects.filter(pk=kept.pk).exists())
+        self.assertEqual(Schedule.objects.count(), 8)
+        self.assertEqual(find_timetable_conflicts(load_slots(Schedule.objects.all())), [])
+    
+    def test_unsatisfied_constraints(self):
+        """Test le rapport des heures impossibles à placer."""
+        TeacherAvailability.objects.filter(teacher=self.teachers[1], day_of_week=1).delete()
+        self.large_room.capacity = 30
+        self.large_room.save()
+        
+        summary = generate_timetable(self.academic_year.id, time_budget=10, commit=False)
+        
+        unsatisfied = {(row['course_id'], row['constraint']): row for row in summary['unsatisfied']}
+        # 6A (35 élèves) n'entre dans aucune salle
+        self.assertEqual(unsatisfied[self.courses['6A', 'MATH'].id, CONSTRAINT_CLASSROOM_CAPACITY]['missing_hours'], 4)
+        self.assertIn('35 élèves', unsatisfied[self.courses['6A', 'MATH'].id, CONSTRAINT_CLASSROOM_CAPACITY]['message'])
+        # 6B : trois heures de français sur une demi-journée, deux au plus par jour
+        row = unsatisfied[self.courses['6B', 'FR'].id, CONSTRAINT_TEACHER_AVAILABILITY]
+        self.assertEqual(row['missing_hours'], 1)
+        self.assertEqual(summary['placed'], 2 + 4)
+        self.assertEqual(summary['written'], 0)
+        self.assertFalse(Schedule.objects.exists())
+    
+    def test_partial_timetable_is_not_written(self):
+        """Test qu'un emploi du temps incomplet ne remplace les créneaux existants qu'à la demande."""
+        self.large_room.capacity = 30
+        self.large_room.save()
+        kept = Schedule.objects.create(
+            course=self.courses['6A', 'MATH'], day_of_week=4, start_time=time(16), end_time=time(17)
+        )
+        
+        summary = generate_timetable(self.academic_year.id, time_budget=10)
+        
+        self.assertFalse(summary['committed'])
+        self.assertEqual(summary['written'], 0)
+        self.assertEqual(list(Schedule.objects.values_list('pk', flat=True)), [kept.pk])
+        
+        out = StringIO()
+        call_command('generate_timetable', '--budget', '10', stdout=out)
+        self.assertIn('existing schedules kept', out.getvalue())
+        self.assertTrue(Schedule.objects.filter(pk=kept.pk).exists())
+        
+        summary = generate_timetable(self.academic_year.id, time_budget=10, allow_partial=True)
+        
+        self.assertTrue(summary['committed'])
+        self.assertEqual(summary['written'], summary['placed'])
+        self.assertFalse(Schedule.objects.filter(pk=kept.pk).exists())
+    
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+    def test_task_and_command(self):
+        """Test la génération par la tâche Celery et par la commande."""
+        result = generate_timetable_task.apply(args=[self.academic_year.id], kwargs={'time_budget': 10}).get()
+        self.assertEqual(result['written'], 14)
+        
+        out = StringIO()
+        call_command('generate_timetable', '--class', str(self.classes[1].id), '--seed', '3', stdout=out)
+        self.assertIn('✓ 7/7 hour(s) placed for 2 course(s)', out.getvalue())
+        self.assertIn("Aucun volume horaire hebdomadaire", out.getvalue())
+        self.assertEqual(Schedule.objects.count(), 14)
@@ -99,7 +99,7 @@ class ClassListView(PermissionRequiredMixin, ListView):
         return super().dispatch(*args, **kwargs)
     
     def get_queryset(self):
-        queryset = Class.objects.filter(is_active=True).select_related('grade', 'academic_year', 'classroom', 'teacher').order_by('academic_year', 'grade__order', 'name')
+        queryset = Class.objects.with_student_counts().filter(is_active=True).select_related('grade', 'academic_year', 'classroom', 'teacher').order_by('academic_year', 'grade__order', 'name')
         search = self.request.GET.get('search')
         if search:
             queryset = queryset.filter(Q(name__icontains=search) | Q(code__icontains=search))
@@ -366,7 +366,7 @@ class ClassDetailView(PermissionRequiredMixin, DetailView):
         return super().dispatch(*args, **kwargs)
     
     def get_queryset(self):
-        return Class.objects.filter(is_active=True).select_related('grade', 'academic_year', 'classroom', 'teacher')
+        return Class.objects.with_student_counts().filter(is_active=True).select_related('grade', 'academic_year', 'classroom', 'teacher__profile')
 
 
 class ClassCreateView(PermissionRequiredMixin, CreateView):
@@ -5,3 +5,10 @@ class AppAttendanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_attendance'
     verbose_name = 'Attendance Management'
+    
+    def ready(self):
+        """
+        Méthode appelée lorsque l'application est prête.
+        Enregistre les signaux.
+        """
+        import app_attendance.signals  # noqa
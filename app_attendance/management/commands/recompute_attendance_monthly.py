@@ -0,0 +1,47 @@
+"""
+Commande de management pour recalculer la table AttendanceMonthly.
+
+Usage:
+    python manage.py recompute_attendance_monthly
+    python manage.py recompute_attendance_monthly --year 2024
+    python manage.py recompute_attendance_monthly --year 2024 --month 10
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from app_attendance.models import AttendanceMonthly
+from app_attendance.services.monthly import recompute_attendance_monthly
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly attendance rollup table from daily attendances'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=int,
+            help='Calendar year to rebuild (default: every year)',
+        )
+        parser.add_argument(
+            '--month',
+            type=int,
+            help='Month to rebuild (1-12), requires --year',
+        )
+    
+    def handle(self, *args, **options):
+        year = options.get('year')
+        month = options.get('month')
+        if month is not None:
+            if year is None:
+                raise CommandError('--month requires --year')
+            if not 1 <= month <= 12:
+                raise CommandError(f'Invalid month {month}')
+            self.stdout.write(f'Recomputing monthly attendance for {year}-{month:02d}...')
+        elif year is not None:
+            self.stdout.write(f'Recomputing monthly attendance for {year}...')
+        else:
+            self.stdout.write('Recomputing monthly attendance for all months...')
+        
+        written = recompute_attendance_monthly(year=year, month=month)
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ {written} monthly attendance row(s) written'))
+        self.stdout.write(f'Monthly attendance: {AttendanceMonthly.objects.count()} rows')
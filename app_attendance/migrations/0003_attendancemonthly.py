@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_attendance_monthly(apps, schema_editor):
+    """Calcule les cumuls mensuels des présences existantes."""
+    Attendance = apps.get_model('app_attendance', 'Attendance')
+    AttendanceMonthly = apps.get_model('app_attendance', 'AttendanceMonthly')
+
+    totals = {}
+    rows = Attendance.objects.filter(is_active=True).values_list('student_id', 'date', 'status')
+    for student_id, day, status in rows.iterator():
+        total = totals.setdefault((student_id, day.year, day.month), {
+            'present': 0, 'absent': 0, 'late': 0, 'excused': 0, 'total': 0
+        })
+        if status in total:
+            total[status] += 1
+        total['total'] += 1
+
+    AttendanceMonthly.objects.bulk_create([
+        AttendanceMonthly(student_id=student_id, year=year, month=month, **counts)
+        for (student_id, year, month), counts in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_attendance', '0002_alter_excuse_document'),
+        ('app_profile', '0016_parent_children'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(help_text='Année civile', verbose_name='Année')),
+                ('month', models.PositiveSmallIntegerField(help_text='Mois (1 à 12)', verbose_name='Mois')),
+                ('present', models.PositiveIntegerField(default=0, help_text='Nombre de jours présents', verbose_name='Présences')),
+                ('absent', models.PositiveIntegerField(default=0, help_text='Nombre de jours absents', verbose_name='Absences')),
+                ('late', models.PositiveIntegerField(default=0, help_text='Nombre de jours en retard', verbose_name='Retards')),
+                ('excused', models.PositiveIntegerField(default=0, help_text='Nombre de jours excusés', verbose_name='Excusés')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Nombre total de présences enregistrées', verbose_name='Total')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('student', models.ForeignKey(help_text='Élève concerné', on_delete=django.db.models.deletion.CASCADE, related_name='monthly_attendances', to='app_profile.student', verbose_name='Élève')),
+            ],
+            options={
+                'verbose_name': 'Cumul mensuel des présences',
+                'verbose_name_plural': 'Cumuls mensuels des présences',
+                'indexes': [models.Index(fields=['year', 'month'], name='app_attenda_year_2902dd_idx')],
+                'unique_together': {('student', 'year', 'month')},
+            },
+        ),
+        migrations.RunPython(populate_attendance_monthly, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_attendance', '0003_attendancemonthly'),
+        ('app_profile', '0016_parent_children'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AbsenceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('alert', "Seuil d'alerte atteint"), ('exceeded', 'Maximum dépassé')], help_text='Niveau atteint', max_length=20, verbose_name='Niveau')),
+                ('absence_days', models.PositiveIntegerField(default=0, help_text="Jours d'absence non justifiés lors du franchissement", verbose_name="Jours d'absence")),
+                ('crossed_on', models.DateField(help_text='Date du balayage ayant détecté le franchissement', verbose_name='Date de franchissement')),
+                ('resolved_on', models.DateField(blank=True, help_text="Date à laquelle l'élève est repassé sous le niveau", null=True, verbose_name='Date de clôture')),
+                ('dispatched_at', models.DateTimeField(blank=True, help_text='Date à laquelle tous les envois ont été traités', null=True, verbose_name="Date d'envoi")),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('rule', models.ForeignKey(help_text='Règle de présence franchie', on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='app_attendance.attendancerule', verbose_name='Règle')),
+                ('student', models.ForeignKey(help_text='Élève concerné', on_delete=django.db.models.deletion.CASCADE, related_name='absence_alerts', to='app_profile.student', verbose_name='Élève')),
+            ],
+            options={
+                'verbose_name': "Alerte d'absences",
+                'verbose_name_plural': "Alertes d'absences",
+                'ordering': ['-crossed_on', 'student'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AbsenceAlertDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(help_text="Canal d'envoi (email, sms, ...)", max_length=20, verbose_name='Canal')),
+                ('recipient', models.CharField(help_text='Adresse email ou numéro de téléphone', max_length=255, verbose_name='Destinataire')),
+                ('status', models.CharField(choices=[('sent', 'Envoyé'), ('failed', 'Échec')], help_text='Résultat du dernier envoi', max_length=20, verbose_name='Statut')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text="Nombre de tentatives d'envoi", verbose_name='Tentatives')),
+                ('error', models.TextField(blank=True, help_text='Erreur du dernier envoi', null=True, verbose_name='Erreur')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name="Date d'envoi")),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('alert', models.ForeignKey(help_text='Alerte envoyée', on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='app_attendance.absencealert', verbose_name='Alerte')),
+                ('parent', models.ForeignKey(help_text='Parent destinataire', on_delete=django.db.models.deletion.CASCADE, related_name='absence_alert_deliveries', to='app_profile.parent', verbose_name='Parent')),
+            ],
+            options={
+                'verbose_name': "Envoi d'alerte d'absences",
+                'verbose_name_plural': "Envois d'alertes d'absences",
+            },
+        ),
+        migrations.AddIndex(
+            model_name='absencealert',
+            index=models.Index(fields=['dispatched_at'], name='app_attenda_dispatc_32aa2a_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='absencealert',
+            constraint=models.UniqueConstraint(condition=models.Q(('resolved_on__isnull', True)), fields=('rule', 'student', 'level'), name='unique_open_absence_alert'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='absencealertdelivery',
+            unique_together={('alert', 'parent', 'channel')},
+        ),
+    ]
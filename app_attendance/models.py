@@ -4,13 +4,16 @@ Modèles pour l'application app_attendance.
 Ce module contient les modèles Django pour la gestion des présences et absences :
 - Règles de présence
 - Présences quotidiennes
+- Cumuls mensuels des présences
 - Absences
 - Justificatifs
+- Alertes d'absences et journal des envois
 """
 
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
+from decimal import Decimal
 
 
 class AttendanceRule(models.Model):
@@ -284,6 +287,94 @@ class Attendance(models.Model):
         ).select_related('student', 'class_section').order_by('student__profile__full_name')
 
 
+class AttendanceMonthly(models.Model):
+    """
+    Table de cumul des présences d'un élève par mois.
+    
+    Stocke le nombre de présences actives par statut pour un mois civil,
+    ce qui permet de calculer un taux de présence sans reparcourir les
+    présences quotidiennes. Elle est maintenue de façon incrémentale par
+    les signaux de app_attendance et peut être recalculée avec la commande
+    `recompute_attendance_monthly`.
+    """
+    
+    student = models.ForeignKey(
+        'app_profile.Student',
+        on_delete=models.CASCADE,
+        related_name='monthly_attendances',
+        verbose_name="Élève",
+        help_text="Élève concerné"
+    )
+    
+    year = models.PositiveSmallIntegerField(
+        verbose_name="Année",
+        help_text="Année civile"
+    )
+    
+    month = models.PositiveSmallIntegerField(
+        verbose_name="Mois",
+        help_text="Mois (1 à 12)"
+    )
+    
+    present = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Présences",
+        help_text="Nombre de jours présents"
+    )
+    
+    absent = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Absences",
+        help_text="Nombre de jours absents"
+    )
+    
+    late = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Retards",
+        help_text="Nombre de jours en retard"
+    )
+    
+    excused = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Excusés",
+        help_text="Nombre de jours excusés"
+    )
+    
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Total",
+        help_text="Nombre total de présences enregistrées"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Date de modification"
+    )
+    
+    class Meta:
+        verbose_name = "Cumul mensuel des présences"
+        verbose_name_plural = "Cumuls mensuels des présences"
+        unique_together = [['student', 'year', 'month']]
+        indexes = [
+            models.Index(fields=['year', 'month']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.profile.full_name} - {self.month:02d}/{self.year}"
+    
+    @property
+    def attendance_rate(self):
+        """
+        Taux de présence du mois.
+        
+        Returns:
+            Decimal: Taux de présence (0-100) ou None si aucune présence
+        """
+        if not self.total:
+            return None
+        return (Decimal(self.present) / Decimal(self.total)) * Decimal('100')
+
+
 class Absence(models.Model):
     """
     Modèle représentant une absence d'un élève.
@@ -567,3 +658,172 @@ class Excuse(models.Model):
             self.reviewed_at = timezone.now()
             self.notes = reason
             self.save()
+
+
+class AbsenceAlert(models.Model):
+    """
+    Modèle représentant le franchissement d'un seuil d'absences par un élève.
+    
+    Une alerte reste ouverte tant que l'élève reste au niveau atteint pour
+    la règle ; une seule alerte ouverte peut exister par (règle, élève,
+    niveau), ce qui empêche d'alerter deux fois pour le même franchissement.
+    Elle est clôturée (resolved_on) quand l'élève repasse sous ce niveau.
+    """
+    
+    LEVEL_CHOICES = [
+        ('alert', "Seuil d'alerte atteint"),
+        ('exceeded', 'Maximum dépassé'),
+    ]
+    
+    rule = models.ForeignKey(
+        AttendanceRule,
+        on_delete=models.CASCADE,
+        related_name='alerts',
+        verbose_name="Règle",
+        help_text="Règle de présence franchie"
+    )
+    
+    student = models.ForeignKey(
+        'app_profile.Student',
+        on_delete=models.CASCADE,
+        related_name='absence_alerts',
+        verbose_name="Élève",
+        help_text="Élève concerné"
+    )
+    
+    level = models.CharField(
+        max_length=20,
+        choices=LEVEL_CHOICES,
+        verbose_name="Niveau",
+        help_text="Niveau atteint"
+    )
+    
+    absence_days = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Jours d'absence",
+        help_text="Jours d'absence non justifiés lors du franchissement"
+    )
+    
+    crossed_on = models.DateField(
+        verbose_name="Date de franchissement",
+        help_text="Date du balayage ayant détecté le franchissement"
+    )
+    
+    resolved_on = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name="Date de clôture",
+        help_text="Date à laquelle l'élève est repassé sous le niveau"
+    )
+    
+    dispatched_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Date d'envoi",
+        help_text="Date à laquelle tous les envois ont été traités"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+    
+    class Meta:
+        verbose_name = "Alerte d'absences"
+        verbose_name_plural = "Alertes d'absences"
+        ordering = ['-crossed_on', 'student']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['rule', 'student', 'level'],
+                condition=models.Q(resolved_on__isnull=True),
+                name='unique_open_absence_alert'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['dispatched_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.profile.full_name} - {self.rule.name} ({self.get_level_display()})"
+
+
+class AbsenceAlertDelivery(models.Model):
+    """
+    Modèle représentant l'envoi d'une alerte d'absences à un parent.
+    
+    Journal des envois : une ligne par (alerte, parent, canal). Un envoi
+    réussi n'est jamais refait ; un envoi en échec est retenté jusqu'au
+    nombre maximal de tentatives.
+    """
+    
+    STATUS_CHOICES = [
+        ('sent', 'Envoyé'),
+        ('failed', 'Échec'),
+    ]
+    
+    alert = models.ForeignKey(
+        AbsenceAlert,
+        on_delete=models.CASCADE,
+        related_name='deliveries',
+        verbose_name="Alerte",
+        help_text="Alerte envoyée"
+    )
+    
+    parent = models.ForeignKey(
+        'app_profile.Parent',
+        on_delete=models.CASCADE,
+        related_name='absence_alert_deliveries',
+        verbose_name="Parent",
+        help_text="Parent destinataire"
+    )
+    
+    channel = models.CharField(
+        max_length=20,
+        verbose_name="Canal",
+        help_text="Canal d'envoi (email, sms, ...)"
+    )
+    
+    recipient = models.CharField(
+        max_length=255,
+        verbose_name="Destinataire",
+        help_text="Adresse email ou numéro de téléphone"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        verbose_name="Statut",
+        help_text="Résultat du dernier envoi"
+    )
+    
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Tentatives",
+        help_text="Nombre de tentatives d'envoi"
+    )
+    
+    error = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name="Erreur",
+        help_text="Erreur du dernier envoi"
+    )
+    
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Date d'envoi"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Date de modification"
+    )
+    
+    class Meta:
+        verbose_name = "Envoi d'alerte d'absences"
+        verbose_name_plural = "Envois d'alertes d'absences"
+        unique_together = [['alert', 'parent', 'channel']]
+    
+    def __str__(self):
+        return f"{self.alert} - {self.channel} {self.recipient} ({self.get_status_display()})"
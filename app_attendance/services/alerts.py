@@ -0,0 +1,423 @@
+"""
+Envoi des alertes d'absences aux parents.
+
+Ce module transforme les élèves signalés par le balayage des seuils en
+alertes (une par franchissement de seuil), retrouve leurs parents en une
+seule requête, regroupe les alertes par parent et les envoie par lots via
+des backends interchangeables (ABSENCE_ALERT_BACKENDS) : email, SMS, ou
+mémoire pour les tests. Chaque envoi est inscrit au journal
+AbsenceAlertDelivery : un envoi réussi n'est jamais refait et un envoi en
+échec est retenté jusqu'à ABSENCE_ALERT_MAX_ATTEMPTS tentatives.
+"""
+
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from ..models import AbsenceAlert, AbsenceAlertDelivery, AttendanceRule
+from .thresholds import LEVEL_ALERT, LEVEL_EXCEEDED, sweep_absence_thresholds
+
+
+LEVEL_RANKS = {LEVEL_ALERT: 1, LEVEL_EXCEEDED: 2}
+
+DEFAULT_ALERT_BACKENDS = [
+    'app_attendance.services.alerts.EmailAlertBackend',
+    'app_attendance.services.alerts.SmsAlertBackend',
+]
+
+
+class AlertBackend:
+    """
+    Backend d'envoi des alertes d'absences.
+    
+    Une sous-classe définit son canal, l'adresse d'un parent sur ce canal
+    et l'envoi d'un lot de messages.
+    """
+    
+    channel = None
+    
+    def get_recipient(self, parent):
+        """
+        Retourne l'adresse du parent sur ce canal.
+        
+        Args:
+            parent: Dictionnaire (parent_id, full_name, email, phone,
+                email_notifications, sms_notifications)
+        
+        Returns:
+            str: Adresse du destinataire, ou None pour ne rien envoyer
+        """
+        raise NotImplementedError
+    
+    def send_messages(self, messages):
+        """
+        Envoie un lot de messages.
+        
+        Args:
+            messages: Liste de dictionnaires (recipient, subject, body)
+        
+        Returns:
+            list: Pour chaque message, None s'il est envoyé ou le message d'erreur
+        """
+        raise NotImplementedError
+
+
+class EmailAlertBackend(AlertBackend):
+    """Envoi par email avec le backend email de Django (EMAIL_BACKEND)."""
+    
+    channel = 'email'
+    
+    def get_recipient(self, parent):
+        if parent['email_notifications'] is False:
+            return None
+        return parent['email'] or None
+    
+    def send_messages(self, messages):
+        connection = mail.get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            return [str(e)] * len(messages)
+        
+        results = []
+        try:
+            for message in messages:
+                try:
+                    mail.EmailMessage(
+                        subject=message['subject'],
+                        body=message['body'],
+                        to=[message['recipient']],
+                        connection=connection
+                    ).send()
+                    results.append(None)
+                except Exception as e:
+                    results.append(str(e))
+        finally:
+            connection.close()
+        return results
+
+
+class SmsAlertBackend(AlertBackend):
+    """Envoi par SMS via Twilio, pour les parents ayant activé les notifications SMS."""
+    
+    channel = 'sms'
+    
+    def get_recipient(self, parent):
+        if not parent['sms_notifications']:
+            return None
+        return parent['phone'] or None
+    
+    def send_messages(self, messages):
+        from app_profile.otp_utils import is_twilio_configured, send_sms_via_twilio
+        
+        if not is_twilio_configured():
+            return ['Twilio is not configured'] * len(messages)
+        
+        results = []
+        for message in messages:
+            sent, _ = send_sms_via_twilio(message['recipient'], message['body'])
+            results.append(None if sent else 'SMS sending failed')
+        return results
+
+
+class LocMemAlertBackend(AlertBackend):
+    """
+    Backend en mémoire pour les tests et le développement hors ligne.
+    
+    Les messages envoyés sont ajoutés à LocMemAlertBackend.outbox.
+    """
+    
+    channel = 'locmem'
+    outbox = []
+    
+    def get_recipient(self, parent):
+        return parent['email'] or parent['phone'] or None
+    
+    def send_messages(self, messages):
+        LocMemAlertBackend.outbox.extend(messages)
+        return [None] * len(messages)
+
+
+def get_alert_backends():
+    """
+    Instancie les backends configurés dans ABSENCE_ALERT_BACKENDS.
+    
+    Returns:
+        list: Instances de AlertBackend
+    """
+    paths = getattr(settings, 'ABSENCE_ALERT_BACKENDS', DEFAULT_ALERT_BACKENDS)
+    return [import_string(path)() for path in paths]
+
+
+def record_threshold_crossings(flagged, rule_ids, today=None):
+    """
+    Enregistre les franchissements de seuil détectés par un balayage.
+    
+    Une alerte n'est créée que s'il n'existe pas déjà une alerte ouverte
+    pour la même règle, le même élève et le même niveau. Les alertes
+    ouvertes des règles balayées dont l'élève est repassé sous le niveau
+    sont clôturées.
+    
+    Args:
+        flagged: Élèves signalés par sweep_absence_thresholds
+        rule_ids: IDs des règles balayées
+        today: Date du balayage (défaut : aujourd'hui)
+    
+    Returns:
+        int: Nombre d'alertes réellement créées, sans les doublons écartés
+        par la contrainte d'unicité
+    """
+    today = today or timezone.now().date()
+    current = {(row['rule_id'], row['student_id']): row['level'] for row in flagged}
+    
+    resolved_ids = []
+    open_keys = set()
+    for alert_id, rule_id, student_id, level in AbsenceAlert.objects.filter(
+        rule_id__in=rule_ids,
+        resolved_on__isnull=True
+    ).values_list('id', 'rule_id', 'student_id', 'level'):
+        current_level = current.get((rule_id, student_id))
+        if current_level is None or LEVEL_RANKS[current_level] < LEVEL_RANKS[level]:
+            resolved_ids.append(alert_id)
+        else:
+            open_keys.add((rule_id, student_id, level))
+    
+    new_alerts = [
+        AbsenceAlert(
+            rule_id=row['rule_id'],
+            student_id=row['student_id'],
+            level=row['level'],
+            absence_days=row['absence_days'],
+            crossed_on=today
+        )
+        for row in flagged
+        if (row['rule_id'], row['student_id'], row['level']) not in open_keys
+    ]
+    
+    if not resolved_ids and not new_alerts:
+        return 0
+    
+    with transaction.atomic():
+        if resolved_ids:
+            AbsenceAlert.objects.filter(id__in=resolved_ids).update(resolved_on=today)
+        if not new_alerts:
+            return 0
+        # La contrainte d'unicité des alertes ouvertes écarte les doublons,
+        # y compris ceux d'un balayage concurrent. L'horodatage de création
+        # est posé sur chaque objet à l'insertion : seules les lignes portant
+        # la clé et l'horodatage d'un objet de ce balayage sont comptées.
+        AbsenceAlert.objects.bulk_create(new_alerts, batch_size=1000, ignore_conflicts=True)
+        inserted = {
+            (alert.rule_id, alert.student_id, alert.level, alert.created_at)
+            for alert in new_alerts
+        }
+        return sum(
+            1 for key in AbsenceAlert.objects.filter(
+                rule_id__in=rule_ids,
+                resolved_on__isnull=True,
+                created_at__gte=min(alert.created_at for alert in new_alerts)
+            ).values_list('rule_id', 'student_id', 'level', 'created_at')
+            if key in inserted
+        )
+
+
+def get_alert_parents(student_ids):
+    """
+    Retourne les parents actifs des élèves, en une seule requête.
+    
+    Args:
+        student_ids: IDs des élèves
+    
+    Returns:
+        dict: {student_id: [parent, ...]} où chaque parent est un
+        dictionnaire (parent_id, full_name, email, phone,
+        email_notifications, sms_notifications)
+    """
+    from app_profile.models import Parent
+    
+    parents = {}
+    for row in Parent.children.through.objects.filter(
+        student_id__in=student_ids,
+        parent__is_active=True
+    ).values(
+        'student_id',
+        'parent_id',
+        'parent__profile__full_name',
+        'parent__profile__user__email',
+        'parent__profile__phone',
+        'parent__profile__preferences__email_notifications',
+        'parent__profile__preferences__sms_notifications',
+    ).order_by('parent_id'):
+        parents.setdefault(row['student_id'], []).append({
+            'parent_id': row['parent_id'],
+            'full_name': row['parent__profile__full_name'],
+            'email': row['parent__profile__user__email'],
+            'phone': row['parent__profile__phone'],
+            'email_notifications': row['parent__profile__preferences__email_notifications'],
+            'sms_notifications': row['parent__profile__preferences__sms_notifications'],
+        })
+    return parents
+
+
+def build_alert_message(parent, alerts):
+    """
+    Rédige le message regroupant les alertes d'un parent.
+    
+    Args:
+        parent: Dictionnaire du parent (voir get_alert_parents)
+        alerts: Alertes des enfants du parent
+    
+    Returns:
+        tuple: (sujet, corps du message)
+    """
+    levels = dict(AbsenceAlert.LEVEL_CHOICES)
+    lines = [
+        f"- {alert['student__profile__full_name']} : {alert['absence_days']} jour(s) d'absence "
+        f"non justifiée sur les {alert['rule__period_days']} derniers jours "
+        f"({levels[alert['level']].lower()}, règle « {alert['rule__name']} »)."
+        for alert in alerts
+    ]
+    greeting = f"Bonjour {parent['full_name']}," if parent['full_name'] else "Bonjour,"
+    body = "\n".join([
+        greeting,
+        "",
+        "Nous vous informons des absences suivantes :",
+        *lines,
+        "",
+        "Merci de prendre contact avec l'établissement.",
+    ])
+    return "Alerte d'absences", body
+
+
+def dispatch_absence_alerts(backends=None, student_ids=None):
+    """
+    Envoie les alertes ouvertes non encore traitées aux parents des élèves.
+    
+    Les alertes sont regroupées en un message par parent et par canal,
+    envoyées par lots de ABSENCE_ALERT_BATCH_SIZE et inscrites au journal
+    après chaque lot. Une alerte est marquée comme traitée lorsque tous
+    ses envois ont réussi ou épuisé leurs tentatives.
+    
+    Args:
+        backends: Instances de AlertBackend (défaut : ABSENCE_ALERT_BACKENDS)
+        student_ids: Limiter l'envoi à ces élèves (optionnel)
+    
+    Returns:
+        dict: Nombre d'alertes, de messages envoyés, d'échecs et d'alertes traitées
+    """
+    backends = get_alert_backends() if backends is None else backends
+    batch_size = getattr(settings, 'ABSENCE_ALERT_BATCH_SIZE', 100)
+    max_attempts = getattr(settings, 'ABSENCE_ALERT_MAX_ATTEMPTS', 3)
+    
+    alerts = AbsenceAlert.objects.filter(dispatched_at__isnull=True, resolved_on__isnull=True)
+    if student_ids is not None:
+        alerts = alerts.filter(student_id__in=student_ids)
+    alerts = list(alerts.values(
+        'id', 'student_id', 'level', 'absence_days',
+        'rule__name', 'rule__period_days', 'student__profile__full_name'
+    ).order_by('id'))
+    summary = {'alerts': len(alerts), 'sent': 0, 'failed': 0, 'dispatched': 0}
+    if not alerts:
+        return summary
+    
+    alerts_by_student = {}
+    for alert in alerts:
+        alerts_by_student.setdefault(alert['student_id'], []).append(alert)
+    parents_by_student = get_alert_parents(list(alerts_by_student))
+    
+    # Journal des envois déjà tentés
+    ledger = {
+        (alert_id, parent_id, channel): (status, attempts)
+        for alert_id, parent_id, channel, status, attempts in AbsenceAlertDelivery.objects.filter(
+            alert_id__in=[alert['id'] for alert in alerts]
+        ).values_list('alert_id', 'parent_id', 'channel', 'status', 'attempts')
+    }
+    
+    # Alertes de chaque parent, tous enfants confondus
+    parents = {}
+    for student_id, student_alerts in alerts_by_student.items():
+        for parent in parents_by_student.get(student_id, []):
+            parents.setdefault(parent['parent_id'], (parent, []))[1].extend(student_alerts)
+    
+    for backend in backends:
+        messages = []
+        for parent, parent_alerts in parents.values():
+            recipient = backend.get_recipient(parent)
+            if not recipient:
+                continue
+            pending = []
+            for alert in parent_alerts:
+                status, attempts = ledger.get((alert['id'], parent['parent_id'], backend.channel), (None, 0))
+                if status != 'sent' and attempts < max_attempts:
+                    pending.append(alert)
+            if not pending:
+                continue
+            subject, body = build_alert_message(parent, pending)
+            messages.append({
+                'parent_id': parent['parent_id'],
+                'recipient': recipient,
+                'subject': subject,
+                'body': body,
+                'alert_ids': [alert['id'] for alert in pending],
+            })
+        
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start:start + batch_size]
+            results = backend.send_messages(batch)
+            now = timezone.now()
+            deliveries = []
+            for message, error in zip(batch, results):
+                summary['failed' if error else 'sent'] += 1
+                for alert_id in message['alert_ids']:
+                    key = (alert_id, message['parent_id'], backend.channel)
+                    attempts = ledger.get(key, (None, 0))[1] + 1
+                    ledger[key] = ('failed' if error else 'sent', attempts)
+                    deliveries.append(AbsenceAlertDelivery(
+                        alert_id=alert_id,
+                        parent_id=message['parent_id'],
+                        channel=backend.channel,
+                        recipient=message['recipient'],
+                        status='failed' if error else 'sent',
+                        attempts=attempts,
+                        error=error,
+                        sent_at=None if error else now
+                    ))
+            AbsenceAlertDelivery.objects.bulk_create(
+                deliveries,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['alert', 'parent', 'channel'],
+                update_fields=['recipient', 'status', 'attempts', 'error', 'sent_at', 'updated_at']
+            )
+    
+    # Alertes dont aucun envoi ne reste à retenter
+    retrying = {
+        alert_id
+        for (alert_id, _, _), (status, attempts) in ledger.items()
+        if status == 'failed' and attempts < max_attempts
+    }
+    dispatched_ids = [alert['id'] for alert in alerts if alert['id'] not in retrying]
+    if dispatched_ids:
+        AbsenceAlert.objects.filter(id__in=dispatched_ids).update(dispatched_at=timezone.now())
+    summary['dispatched'] = len(dispatched_ids)
+    
+    return summary
+
+
+def run_absence_alerts(today=None, backends=None):
+    """
+    Balaye les seuils d'absences, enregistre les franchissements et envoie les alertes.
+    
+    Args:
+        today: Date du balayage (défaut : aujourd'hui)
+        backends: Instances de AlertBackend (défaut : ABSENCE_ALERT_BACKENDS)
+    
+    Returns:
+        dict: Résumé de dispatch_absence_alerts avec le nombre de nouvelles alertes
+    """
+    rule_ids = list(AttendanceRule.objects.filter(is_active=True).values_list('id', flat=True))
+    created = record_threshold_crossings(sweep_absence_thresholds(today), rule_ids, today)
+    summary = dispatch_absence_alerts(backends)
+    summary['created'] = created
+    return summary
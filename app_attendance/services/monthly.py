@@ -0,0 +1,261 @@
+"""
+Maintenance et lecture de la table de cumul AttendanceMonthly.
+
+Ce module tient à jour le nombre de présences par statut et par (élève,
+mois) : application incrémentale d'une présence ajoutée, modifiée ou
+retirée, recalcul complet depuis les présences, et calcul d'un taux de
+présence à partir des mois complets du cumul et des seules présences
+quotidiennes des mois partiels.
+"""
+
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from ..models import Attendance, AttendanceMonthly
+
+
+STATUS_FIELDS = ('present', 'absent', 'late', 'excused')
+
+
+def get_attendance_state(attendance):
+    """
+    Retourne la clé de cumul et le statut compté d'une présence.
+    
+    Args:
+        attendance: Instance du modèle Attendance
+    
+    Returns:
+        tuple: ((student_id, year, month), statut) ; le statut vaut None si
+        la présence est inactive
+    """
+    day = attendance.date
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    key = (attendance.student_id, day.year, day.month)
+    return key, attendance.status if attendance.is_active else None
+
+
+def get_stored_attendance_state(attendance_id):
+    """
+    Lit en base la clé de cumul et le statut d'une présence avant sa modification.
+    
+    Args:
+        attendance_id: ID de la présence
+    
+    Returns:
+        tuple: Comme get_attendance_state, ou None si la présence n'existe pas
+    """
+    row = Attendance.objects.filter(pk=attendance_id).values_list(
+        'student_id', 'date', 'status', 'is_active'
+    ).first()
+    if row is None:
+        return None
+    student_id, day, status, is_active = row
+    return (student_id, day.year, day.month), status if is_active else None
+
+
+def apply_attendance_monthly_delta(key, status, delta):
+    """
+    Ajoute (delta = 1) ou retire (delta = -1) une présence d'une ligne de cumul.
+    
+    La mise à jour est faite en base avec des expressions F() pour rester
+    correcte en cas d'écritures concurrentes. La ligne est créée au premier
+    ajout ; un retrait sans ligne existante est ignoré (élève supprimé).
+    
+    Args:
+        key: Tuple (student_id, year, month)
+        status: Statut de la présence
+        delta: 1 pour un ajout, -1 pour un retrait
+    """
+    student_id, year, month = key
+    rows = AttendanceMonthly.objects.filter(student_id=student_id, year=year, month=month)
+    values = {'total': F('total') + delta}
+    if status in STATUS_FIELDS:
+        values[status] = F(status) + delta
+    
+    if rows.update(**values) or delta <= 0:
+        return
+    
+    counts = {'total': 1}
+    if status in STATUS_FIELDS:
+        counts[status] = 1
+    try:
+        with transaction.atomic():
+            AttendanceMonthly.objects.create(student_id=student_id, year=year, month=month, **counts)
+    except IntegrityError:
+        # Ligne créée entre-temps par une autre écriture
+        rows.update(**values)
+
+
+def apply_attendance_change(previous, current):
+    """
+    Reporte la modification d'une présence sur la table de cumul.
+    
+    Args:
+        previous: État avant modification (get_stored_attendance_state) ou None
+        current: État après modification (get_attendance_state) ou None
+    """
+    if previous == current:
+        return
+    
+    with transaction.atomic():
+        if previous is not None and previous[1] is not None:
+            apply_attendance_monthly_delta(previous[0], previous[1], -1)
+        if current is not None and current[1] is not None:
+            apply_attendance_monthly_delta(current[0], current[1], 1)
+
+
+def apply_attendance_changes(changes):
+    """
+    Reporte un lot de modifications de présences sur la table de cumul.
+    
+    Les modifications sont regroupées par mois et par changement de statut :
+    une mise à jour F() par groupe, comme apply_attendance_monthly_delta, ce
+    qui reste correct si des signaux modifient les mêmes lignes en même
+    temps. Les lignes manquantes sont créées à zéro avant les mises à jour.
+    
+    Args:
+        changes: Itérable de tuples (clé, statut précédent, statut actuel) ;
+            la clé est (student_id, year, month) et un statut vaut None pour
+            une présence absente ou inactive
+    """
+    groups = defaultdict(list)
+    for (student_id, year, month), previous, current in changes:
+        if previous != current:
+            groups[year, month, previous, current].append(student_id)
+    if not groups:
+        return
+    
+    with transaction.atomic():
+        AttendanceMonthly.objects.bulk_create([
+            AttendanceMonthly(student_id=student_id, year=year, month=month)
+            for (year, month, previous, current), student_ids in groups.items()
+            if previous is None
+            for student_id in student_ids
+        ], batch_size=1000, ignore_conflicts=True)
+        
+        for (year, month, previous, current), student_ids in groups.items():
+            values = {}
+            if previous is None or current is None:
+                values['total'] = F('total') + (1 if previous is None else -1)
+            if previous in STATUS_FIELDS:
+                values[previous] = F(previous) - 1
+            if current in STATUS_FIELDS:
+                values[current] = F(current) + 1
+            if values:
+                AttendanceMonthly.objects.filter(
+                    student_id__in=student_ids, year=year, month=month
+                ).update(**values)
+
+
+def recompute_attendance_monthly(student_ids=None, year=None, month=None):
+    """
+    Recalcule les lignes de cumul depuis les présences, en une requête groupée.
+    
+    Les lignes du périmètre sont remplacées : celles qui n'ont plus de
+    présence sont supprimées.
+    
+    Args:
+        student_ids: IDs des élèves à recalculer (None : tous)
+        year: Année civile à recalculer (None : toutes)
+        month: Mois à recalculer, avec year (None : tous les mois)
+    
+    Returns:
+        int: Nombre de lignes de cumul écrites
+    """
+    attendances = Attendance.objects.filter(is_active=True)
+    rows = AttendanceMonthly.objects.all()
+    if student_ids is not None:
+        attendances = attendances.filter(student_id__in=student_ids)
+        rows = rows.filter(student_id__in=student_ids)
+    if year is not None:
+        attendances = attendances.filter(date__year=year)
+        rows = rows.filter(year=year)
+        if month is not None:
+            attendances = attendances.filter(date__month=month)
+            rows = rows.filter(month=month)
+    
+    totals = attendances.annotate(
+        attendance_year=ExtractYear('date'),
+        attendance_month=ExtractMonth('date')
+    ).values('student_id', 'attendance_year', 'attendance_month').annotate(
+        total_count=Count('id'),
+        **{f'{status}_count': Count('id', filter=Q(status=status)) for status in STATUS_FIELDS}
+    ).order_by()
+    
+    monthly = [
+        AttendanceMonthly(
+            student_id=row['student_id'],
+            year=row['attendance_year'],
+            month=row['attendance_month'],
+            total=row['total_count'],
+            **{status: row[f'{status}_count'] for status in STATUS_FIELDS}
+        )
+        for row in totals
+    ]
+    
+    with transaction.atomic():
+        rows.delete()
+        AttendanceMonthly.objects.bulk_create(monthly, batch_size=1000)
+    
+    return len(monthly)
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def calculate_attendance_counts(student_id, start_date, end_date):
+    """
+    Compte les présences d'un élève sur une période.
+    
+    Les mois entièrement compris dans la période sont lus dans la table de
+    cumul ; seuls les jours des mois partiels (début et fin de période) sont
+    comptés sur les présences quotidiennes.
+    
+    Args:
+        student_id: ID de l'élève
+        start_date: Date de début
+        end_date: Date de fin
+    
+    Returns:
+        tuple: (nombre de présences, nombre de jours présents)
+    """
+    if start_date > end_date:
+        return 0, 0
+    
+    # Premier et dernier mois complets de la période
+    first_full = _month_index(start_date) + (0 if start_date.day == 1 else 1)
+    last_full = _month_index(end_date) - (0 if end_date.day == monthrange(end_date.year, end_date.month)[1] else 1)
+    
+    total = present = 0
+    partial = Q(date__gte=start_date, date__lte=end_date)
+    if first_full <= last_full:
+        monthly = AttendanceMonthly.objects.filter(student_id=student_id).annotate(
+            month_index=F('year') * 12 + F('month') - 1
+        ).filter(
+            month_index__gte=first_full,
+            month_index__lte=last_full
+        ).aggregate(total_sum=Sum('total'), present_sum=Sum('present'))
+        total += monthly['total_sum'] or 0
+        present += monthly['present_sum'] or 0
+        
+        full_start = date(first_full // 12, first_full % 12 + 1, 1)
+        full_end = date(last_full // 12, last_full % 12 + 1, 1)
+        full_end = full_end.replace(day=monthrange(full_end.year, full_end.month)[1])
+        partial = (
+            Q(date__gte=start_date, date__lte=full_start - timedelta(days=1))
+            | Q(date__gte=full_end + timedelta(days=1), date__lte=end_date)
+        )
+        if start_date == full_start and end_date == full_end:
+            return total, present
+    
+    counts = Attendance.objects.filter(partial, student_id=student_id, is_active=True).aggregate(
+        total_count=Count('id'),
+        present_count=Count('id', filter=Q(status='present'))
+    )
+    return total + counts['total_count'], present + counts['present_count']
+
@@ -0,0 +1,175 @@
+"""
+Appel groupé des présences d'une classe.
+
+Ce module prépare la liste d'appel d'une classe pour une date, pré-remplie
+avec les présences déjà saisies, puis enregistre tous les statuts en un
+seul upsert sur la clé (élève, classe, date).
+"""
+
+from django.db import transaction
+from django.utils.dateparse import parse_time
+from ..models import Attendance
+from .monthly import apply_attendance_changes
+
+
+ATTENDANCE_STATUSES = {status for status, _ in Attendance.STATUS_CHOICES}
+
+
+def get_roll_call(class_id, date):
+    """
+    Retourne la liste d'appel d'une classe pour une date.
+    
+    Les élèves sans présence enregistrée sont proposés comme présents.
+    
+    Args:
+        class_id: ID de la classe
+        date: Date de l'appel
+    
+    Returns:
+        list: Dictionnaires (student_id, full_name, status, time_in, notes,
+        recorded) triés par nom
+    """
+    from app_profile.models import Student
+    
+    attendances = {
+        attendance['student_id']: attendance
+        for attendance in Attendance.get_attendance_by_class(class_id, date).values(
+            'student_id', 'status', 'time_in', 'notes'
+        )
+    }
+    roll_call = []
+    for student_id, full_name in Student.objects.filter(
+        class_section_id=class_id,
+        is_active=True
+    ).order_by('profile__full_name', 'id').values_list('id', 'profile__full_name'):
+        attendance = attendances.get(student_id)
+        roll_call.append({
+            'student_id': student_id,
+            'full_name': full_name,
+            'status': attendance['status'] if attendance else 'present',
+            'time_in': attendance['time_in'] if attendance else None,
+            'notes': attendance['notes'] if attendance else None,
+            'recorded': attendance is not None,
+        })
+    return roll_call
+
+
+def _validate_entry(entry, roster_ids, seen):
+    """
+    Valide une ligne de l'appel.
+    
+    Returns:
+        tuple: (valeurs nettoyées, liste d'erreurs)
+    """
+    if not isinstance(entry, dict):
+        return None, ['Row must be an object.']
+    
+    errors = []
+    student_id = entry.get('student_id')
+    if not isinstance(student_id, int) or isinstance(student_id, bool) or student_id not in roster_ids:
+        errors.append('Student is not enrolled in this class.')
+    elif student_id in seen:
+        errors.append('Student appears more than once.')
+    
+    status = entry.get('status', 'present')
+    if not isinstance(status, str) or status not in ATTENDANCE_STATUSES:
+        errors.append(f"Unknown status '{status}'.")
+    
+    time_in = entry.get('time_in') or None
+    if time_in is not None:
+        try:
+            time_in = parse_time(time_in) if isinstance(time_in, str) else None
+        except ValueError:
+            time_in = None
+        if time_in is None:
+            errors.append('Arrival time must use the HH:MM format.')
+    
+    notes = entry.get('notes') or None
+    if notes is not None and not isinstance(notes, str):
+        errors.append('Notes must be a string.')
+    
+    return {'student_id': student_id, 'status': status, 'time_in': time_in, 'notes': notes}, errors
+
+
+def save_roll_call(class_id, date, entries, user=None):
+    """
+    Valide et enregistre l'appel d'une classe pour une date.
+    
+    Si une ligne est invalide, rien n'est écrit. Sinon toutes les présences
+    sont écrites en un seul upsert ; celles déjà saisies sont mises à jour.
+    L'upsert ne déclenche pas les signaux : les statuts précédents sont lus
+    (et verrouillés) avant l'upsert, et seuls les changements de statut sont
+    reportés sur les cumuls mensuels.
+    
+    Args:
+        class_id: ID de la classe
+        date: Date de l'appel
+        entries: Liste de dictionnaires (student_id, status, time_in, notes)
+        user: Utilisateur à l'origine de l'appel (optionnel)
+    
+    Returns:
+        tuple: (nombre de présences écrites, liste des erreurs par ligne
+        {'row': index, 'student_id': id, 'errors': [...]})
+    """
+    from app_profile.models import Student
+    
+    roster_ids = set(Student.objects.filter(
+        class_section_id=class_id,
+        is_active=True
+    ).order_by().values_list('id', flat=True))
+    
+    cleaned = []
+    errors = []
+    seen = set()
+    for index, entry in enumerate(entries):
+        values, row_errors = _validate_entry(entry, roster_ids, seen)
+        if row_errors:
+            errors.append({
+                'row': index,
+                'student_id': values['student_id'] if values else None,
+                'errors': row_errors,
+            })
+            continue
+        seen.add(values['student_id'])
+        cleaned.append(values)
+    
+    if errors or not cleaned:
+        return 0, errors
+    
+    attendances = [
+        Attendance(
+            student_id=values['student_id'],
+            class_section_id=class_id,
+            date=date,
+            status=values['status'],
+            time_in=values['time_in'],
+            notes=values['notes'],
+            is_active=True,
+            created_by=user,
+            updated_by=user
+        )
+        for values in cleaned
+    ]
+    
+    with transaction.atomic():
+        previous = {
+            student_id: status if is_active else None
+            for student_id, status, is_active in Attendance.objects.select_for_update().filter(
+                student_id__in=seen,
+                class_section_id=class_id,
+                date=date
+            ).order_by().values_list('student_id', 'status', 'is_active')
+        }
+        Attendance.objects.bulk_create(
+            attendances,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['student', 'class_section', 'date'],
+            update_fields=['status', 'time_in', 'notes', 'is_active', 'updated_by', 'updated_at']
+        )
+        apply_attendance_changes(
+            ((values['student_id'], date.year, date.month), previous.get(values['student_id']), values['status'])
+            for values in cleaned
+        )
+    
+    return len(attendances), errors
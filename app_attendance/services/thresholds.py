@@ -0,0 +1,160 @@
+"""
+Balayage des seuils d'absences.
+
+Ce module évalue toutes les règles de présence actives sur l'ensemble des
+élèves : pour chaque règle, une seule requête groupée additionne les jours
+d'absence non justifiés de chaque élève, bornés à la fenêtre de la règle
+(period_days), et ne retourne que les élèves ayant atteint le seuil
+d'alerte ou le maximum autorisé.
+"""
+
+from datetime import timedelta
+from django.db.models import Count, DateField, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+from ..models import Absence, AttendanceRule
+
+
+LEVEL_ALERT = 'alert'
+LEVEL_EXCEEDED = 'exceeded'
+
+
+def get_rule_window(rule, today=None):
+    """
+    Retourne la fenêtre de calcul d'une règle, bornes incluses.
+    
+    La fenêtre compte exactement period_days jours, aujourd'hui compris.
+    
+    Args:
+        rule: Instance du modèle AttendanceRule
+        today: Date de fin de la fenêtre (défaut : aujourd'hui)
+    
+    Returns:
+        tuple: (date de début, date de fin)
+    """
+    today = today or timezone.now().date()
+    return today - timedelta(days=max(rule.period_days - 1, 0)), today
+
+
+def annotate_absence_days(absences, window_start, window_end):
+    """
+    Groupe des absences par élève avec leur durée bornée à une fenêtre.
+    
+    Chaque absence compte end_date - start_date + 1 jours (un jour si
+    end_date est vide), après avoir ramené ses bornes dans la fenêtre.
+    Le calcul est fait par la base de données.
+    
+    Args:
+        absences: QuerySet d'absences
+        window_start: Premier jour de la fenêtre
+        window_end: Dernier jour de la fenêtre
+    
+    Returns:
+        QuerySet: Lignes (student_id, absence_duration, absence_count), où
+        absence_duration est un timedelta
+    """
+    clipped_start = Greatest(F('start_date'), Value(window_start, output_field=DateField()))
+    clipped_end = Least(
+        Coalesce(F('end_date'), F('start_date')),
+        Value(window_end, output_field=DateField())
+    )
+    span = ExpressionWrapper(
+        clipped_end - clipped_start + Value(timedelta(days=1)),
+        output_field=DurationField()
+    )
+    return absences.filter(
+        Q(end_date__gte=window_start) | Q(end_date__isnull=True, start_date__gte=window_start),
+        start_date__lte=window_end,
+        is_justified=False,
+        is_active=True
+    ).values('student_id').annotate(
+        absence_duration=Sum(span),
+        absence_count=Count('id')
+    ).order_by()
+
+
+def get_absence_level(rule, absence_days):
+    """
+    Retourne le niveau atteint pour un nombre de jours d'absence.
+    
+    Args:
+        rule: Instance du modèle AttendanceRule
+        absence_days: Nombre de jours d'absence dans la fenêtre
+    
+    Returns:
+        str: LEVEL_EXCEEDED, LEVEL_ALERT ou None
+    """
+    if absence_days >= rule.max_absences:
+        return LEVEL_EXCEEDED
+    if absence_days >= rule.alert_threshold:
+        return LEVEL_ALERT
+    return None
+
+
+def find_students_over_threshold(rule, today=None):
+    """
+    Retourne les élèves actifs ayant atteint le seuil d'alerte d'une règle.
+    
+    Une seule requête groupée est exécutée ; le filtre sur le seuil est
+    appliqué par la base de données (HAVING).
+    
+    Args:
+        rule: Instance du modèle AttendanceRule
+        today: Date de fin de la fenêtre (défaut : aujourd'hui)
+    
+    Returns:
+        list: Dictionnaires (rule_id, student_id, absence_days, level)
+    """
+    window_start, window_end = get_rule_window(rule, today)
+    lowest = min(rule.alert_threshold, rule.max_absences)
+    rows = annotate_absence_days(
+        Absence.objects.filter(student__is_active=True),
+        window_start,
+        window_end
+    ).filter(absence_duration__gte=timedelta(days=lowest))
+    
+    flagged = []
+    for row in rows:
+        absence_days = row['absence_duration'].days
+        flagged.append({
+            'rule_id': rule.id,
+            'student_id': row['student_id'],
+            'absence_days': absence_days,
+            'level': get_absence_level(rule, absence_days),
+        })
+    return flagged
+
+
+def sweep_absence_thresholds(today=None):
+    """
+    Évalue toutes les règles actives sur tous les élèves.
+    
+    Args:
+        today: Date de fin des fenêtres (défaut : aujourd'hui)
+    
+    Returns:
+        list: Élèves signalés, une entrée par (règle, élève), comme
+        find_students_over_threshold
+    """
+    flagged = []
+    for rule in AttendanceRule.objects.filter(is_active=True).order_by('id'):
+        flagged.extend(find_students_over_threshold(rule, today))
+    return flagged
+
+
+def count_absence_days(student_id, rule, today=None):
+    """
+    Compte les jours d'absence non justifiés d'un élève dans la fenêtre d'une règle.
+    
+    Args:
+        student_id: ID de l'élève
+        rule: Instance du modèle AttendanceRule
+        today: Date de fin de la fenêtre (défaut : aujourd'hui)
+    
+    Returns:
+        int: Nombre de jours d'absence
+    """
+    window_start, window_end = get_rule_window(rule, today)
+    for row in annotate_absence_days(Absence.objects.filter(student_id=student_id), window_start, window_end):
+        return row['absence_duration'].days
+    return 0
@@ -5,15 +5,19 @@ Ce module contient les fonctions utilitaires pour les calculs de présences.
 """
 
 from decimal import Decimal
-from django.utils import timezone
-from datetime import timedelta
-from ..models import Attendance, Absence, AttendanceRule
+from ..models import AttendanceRule
+from .alerts import dispatch_absence_alerts
+from .monthly import calculate_attendance_counts
+from .thresholds import count_absence_days
 
 
 def calculate_attendance_rate(student_id, start_date, end_date):
     """
     Calcule le taux de présence d'un élève sur une période.
     
+    Les mois complets sont lus dans la table de cumul AttendanceMonthly ;
+    seuls les mois partiels sont comptés sur les présences quotidiennes.
+    
     Args:
         student_id: ID de l'élève
         start_date: Date de début
@@ -22,18 +26,7 @@ def calculate_attendance_rate(student_id, start_date, end_date):
     Returns:
         Decimal: Taux de présence (0-100) ou None
     """
-    attendances = Attendance.objects.filter(
-        student_id=student_id,
-        date__gte=start_date,
-        date__lte=end_date,
-        is_active=True
-    )
-    
-    if not attendances.exists():
-        return None
-    
-    total = attendances.count()
-    present = attendances.filter(status='present').count()
+    total, present = calculate_attendance_counts(student_id, start_date, end_date)
     
     if total == 0:
         return None
@@ -46,6 +39,10 @@ def check_absence_threshold(student_id, rule_id):
     """
     Vérifie si un élève a dépassé le seuil d'absences.
     
+    Les jours d'absence non justifiés sont comptés sur la période de la
+    règle (period_days). Pour évaluer tous les élèves, utiliser
+    services.thresholds.sweep_absence_thresholds.
+    
     Args:
         student_id: ID de l'élève
         rule_id: ID de la règle
@@ -57,37 +54,18 @@ def check_absence_threshold(student_id, rule_id):
     if not rule:
         return False
     
-    # Compter les absences non justifiées sur les 30 derniers jours
-    start_date = timezone.now().date() - timedelta(days=30)
-    absences = Absence.objects.filter(
-        student_id=student_id,
-        start_date__gte=start_date,
-        is_justified=False,
-        is_active=True
-    )
-    
-    total_days = 0
-    for absence in absences:
-        if absence.end_date:
-            days = (absence.end_date - absence.start_date).days + 1
-        else:
-            days = 1
-        total_days += days
-    
-    return total_days >= rule.max_absences
+    return count_absence_days(student_id, rule) >= rule.max_absences
 
 
 def send_absence_alert(student_id):
     """
-    Envoie une alerte pour les absences répétées.
+    Envoie aux parents les alertes d'absences en attente d'un élève.
     
     Args:
         student_id: ID de l'élève
         
     Returns:
-        bool: True si l'alerte a été envoyée
+        bool: True si toutes les alertes ont été envoyées
     """
-    # TODO: Implémenter l'envoi d'alerte via Celery
-    # Utiliser app_profile.tasks pour envoyer un email/SMS
-    return True
-
+    summary = dispatch_absence_alerts(student_ids=[student_id])
+    return summary['failed'] == 0
@@ -0,0 +1,35 @@
+"""
+Signals pour l'application app_attendance.
+
+Ce module tient à jour la table de cumul AttendanceMonthly à chaque
+création, modification, désactivation ou suppression d'une présence.
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Attendance
+from .services.monthly import apply_attendance_change, get_attendance_state, get_stored_attendance_state
+
+
+@receiver(pre_save, sender=Attendance)
+def store_previous_attendance_state(sender, instance, raw=False, **kwargs):
+    """Mémorise le mois et le statut de la présence avant sa modification."""
+    if raw:
+        return
+    instance._attendance_monthly_previous = get_stored_attendance_state(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Attendance)
+def update_attendance_monthly_on_save(sender, instance, raw=False, **kwargs):
+    """Reporte l'écart entre l'ancien et le nouvel état de la présence."""
+    if raw:
+        return
+    previous = getattr(instance, '_attendance_monthly_previous', None)
+    apply_attendance_change(previous, get_attendance_state(instance))
+    instance._attendance_monthly_previous = None
+
+
+@receiver(post_delete, sender=Attendance)
+def update_attendance_monthly_on_delete(sender, instance, **kwargs):
+    """Retire une présence supprimée de son cumul mensuel."""
+    apply_attendance_change(get_attendance_state(instance), None)
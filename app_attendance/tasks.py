@@ -0,0 +1,73 @@
+"""
+Tâches Celery pour l'application app_attendance.
+
+Ce module contient le balayage périodique des seuils d'absences, planifié
+par Celery Beat (CELERY_BEAT_SCHEDULE), et l'envoi des alertes aux parents
+qui en découle.
+"""
+
+from celery import shared_task
+from django.db import DatabaseError
+from django.utils.dateparse import parse_date
+from .models import AttendanceRule
+from .services.alerts import dispatch_absence_alerts, record_threshold_crossings
+from .services.thresholds import LEVEL_EXCEEDED, sweep_absence_thresholds
+
+
+@shared_task(
+    name='app_attendance.sweep_absence_thresholds',
+    autoretry_for=(DatabaseError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def sweep_absence_thresholds_task(today=None):
+    """
+    Évalue toutes les règles de présence actives sur tous les élèves.
+    
+    Les nouveaux franchissements de seuil sont enregistrés puis leurs
+    alertes sont envoyées par la tâche dispatch_absence_alerts.
+    
+    Args:
+        today (str): Date de fin des fenêtres au format ISO (défaut : aujourd'hui)
+    
+    Returns:
+        dict: Nombre d'alertes, de dépassements et de nouveaux franchissements
+    """
+    today = parse_date(today) if today else None
+    rule_ids = list(AttendanceRule.objects.filter(is_active=True).values_list('id', flat=True))
+    flagged = sweep_absence_thresholds(today)
+    created = record_threshold_crossings(flagged, rule_ids, today)
+    if created:
+        dispatch_absence_alerts_task.delay()
+    
+    exceeded = sum(1 for row in flagged if row['level'] == LEVEL_EXCEEDED)
+    return {
+        'alerts': len(flagged) - exceeded,
+        'exceeded': exceeded,
+        'created': created,
+    }
+
+
+@shared_task(
+    name='app_attendance.dispatch_absence_alerts',
+    bind=True,
+    acks_late=True,
+    autoretry_for=(DatabaseError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def dispatch_absence_alerts_task(self):
+    """
+    Envoie aux parents les alertes d'absences en attente.
+    
+    Les envois déjà réussis sont inscrits au journal et ne sont jamais
+    refaits : la tâche peut être relancée sans doublon. Si des envois ont
+    échoué, elle se relance pour les retenter.
+    
+    Returns:
+        dict: Nombre d'alertes, de messages envoyés, d'échecs et d'alertes traitées
+    """
+    summary = dispatch_absence_alerts()
+    if summary['failed'] and self.request.retries < self.max_retries:
+        raise self.retry(countdown=5 * 60)
+    return summary
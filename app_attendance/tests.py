@@ -4,7 +4,9 @@ Tests unitaires pour l'application app_attendance.
 Ce module contient les tests pour tous les modèles de présence.
 """
 
-from django.test import TestCase
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import date, timedelta
@@ -203,6 +205,13 @@ class ExcuseTestCase(TestCase):
     
     def setUp(self):
         """Préparation des données de test."""
+        # Les justificatifs sont écrits dans un MEDIA_ROOT temporaire
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        
         self.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
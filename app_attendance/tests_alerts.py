@@ -0,0 +1,258 @@
+"""
+Tests unitaires pour l'envoi des alertes d'absences.
+
+Ce module vérifie l'enregistrement des franchissements de seuil sans
+doublon, le regroupement des alertes par parent, le journal des envois
+et les nouvelles tentatives, ainsi que les backends email et SMS.
+"""
+
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core import mail
+from datetime import date
+from unittest import mock
+from .models import AttendanceRule, Absence, AbsenceAlert, AbsenceAlertDelivery
+from .services.alerts import (
+    EmailAlertBackend, LocMemAlertBackend, SmsAlertBackend, dispatch_absence_alerts,
+    record_threshold_crossings, run_absence_alerts
+)
+from .tasks import sweep_absence_thresholds_task
+from app_academic.models import AcademicYear, Grade, Class
+from app_profile.models import Parent, Profile, Student, UserPreferences
+
+
+class FlakyAlertBackend(LocMemAlertBackend):
+    """Backend en mémoire dont les envois vers certaines adresses échouent."""
+    
+    failing = set()
+    
+    def send_messages(self, messages):
+        results = [
+            'Temporary failure' if message['recipient'] in self.failing else None
+            for message in messages
+        ]
+        LocMemAlertBackend.outbox.extend(
+            message for message, error in zip(messages, results) if error is None
+        )
+        return results
+
+
+@override_settings(ABSENCE_ALERT_BACKENDS=['app_attendance.services.alerts.LocMemAlertBackend'])
+class AbsenceAlertTestCase(TestCase):
+    """Tests pour le pipeline d'alertes d'absences."""
+    
+    def setUp(self):
+        """Préparation des données de test."""
+        LocMemAlertBackend.outbox = []
+        self.today = date(2024, 11, 30)
+        academic_year = AcademicYear.objects.create(
+            name='2024-2025',
+            start_date=date(2024, 9, 1),
+            end_date=date(2025, 6, 30),
+            is_current=True,
+            is_active=True
+        )
+        grade = Grade.objects.create(name='6ème', code='6EME', order=6, is_active=True)
+        class_section = Class.objects.create(
+            name='6A', code='6A', grade=grade,
+            academic_year=academic_year, capacity=30, is_active=True
+        )
+        self.students = [
+            Student.objects.create(
+                profile=self.create_profile(f'student{i}', f'Élève {i}'),
+                class_section=class_section,
+                academic_year=academic_year,
+                is_active=True
+            )
+            for i in range(2)
+        ]
+        # Parent des deux élèves, parent du premier élève, parent inactif
+        self.parent = self.create_parent('parent', 'Parent Un', self.students, phone='242060000001')
+        self.other_parent = self.create_parent('other', 'Parent Deux', self.students[:1])
+        self.create_parent('inactive', 'Parent Inactif', self.students, is_active=False)
+        UserPreferences.objects.create(profile=self.parent.profile, sms_notifications=True)
+        self.rule = AttendanceRule.objects.create(
+            name='Mensuelle', max_absences=5, alert_threshold=3, period_days=30
+        )
+    
+    def create_profile(self, username, full_name, phone=None):
+        """Crée un utilisateur et complète son profil."""
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='testpass123'
+        )
+        profile = Profile.objects.get(user=user)
+        profile.full_name = full_name
+        profile.phone = phone
+        profile.save()
+        return profile
+    
+    def create_parent(self, username, full_name, children, phone=None, is_active=True):
+        """Crée un parent et lui rattache ses enfants."""
+        parent = Parent.objects.create(
+            profile=self.create_profile(username, full_name, phone), is_active=is_active
+        )
+        parent.children.set(children)
+        return parent
+    
+    def flag(self, student, level='alert', absence_days=3):
+        """Ligne de balayage signalant un élève pour la règle de test."""
+        return {
+            'rule_id': self.rule.id,
+            'student_id': student.id,
+            'absence_days': absence_days,
+            'level': level,
+        }
+    
+    def open_alerts(self):
+        """Retourne les alertes ouvertes (élève, niveau)."""
+        return sorted(AbsenceAlert.objects.filter(resolved_on__isnull=True).values_list('student_id', 'level'))
+    
+    def test_crossings_are_recorded_once(self):
+        """Test qu'un franchissement n'est enregistré qu'une fois tant qu'il dure."""
+        student = self.students[0]
+        self.assertEqual(record_threshold_crossings([self.flag(student)], [self.rule.id], self.today), 1)
+        self.assertEqual(record_threshold_crossings([self.flag(student)], [self.rule.id], self.today), 0)
+        self.assertEqual(self.open_alerts(), [(student.id, 'alert')])
+        
+        # Les doublons écartés par la contrainte d'unicité ne sont pas comptés
+        other = self.students[1]
+        self.assertEqual(record_threshold_crossings(
+            [self.flag(student), self.flag(other), self.flag(other)], [self.rule.id], self.today
+        ), 1)
+        AbsenceAlert.objects.filter(student=other).delete()
+        
+        # Passage au maximum : nouvelle alerte, la précédente reste ouverte
+        record_threshold_crossings([self.flag(student, 'exceeded', 5)], [self.rule.id], self.today)
+        self.assertEqual(self.open_alerts(), [(student.id, 'alert'), (student.id, 'exceeded')])
+        
+        # Retour au seuil d'alerte puis sous le seuil
+        record_threshold_crossings([self.flag(student)], [self.rule.id], self.today)
+        self.assertEqual(self.open_alerts(), [(student.id, 'alert')])
+        record_threshold_crossings([], [self.rule.id], self.today)
+        self.assertEqual(self.open_alerts(), [])
+        
+        # Nouveau franchissement
+        self.assertEqual(record_threshold_crossings([self.flag(student)], [self.rule.id], self.today), 1)
+        self.assertEqual(AbsenceAlert.objects.count(), 3)
+    
+    def test_concurrent_crossings_are_not_counted(self):
+        """Test que les alertes créées par un balayage concurrent ne sont pas comptées."""
+        student, other = self.students[0], self.students[1]
+        bulk_create = AbsenceAlert.objects.bulk_create
+        
+        def concurrent_bulk_create(alerts, **kwargs):
+            # Un autre balayage crée la même alerte juste avant l'insertion
+            AbsenceAlert.objects.create(rule=self.rule, student=student, level='alert', absence_days=3, crossed_on=self.today)
+            return bulk_create(alerts, **kwargs)
+        
+        with mock.patch.object(AbsenceAlert.objects, 'bulk_create', side_effect=concurrent_bulk_create):
+            created = record_threshold_crossings([self.flag(student), self.flag(other)], [self.rule.id], self.today)
+        
+        self.assertEqual(created, 1)
+        self.assertEqual(self.open_alerts(), [(student.id, 'alert'), (other.id, 'alert')])
+    
+    def test_dispatch_groups_alerts_per_parent(self):
+        """Test un message par parent regroupant les alertes de ses enfants."""
+        record_threshold_crossings(
+            [self.flag(self.students[0]), self.flag(self.students[1], 'exceeded', 6)],
+            [self.rule.id],
+            self.today
+        )
+        
+        # Alertes, parents, journal, écriture du lot et alertes traitées
+        with self.assertNumQueries(5):
+            summary = dispatch_absence_alerts()
+        
+        self.assertEqual(summary, {'alerts': 2, 'sent': 2, 'failed': 0, 'dispatched': 2})
+        messages = {message['recipient']: message for message in LocMemAlertBackend.outbox}
+        self.assertEqual(set(messages), {'parent@example.com', 'other@example.com'})
+        self.assertIn('Élève 0 : 3 jour(s)', messages['parent@example.com']['body'])
+        self.assertIn('Élève 1 : 6 jour(s)', messages['parent@example.com']['body'])
+        self.assertNotIn('Élève 1', messages['other@example.com']['body'])
+        self.assertEqual(AbsenceAlertDelivery.objects.filter(status='sent').count(), 3)
+        
+        # Rien n'est renvoyé au passage suivant
+        self.assertEqual(dispatch_absence_alerts()['alerts'], 0)
+        self.assertEqual(len(LocMemAlertBackend.outbox), 2)
+    
+    def test_sweep_does_not_duplicate_alerts(self):
+        """Test que des balayages successifs n'envoient qu'une alerte par franchissement."""
+        Absence.objects.create(student=self.students[0], start_date=date(2024, 11, 18), end_date=date(2024, 11, 20))
+        
+        self.assertEqual(run_absence_alerts(self.today)['created'], 1)
+        self.assertEqual(run_absence_alerts(date(2024, 12, 1))['created'], 0)
+        self.assertEqual(len(LocMemAlertBackend.outbox), 2)
+    
+    @override_settings(ABSENCE_ALERT_MAX_ATTEMPTS=2)
+    def test_failed_deliveries_are_retried(self):
+        """Test que seuls les envois en échec sont retentés, dans la limite des tentatives."""
+        backends = [FlakyAlertBackend()]
+        FlakyAlertBackend.failing = {'other@example.com'}
+        record_threshold_crossings([self.flag(self.students[0])], [self.rule.id], self.today)
+        
+        summary = dispatch_absence_alerts(backends)
+        self.assertEqual((summary['sent'], summary['failed'], summary['dispatched']), (1, 1, 0))
+        delivery = AbsenceAlertDelivery.objects.get(parent=self.other_parent)
+        self.assertEqual((delivery.status, delivery.attempts, delivery.error), ('failed', 1, 'Temporary failure'))
+        
+        FlakyAlertBackend.failing = set()
+        summary = dispatch_absence_alerts(backends)
+        self.assertEqual((summary['sent'], summary['failed'], summary['dispatched']), (1, 0, 1))
+        self.assertEqual([message['recipient'] for message in LocMemAlertBackend.outbox], [
+            'parent@example.com', 'other@example.com'
+        ])
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), ('sent', 2))
+        
+        # Tentatives épuisées : l'alerte est traitée malgré l'échec
+        FlakyAlertBackend.failing = {'parent@example.com'}
+        record_threshold_crossings([self.flag(self.students[1])], [self.rule.id], self.today)
+        dispatch_absence_alerts(backends)
+        summary = dispatch_absence_alerts(backends)
+        self.assertEqual((summary['failed'], summary['dispatched']), (1, 1))
+        self.assertEqual(dispatch_absence_alerts(backends)['alerts'], 0)
+    
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_email_and_sms_backends(self):
+        """Test l'envoi par email à tous les parents et par SMS aux parents qui l'ont activé."""
+        record_threshold_crossings([self.flag(self.students[0])], [self.rule.id], self.today)
+        
+        with mock.patch('app_profile.otp_utils.is_twilio_configured', return_value=True), \
+                mock.patch('app_profile.otp_utils.send_sms_via_twilio', return_value=(True, 'SM1')) as send_sms:
+            summary = dispatch_absence_alerts([EmailAlertBackend(), SmsAlertBackend()])
+        
+        self.assertEqual(summary['sent'], 3)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['other@example.com', 'parent@example.com'])
+        self.assertEqual(mail.outbox[0].subject, "Alerte d'absences")
+        send_sms.assert_called_once()
+        self.assertEqual(send_sms.call_args[0][0], '242060000001')
+        self.assertEqual(
+            AbsenceAlertDelivery.objects.get(channel='sms').recipient,
+            '242060000001'
+        )
+    
+    def test_sms_backend_without_twilio(self):
+        """Test qu'un SMS n'est pas compté comme envoyé si Twilio n'est pas configuré."""
+        record_threshold_crossings([self.flag(self.students[0])], [self.rule.id], self.today)
+        
+        with override_settings(TWILIO_ACCOUNT_SID=None, TWILIO_AUTH_TOKEN=None):
+            summary = dispatch_absence_alerts([SmsAlertBackend()])
+        
+        self.assertEqual((summary['sent'], summary['failed']), (0, 1))
+        delivery = AbsenceAlertDelivery.objects.get(channel='sms')
+        self.assertEqual(delivery.status, 'failed')
+        self.assertEqual(delivery.error, 'Twilio is not configured')
+    
+    @override_settings(
+        CELERY_TASK_ALWAYS_EAGER=True,
+        CELERY_TASK_EAGER_PROPAGATES=True
+    )
+    def test_sweep_task_dispatches_alerts(self):
+        """Test que la tâche périodique enregistre et envoie les nouvelles alertes."""
+        Absence.objects.create(student=self.students[1], start_date=date(2024, 11, 4), end_date=date(2024, 11, 8))
+        
+        result = sweep_absence_thresholds_task.apply(kwargs={'today': '2024-11-30'}).get()
+        
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([message['recipient'] for message in LocMemAlertBackend.outbox], ['parent@example.com'])
+        self.assertIsNotNone(AbsenceAlert.objects.get().dispatched_at)
@@ -0,0 +1,142 @@
+"""
+Tests unitaires pour l'appel groupé des présences.
+
+Ce module vérifie la liste d'appel pré-remplie, la validation ligne par
+ligne, l'upsert des présences d'une classe et la vue JSON d'appel.
+"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
+from datetime import date, time
+from app_config.permissions import assign_permission
+from app_config.models import Permission
+from .models import Attendance
+from .services.roll_call import _validate_entry, get_roll_call, save_roll_call
+from app_academic.models import AcademicYear, Grade, Class
+from app_profile.models import Profile, Student
+
+
+class RollCallTestCase(TestCase):
+    """Tests pour l'appel d'une classe."""
+    
+    def setUp(self):
+        """Préparation des données de test."""
+        self.academic_year = AcademicYear.objects.create(
+            name='2024-2025',
+            start_date=date(2024, 9, 1),
+            end_date=date(2025, 6, 30),
+            is_current=True,
+            is_active=True
+        )
+        self.grade = Grade.objects.create(name='6ème', code='6EME', order=6, is_active=True)
+        self.class_section = self.create_class('6A')
+        self.day = date(2024, 10, 7)
+        self.students = [self.create_student(f'student{i}', self.class_section) for i in range(3)]
+        Attendance.objects.create(
+            student=self.students[0], class_section=self.class_section, date=self.day,
+            status='late', time_in=time(8, 20)
+        )
+    
+    def create_class(self, code):
+        """Crée une classe de l'année de test."""
+        return Class.objects.create(
+            name=code, code=code, grade=self.grade,
+            academic_year=self.academic_year, capacity=30, is_active=True
+        )
+    
+    def create_student(self, username, class_section):
+        """Crée un élève actif de la classe."""
+        user = User.objects.create_user(username=username, password='testpass123')
+        profile = Profile.objects.get(user=user)
+        profile.full_name = username.capitalize()
+        profile.save()
+        return Student.objects.create(
+            profile=profile,
+            class_section=class_section,
+            academic_year=self.academic_year,
+            is_active=True
+        )
+    
+    def get_statuses(self):
+        """Retourne les statuts enregistrés du jour par élève."""
+        return dict(Attendance.objects.filter(date=self.day).values_list('student_id', 'status'))
+    
+    def test_roll_call_is_prefilled(self):
+        """Test que la liste d'appel reprend les présences déjà saisies."""
+        roll_call = {row['student_id']: row for row in get_roll_call(self.class_section.id, self.day)}
+        
+        self.assertEqual(len(roll_call), 3)
+        self.assertEqual(roll_call[self.students[0].id]['status'], 'late')
+        self.assertEqual(roll_call[self.students[0].id]['time_in'], time(8, 20))
+        self.assertTrue(roll_call[self.students[0].id]['recorded'])
+        self.assertEqual(roll_call[self.students[1].id]['status'], 'present')
+        self.assertFalse(roll_call[self.students[1].id]['recorded'])
+    
+    def test_save_roll_call(self):
+        """Test l'enregistrement de toute la classe en un seul upsert."""
+        entries = [
+            {'student_id': self.students[0].id, 'status': 'present', 'time_in': '08:00'},
+            {'student_id': self.students[1].id, 'status': 'absent'},
+            {'student_id': self.students[2].id, 'status': 'late', 'time_in': '08:25', 'notes': 'Bus'},
+        ]
+        
+        # Liste de la classe, statuts précédents, upsert, lignes de cumul manquantes,
+        # une mise à jour par changement de statut (3) et deux points de sauvegarde
+        with self.assertNumQueries(11):
+            written, errors = save_roll_call(self.class_section.id, self.day, entries)
+        
+        self.assertEqual((written, errors), (3, []))
+        self.assertEqual(Attendance.objects.filter(date=self.day).count(), 3)
+        self.assertEqual(self.get_statuses(), {
+            self.students[0].id: 'present',
+            self.students[1].id: 'absent',
+            self.students[2].id: 'late',
+        })
+        self.assertEqual(Attendance.objects.get(student=self.students[2]).notes, 'Bus')
+    
+    def test_validation_errors(self):
+        """Test les erreurs par ligne : rien n'est écrit si une ligne est invalide."""
+        outsider = self.create_student('outsider', self.create_class('6B'))
+        written, errors = save_roll_call(self.class_section.id, self.day, [
+            {'student_id': self.students[0].id, 'status': 'absent'},
+            {'student_id': self.students[1].id, 'status': 'sick'},
+            {'student_id': self.students[2].id, 'time_in': '25:99'},
+            {'student_id': outsider.id},
+            {'student_id': self.students[0].id},
+        ])
+        
+        self.assertEqual(written, 0)
+        self.assertEqual([error['row'] for error in errors], [1, 2, 3, 4])
+        self.assertEqual(errors[0]['errors'], ["Unknown status 'sick'."])
+        self.assertEqual(self.get_statuses(), {self.students[0].id: 'late'})
+        
+        # Un booléen n'est pas un identifiant, même si True vaut 1
+        _, row_errors = _validate_entry({'student_id': True}, {1}, set())
+        self.assertEqual(row_errors, ['Student is not enrolled in this class.'])
+    
+    def test_endpoint(self):
+        """Test la vue JSON d'appel."""
+        user = User.objects.create_user(username='teacher', password='testpass123')
+        self.client.force_login(user)
+        url = reverse('app_attendance:roll_call', kwargs={'class_id': self.class_section.id, 'date': '2024-10-07'})
+        
+        self.assertEqual(self.client.get(url).status_code, 403)
+        
+        Permission.objects.create(name='create_attendance', codename='create_attendance', resource='app_attendance', action='create')
+        assign_permission(user.profile, 'create_attendance')
+        
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['attendances']), 3)
+        
+        payload = {'attendances': [{'student_id': student.id, 'status': 'present'} for student in self.students]}
+        response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['written'], 3)
+        self.assertEqual(Attendance.objects.get(student=self.students[1]).created_by, user)
+        
+        invalid_date_url = reverse('app_attendance:roll_call', kwargs={'class_id': self.class_section.id, 'date': '2024-13-45'})
+        self.assertEqual(self.client.get(invalid_date_url).status_code, 400)
+        missing_class_url = reverse('app_attendance:roll_call', kwargs={'class_id': 0, 'date': '2024-10-07'})
+        self.assertEqual(self.client.get(missing_class_url).status_code, 404)
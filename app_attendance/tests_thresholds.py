@@ -0,0 +1,128 @@
+"""
+Tests unitaires pour le balayage des seuils d'absences.
+
+Ce module vérifie le calcul des jours d'absence bornés à la fenêtre de
+chaque règle, les niveaux d'alerte retournés et la tâche périodique.
+"""
+
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from datetime import date, timedelta
+from .models import AttendanceRule, Absence
+from .services.thresholds import (
+    LEVEL_ALERT, LEVEL_EXCEEDED, count_absence_days, sweep_absence_thresholds
+)
+from .services.utils import check_absence_threshold
+from .tasks import sweep_absence_thresholds_task
+from app_academic.models import AcademicYear, Grade, Class
+from app_profile.models import Profile, Student
+
+
+class AbsenceThresholdTestCase(TestCase):
+    """Tests pour le balayage des règles de présence."""
+    
+    def setUp(self):
+        """Préparation des données de test."""
+        self.today = date(2024, 11, 30)
+        academic_year = AcademicYear.objects.create(
+            name='2024-2025',
+            start_date=date(2024, 9, 1),
+            end_date=date(2025, 6, 30),
+            is_current=True,
+            is_active=True
+        )
+        grade = Grade.objects.create(name='6ème', code='6EME', order=6, is_active=True)
+        class_section = Class.objects.create(
+            name='6A', code='6A', grade=grade,
+            academic_year=academic_year, capacity=30, is_active=True
+        )
+        self.students = []
+        for i in range(4):
+            user = User.objects.create_user(username=f'student{i}', password='testpass123')
+            self.students.append(Student.objects.create(
+                profile=Profile.objects.get(user=user),
+                class_section=class_section,
+                academic_year=academic_year,
+                is_active=True
+            ))
+        self.rule = AttendanceRule.objects.create(
+            name='Mensuelle', max_absences=5, alert_threshold=3, period_days=30
+        )
+    
+    def absent(self, student, start_date, end_date=None, **kwargs):
+        """Enregistre une absence non justifiée."""
+        return Absence.objects.create(
+            student=student, start_date=start_date, end_date=end_date, **kwargs
+        )
+    
+    def test_absence_days_are_clipped_to_window(self):
+        """Test que seuls les jours compris dans la fenêtre de la règle sont comptés."""
+        student = self.students[0]
+        # Fenêtre de 30 jours, du 01/11 au 30/11 : 1 jour sur 7
+        self.absent(student, date(2024, 10, 26), date(2024, 11, 1))
+        self.absent(student, date(2024, 11, 10))
+        self.absent(student, date(2024, 11, 12), date(2024, 11, 13))
+        # Hors fenêtre, justifiée ou désactivée
+        self.absent(student, date(2024, 10, 1), date(2024, 10, 5))
+        self.absent(student, date(2024, 11, 20), date(2024, 11, 25), is_justified=True)
+        self.absent(student, date(2024, 11, 20), is_active=False)
+        # Se termine après la fin de la fenêtre
+        self.absent(student, date(2024, 11, 29), date(2024, 12, 3))
+        
+        self.assertEqual(count_absence_days(student.id, self.rule, self.today), 6)
+        self.assertEqual(count_absence_days(self.students[1].id, self.rule, self.today), 0)
+    
+    def test_sweep_levels(self):
+        """Test les niveaux retournés pour chaque élève et chaque règle."""
+        self.absent(self.students[0], date(2024, 11, 18), date(2024, 11, 20))
+        self.absent(self.students[1], date(2024, 11, 4), date(2024, 11, 8))
+        self.absent(self.students[1], date(2024, 11, 28), date(2024, 11, 29))
+        self.absent(self.students[2], date(2024, 11, 25))
+        self.absent(self.students[3], date(2024, 11, 4), date(2024, 11, 8))
+        self.students[3].is_active = False
+        self.students[3].save()
+        weekly = AttendanceRule.objects.create(
+            name='Hebdomadaire', max_absences=2, alert_threshold=1, period_days=7
+        )
+        AttendanceRule.objects.create(name='Inactive', max_absences=1, alert_threshold=1, is_active=False)
+        
+        # Liste des règles puis une requête groupée par règle active
+        with self.assertNumQueries(3):
+            flagged = sweep_absence_thresholds(self.today)
+        
+        self.assertEqual(
+            sorted((row['rule_id'], row['student_id'], row['absence_days'], row['level']) for row in flagged),
+            sorted([
+                (self.rule.id, self.students[0].id, 3, LEVEL_ALERT),
+                (self.rule.id, self.students[1].id, 7, LEVEL_EXCEEDED),
+                (weekly.id, self.students[1].id, 2, LEVEL_EXCEEDED),
+                (weekly.id, self.students[2].id, 1, LEVEL_ALERT),
+            ])
+        )
+    
+    def test_check_absence_threshold_uses_rule_period(self):
+        """Test que la vérification individuelle suit la période de la règle."""
+        today = date.today()
+        self.absent(self.students[0], today - timedelta(days=20), today - timedelta(days=15))
+        self.assertTrue(check_absence_threshold(self.students[0].id, self.rule.id))
+        
+        self.rule.period_days = 10
+        self.rule.save()
+        self.assertFalse(check_absence_threshold(self.students[0].id, self.rule.id))
+    
+    @override_settings(
+        CELERY_TASK_ALWAYS_EAGER=True,
+        CELERY_TASK_EAGER_PROPAGATES=True,
+        ABSENCE_ALERT_BACKENDS=['app_attendance.services.alerts.LocMemAlertBackend']
+    )
+    def test_task_summary(self):
+        """Test le résumé retourné par la tâche périodique."""
+        self.absent(self.students[0], date(2024, 11, 18), date(2024, 11, 20))
+        self.absent(self.students[1], date(2024, 11, 4), date(2024, 11, 8))
+        
+        result = sweep_absence_thresholds_task.apply(kwargs={'today': '2024-11-30'}).get()
+        
+        self.assertEqual(result['alerts'], 1)
+        self.assertEqual(result['exceeded'], 1)
+        self.assertEqual(result['created'], 2)
+        self.assertNotIn('flagged', result)
@@ -21,6 +21,7 @@ urlpatterns = [
     path('attendances/<int:pk>/', views.AttendanceDetailView.as_view(), name='attendance_detail'),
     path('attendances/create/', views.AttendanceCreateView.as_view(), name='attendance_create'),
     path('attendances/<int:pk>/update/', views.AttendanceUpdateView.as_view(), name='attendance_update'),
+    path('roll-call/<int:class_id>/<str:date>/', views.RollCallView.as_view(), name='roll_call'),
     
     # Absence
     path('absences/', views.AbsenceListView.as_view(), name='absence_list'),
@@ -12,9 +12,15 @@ from django.core.paginator import Paginator
 from django.db.models import Q
 from django.contrib import messages
 from django.urls import reverse_lazy
+from django.views import View
+from django.http import JsonResponse
+from django.utils.dateparse import parse_date
+import json
 
 from .models import AttendanceRule, Attendance, Absence, Excuse
+from .services.roll_call import get_roll_call, save_roll_call
 from app_config.permissions import PermissionRequiredMixin
+from app_academic.models import Class
 
 
 # ==================== ATTENDANCE RULE ====================
@@ -225,6 +231,91 @@ class AttendanceUpdateView(PermissionRequiredMixin, UpdateView):
         return reverse_lazy('app_attendance:attendance_detail', kwargs={'pk': self.object.pk})
 
 
+# ==================== ROLL CALL ====================
+
+@method_decorator(login_required, name='dispatch')
+class RollCallView(PermissionRequiredMixin, View):
+    """
+    Vue JSON de l'appel d'une classe pour une date.
+    
+    GET renvoie la liste d'appel pré-remplie ; POST enregistre tous les
+    statuts en une requête.
+    """
+    required_permission = 'create_attendance'
+    required_resource = 'app_attendance'
+    
+    def get_target(self, class_id, date):
+        """Retourne la date de l'appel, ou une réponse d'erreur."""
+        try:
+            roll_call_date = parse_date(date)
+        except ValueError:
+            roll_call_date = None
+        if roll_call_date is None:
+            return None, JsonResponse({'status': 'error', 'message': 'Invalid date.'}, status=400)
+        if not Class.objects.filter(pk=class_id, is_active=True).exists():
+            return None, JsonResponse({'status': 'error', 'message': 'Class not found.'}, status=404)
+        return roll_call_date, None
+    
+    def get(self, request, class_id, date):
+        roll_call_date, error = self.get_target(class_id, date)
+        if error:
+            return error
+        
+        return JsonResponse({
+            'status': 'success',
+            'class_id': class_id,
+            'date': roll_call_date,
+            'attendances': get_roll_call(class_id, roll_call_date)
+        })
+    
+    def post(self, request, class_id, date):
+        """
+        Enregistre l'appel de la classe.
+        
+        Body JSON attendu:
+        {
+            "attendances": [
+                {"student_id": 12, "status": "present", "time_in": "08:00"},
+                {"student_id": 13, "status": "late", "time_in": "08:25", "notes": "Bus"}
+            ]
+        }
+        
+        Si une ligne est invalide, rien n'est enregistré et les erreurs sont
+        renvoyées ligne par ligne.
+        """
+        roll_call_date, error = self.get_target(class_id, date)
+        if error:
+            return error
+        
+        try:
+            data = json.loads(request.body or '{}')
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid JSON data.'
+            }, status=400)
+        
+        entries = data.get('attendances') if isinstance(data, dict) else None
+        if not isinstance(entries, list) or not entries:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'A non-empty attendances list is required.'
+            }, status=400)
+        
+        written, errors = save_roll_call(class_id, roll_call_date, entries, request.user)
+        if errors:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Some attendances are invalid.',
+                'errors': errors
+            }, status=400)
+        
+        return JsonResponse({
+            'status': 'success',
+            'written': written
+        })
+
+
 # ==================== ABSENCE CRUD ====================
 
 class AbsenceDetailView(PermissionRequiredMixin, DetailView):
@@ -5,3 +5,10 @@ class AppConfigConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_config'
     verbose_name = 'Configuration Management'
+    
+    def ready(self):
+        """
+        Méthode appelée lorsque l'application est prête.
+        Enregistre les signaux.
+        """
+        import app_config.signals  # noqa
@@ -5,8 +5,195 @@ Ces processeurs ajoutent des variables au contexte de tous les templates,
 permettant d'accéder aux permissions et rôles de l'utilisateur.
 """
 
+import logging
+import threading
+from functools import lru_cache
 from django.urls import reverse, NoReverseMatch
-from .permissions import has_permission, is_admin, get_user_permissions
+from django.utils.functional import SimpleLazyObject
+from .permissions import get_request_permissions
+
+
+logger = logging.getLogger(__name__)
+
+# Compteurs des contextes de permissions paresseux (voir get_lazy_permissions_stats)
+_lazy_permissions_stats = {'contexts': 0, 'resolved': 0}
+_stats_lock = threading.Lock()
+
+# Permissions donnant accès à la section Configuration
+CONFIG_PERMISSIONS = (
+    ('manage_permissions', 'app_config'),
+    ('assign_role_permissions', 'app_config'),
+)
+
+# Nombre maximal de menus filtrés conservés en mémoire (un par jeu de permissions)
+SIDEBAR_CACHE_SIZE = 256
+
+# Déclaration statique du sidebar.
+#
+# Pour chaque section :
+# - permissions : la section n'est affichée que si l'une de ces paires
+#   (codename, resource) est effective (vide = tous les utilisateurs connectés)
+# - admin : les administrateurs voient la section quelles que soient leurs
+#   permissions
+# - admin_bypass : les administrateurs voient tous les enfants de la section
+# - active_prefixes / inactive_prefixes : préfixes de `request.path` qui
+#   activent (ou non) la surbrillance de la section
+# - children : sous-menus, chacun affiché si l'une de ses permissions est
+#   effective ; une section à enfants n'est affichée que si au moins un
+#   enfant est visible
+SIDEBAR_MENU = (
+    {
+        'title': 'Dashboard',
+        'icon': 'iconoir-home-simple',
+        'url_name': 'app_profile:standard_dashboard',
+        'permissions': (),
+        'active_prefixes': ('/profiles/dashboard/',),
+    },
+    {
+        'title': 'Profiles',
+        'icon': 'iconoir-user',
+        'permissions': (('view_profile', 'app_profile'),),
+        'resource': 'app_profile',
+        'active_prefixes': ('/profiles/',),
+        'inactive_prefixes': ('/profiles/dashboard/',),
+        'children': (
+            {'title': 'Liste des profils', 'url_name': 'app_profile:profile_list',
+             'permissions': (('view_all_profiles', 'app_profile'),)},
+            {'title': 'Étudiants', 'url_name': 'app_profile:student_list',
+             'permissions': (('view_student', 'app_profile'),)},
+            {'title': 'Enseignants', 'url_name': 'app_profile:teacher_list',
+             'permissions': (('view_teacher', 'app_profile'),)},
+            {'title': 'Parents', 'url_name': 'app_profile:parent_list',
+             'permissions': (('view_parent', 'app_profile'),)},
+            {'title': 'Mon profil', 'url_name': 'app_profile:profile_view',
+             'permissions': ()},
+        ),
+    },
+    {
+        'title': 'Académique',
+        'icon': 'iconoir-book',
+        'permissions': (),
+        'resource': 'app_academic',
+        'admin_bypass': True,
+        'active_prefixes': ('/academic/',),
+        'children': (
+            {'title': 'Années scolaires', 'url_name': 'app_academic:academic_year_list',
+             'permissions': (('view_academic_year', 'app_academic'),)},
+            {'title': 'Niveaux', 'url_name': 'app_academic:grade_list',
+             'permissions': (('view_class', 'app_academic'),)},
+            {'title': 'Salles de classe', 'url_name': 'app_academic:classroom_list',
+             'permissions': (('view_class', 'app_academic'),)},
+            {'title': 'Classes', 'url_name': 'app_academic:class_list',
+             'permissions': (('view_class', 'app_academic'),)},
+            {'title': 'Matières', 'url_name': 'app_academic:subject_list',
+             'permissions': (('view_subject', 'app_academic'),)},
+            {'title': 'Emploi du temps', 'url_name': 'app_academic:schedule_list',
+             'permissions': (('view_schedule', 'app_academic'),)},
+        ),
+    },
+    {
+        'title': 'Notes',
+        'icon': 'iconoir-document',
+        'permissions': (),
+        'resource': 'app_grades',
+        'admin_bypass': True,
+        'active_prefixes': ('/grades/',),
+        'children': (
+            {'title': 'Évaluations', 'url_name': 'app_grades:assessment_list',
+             'permissions': (('view_assessment', 'app_grades'),)},
+            {'title': 'Notes', 'url_name': 'app_grades:grade_list',
+             'permissions': (('view_grade', 'app_grades'),)},
+            {'title': 'Bulletins', 'url_name': 'app_grades:report_card_list',
+             'permissions': (('view_report_card', 'app_grades'),)},
+            {'title': 'Barèmes', 'url_name': 'app_grades:grade_scale_list',
+             'permissions': (('view_grade', 'app_grades'),)},
+            {'title': 'Catégories', 'url_name': 'app_grades:grade_category_list',
+             'permissions': (('view_assessment', 'app_grades'),)},
+        ),
+    },
+    {
+        'title': 'Présences',
+        'icon': 'iconoir-calendar',
+        'permissions': (),
+        'resource': 'app_attendance',
+        'admin_bypass': True,
+        'active_prefixes': ('/attendance/',),
+        'children': (
+            {'title': 'Présences', 'url_name': 'app_attendance:attendance_list',
+             'permissions': (('view_attendance', 'app_attendance'),)},
+            {'title': 'Absences', 'url_name': 'app_attendance:absence_list',
+             'permissions': (('view_absence', 'app_attendance'),)},
+            {'title': 'Justificatifs', 'url_name': 'app_attendance:excuse_list',
+             'permissions': (('view_excuse', 'app_attendance'),)},
+            {'title': 'Règles de présence', 'url_name': 'app_attendance:attendance_rule_list',
+             'permissions': (('view_attendance', 'app_attendance'),)},
+        ),
+    },
+    {
+        'title': 'Configuration',
+        'icon': 'iconoir-settings',
+        'permissions': CONFIG_PERMISSIONS,
+        'resource': 'app_config',
+        'admin': True,
+        'active_prefixes': ('/profiles/roles-management/', '/profiles/verifications/'),
+        'children': (
+            {'title': 'Gestion des rôles', 'url_name': 'app_profile:roles_management',
+             'permissions': CONFIG_PERMISSIONS},
+            {'title': 'Vérifications', 'url_name': 'app_profile:verification_management',
+             'permissions': (('manage_verifications', 'app_profile'),)},
+        ),
+    },
+)
+
+# Ensemble des paires (codename, resource) utilisées par le sidebar :
+# seules celles-ci entrent dans l'empreinte servant de clé de mémorisation
+MENU_PERMISSIONS = frozenset(
+    permission
+    for section in SIDEBAR_MENU
+    for entry in (section, *section.get('children', ()))
+    for permission in entry['permissions']
+)
+
+
+def get_lazy_permissions_stats():
+    """
+    Retourne les compteurs des contextes de permissions paresseux.
+    
+    Returns:
+        dict: contexts (contextes construits), resolved (contextes ayant
+        réellement résolu les permissions) et avoided (rendus sans résolution)
+    """
+    with _stats_lock:
+        stats = dict(_lazy_permissions_stats)
+    stats['avoided'] = stats['contexts'] - stats['resolved']
+    return stats
+
+
+def _count_context():
+    with _stats_lock:
+        _lazy_permissions_stats['contexts'] += 1
+
+
+def _lazy_request_permissions(request):
+    """
+    Retourne une fonction qui résout les permissions de la requête au
+    premier appel seulement, en comptabilisant la résolution.
+    """
+    resolved = []
+    
+    def resolve():
+        if not resolved:
+            with _stats_lock:
+                _lazy_permissions_stats['resolved'] += 1
+                stats = dict(_lazy_permissions_stats)
+            logger.debug(
+                "Permissions résolues pour %s (%d contextes, %d sans résolution)",
+                request.path, stats['contexts'], stats['contexts'] - stats['resolved']
+            )
+            resolved.append(get_request_permissions(request))
+        return resolved[0]
+    
+    return resolve
 
 
 def user_permissions(request):
@@ -17,6 +204,9 @@ def user_permissions(request):
     - user_permissions: Liste des permissions de l'utilisateur
     - user_is_admin: Boolean indiquant si l'utilisateur est admin
     - has_permission: Fonction pour vérifier une permission spécifique
+    
+    Les valeurs sont paresseuses : les permissions ne sont résolues que si
+    un template les utilise réellement.
     """
     context = {
         'user_permissions': [],
@@ -28,18 +218,17 @@ def user_permissions(request):
         try:
             profile = request.user.profile
             if profile and profile.is_active:
-                # Récupérer toutes les permissions de l'utilisateur
-                permissions = get_user_permissions(profile)
-                context['user_permissions'] = [p.codename for p in permissions]
+                _count_context()
+                permissions = _lazy_request_permissions(request)
+                context['user_permissions'] = SimpleLazyObject(lambda: permissions().codenames)
                 
                 # Vérifier si l'utilisateur est admin
-                context['user_is_admin'] = is_admin(profile)
+                context['user_is_admin'] = SimpleLazyObject(lambda: permissions().has_role('admin'))
                 
                 # Fonction pour vérifier une permission
-                def check_permission(permission_codename, resource=None):
-                    return has_permission(profile, permission_codename, resource)
-                
-                context['has_permission'] = check_permission
+                context['has_permission'] = (
+                    lambda perm, resource=None: permissions().has(perm, resource)
+                )
         except Exception:
             # En cas d'erreur, on retourne les valeurs par défaut
             pass
@@ -47,6 +236,108 @@ def user_permissions(request):
     return context
 
 
+def _is_visible(entry, granted, is_admin_user, admin_bypass=False):
+    """Vérifie si une entrée du menu est visible pour un jeu de permissions."""
+    if is_admin_user and (admin_bypass or entry.get('admin')):
+        return True
+    permissions = entry['permissions']
+    return not permissions or any(permission in granted for permission in permissions)
+
+
+def _menu_item(entry, url):
+    """Construit le dictionnaire d'une entrée telle qu'attendue par le template."""
+    permissions = entry['permissions']
+    return {
+        'title': entry['title'],
+        'url': url,
+        'url_name': entry.get('url_name'),
+        'permission': permissions[0][0] if permissions else None,
+        'resource': entry.get('resource', permissions[0][1] if permissions else None),
+    }
+
+
+@lru_cache(maxsize=SIDEBAR_CACHE_SIZE)
+def build_sidebar_menu(granted, is_admin_user):
+    """
+    Filtre le sidebar statique pour un jeu de permissions.
+    
+    Le résultat est mémorisé par empreinte de permissions : les `reverse()`
+    et les vérifications ne sont faits qu'une fois par jeu de permissions
+    distinct. Les entrées retournées ne doivent pas être modifiées.
+    
+    Args:
+        granted: frozenset des paires (codename, resource) effectives
+            parmi MENU_PERMISSIONS
+        is_admin_user: True si le profil a le rôle admin
+    
+    Returns:
+        tuple: Sections visibles, sans la surbrillance `is_active`
+    """
+    sections = []
+    
+    for section in SIDEBAR_MENU:
+        if not _is_visible(section, granted, is_admin_user):
+            continue
+        
+        children = section.get('children')
+        if children is None:
+            try:
+                url = reverse(section['url_name'])
+            except NoReverseMatch:
+                url = '#'
+            item = _menu_item(section, url)
+            item['children'] = []
+        else:
+            visible_children = []
+            for child in children:
+                if not _is_visible(child, granted, is_admin_user, section.get('admin_bypass')):
+                    continue
+                try:
+                    visible_children.append(_menu_item(child, reverse(child['url_name'])))
+                except NoReverseMatch:
+                    pass
+            
+            # Afficher la section SEULEMENT si au moins un enfant est disponible
+            if not visible_children:
+                continue
+            item = _menu_item(section, None)
+            item['children'] = visible_children
+        
+        item['icon'] = section['icon']
+        item['active_prefixes'] = section['active_prefixes']
+        item['inactive_prefixes'] = section.get('inactive_prefixes', ())
+        sections.append(item)
+    
+    return tuple(sections)
+
+
+def get_sidebar_menu(permissions, path):
+    """
+    Retourne le sidebar d'un utilisateur avec la surbrillance de la page courante.
+    
+    Args:
+        permissions: EffectivePermissions de l'utilisateur
+        path: Chemin de la requête (`request.path`)
+    
+    Returns:
+        list: Sections du sidebar prêtes pour le template
+    """
+    granted = frozenset(
+        permission
+        for permission, allowed in permissions.has_many(MENU_PERMISSIONS).items()
+        if allowed
+    )
+    menu = build_sidebar_menu(granted, permissions.has_role('admin'))
+    return [
+        dict(
+            item,
+            is_active=path.startswith(item['active_prefixes'])
+            and not path.startswith(item['inactive_prefixes'])
+        )
+        for item in menu
+    ]
+
+
 def navigation_menu(request):
     """
     Context processor qui génère dynamiquement les menus du sidebar et navbar.
@@ -80,424 +371,16 @@ def navigation_menu(request):
         context['user_full_name'] = profile.full_name or request.user.get_full_name() or request.user.username
         context['user_photo'] = profile.photo if profile.photo else None
         
-        # Fonction helper pour vérifier les permissions
-        def check_perm(permission_codename, resource=None):
-            return has_permission(profile, permission_codename, resource)
-        
-        # Fonction helper pour vérifier si un menu doit être affiché
-        def should_show_menu(menu_item):
-            # Si pas de permission requise, afficher pour tous les utilisateurs connectés
-            if not menu_item.get('permission'):
-                return True
-            
-            # Vérifier la permission
-            resource = menu_item.get('resource', None)
-            return check_perm(menu_item['permission'], resource)
-        
-        # Construire le menu du sidebar
-        sidebar_menu_items = []
+        # Menu filtré mémorisé par jeu de permissions, seule la surbrillance
+        # dépend de la requête ; résolu seulement si le template l'affiche
+        _count_context()
+        permissions = _lazy_request_permissions(request)
+        context['sidebar_menu'] = SimpleLazyObject(
+            lambda: get_sidebar_menu(permissions(), request.path)
+        )
         
-        # ========== DASHBOARD ==========
-        dashboard_item = {
-            'title': 'Dashboard',
-            'icon': 'iconoir-home-simple',
-            'url_name': 'app_profile:standard_dashboard',
-            'permission': None,
-            'resource': None,
-            'children': [],
-            'is_active': False,
-        }
-        try:
-            dashboard_item['url'] = reverse('app_profile:standard_dashboard')
-            if request.path.startswith('/profiles/dashboard/'):
-                dashboard_item['is_active'] = True
-        except NoReverseMatch:
-            dashboard_item['url'] = '#'
-        
-        if should_show_menu(dashboard_item):
-            sidebar_menu_items.append(dashboard_item)
-        
-        # ========== PROFILES ==========
-        profiles_children = []
-        
-        # Liste des profils
-        if check_perm('view_all_profiles', 'app_profile'):
-            try:
-                profiles_children.append({
-                    'title': 'Liste des profils',
-                    'url': reverse('app_profile:profile_list'),
-                    'url_name': 'app_profile:profile_list',
-                    'permission': 'view_all_profiles',
-                    'resource': 'app_profile',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Étudiants
-        if check_perm('view_student', 'app_profile'):
-            try:
-                profiles_children.append({
-                    'title': 'Étudiants',
-                    'url': reverse('app_profile:student_list'),
-                    'url_name': 'app_profile:student_list',
-                    'permission': 'view_student',
-                    'resource': 'app_profile',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Enseignants
-        if check_perm('view_teacher', 'app_profile'):
-            try:
-                profiles_children.append({
-                    'title': 'Enseignants',
-                    'url': reverse('app_profile:teacher_list'),
-                    'url_name': 'app_profile:teacher_list',
-                    'permission': 'view_teacher',
-                    'resource': 'app_profile',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Parents
-        if check_perm('view_parent', 'app_profile'):
-            try:
-                profiles_children.append({
-                    'title': 'Parents',
-                    'url': reverse('app_profile:parent_list'),
-                    'url_name': 'app_profile:parent_list',
-                    'permission': 'view_parent',
-                    'resource': 'app_profile',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Mon profil (accessible à tous)
-        try:
-            profiles_children.append({
-                'title': 'Mon profil',
-                'url': reverse('app_profile:profile_view'),
-                'url_name': 'app_profile:profile_view',
-                'permission': None,
-                'resource': None,
-            })
-        except NoReverseMatch:
-            pass
-        
-        # Menu Profiles (si au moins un enfant est disponible)
-        if profiles_children:
-            profiles_item = {
-                'title': 'Profiles',
-                'icon': 'iconoir-user',
-                'url': None,
-                'url_name': None,
-                'permission': 'view_profile',
-                'resource': 'app_profile',
-                'children': profiles_children,
-                'is_active': request.path.startswith('/profiles/') and not request.path.startswith('/profiles/dashboard/'),
-            }
-            
-            if should_show_menu(profiles_item):
-                sidebar_menu_items.append(profiles_item)
-        
-        # ========== ACADEMIC ==========
-        academic_children = []
-        
-        # Années scolaires
-        if is_admin(profile) or check_perm('view_academic_year', 'app_academic'):
-            try:
-                academic_children.append({
-                    'title': 'Années scolaires',
-                    'url': reverse('app_academic:academic_year_list'),
-                    'url_name': 'app_academic:academic_year_list',
-                    'permission': 'view_academic_year',
-                    'resource': 'app_academic',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Niveaux
-        if is_admin(profile) or check_perm('view_class', 'app_academic'):
-            try:
-                academic_children.append({
-                    'title': 'Niveaux',
-                    'url': reverse('app_academic:grade_list'),
-                    'url_name': 'app_academic:grade_list',
-                    'permission': 'view_class',
-                    'resource': 'app_academic',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Salles de classe
-        if is_admin(profile) or check_perm('view_class', 'app_academic'):
-            try:
-                academic_children.append({
-                    'title': 'Salles de classe',
-                    'url': reverse('app_academic:classroom_list'),
-                    'url_name': 'app_academic:classroom_list',
-                    'permission': 'view_class',
-                    'resource': 'app_academic',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Classes
-        if is_admin(profile) or check_perm('view_class', 'app_academic'):
-            try:
-                academic_children.append({
-                    'title': 'Classes',
-                    'url': reverse('app_academic:class_list'),
-                    'url_name': 'app_academic:class_list',
-                    'permission': 'view_class',
-                    'resource': 'app_academic',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Matières
-        if is_admin(profile) or check_perm('view_subject', 'app_academic'):
-            try:
-                academic_children.append({
-                    'title': 'Matières',
-                    'url': reverse('app_academic:subject_list'),
-                    'url_name': 'app_academic:subject_list',
-                    'permission': 'view_subject',
-                    'resource': 'app_academic',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Emploi du temps
-        if is_admin(profile) or check_perm('view_schedule', 'app_academic'):
-            try:
-                academic_children.append({
-                    'title': 'Emploi du temps',
-                    'url': reverse('app_academic:schedule_list'),
-                    'url_name': 'app_academic:schedule_list',
-                    'permission': 'view_schedule',
-                    'resource': 'app_academic',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Afficher le menu SEULEMENT si on a au moins un enfant disponible
-        if academic_children:
-            academic_item = {
-                'title': 'Académique',
-                'icon': 'iconoir-book',
-                'url': None,
-                'url_name': None,
-                'permission': None,  # Pas de permission requise si on est déjà dans la condition
-                'resource': 'app_academic',
-                'children': academic_children,
-                'is_active': request.path.startswith('/academic/'),
-            }
-            sidebar_menu_items.append(academic_item)
-        
-        # ========== GRADES ==========
-        grades_children = []
-        
-        # Évaluations
-        if is_admin(profile) or check_perm('view_assessment', 'app_grades'):
-            try:
-                grades_children.append({
-                    'title': 'Évaluations',
-                    'url': reverse('app_grades:assessment_list'),
-                    'url_name': 'app_grades:assessment_list',
-                    'permission': 'view_assessment',
-                    'resource': 'app_grades',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Notes
-        if is_admin(profile) or check_perm('view_grade', 'app_grades'):
-            try:
-                grades_children.append({
-                    'title': 'Notes',
-                    'url': reverse('app_grades:grade_list'),
-                    'url_name': 'app_grades:grade_list',
-                    'permission': 'view_grade',
-                    'resource': 'app_grades',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Bulletins
-        if is_admin(profile) or check_perm('view_report_card', 'app_grades'):
-            try:
-                grades_children.append({
-                    'title': 'Bulletins',
-                    'url': reverse('app_grades:report_card_list'),
-                    'url_name': 'app_grades:report_card_list',
-                    'permission': 'view_report_card',
-                    'resource': 'app_grades',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Barèmes
-        if is_admin(profile) or check_perm('view_grade', 'app_grades'):
-            try:
-                grades_children.append({
-                    'title': 'Barèmes',
-                    'url': reverse('app_grades:grade_scale_list'),
-                    'url_name': 'app_grades:grade_scale_list',
-                    'permission': 'view_grade',
-                    'resource': 'app_grades',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Catégories
-        if is_admin(profile) or check_perm('view_assessment', 'app_grades'):
-            try:
-                grades_children.append({
-                    'title': 'Catégories',
-                    'url': reverse('app_grades:grade_category_list'),
-                    'url_name': 'app_grades:grade_category_list',
-                    'permission': 'view_assessment',
-                    'resource': 'app_grades',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Afficher le menu SEULEMENT si on a au moins un enfant disponible
-        if grades_children:
-            grades_item = {
-                'title': 'Notes',
-                'icon': 'iconoir-document',
-                'url': None,
-                'url_name': None,
-                'permission': None,  # Pas de permission requise si on est déjà dans la condition
-                'resource': 'app_grades',
-                'children': grades_children,
-                'is_active': request.path.startswith('/grades/'),
-            }
-            sidebar_menu_items.append(grades_item)
-        
-        # ========== ATTENDANCE ==========
-        attendance_children = []
-        
-        # Présences
-        if is_admin(profile) or check_perm('view_attendance', 'app_attendance'):
-            try:
-                attendance_children.append({
-                    'title': 'Présences',
-                    'url': reverse('app_attendance:attendance_list'),
-                    'url_name': 'app_attendance:attendance_list',
-                    'permission': 'view_attendance',
-                    'resource': 'app_attendance',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Absences
-        if is_admin(profile) or check_perm('view_absence', 'app_attendance'):
-            try:
-                attendance_children.append({
-                    'title': 'Absences',
-                    'url': reverse('app_attendance:absence_list'),
-                    'url_name': 'app_attendance:absence_list',
-                    'permission': 'view_absence',
-                    'resource': 'app_attendance',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Justificatifs
-        if is_admin(profile) or check_perm('view_excuse', 'app_attendance'):
-            try:
-                attendance_children.append({
-                    'title': 'Justificatifs',
-                    'url': reverse('app_attendance:excuse_list'),
-                    'url_name': 'app_attendance:excuse_list',
-                    'permission': 'view_excuse',
-                    'resource': 'app_attendance',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Règles de présence
-        if is_admin(profile) or check_perm('view_attendance', 'app_attendance'):
-            try:
-                attendance_children.append({
-                    'title': 'Règles de présence',
-                    'url': reverse('app_attendance:attendance_rule_list'),
-                    'url_name': 'app_attendance:attendance_rule_list',
-                    'permission': 'view_attendance',
-                    'resource': 'app_attendance',
-                })
-            except NoReverseMatch:
-                pass
-        
-        # Afficher le menu SEULEMENT si on a au moins un enfant disponible
-        if attendance_children:
-            attendance_item = {
-                'title': 'Présences',
-                'icon': 'iconoir-calendar',
-                'url': None,
-                'url_name': None,
-                'permission': None,  # Pas de permission requise si on est déjà dans la condition
-                'resource': 'app_attendance',
-                'children': attendance_children,
-                'is_active': request.path.startswith('/attendance/'),
-            }
-            sidebar_menu_items.append(attendance_item)
-        
-        # ========== CONFIGURATION (Admin uniquement) ==========
-        if is_admin(profile) or check_perm('manage_permissions', 'app_config') or \
-           check_perm('assign_role_permissions', 'app_config'):
-            config_children = []
-            
-            # Gestion des rôles
-            if check_perm('manage_permissions', 'app_config') or \
-               check_perm('assign_role_permissions', 'app_config'):
-                try:
-                    config_children.append({
-                        'title': 'Gestion des rôles',
-                        'url': reverse('app_profile:roles_management'),
-                        'url_name': 'app_profile:roles_management',
-                        'permission': 'manage_permissions',
-                        'resource': 'app_config',
-                    })
-                except NoReverseMatch:
-                    pass
-            
-            # Vérifications (si permission)
-            if check_perm('manage_verifications', 'app_profile'):
-                try:
-                    config_children.append({
-                        'title': 'Vérifications',
-                        'url': reverse('app_profile:verification_management'),
-                        'url_name': 'app_profile:verification_management',
-                        'permission': 'manage_verifications',
-                        'resource': 'app_profile',
-                    })
-                except NoReverseMatch:
-                    pass
-            
-            if config_children:
-                config_item = {
-                    'title': 'Configuration',
-                    'icon': 'iconoir-settings',
-                    'url': None,
-                    'url_name': None,
-                    'permission': 'manage_permissions',
-                    'resource': 'app_config',
-                    'children': config_children,
-                    'is_active': request.path.startswith('/profiles/roles-management/') or \
-                                request.path.startswith('/profiles/verifications/'),
-                }
-                
-                sidebar_menu_items.append(config_item)
-        
-        context['sidebar_menu'] = sidebar_menu_items
-        
-    except Exception as e:
+    except Exception:
         # En cas d'erreur, retourner un menu vide
         pass
     
     return context
-
@@ -0,0 +1,38 @@
+"""
+Commande de management pour recalculer la table EffectivePermission.
+
+Usage:
+    python manage.py rebuild_effective_permissions
+    python manage.py rebuild_effective_permissions --profile 12 --profile 42
+"""
+
+from django.core.management.base import BaseCommand
+from app_config.models import EffectivePermission
+from app_config.permissions import sync_effective_permissions
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized effective permissions table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile',
+            type=int,
+            action='append',
+            dest='profile_ids',
+            help='Only rebuild the given profile id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        profile_ids = options.get('profile_ids')
+        if profile_ids:
+            self.stdout.write(f'Rebuilding effective permissions for {len(profile_ids)} profile(s)...')
+        else:
+            self.stdout.write('Rebuilding effective permissions for all profiles...')
+        
+        created, deleted = sync_effective_permissions(profile_ids)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {created} row(s) created, {deleted} row(s) deleted'
+        ))
+        self.stdout.write(f'Effective permissions: {EffectivePermission.objects.count()} rows')
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_effective_permissions(apps, schema_editor):
+    """Calcule les permissions effectives des assignations existantes."""
+    Role = apps.get_model('app_config', 'Role')
+    UserPermission = apps.get_model('app_config', 'UserPermission')
+    EffectivePermission = apps.get_model('app_config', 'EffectivePermission')
+
+    granted = set()
+    denied = set()
+    direct_rows = UserPermission.permissions.through.objects.filter(
+        userpermission__is_active=True,
+        permission__is_active=True
+    ).values_list('userpermission__profile_id', 'permission_id', 'userpermission__granted')
+    for profile_id, permission_id, is_granted in direct_rows:
+        (granted if is_granted else denied).add((profile_id, permission_id))
+
+    granted.update(Role.permissions.through.objects.filter(
+        role__user_roles__is_active=True,
+        role__is_active=True,
+        permission__is_active=True
+    ).values_list('role__user_roles__profile_id', 'permission_id'))
+
+    EffectivePermission.objects.bulk_create([
+        EffectivePermission(profile_id=profile_id, permission_id=permission_id)
+        for profile_id, permission_id in granted - denied
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0010_alter_permission_codename_alter_permission_name'),
+        ('app_profile', '0016_parent_children'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffectivePermission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('permission', models.ForeignKey(help_text='Permission effective', on_delete=django.db.models.deletion.CASCADE, related_name='effective_permissions', to='app_config.permission', verbose_name='Permission')),
+                ('profile', models.ForeignKey(help_text='Profil utilisateur', on_delete=django.db.models.deletion.CASCADE, related_name='effective_permissions', to='app_profile.profile', verbose_name='Profile')),
+            ],
+            options={
+                'verbose_name': 'Effective Permission',
+                'verbose_name_plural': 'Effective Permissions',
+                'indexes': [models.Index(fields=['permission', 'profile'], name='app_config__permiss_0ea92e_idx')],
+                'unique_together': {('profile', 'permission')},
+            },
+        ),
+        migrations.RunPython(populate_effective_permissions, migrations.RunPython.noop),
+    ]
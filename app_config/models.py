@@ -509,4 +509,45 @@ class UserRole(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.profile.full_name} - {self.role.name}"
\ No newline at end of file
+        return f"{self.profile.full_name} - {self.role.name}"
+
+
+class EffectivePermission(models.Model):
+    """
+    Table dénormalisée des permissions effectives d'un profil.
+    
+    Une ligne par couple (profil, permission) effectif : permissions directes
+    accordées et permissions des rôles actifs, moins les refus explicites.
+    Elle est maintenue par les signaux de app_config et peut être recalculée
+    avec la commande `rebuild_effective_permissions`.
+    
+    L'activité du profil n'est pas prise en compte : elle est vérifiée à la
+    lecture.
+    """
+    
+    profile = models.ForeignKey(
+        'app_profile.Profile',
+        on_delete=models.CASCADE,
+        related_name='effective_permissions',
+        verbose_name="Profile",
+        help_text="Profil utilisateur"
+    )
+    
+    permission = models.ForeignKey(
+        'Permission',
+        on_delete=models.CASCADE,
+        related_name='effective_permissions',
+        verbose_name="Permission",
+        help_text="Permission effective"
+    )
+    
+    class Meta:
+        verbose_name = "Effective Permission"
+        verbose_name_plural = "Effective Permissions"
+        unique_together = [['profile', 'permission']]
+        indexes = [
+            models.Index(fields=['permission', 'profile']),
+        ]
+    
+    def __str__(self):
+        return f"{self.profile.full_name} - {self.permission.codename}"
@@ -5,72 +5,288 @@ Ce module contient les fonctions et classes pour vérifier
 et gérer les permissions des utilisateurs.
 """
 
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from .models import Permission, Role, UserPermission, UserRole
+from django.db import transaction
+from .models import EffectivePermission, Permission, Role, UserPermission, UserRole
 
 
-def has_permission(profile, permission_codename, resource=None):
+# Clé du compteur de génération partagé par tous les workers
+PERMISSIONS_GENERATION_KEY = 'app_config:permissions:generation'
+
+
+class EffectivePermissions:
     """
-    Vérifie si un profil a une permission spécifique.
+    Ensemble compilé des permissions effectives d'un profil.
+    
+    Les permissions sont stockées sous forme de paires (codename, resource) :
+    permissions accordées (directes + rôles) moins les permissions refusées.
+    Les vérifications se font ensuite en mémoire, sans requête.
+    """
+    
+    __slots__ = ('permissions', 'denied', 'roles', '_codenames')
+    
+    def __init__(self, permissions=(), denied=(), roles=()):
+        denied = frozenset(denied)
+        self.permissions = frozenset(permissions) - denied
+        self.denied = denied
+        self.roles = frozenset(roles)
+        
+        # Un refus sur une ressource bloque la vérification sans ressource
+        denied_codenames = {codename for codename, _ in denied}
+        self._codenames = frozenset(
+            codename for codename, _ in self.permissions
+            if codename not in denied_codenames
+        )
+    
+    def has(self, permission_codename, resource=None):
+        """
+        Vérifie une permission en mémoire.
+        
+        Args:
+            permission_codename: Code de la permission
+            resource: Ressource concernée (optionnel)
+        
+        Returns:
+            bool: True si la permission est effective
+        """
+        if resource:
+            return (permission_codename, resource) in self.permissions
+        return permission_codename in self._codenames
+    
+    def has_many(self, permissions):
+        """
+        Vérifie plusieurs permissions en mémoire.
+        
+        Args:
+            permissions: Itérable de paires (codename, resource)
+        
+        Returns:
+            dict: Booléen de chaque paire, indexé par la paire
+        """
+        return {
+            (codename, resource): self.has(codename, resource)
+            for codename, resource in permissions
+        }
+    
+    def has_role(self, role_codename):
+        """Vérifie si le rôle fait partie des rôles actifs du profil."""
+        return role_codename in self.roles
+    
+    @property
+    def codenames(self):
+        """Liste triée des codenames des permissions effectives."""
+        return sorted({codename for codename, _ in self.permissions})
+
+
+def resolve_permissions(profile):
+    """
+    Calcule les permissions effectives d'un profil en deux requêtes.
     
     Args:
         profile: Instance du modèle Profile
-        permission_codename: Code de la permission (ex: 'view_profile')
-        resource: Ressource concernée (optionnel, pour filtrage)
     
     Returns:
-        bool: True si le profil a la permission, False sinon
+        EffectivePermissions: Permissions compilées du profil
     """
     if not profile or not profile.is_active:
-        return False
-    
-    # Vérifier les permissions directes de l'utilisateur
-    user_permissions = UserPermission.objects.filter(
+        return EffectivePermissions()
+    
+    granted = set()
+    denied = set()
+    roles = set()
+    
+    # Permissions directes (accordées et refusées)
+    direct_rows = UserPermission.permissions.through.objects.filter(
+        userpermission__profile=profile,
+        userpermission__is_active=True
+    ).values_list('permission__codename', 'permission__resource', 'userpermission__granted')
+    
+    for codename, resource, is_granted in direct_rows:
+        if is_granted:
+            granted.add((codename, resource))
+        else:
+            denied.add((codename, resource))
+    
+    # Rôles actifs et leurs permissions actives
+    role_rows = UserRole.objects.filter(
         profile=profile,
-        permissions__codename=permission_codename,
-        granted=True,
-        is_active=True
+        is_active=True,
+        role__is_active=True
+    ).values_list(
+        'role__codename',
+        'role__permissions__codename',
+        'role__permissions__resource',
+        'role__permissions__is_active'
     )
     
-    if resource:
-        user_permissions = user_permissions.filter(permissions__resource=resource)
+    for role_codename, codename, resource, permission_active in role_rows:
+        roles.add(role_codename)
+        if codename is not None and permission_active:
+            granted.add((codename, resource))
     
-    # Si une permission est explicitement refusée, retourner False
-    denied_permissions = UserPermission.objects.filter(
-        profile=profile,
-        permissions__codename=permission_codename,
-        granted=False,
-        is_active=True
-    )
-    if resource:
-        denied_permissions = denied_permissions.filter(permissions__resource=resource)
+    return EffectivePermissions(granted, denied, roles)
+
+
+def clear_permissions_cache(profile):
+    """
+    Invalide les permissions mémorisées sur une instance de profil.
     
-    if denied_permissions.exists():
-        return False
+    Args:
+        profile: Instance du modèle Profile
+    """
+    if profile is not None:
+        profile.__dict__.pop('_effective_permissions', None)
+
+
+def get_permissions_generation():
+    """
+    Retourne la génération courante des permissions.
     
-    # Si une permission est explicitement accordée, retourner True
-    if user_permissions.exists():
-        return True
+    Returns:
+        int: Compteur incrémenté à chaque modification de permissions
+    """
+    generation = cache.get(PERMISSIONS_GENERATION_KEY)
+    if generation is None:
+        cache.add(PERMISSIONS_GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(PERMISSIONS_GENERATION_KEY, 1)
+    return generation
+
+
+def bump_permissions_generation():
+    """
+    Incrémente la génération des permissions.
     
-    # Vérifier les permissions via les rôles
-    user_roles = UserRole.objects.filter(
-        profile=profile,
-        is_active=True,
-        role__is_active=True
-    ).select_related('role').prefetch_related('role__permissions')
+    Toutes les entrées du cache deviennent obsolètes d'un coup, ce qui
+    rend les révocations immédiates sur tous les workers.
+    """
+    try:
+        cache.incr(PERMISSIONS_GENERATION_KEY)
+    except ValueError:
+        # Clé absente (cache vidé ou expiré) : repartir d'une nouvelle génération
+        cache.add(PERMISSIONS_GENERATION_KEY, 1, timeout=None)
+        cache.incr(PERMISSIONS_GENERATION_KEY)
+
+
+def invalidate_permissions(profile=None):
+    """
+    Invalide les permissions en cache après une modification.
     
-    for user_role in user_roles:
-        role_permissions = user_role.role.permissions.filter(
-            codename=permission_codename,
-            is_active=True
+    La génération est incrémentée immédiatement puis à nouveau après le
+    commit, pour qu'aucun worker ne mette en cache un état non encore
+    validé en base.
+    
+    Args:
+        profile: Instance du modèle Profile modifiée (optionnel)
+    """
+    clear_permissions_cache(profile)
+    bump_permissions_generation()
+    transaction.on_commit(bump_permissions_generation)
+
+
+def _permissions_cache_key(profile_id, generation):
+    return f'app_config:permissions:{profile_id}:{generation}'
+
+
+def get_effective_permissions(profile):
+    """
+    Retourne les permissions effectives d'un profil, mémorisées sur l'instance.
+    
+    Le profil de l'utilisateur connecté étant rechargé à chaque requête,
+    la mémorisation dure le temps d'une requête. Entre les requêtes, les
+    permissions sont conservées dans le cache Django, indexées par
+    l'identifiant du profil et la génération courante.
+    
+    Args:
+        profile: Instance du modèle Profile
+    
+    Returns:
+        EffectivePermissions: Permissions compilées du profil
+    """
+    if not profile or not profile.is_active:
+        return EffectivePermissions()
+    
+    permissions = getattr(profile, '_effective_permissions', None)
+    if permissions is not None:
+        return permissions
+    
+    cache_key = _permissions_cache_key(profile.pk, get_permissions_generation())
+    cached = cache.get(cache_key)
+    if cached is not None:
+        permissions = EffectivePermissions(*cached)
+    else:
+        permissions = resolve_permissions(profile)
+        cache.set(
+            cache_key,
+            (permissions.permissions, permissions.denied, permissions.roles),
+            getattr(settings, 'PERMISSIONS_CACHE_TIMEOUT', 60 * 60)
         )
-        if resource:
-            role_permissions = role_permissions.filter(resource=resource)
-        
-        if role_permissions.exists():
-            return True
     
-    return False
+    profile._effective_permissions = permissions
+    return permissions
+
+
+def get_request_permissions(request):
+    """
+    Retourne les permissions effectives de l'utilisateur de la requête.
+    
+    Le résultat est attaché à `request.effective_permissions` afin que
+    toutes les vérifications de la requête partagent la même résolution.
+    
+    Args:
+        request: Objet Request Django
+    
+    Returns:
+        EffectivePermissions: Permissions compilées de l'utilisateur
+    """
+    permissions = getattr(request, 'effective_permissions', None)
+    if permissions is not None:
+        return permissions
+    
+    profile = None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and hasattr(user, 'profile'):
+        profile = user.profile
+    
+    permissions = get_effective_permissions(profile)
+    request.effective_permissions = permissions
+    return permissions
+
+
+def has_permission(profile, permission_codename, resource=None):
+    """
+    Vérifie si un profil a une permission spécifique.
+    
+    Args:
+        profile: Instance du modèle Profile
+        permission_codename: Code de la permission (ex: 'view_profile')
+        resource: Ressource concernée (optionnel, pour filtrage)
+    
+    Returns:
+        bool: True si le profil a la permission, False sinon
+    """
+    return get_effective_permissions(profile).has(permission_codename, resource)
+
+
+def has_permissions(profile, permissions):
+    """
+    Vérifie plusieurs permissions d'un profil en une seule résolution.
+    
+    Usage:
+        checks = has_permissions(profile, [('view_profile', 'app_profile'),
+                                           ('manage_permissions', 'app_config')])
+        checks[('view_profile', 'app_profile')]  # True ou False
+    
+    Args:
+        profile: Instance du modèle Profile
+        permissions: Itérable de paires (codename, resource), resource pouvant être None
+    
+    Returns:
+        dict: Booléen de chaque paire, indexé par la paire
+    """
+    return get_effective_permissions(profile).has_many(permissions)
 
 
 def has_role(profile, role_codename):
@@ -84,15 +300,7 @@ def has_role(profile, role_codename):
     Returns:
         bool: True si le profil a le rôle, False sinon
     """
-    if not profile or not profile.is_active:
-        return False
-    
-    return UserRole.objects.filter(
-        profile=profile,
-        role__codename=role_codename,
-        role__is_active=True,
-        is_active=True
-    ).exists()
+    return get_effective_permissions(profile).has_role(role_codename)
 
 
 def is_admin(profile):
@@ -108,6 +316,54 @@ def is_admin(profile):
     return has_role(profile, 'admin')
 
 
+def get_user_permission_ids(profile):
+    """
+    Résout les permissions effectives d'un profil en deux requêtes étroites.
+    
+    Les permissions directes et celles obtenues via les rôles sont lues par
+    `values_list` sur les tables de liaison puis fusionnées en Python, sans
+    UNION, DISTINCT ni sous-requête d'exclusion.
+    
+    Args:
+        profile: Instance du modèle Profile
+    
+    Returns:
+        dict: Codename de chaque permission effective, indexé par son id
+    """
+    if not profile or not profile.is_active:
+        return {}
+    
+    granted = {}
+    denied = set()
+    
+    # Permissions directes (accordées et refusées)
+    direct_rows = UserPermission.permissions.through.objects.filter(
+        userpermission__profile=profile,
+        userpermission__is_active=True,
+        permission__is_active=True
+    ).values_list('permission_id', 'permission__codename', 'userpermission__granted')
+    
+    for permission_id, codename, is_granted in direct_rows:
+        if is_granted:
+            granted[permission_id] = codename
+        else:
+            denied.add(permission_id)
+    
+    # Permissions via les rôles actifs
+    granted.update(Role.permissions.through.objects.filter(
+        role__user_roles__profile=profile,
+        role__user_roles__is_active=True,
+        role__is_active=True,
+        permission__is_active=True
+    ).values_list('permission_id', 'permission__codename'))
+    
+    # Exclure les permissions explicitement refusées
+    for permission_id in denied:
+        granted.pop(permission_id, None)
+    
+    return granted
+
+
 def get_user_permissions(profile):
     """
     Récupère toutes les permissions d'un profil (via rôles et permissions directes).
@@ -121,34 +377,104 @@ def get_user_permissions(profile):
     if not profile or not profile.is_active:
         return Permission.objects.none()
     
-    # Permissions via rôles
-    role_permissions = Permission.objects.filter(
-        roles__user_roles__profile=profile,
-        roles__user_roles__is_active=True,
-        roles__user_roles__role__is_active=True,
-        is_active=True
-    ).distinct()
+    return Permission.objects.filter(id__in=list(get_user_permission_ids(profile)))
+
+
+def compute_effective_permission_ids(profile_ids=None):
+    """
+    Calcule en deux requêtes les permissions effectives de plusieurs profils.
     
-    # Permissions directes accordées
-    direct_permissions = Permission.objects.filter(
-        user_permissions__profile=profile,
-        user_permissions__granted=True,
-        user_permissions__is_active=True,
-        is_active=True
-    ).distinct()
+    Les profils inactifs n'ont aucune permission effective, comme avec
+    get_user_permission_ids.
     
-    # Combiner les deux
-    all_permissions = (role_permissions | direct_permissions).distinct()
+    Args:
+        profile_ids: Identifiants des profils (None pour tous les profils)
     
-    # Exclure les permissions explicitement refusées
-    denied_permissions = Permission.objects.filter(
-        user_permissions__profile=profile,
-        user_permissions__granted=False,
-        user_permissions__is_active=True,
-        is_active=True
-    ).values_list('id', flat=True)
+    Returns:
+        dict: Ensemble des ids de permissions effectives, indexé par id de profil
+    """
+    direct_filters = {
+        'userpermission__is_active': True,
+        'userpermission__profile__is_active': True,
+        'permission__is_active': True,
+    }
+    # user_roles est une relation multiple : toutes ses conditions doivent
+    # figurer dans le même filter() pour porter sur la même jointure que
+    # les colonnes lues par values_list
+    role_filters = {
+        'role__user_roles__is_active': True,
+        'role__user_roles__profile__is_active': True,
+        'role__is_active': True,
+        'permission__is_active': True,
+    }
+    if profile_ids is not None:
+        direct_filters['userpermission__profile_id__in'] = profile_ids
+        role_filters['role__user_roles__profile_id__in'] = profile_ids
+    direct_rows = UserPermission.permissions.through.objects.filter(**direct_filters)
+    role_rows = Role.permissions.through.objects.filter(**role_filters)
+    
+    granted = defaultdict(set)
+    denied = defaultdict(set)
+    
+    for profile_id, permission_id, is_granted in direct_rows.values_list(
+        'userpermission__profile_id', 'permission_id', 'userpermission__granted'
+    ):
+        (granted if is_granted else denied)[profile_id].add(permission_id)
+    
+    for profile_id, permission_id in role_rows.values_list(
+        'role__user_roles__profile_id', 'permission_id'
+    ):
+        granted[profile_id].add(permission_id)
+    
+    return {
+        profile_id: permission_ids - denied[profile_id]
+        for profile_id, permission_ids in granted.items()
+    }
+
+
+def sync_effective_permissions(profile_ids=None):
+    """
+    Met à jour la table EffectivePermission pour les profils donnés.
+    
+    Seules les lignes qui diffèrent sont supprimées ou créées.
     
-    return all_permissions.exclude(id__in=denied_permissions)
+    Args:
+        profile_ids: Identifiants des profils (None pour une reconstruction complète)
+    
+    Returns:
+        tuple: Nombre de lignes créées et supprimées
+    """
+    if profile_ids is not None:
+        profile_ids = set(profile_ids)
+        if not profile_ids:
+            return 0, 0
+    
+    expected = {
+        (profile_id, permission_id)
+        for profile_id, permission_ids in compute_effective_permission_ids(profile_ids).items()
+        for permission_id in permission_ids
+    }
+    
+    existing_rows = EffectivePermission.objects.all()
+    if profile_ids is not None:
+        existing_rows = existing_rows.filter(profile_id__in=profile_ids)
+    existing = {
+        (profile_id, permission_id): pk
+        for pk, profile_id, permission_id in existing_rows.values_list('pk', 'profile_id', 'permission_id')
+    }
+    
+    stale = [pk for key, pk in existing.items() if key not in expected]
+    missing = [
+        EffectivePermission(profile_id=profile_id, permission_id=permission_id)
+        for profile_id, permission_id in expected - existing.keys()
+    ]
+    
+    with transaction.atomic():
+        if stale:
+            EffectivePermission.objects.filter(pk__in=stale).delete()
+        EffectivePermission.objects.bulk_create(missing, batch_size=1000)
+    
+    return len(missing), len(stale)
 
 
 def assign_permission(profile, permission_codename, granted=True, granted_by=None):
@@ -194,6 +520,7 @@ def assign_permission(profile, permission_codename, granted=True, granted_by=Non
         )
         user_permission.permissions.add(permission)
     
+    invalidate_permissions(profile)
     return user_permission
 
 
@@ -223,6 +550,7 @@ def assign_role(profile, role_codename, assigned_by=None):
         }
     )
     
+    invalidate_permissions(profile)
     return user_role
 
 
@@ -245,6 +573,7 @@ def remove_role(profile, role_codename):
         )
         user_role.is_active = False
         user_role.save()
+        invalidate_permissions(profile)
         return True
     except UserRole.DoesNotExist:
         return False
@@ -276,8 +605,7 @@ class PermissionRequiredMixin:
             return self.handle_no_permission()
         
         if self.required_permission:
-            has_perm = has_permission(
-                request.user.profile,
+            has_perm = get_request_permissions(request).has(
                 self.required_permission,
                 self.required_resource
             )
@@ -317,7 +645,7 @@ def require_permission(permission_codename, resource=None):
             if not hasattr(request.user, 'profile'):
                 raise PermissionDenied("Profile not found")
             
-            if not has_permission(request.user.profile, permission_codename, resource):
+            if not get_request_permissions(request).has(permission_codename, resource):
                 raise PermissionDenied(
                     f"You don't have permission to {permission_codename}"
                 )
@@ -0,0 +1,139 @@
+"""
+Signals pour l'application app_config.
+
+Ce module invalide le cache des permissions effectives dès qu'un rôle,
+une permission ou une assignation est modifié, quel que soit le chemin
+utilisé (helpers, vues API, admin Django), et tient à jour la table
+dénormalisée EffectivePermission.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from app_profile.models import Profile
+from .models import Permission, Role, UserPermission, UserRole
+from .permissions import invalidate_permissions, sync_effective_permissions
+
+
+def schedule_effective_permissions_sync(profile_ids):
+    """
+    Planifie la mise à jour de EffectivePermission après le commit.
+    
+    Le report au commit évite de recréer des lignes pour un profil en cours
+    de suppression (suppression en cascade de ses rôles et permissions).
+    
+    Args:
+        profile_ids: Identifiants des profils concernés
+    """
+    profile_ids = set(profile_ids)
+    if profile_ids:
+        transaction.on_commit(lambda: sync_effective_permissions(profile_ids))
+
+
+def _role_profile_ids(role_ids):
+    return UserRole.objects.filter(role_id__in=role_ids).values_list('profile_id', flat=True)
+
+
+def _permission_profile_ids(permission):
+    profile_ids = set(
+        UserRole.objects.filter(role__permissions=permission).values_list('profile_id', flat=True)
+    )
+    profile_ids.update(
+        UserPermission.objects.filter(permissions=permission).values_list('profile_id', flat=True)
+    )
+    return profile_ids
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_on_definition_change(sender, instance, **kwargs):
+    """
+    Invalide le cache lorsqu'une permission ou un rôle est modifié
+    (activation, désactivation, suppression).
+    """
+    invalidate_permissions()
+
+
+@receiver(post_save, sender=Permission)
+def sync_on_permission_change(sender, instance, **kwargs):
+    """Recalcule les profils qui détiennent une permission modifiée."""
+    schedule_effective_permissions_sync(_permission_profile_ids(instance))
+
+
+@receiver(post_save, sender=Role)
+def sync_on_role_change(sender, instance, **kwargs):
+    """Recalcule les profils qui ont un rôle modifié (activation, désactivation)."""
+    schedule_effective_permissions_sync(_role_profile_ids([instance.pk]))
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=UserPermission)
+@receiver(post_delete, sender=UserPermission)
+def invalidate_on_assignment_change(sender, instance, **kwargs):
+    """
+    Invalide le cache lorsqu'un rôle ou une permission directe d'un profil
+    est assigné, modifié ou retiré.
+    """
+    invalidate_permissions()
+    schedule_effective_permissions_sync([instance.profile_id])
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+@receiver(m2m_changed, sender=UserPermission.permissions.through)
+def invalidate_on_permissions_m2m_change(sender, action, **kwargs):
+    """
+    Invalide le cache lorsque les permissions d'un rôle ou d'une
+    assignation directe changent (add, remove, clear, set).
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_permissions()
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def sync_on_role_permissions_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recalcule les profils dont un rôle a gagné ou perdu des permissions."""
+    if reverse:
+        # instance est une Permission, pk_set contient des rôles
+        if action == 'pre_clear':
+            instance._cleared_role_ids = list(instance.roles.values_list('pk', flat=True))
+            return
+        role_ids = instance.__dict__.pop('_cleared_role_ids', []) if action == 'post_clear' else pk_set
+    else:
+        role_ids = [instance.pk]
+    
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        schedule_effective_permissions_sync(_role_profile_ids(role_ids or []))
+
+
+@receiver(m2m_changed, sender=UserPermission.permissions.through)
+def sync_on_user_permissions_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recalcule les profils dont une assignation directe a changé."""
+    if reverse:
+        # instance est une Permission, pk_set contient des UserPermission
+        if action == 'pre_clear':
+            instance._cleared_profile_ids = list(
+                instance.user_permissions.values_list('profile_id', flat=True)
+            )
+            return
+        if action == 'post_clear':
+            profile_ids = instance.__dict__.pop('_cleared_profile_ids', [])
+        else:
+            profile_ids = UserPermission.objects.filter(
+                pk__in=pk_set or []
+            ).values_list('profile_id', flat=True)
+    else:
+        profile_ids = [instance.profile_id]
+    
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        schedule_effective_permissions_sync(profile_ids)
+
+
+@receiver(post_save, sender=Profile)
+def sync_on_profile_change(sender, instance, created, update_fields=None, **kwargs):
+    """Recalcule les permissions d'un profil existant, actif ou désactivé."""
+    if created or (update_fields is not None and 'is_active' not in update_fields):
+        return
+    schedule_effective_permissions_sync([instance.pk])
@@ -1,3 +1,409 @@
-from django.test import TestCase
+"""
+Tests unitaires pour l'application app_config.
 
-# Create your tests here.
+Ce module contient les tests pour la résolution des permissions.
+"""
+
+import io
+import os
+import random
+import sys
+import time
+from unittest import mock, skipUnless
+from django.core.management import call_command
+from django.test import TestCase, RequestFactory
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from app_profile.models import Profile
+from .models import EffectivePermission, Permission, Role, UserPermission, UserRole
+from .permissions import (
+    has_permission, has_permissions, is_admin, assign_permission, assign_role, remove_role,
+    resolve_permissions, get_request_permissions, get_user_permissions,
+    get_user_permission_ids, compute_effective_permission_ids, sync_effective_permissions
+)
+from .context_processors import (
+    user_permissions, navigation_menu, build_sidebar_menu, get_lazy_permissions_stats
+)
+
+
+class PermissionTestBase(TestCase):
+    """Données communes aux tests de permissions."""
+
+    def setUp(self):
+        """Préparation des données de test."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.profile = Profile.objects.get(user=self.user)
+        self.profile.full_name = 'Test User'
+        self.profile.is_active = True
+        self.profile.save()
+
+        self.view_student = Permission.objects.create(
+            name='View Student', codename='view_student',
+            resource='app_profile', action='view'
+        )
+        self.view_class = Permission.objects.create(
+            name='View Class', codename='view_class',
+            resource='app_academic', action='view'
+        )
+        self.view_grade = Permission.objects.create(
+            name='View Grade', codename='view_grade',
+            resource='app_grades', action='view'
+        )
+        self.role = Role.objects.create(name='Enseignant', codename='teacher')
+        self.role.permissions.add(self.view_student, self.view_class)
+        self.admin_role = Role.objects.create(name='Administrateur', codename='admin')
+        UserRole.objects.create(profile=self.profile, role=self.role)
+
+
+class PermissionResolverTestCase(PermissionTestBase):
+    """Tests pour la résolution compilée des permissions."""
+
+    def test_role_permissions(self):
+        """Test les permissions obtenues via un rôle."""
+        self.assertTrue(has_permission(self.profile, 'view_student', 'app_profile'))
+        self.assertTrue(has_permission(self.profile, 'view_class'))
+        self.assertFalse(has_permission(self.profile, 'view_class', 'app_profile'))
+        self.assertFalse(has_permission(self.profile, 'view_grade'))
+
+    def test_direct_grant_and_denial(self):
+        """Test qu'un refus explicite l'emporte sur un rôle."""
+        assign_permission(self.profile, 'view_grade')
+        assign_permission(self.profile, 'view_student', granted=False)
+        self.assertTrue(has_permission(self.profile, 'view_grade', 'app_grades'))
+        self.assertFalse(has_permission(self.profile, 'view_student', 'app_profile'))
+        self.assertFalse(has_permission(self.profile, 'view_student'))
+
+    def test_user_permission_ids(self):
+        """Test la résolution des ids de permissions effectives."""
+        assign_permission(self.profile, 'view_grade')
+        assign_permission(self.profile, 'view_student', granted=False)
+        self.assertEqual(
+            get_user_permission_ids(self.profile),
+            {self.view_class.pk: 'view_class', self.view_grade.pk: 'view_grade'}
+        )
+        with self.assertNumQueries(3):
+            self.assertEqual(
+                {permission.codename for permission in get_user_permissions(self.profile)},
+                {'view_class', 'view_grade'}
+            )
+
+    def test_has_permissions_batch(self):
+        """Test la vérification groupée en une seule résolution."""
+        with self.assertNumQueries(2):
+            checks = has_permissions(self.profile, [
+                ('view_student', 'app_profile'),
+                ('view_class', None),
+                ('view_grade', 'app_grades'),
+            ])
+        self.assertEqual(checks, {
+            ('view_student', 'app_profile'): True,
+            ('view_class', None): True,
+            ('view_grade', 'app_grades'): False,
+        })
+
+    def test_is_admin(self):
+        """Test la détection du rôle admin et son retrait."""
+        self.assertFalse(is_admin(self.profile))
+        assign_role(self.profile, 'admin')
+        self.assertTrue(is_admin(self.profile))
+        remove_role(self.profile, 'admin')
+        self.assertFalse(is_admin(self.profile))
+
+    def test_inactive_profile(self):
+        """Test qu'un profil inactif n'a aucune permission."""
+        self.profile.is_active = False
+        self.assertFalse(resolve_permissions(self.profile).permissions)
+        self.assertFalse(has_permission(self.profile, 'view_student'))
+
+    def test_request_resolution_query_count(self):
+        """Test que toutes les vérifications d'une requête coûtent au plus 2 requêtes."""
+        request = RequestFactory().get('/academic/classes/')
+        request.user = self.user
+        profile = self.user.profile
+
+        with self.assertNumQueries(2):
+            context = user_permissions(request)
+            menu = navigation_menu(request)
+            self.assertIn('view_class', context['user_permissions'])
+            self.assertTrue(menu['sidebar_menu'])
+            for _ in range(20):
+                has_permission(profile, 'view_student', 'app_profile')
+                is_admin(profile)
+
+        self.assertIs(request.effective_permissions, get_request_permissions(request))
+
+
+class PermissionCacheTestCase(PermissionTestBase):
+    """Tests pour le cache inter-requêtes des permissions."""
+
+    def _request(self):
+        request = RequestFactory().get('/profiles/dashboard/')
+        request.user = User.objects.select_related('profile').get(pk=self.user.pk)
+        return request
+
+    def test_warm_request_has_no_queries(self):
+        """Test qu'une requête suivante ne coûte aucune requête SQL."""
+        get_request_permissions(self._request())
+
+        request = self._request()
+        with self.assertNumQueries(0):
+            user_permissions(request)
+            navigation_menu(request)
+
+    def test_role_permissions_change_invalidates(self):
+        """Test qu'un retrait de permission d'un rôle est immédiat."""
+        self.assertTrue(get_request_permissions(self._request()).has('view_class', 'app_academic'))
+        self.role.permissions.remove(self.view_class)
+        self.assertFalse(get_request_permissions(self._request()).has('view_class', 'app_academic'))
+
+    def test_direct_permission_removal_invalidates(self):
+        """Test qu'un retrait de permission directe est immédiat."""
+        user_permission = assign_permission(self.profile, 'view_grade')
+        self.assertTrue(get_request_permissions(self._request()).has('view_grade', 'app_grades'))
+        UserPermission.objects.get(pk=user_permission.pk).permissions.remove(self.view_grade)
+        self.assertFalse(get_request_permissions(self._request()).has('view_grade', 'app_grades'))
+
+    def test_user_role_deactivation_invalidates(self):
+        """Test qu'une désactivation de rôle est immédiate."""
+        self.assertTrue(get_request_permissions(self._request()).has('view_student'))
+        user_role = UserRole.objects.get(profile=self.profile, role=self.role)
+        user_role.is_active = False
+        user_role.save()
+        self.assertFalse(get_request_permissions(self._request()).has('view_student'))
+
+
+class SidebarMenuTestCase(PermissionTestBase):
+    """Tests pour le sidebar mémorisé par jeu de permissions."""
+
+    def _menu(self, path):
+        request = RequestFactory().get(path)
+        request.user = User.objects.select_related('profile').get(pk=self.user.pk)
+        return navigation_menu(request)['sidebar_menu']
+
+    def test_menu_filtered_by_permissions(self):
+        """Test que seules les entrées autorisées sont affichées."""
+        titles = [item['title'] for item in self._menu('/')]
+        self.assertEqual(titles, ['Dashboard', 'Académique'])
+        academic = self._menu('/')[1]
+        self.assertEqual(
+            [child['title'] for child in academic['children']],
+            ['Niveaux', 'Salles de classe', 'Classes']
+        )
+
+    def test_admin_sees_admin_sections(self):
+        """Test que le rôle admin ouvre les sections avec contournement."""
+        assign_role(self.profile, 'admin')
+        titles = [item['title'] for item in self._menu('/')]
+        self.assertEqual(titles, ['Dashboard', 'Académique', 'Notes', 'Présences'])
+
+    def test_menu_memoized_per_permission_set(self):
+        """Test que le menu n'est reconstruit qu'une fois par jeu de permissions."""
+        build_sidebar_menu.cache_clear()
+        list(self._menu('/academic/classes/'))
+
+        with mock.patch('app_config.context_processors.reverse') as reverse:
+            menu = list(self._menu('/profiles/dashboard/'))
+        reverse.assert_not_called()
+        self.assertEqual(build_sidebar_menu.cache_info().hits, 1)
+        self.assertTrue(menu[0]['is_active'])
+        self.assertFalse(menu[1]['is_active'])
+
+    def test_is_active_per_request(self):
+        """Test que la surbrillance dépend uniquement du chemin."""
+        menu = self._menu('/academic/classes/')
+        self.assertFalse(menu[0]['is_active'])
+        self.assertTrue(menu[1]['is_active'])
+
+
+class LazyPermissionsContextTestCase(PermissionTestBase):
+    """Tests pour les valeurs de contexte paresseuses."""
+
+    def _request(self):
+        request = RequestFactory().get('/api/ping/')
+        request.user = User.objects.select_related('profile').get(pk=self.user.pk)
+        return request
+
+    def test_unused_context_has_no_queries(self):
+        """Test qu'un rendu qui n'utilise pas les permissions ne les résout pas."""
+        before = get_lazy_permissions_stats()
+        request = self._request()
+        with self.assertNumQueries(0):
+            user_permissions(request)
+            navigation_menu(request)
+        self.assertFalse(hasattr(request, 'effective_permissions'))
+
+        after = get_lazy_permissions_stats()
+        self.assertEqual(after['avoided'] - before['avoided'], 2)
+
+    def test_values_resolved_on_access(self):
+        """Test que les valeurs sont résolues au premier accès."""
+        context = user_permissions(self._request())
+        self.assertIn('view_class', context['user_permissions'])
+        self.assertFalse(context['user_is_admin'])
+        self.assertTrue(context['has_permission']('view_student', 'app_profile'))
+        self.assertFalse(context['has_permission']('view_grade'))
+
+
+class EffectivePermissionTableTestCase(PermissionTestBase):
+    """Tests pour la table dénormalisée EffectivePermission."""
+
+    def _effective(self):
+        return set(
+            EffectivePermission.objects.filter(profile=self.profile)
+            .values_list('permission__codename', flat=True)
+        )
+
+    def test_signals_maintain_table(self):
+        """Test la mise à jour incrémentale via les signaux."""
+        with self.captureOnCommitCallbacks(execute=True):
+            UserRole.objects.filter(profile=self.profile).delete()
+            assign_role(self.profile, 'teacher')
+        self.assertEqual(self._effective(), {'view_student', 'view_class'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assign_permission(self.profile, 'view_grade')
+            assign_permission(self.profile, 'view_student', granted=False)
+        self.assertEqual(self._effective(), {'view_class', 'view_grade'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.remove(self.view_class)
+        self.assertEqual(self._effective(), {'view_grade'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.view_student.user_permissions.clear()
+        self.assertEqual(self._effective(), {'view_student', 'view_grade'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.is_active = False
+            self.role.save()
+        self.assertEqual(self._effective(), {'view_grade'})
+
+    def test_inactive_role_holder(self):
+        """Test qu'un rôle tenu par une assignation inactive ne donne aucune permission."""
+        other_user = User.objects.create_user(username='otheruser', password='testpass123')
+        other = Profile.objects.get(user=other_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserRole.objects.create(profile=other, role=self.role, is_active=False)
+        self.assertEqual(
+            compute_effective_permission_ids([self.profile.pk, other.pk]),
+            {self.profile.pk: {self.view_student.pk, self.view_class.pk}}
+        )
+        self.assertFalse(EffectivePermission.objects.filter(profile=other).exists())
+
+        sync_effective_permissions([self.profile.pk])
+        self.assertEqual(self._effective(), {'view_student', 'view_class'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.is_active = False
+            self.profile.save()
+        self.assertEqual(compute_effective_permission_ids([self.profile.pk, other.pk]), {})
+        self.assertEqual(self._effective(), set())
+
+    def test_profile_deletion(self):
+        """Test qu'une suppression de profil ne laisse aucune ligne."""
+        with self.captureOnCommitCallbacks(execute=True):
+            assign_permission(self.profile, 'view_grade')
+            self.user.delete()
+        self.assertFalse(EffectivePermission.objects.exists())
+
+    def test_rebuild_command(self):
+        """Test la reconstruction complète par la commande de management."""
+        EffectivePermission.objects.all().delete()
+        call_command('rebuild_effective_permissions', stdout=io.StringIO())
+        self.assertEqual(self._effective(), {'view_student', 'view_class'})
+
+
+def legacy_user_permissions(profile):
+    """Ancienne résolution (UNION + DISTINCT + EXCLUDE), pour comparaison."""
+    role_permissions = Permission.objects.filter(
+        roles__user_roles__profile=profile,
+        roles__user_roles__is_active=True,
+        roles__user_roles__role__is_active=True,
+        is_active=True
+    ).distinct()
+    direct_permissions = Permission.objects.filter(
+        user_permissions__profile=profile,
+        user_permissions__granted=True,
+        user_permissions__is_active=True,
+        is_active=True
+    ).distinct()
+    denied_permissions = Permission.objects.filter(
+        user_permissions__profile=profile,
+        user_permissions__granted=False,
+        user_permissions__is_active=True,
+        is_active=True
+    ).values_list('id', flat=True)
+    return (role_permissions | direct_permissions).distinct().exclude(id__in=denied_permissions)
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), "Benchmark lent : définir RUN_BENCHMARKS=1")
+class UserPermissionsBenchmarkTestCase(TestCase):
+    """Benchmark de get_user_permissions sur 10 000 profils et 50 rôles."""
+
+    PROFILES = 10000
+    ROLES = 50
+    SAMPLE = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        permissions = Permission.objects.bulk_create([
+            Permission(name=f'Perm {i}', codename=f'perm_{i}', resource='bench', action='view')
+            for i in range(200)
+        ])
+        roles = Role.objects.bulk_create([
+            Role(name=f'Role {i}', codename=f'role_{i}') for i in range(cls.ROLES)
+        ])
+        Role.permissions.through.objects.bulk_create([
+            Role.permissions.through(role=role, permission=permission)
+            for role in roles
+            for permission in rng.sample(permissions, 20)
+        ])
+
+        users = User.objects.bulk_create([
+            User(username=f'bench_{i}') for i in range(cls.PROFILES)
+        ])
+        profiles = Profile.objects.bulk_create([
+            Profile(user=user, is_active=True) for user in users
+        ])
+        UserRole.objects.bulk_create([
+            UserRole(profile=profile, role=role)
+            for profile in profiles
+            for role in rng.sample(roles, 3)
+        ])
+
+        user_permissions = UserPermission.objects.bulk_create([
+            UserPermission(profile=profile, granted=granted)
+            for profile in profiles[::10]
+            for granted in (True, False)
+        ])
+        UserPermission.permissions.through.objects.bulk_create([
+            UserPermission.permissions.through(userpermission=user_permission, permission=permission)
+            for user_permission in user_permissions
+            for permission in rng.sample(permissions, 5)
+        ])
+        cls.sample = rng.sample(profiles, cls.SAMPLE)
+
+    def _measure(self, resolver):
+        start = time.perf_counter()
+        results = [resolver(profile) for profile in self.sample]
+        return time.perf_counter() - start, results
+
+    def test_benchmark_against_legacy(self):
+        """Compare la nouvelle résolution à l'ancienne et vérifie les résultats."""
+        legacy_time, legacy = self._measure(
+            lambda profile: set(legacy_user_permissions(profile).values_list('id', flat=True))
+        )
+        new_time, new = self._measure(lambda profile: set(get_user_permission_ids(profile)))
+
+        self.assertEqual(legacy, new)
+        sys.stderr.write(
+            f"\nget_user_permissions ({self.PROFILES} profils, {self.ROLES} rôles, "
+            f"{self.SAMPLE} résolutions) : ancien {legacy_time * 1000:.1f} ms, "
+            f"nouveau {new_time * 1000:.1f} ms\n"
+        )
@@ -45,10 +45,12 @@ class AllUsersView(PermissionRequiredMixin, View):
         # Récupérer tous les profils avec leurs informations
         profiles = Profile.objects.filter(is_active=True).select_related('user').prefetch_related(
             'user_roles__role',
-            'user_permissions__permissions'
+            'user_permissions__permissions',
+            'effective_permissions__permission'
         ).annotate(
-            roles_count=Count('user_roles', filter=Q(user_roles__is_active=True)),
-            permissions_count=Count('user_permissions__permissions', filter=Q(user_permissions__granted=True, user_permissions__is_active=True), distinct=True)
+            roles_count=Count('user_roles', filter=Q(user_roles__is_active=True), distinct=True),
+            # Permissions effectives lues dans la table dénormalisée
+            permissions_count=Count('effective_permissions', distinct=True)
         ).order_by('-created_at')
         
         # Recherche et filtrage
@@ -99,10 +101,12 @@ class PermissionManagementView(PermissionRequiredMixin, View):
         # Récupérer tous les profils avec leurs permissions et rôles
         profiles = Profile.objects.filter(is_active=True).select_related('user').prefetch_related(
             'user_roles__role',
-            'user_permissions__permissions'
+            'user_permissions__permissions',
+            'effective_permissions__permission'
         ).annotate(
-            roles_count=Count('user_roles', filter=Q(user_roles__is_active=True)),
-            permissions_count=Count('user_permissions__permissions', filter=Q(user_permissions__granted=True, user_permissions__is_active=True), distinct=True)
+            roles_count=Count('user_roles', filter=Q(user_roles__is_active=True), distinct=True),
+            # Permissions effectives lues dans la table dénormalisée
+            permissions_count=Count('effective_permissions', distinct=True)
         ).order_by('-created_at')
         
         # Récupérer tous les rôles et permissions disponibles
@@ -4,11 +4,14 @@ Administration pour l'application app_grades.
 Ce module contient les classes d'administration Django pour tous les modèles de notes.
 """
 
+from django import forms
 from django.contrib import admin
+from django.utils.text import capfirst
 from import_export.admin import ImportExportModelAdmin
 from .models import (
     GradeScale, GradeCategory, Assessment, StudentGrade, ReportCard
 )
+from .services.averaging import get_strategy_choices
 
 
 @admin.register(GradeScale)
@@ -16,11 +19,25 @@ class GradeScaleAdmin(ImportExportModelAdmin):
     """
     Administration pour le modèle GradeScale.
     """
-    list_display = ['name', 'min_score', 'max_score', 'passing_score', 'is_active', 'created_at']
-    list_filter = ['is_active', 'created_at']
+    list_display = [
+        'name', 'min_score', 'max_score', 'passing_score', 'averaging_method',
+        'academic_year', 'is_active', 'created_at'
+    ]
+    list_filter = ['is_active', 'averaging_method', 'academic_year', 'created_at']
     search_fields = ['name', 'description']
     ordering = ['name']
     readonly_fields = ['created_at', 'updated_at']
+    
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        # Les formules proposées sont celles du registre des stratégies
+        if db_field.name == 'averaging_method':
+            return forms.ChoiceField(
+                choices=get_strategy_choices(),
+                initial=db_field.default,
+                label=capfirst(db_field.verbose_name),
+                help_text=db_field.help_text
+            )
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
 
 
 @admin.register(GradeCategory)
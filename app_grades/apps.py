@@ -5,3 +5,10 @@ class AppGradesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_grades'
     verbose_name = 'Grades Management'
+    
+    def ready(self):
+        """
+        Méthode appelée lorsque l'application est prête.
+        Enregistre les signaux.
+        """
+        import app_grades.signals  # noqa
@@ -0,0 +1,74 @@
+"""
+Commande de management pour générer les bulletins d'une période.
+
+Usage:
+    python manage.py generate_report_cards --term "Trimestre 1"
+    python manage.py generate_report_cards --term "Trimestre 1" --class 4 --class 7
+    python manage.py generate_report_cards --term "Semestre 2" --year 3 --ranking dense --workers 4
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from app_academic.models import AcademicYear
+from app_grades.services.report_cards import (
+    RANKING_COMPETITION, RANKING_METHODS, generate_year_report_cards
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate ranked report cards for every class of an academic year'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--term',
+            required=True,
+            help='Term of the report cards (e.g. "Trimestre 1")',
+        )
+        parser.add_argument(
+            '--year',
+            type=int,
+            dest='year_id',
+            help='Academic year id (default: current year)',
+        )
+        parser.add_argument(
+            '--class',
+            type=int,
+            action='append',
+            dest='class_ids',
+            help='Only generate the given class id (repeatable)',
+        )
+        parser.add_argument(
+            '--ranking',
+            choices=RANKING_METHODS,
+            default=RANKING_COMPETITION,
+            help='Tie handling: competition (1, 2, 2, 4) or dense (1, 2, 2, 3)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes, one class at a time per worker (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        year_id = options.get('year_id')
+        if year_id is None:
+            current_year = AcademicYear.get_current_year()
+            if current_year is None:
+                raise CommandError('No current academic year, use --year')
+            year_id = current_year.id
+        elif not AcademicYear.objects.filter(id=year_id).exists():
+            raise CommandError(f'Academic year {year_id} not found')
+        
+        self.stdout.write(f'Generating report cards "{options["term"]}" for academic year {year_id}...')
+        
+        written = generate_year_report_cards(
+            year_id,
+            options['term'],
+            ranking=options['ranking'],
+            class_ids=options.get('class_ids'),
+            workers=options['workers']
+        )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {sum(written.values())} report card(s) written for {len(written)} class(es)'
+        ))
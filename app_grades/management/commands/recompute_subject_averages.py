@@ -0,0 +1,50 @@
+"""
+Commande de management pour recalculer la table SubjectAverage.
+
+Usage:
+    python manage.py recompute_subject_averages
+    python manage.py recompute_subject_averages --year 3
+    python manage.py recompute_subject_averages --all-years
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from app_academic.models import AcademicYear
+from app_grades.models import SubjectAverage
+from app_grades.services.averages import recompute_subject_averages
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the subject averages rollup table from student grades'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=int,
+            dest='year_id',
+            help='Academic year id to rebuild (default: current year)',
+        )
+        parser.add_argument(
+            '--all-years',
+            action='store_true',
+            help='Rebuild every academic year',
+        )
+
+    def handle(self, *args, **options):
+        year_id = options.get('year_id')
+        if options.get('all_years'):
+            year_id = None
+            self.stdout.write('Recomputing subject averages for all academic years...')
+        else:
+            if year_id is None:
+                current_year = AcademicYear.get_current_year()
+                if current_year is None:
+                    raise CommandError('No current academic year, use --year or --all-years')
+                year_id = current_year.id
+            elif not AcademicYear.objects.filter(id=year_id).exists():
+                raise CommandError(f'Academic year {year_id} not found')
+            self.stdout.write(f'Recomputing subject averages for academic year {year_id}...')
+        
+        written = recompute_subject_averages(year_id=year_id)
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ {written} subject average row(s) written'))
+        self.stdout.write(f'Subject averages: {SubjectAverage.objects.count()} rows')
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:59
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def populate_subject_averages(apps, schema_editor):
+    """Calcule les cumuls par matière des notes existantes."""
+    StudentGrade = apps.get_model('app_grades', 'StudentGrade')
+    SubjectAverage = apps.get_model('app_grades', 'SubjectAverage')
+
+    totals = {}
+    rows = StudentGrade.objects.filter(
+        is_active=True,
+        is_absent=False,
+        score__isnull=False
+    ).values_list('student_id', 'assessment__subject_id', 'assessment__academic_year_id',
+                  'score', 'assessment__coefficient')
+    for student_id, subject_id, year_id, score, coefficient in rows.iterator():
+        total = totals.setdefault((student_id, subject_id, year_id), [Decimal('0'), Decimal('0'), 0])
+        total[0] += score * coefficient
+        total[1] += coefficient
+        total[2] += 1
+
+    SubjectAverage.objects.bulk_create([
+        SubjectAverage(
+            student_id=student_id,
+            subject_id=subject_id,
+            academic_year_id=year_id,
+            weighted_sum=weighted_sum,
+            coefficient_sum=coefficient_sum,
+            grade_count=grade_count
+        )
+        for (student_id, subject_id, year_id), (weighted_sum, coefficient_sum, grade_count) in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_academic', '0001_initial'),
+        ('app_grades', '0001_initial'),
+        ('app_profile', '0016_parent_children'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectAverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weighted_sum', models.DecimalField(decimal_places=4, default=Decimal('0'), help_text='Somme des notes multipliées par le coefficient de leur évaluation', max_digits=14, verbose_name='Somme pondérée')),
+                ('coefficient_sum', models.DecimalField(decimal_places=2, default=Decimal('0'), help_text='Somme des coefficients des évaluations notées', max_digits=10, verbose_name='Somme des coefficients')),
+                ('grade_count', models.PositiveIntegerField(default=0, help_text='Nombre de notes prises en compte', verbose_name='Nombre de notes')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('academic_year', models.ForeignKey(help_text='Année scolaire concernée', on_delete=django.db.models.deletion.CASCADE, related_name='subject_averages', to='app_academic.academicyear', verbose_name='Année scolaire')),
+                ('student', models.ForeignKey(help_text='Élève concerné', on_delete=django.db.models.deletion.CASCADE, related_name='subject_averages', to='app_profile.student', verbose_name='Élève')),
+                ('subject', models.ForeignKey(help_text='Matière concernée', on_delete=django.db.models.deletion.CASCADE, related_name='student_averages', to='app_academic.subject', verbose_name='Matière')),
+            ],
+            options={
+                'verbose_name': 'Moyenne par matière',
+                'verbose_name_plural': 'Moyennes par matière',
+                'indexes': [models.Index(fields=['academic_year', 'subject'], name='app_grades__academi_2e2a54_idx')],
+                'unique_together': {('student', 'subject', 'academic_year')},
+            },
+        ),
+        migrations.RunPython(populate_subject_averages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_grades', '0002_subjectaverage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gradescale',
+            name='averaging_method',
+            field=models.CharField(default='coefficient', editable=False, help_text='Code de la stratégie utilisée pour calculer les moyennes avec ce barème', max_length=30, verbose_name='Méthode de calcul des moyennes'),
+        ),
+    ]
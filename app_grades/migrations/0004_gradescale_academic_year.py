@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_academic', '0002_teacheravailability'),
+        ('app_grades', '0003_gradescale_averaging_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gradescale',
+            name='academic_year',
+            field=models.ForeignKey(blank=True, help_text='Année scolaire dont les moyennes sont calculées avec ce barème', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='grade_scales', to='app_academic.academicyear', verbose_name='Année scolaire'),
+        ),
+        migrations.AlterField(
+            model_name='gradescale',
+            name='averaging_method',
+            field=models.CharField(default='coefficient', help_text='Code de la stratégie utilisée pour calculer les moyennes avec ce barème', max_length=30, verbose_name='Méthode de calcul des moyennes'),
+        ),
+        migrations.AddConstraint(
+            model_name='gradescale',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('academic_year',), name='unique_active_grade_scale_per_year'),
+        ),
+    ]
@@ -23,6 +23,10 @@ class GradeScale(models.Model):
     Exemple : "0-20", "A-F", "0-100"
     """
     
+    AVERAGING_COEFFICIENT = 'coefficient'
+    AVERAGING_NORMALIZED = 'normalized'
+    AVERAGING_WEIGHTED = 'weighted'
+    
     name = models.CharField(
         max_length=50,
         unique=True,
@@ -51,6 +55,25 @@ class GradeScale(models.Model):
         help_text="Note minimale pour réussir"
     )
     
+    # Code d'une stratégie de app_grades.services.averaging (register_strategy) ;
+    # les choix sont proposés par le formulaire d'administration
+    averaging_method = models.CharField(
+        max_length=30,
+        default=AVERAGING_COEFFICIENT,
+        verbose_name="Méthode de calcul des moyennes",
+        help_text="Code de la stratégie utilisée pour calculer les moyennes avec ce barème"
+    )
+    
+    academic_year = models.ForeignKey(
+        'app_academic.AcademicYear',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='grade_scales',
+        verbose_name="Année scolaire",
+        help_text="Année scolaire dont les moyennes sont calculées avec ce barème"
+    )
+    
     description = models.TextField(
         blank=True,
         null=True,
@@ -97,6 +120,13 @@ class GradeScale(models.Model):
         verbose_name = "Barème de notation"
         verbose_name_plural = "Barèmes de notation"
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['academic_year'],
+                condition=models.Q(is_active=True),
+                name='unique_active_grade_scale_per_year'
+            ),
+        ]
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['is_active']),
@@ -120,6 +150,19 @@ class GradeScale(models.Model):
         if instances:
             return instances[0]
         return None
+    
+    @classmethod
+    def get_year_scale(cls, year_id):
+        """
+        Récupère le barème actif rattaché à une année scolaire.
+        
+        Args:
+            year_id: ID de l'année scolaire
+            
+        Returns:
+            GradeScale ou None: Barème de l'année ou None si aucun n'est rattaché
+        """
+        return cls.objects.filter(academic_year_id=year_id, is_active=True).first()
 
 
 class GradeCategory(models.Model):
@@ -503,6 +546,9 @@ class StudentGrade(models.Model):
         """
         Calcule la moyenne d'un élève pour une matière.
         
+        La moyenne est lue dans la table de cumul SubjectAverage (une ligne
+        par année scolaire) au lieu d'être recalculée depuis les notes.
+        
         Args:
             student_id: ID de l'élève
             subject_id: ID de la matière
@@ -511,29 +557,21 @@ class StudentGrade(models.Model):
         Returns:
             Decimal: Moyenne calculée ou None
         """
-        grades = cls.objects.filter(
+        rows = SubjectAverage.objects.filter(
             student_id=student_id,
-            assessment__subject_id=subject_id,
-            is_active=True,
-            is_absent=False
+            subject_id=subject_id,
+            grade_count__gt=0
         )
         
         if year_id:
-            grades = grades.filter(assessment__academic_year_id=year_id)
-        
-        grades = grades.select_related('assessment')
-        
-        if not grades.exists():
-            return None
+            rows = rows.filter(academic_year_id=year_id)
         
         total_score = Decimal('0')
         total_coefficient = Decimal('0')
         
-        for grade in grades:
-            if grade.score is not None:
-                coefficient = grade.assessment.coefficient
-                total_score += grade.score * coefficient
-                total_coefficient += coefficient
+        for weighted_sum, coefficient_sum in rows.values_list('weighted_sum', 'coefficient_sum'):
+            total_score += weighted_sum
+            total_coefficient += coefficient_sum
         
         if total_coefficient == 0:
             return None
@@ -541,6 +579,92 @@ class StudentGrade(models.Model):
         return total_score / total_coefficient
 
 
+class SubjectAverage(models.Model):
+    """
+    Table de cumul des notes d'un élève par matière et par année scolaire.
+    
+    Stocke la somme pondérée des notes, la somme des coefficients et le
+    nombre de notes prises en compte, ce qui permet de lire une moyenne sans
+    reparcourir les notes. Elle est maintenue de façon incrémentale par les
+    signaux de app_grades et peut être recalculée avec la commande
+    `recompute_subject_averages`.
+    """
+    
+    student = models.ForeignKey(
+        'app_profile.Student',
+        on_delete=models.CASCADE,
+        related_name='subject_averages',
+        verbose_name="Élève",
+        help_text="Élève concerné"
+    )
+    
+    subject = models.ForeignKey(
+        'app_academic.Subject',
+        on_delete=models.CASCADE,
+        related_name='student_averages',
+        verbose_name="Matière",
+        help_text="Matière concernée"
+    )
+    
+    academic_year = models.ForeignKey(
+        'app_academic.AcademicYear',
+        on_delete=models.CASCADE,
+        related_name='subject_averages',
+        verbose_name="Année scolaire",
+        help_text="Année scolaire concernée"
+    )
+    
+    weighted_sum = models.DecimalField(
+        max_digits=14,
+        decimal_places=4,
+        default=Decimal('0'),
+        verbose_name="Somme pondérée",
+        help_text="Somme des notes multipliées par le coefficient de leur évaluation"
+    )
+    
+    coefficient_sum = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0'),
+        verbose_name="Somme des coefficients",
+        help_text="Somme des coefficients des évaluations notées"
+    )
+    
+    grade_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Nombre de notes",
+        help_text="Nombre de notes prises en compte"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Date de modification"
+    )
+    
+    class Meta:
+        verbose_name = "Moyenne par matière"
+        verbose_name_plural = "Moyennes par matière"
+        unique_together = [['student', 'subject', 'academic_year']]
+        indexes = [
+            models.Index(fields=['academic_year', 'subject']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.profile.full_name} - {self.subject.name} ({self.academic_year.name})"
+    
+    @property
+    def average(self):
+        """
+        Moyenne pondérée de l'élève dans la matière.
+        
+        Returns:
+            Decimal: Moyenne ou None si aucune note
+        """
+        if not self.grade_count or self.coefficient_sum == 0:
+            return None
+        return self.weighted_sum / self.coefficient_sum
+
+
 class ReportCard(models.Model):
     """
     Modèle représentant un bulletin de notes.
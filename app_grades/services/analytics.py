@@ -0,0 +1,244 @@
+"""
+Statistiques des évaluations.
+
+Ce module calcule, pour une évaluation ou toutes les évaluations d'une
+classe, la moyenne, la médiane, l'écart type, les notes minimale et
+maximale, le taux de réussite par rapport à un barème et un histogramme
+des notes. Tout est calculé par la base en une seule requête, à l'aide de
+fonctions de fenêtrage partitionnées par évaluation.
+
+Les résultats sont conservés dans le cache Django et invalidés dès qu'une
+note de l'évaluation change (voir signals.py).
+"""
+
+import math
+from decimal import Decimal, ROUND_HALF_UP
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, Max, Min, Q, Value, Window
+from django.db.models.functions import Cast, RowNumber
+from ..models import StudentGrade
+
+
+DEFAULT_HISTOGRAM_BINS = 10
+MAX_HISTOGRAM_BINS = 20
+
+STATISTICS_PRECISION = Decimal('0.01')
+
+
+def _generation_key(kind, object_id):
+    return f'app_grades:analytics:{kind}:{object_id}:generation'
+
+
+def _get_generation(kind, object_id):
+    key = _generation_key(kind, object_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, 1, timeout=None)
+        generation = cache.get(key, 1)
+    return generation
+
+
+def _bump_generation(kind, object_id):
+    key = _generation_key(kind, object_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Clé absente (cache vidé ou expiré) : repartir d'une nouvelle génération
+        cache.add(key, 1, timeout=None)
+        cache.incr(key)
+
+
+def invalidate_assessment_statistics(assessment_id, class_id=None):
+    """
+    Invalide les statistiques en cache d'une évaluation et de sa classe.
+    
+    La génération est incrémentée immédiatement puis à nouveau après le
+    commit, pour qu'aucun calcul concurrent ne mette en cache un état non
+    encore validé en base.
+    
+    Args:
+        assessment_id: ID de l'évaluation
+        class_id: ID de la classe de l'évaluation (optionnel)
+    """
+    def bump():
+        _bump_generation('assessment', assessment_id)
+        if class_id is not None:
+            _bump_generation('class', class_id)
+    
+    bump()
+    transaction.on_commit(bump)
+
+
+def _quantize(value):
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(STATISTICS_PRECISION, rounding=ROUND_HALF_UP)
+
+
+def _compute_statistics(grades, scale=None, bins=DEFAULT_HISTOGRAM_BINS):
+    """
+    Calcule les statistiques de notes par évaluation, en une requête.
+    
+    Les agrégats sont calculés par fenêtre sur chaque évaluation, puis
+    seules les lignes médianes (une ou deux par évaluation) sont renvoyées.
+    L'histogramme découpe l'intervalle [0, note maximale de l'évaluation]
+    en `bins` tranches de même largeur ; la dernière inclut la note maximale.
+    
+    Args:
+        grades: QuerySet de StudentGrade à analyser
+        scale: Instance de GradeScale pour le taux de réussite (optionnel)
+        bins: Nombre de tranches de l'histogramme
+    
+    Returns:
+        dict: {assessment_id: statistiques}
+    """
+    partition = {'partition_by': [F('assessment_id')]}
+    max_score = Cast('assessment__max_score', FloatField())
+    score = Cast('score', FloatField())
+    
+    annotations = {
+        'position': Window(RowNumber(), order_by=F('score').asc(), **partition),
+        'total': Window(Count('id'), **partition),
+        'mean': Window(Avg('score'), **partition),
+        'mean_square': Window(Avg(score * score), **partition),
+        'minimum': Window(Min('score'), **partition),
+        'maximum': Window(Max('score'), **partition),
+    }
+    for index in range(bins):
+        condition = Q(score__gte=max_score * Value(index / bins))
+        if index < bins - 1:
+            condition &= Q(score__lt=max_score * Value((index + 1) / bins))
+        annotations[f'bin_{index}'] = Window(Count('id', filter=condition), **partition)
+    if scale is not None:
+        passing_ratio = float(scale.passing_score) / float(scale.max_score)
+        annotations['passed'] = Window(
+            Count('id', filter=Q(score__gte=max_score * Value(passing_ratio))), **partition
+        )
+    
+    rows = grades.filter(
+        is_active=True,
+        is_absent=False,
+        score__isnull=False
+    ).annotate(**annotations).filter(
+        position__gte=(F('total') + 1) / 2,
+        position__lte=F('total') / 2 + 1
+    ).values('assessment_id', 'assessment__max_score', 'score', *annotations).order_by('assessment_id', 'position')
+    
+    statistics = {}
+    for row in rows:
+        current = statistics.get(row['assessment_id'])
+        if current is not None:
+            # Nombre pair de notes : la médiane est la moyenne des deux notes centrales
+            current['median'] = _quantize((current['_median_score'] + row['score']) / 2)
+            continue
+        
+        mean = float(row['mean'])
+        variance = max(float(row['mean_square']) - mean * mean, 0)
+        max_score_value = row['assessment__max_score']
+        width = max_score_value / bins
+        statistics[row['assessment_id']] = {
+            'assessment_id': row['assessment_id'],
+            'count': row['total'],
+            'mean': _quantize(mean),
+            'median': _quantize(row['score']),
+            'std_dev': _quantize(math.sqrt(variance)),
+            'min': _quantize(row['minimum']),
+            'max': _quantize(row['maximum']),
+            'pass_rate': (
+                _quantize(Decimal(row['passed']) * 100 / Decimal(row['total']))
+                if scale is not None else None
+            ),
+            'histogram': [
+                {
+                    'start': _quantize(width * index),
+                    'end': _quantize(width * (index + 1)),
+                    'count': row[f'bin_{index}'],
+                }
+                for index in range(bins)
+            ],
+            '_median_score': row['score'],
+        }
+    
+    for result in statistics.values():
+        del result['_median_score']
+    return statistics
+
+
+def _check_bins(bins):
+    if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+        raise ValueError(f'Histogram bins must be between 1 and {MAX_HISTOGRAM_BINS}')
+
+
+def _scale_cache_part(scale):
+    if scale is None:
+        return 'none'
+    return f'{scale.passing_score}-{scale.max_score}'
+
+
+def get_assessment_statistics(assessment_id, scale=None, bins=DEFAULT_HISTOGRAM_BINS):
+    """
+    Retourne les statistiques d'une évaluation.
+    
+    Args:
+        assessment_id: ID de l'évaluation
+        scale: Instance de GradeScale pour le taux de réussite (optionnel)
+        bins: Nombre de tranches de l'histogramme
+    
+    Returns:
+        dict: Statistiques (count, mean, median, std_dev, min, max,
+        pass_rate, histogram) ou None si aucune note n'est renseignée
+    
+    Raises:
+        ValueError: Si le nombre de tranches est hors limites
+    """
+    _check_bins(bins)
+    cache_key = 'app_grades:analytics:assessment:{}:{}:{}:{}'.format(
+        assessment_id, _get_generation('assessment', assessment_id), _scale_cache_part(scale), bins
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached or None
+    
+    statistics = _compute_statistics(
+        StudentGrade.objects.filter(assessment_id=assessment_id), scale, bins
+    ).get(assessment_id)
+    cache.set(cache_key, statistics or {}, getattr(settings, 'GRADE_ANALYTICS_CACHE_TIMEOUT', 60 * 60))
+    return statistics
+
+
+def get_class_statistics(class_id, year_id=None, scale=None, bins=DEFAULT_HISTOGRAM_BINS):
+    """
+    Retourne les statistiques de toutes les évaluations actives d'une classe.
+    
+    Args:
+        class_id: ID de la classe
+        year_id: ID de l'année scolaire (optionnel)
+        scale: Instance de GradeScale pour le taux de réussite (optionnel)
+        bins: Nombre de tranches de l'histogramme
+    
+    Returns:
+        dict: {assessment_id: statistiques} pour les évaluations notées
+    
+    Raises:
+        ValueError: Si le nombre de tranches est hors limites
+    """
+    _check_bins(bins)
+    cache_key = 'app_grades:analytics:class:{}:{}:{}:{}:{}'.format(
+        class_id, _get_generation('class', class_id), year_id, _scale_cache_part(scale), bins
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    grades = StudentGrade.objects.filter(
+        assessment__class_section_id=class_id,
+        assessment__is_active=True
+    )
+    if year_id:
+        grades = grades.filter(assessment__academic_year_id=year_id)
+    
+    statistics = _compute_statistics(grades, scale, bins)
+    cache.set(cache_key, statistics, getattr(settings, 'GRADE_ANALYTICS_CACHE_TIMEOUT', 60 * 60))
+    return statistics
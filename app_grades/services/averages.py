@@ -0,0 +1,214 @@
+"""
+Maintenance de la table de cumul SubjectAverage.
+
+Ce module contient les fonctions qui tiennent à jour les sommes pondérées
+par (élève, matière, année scolaire) : application incrémentale d'une
+note ajoutée, modifiée ou retirée, et recalcul complet depuis les notes.
+"""
+
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from ..models import StudentGrade, SubjectAverage
+
+
+def to_decimal(value):
+    """
+    Convertit une valeur numérique en Decimal.
+    
+    Les instances non relues depuis la base peuvent porter des float
+    (valeur par défaut du coefficient) ou des chaînes.
+    
+    Args:
+        value: Valeur à convertir (ou None)
+    
+    Returns:
+        Decimal: Valeur convertie ou None
+    """
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def grade_contribution(score, coefficient, is_active=True, is_absent=False):
+    """
+    Calcule l'apport d'une note à la moyenne de sa matière.
+    
+    Seules les notes actives, renseignées et sans absence comptent, comme
+    dans StudentGrade.calculate_average.
+    
+    Args:
+        score: Note obtenue (ou None)
+        coefficient: Coefficient de l'évaluation
+        is_active: Indique si la note est active
+        is_absent: Indique si l'élève était absent
+    
+    Returns:
+        tuple: (somme pondérée, coefficient) ou None si la note ne compte pas
+    """
+    if not is_active or is_absent or score is None:
+        return None
+    score = to_decimal(score)
+    coefficient = to_decimal(coefficient)
+    return score * coefficient, coefficient
+
+
+def get_grade_state(grade):
+    """
+    Retourne la clé de cumul et l'apport d'une note.
+    
+    Args:
+        grade: Instance du modèle StudentGrade
+    
+    Returns:
+        tuple: ((student_id, subject_id, year_id), apport) ; l'apport vaut
+        None si la note ne compte pas
+    """
+    assessment = grade.assessment
+    key = (grade.student_id, assessment.subject_id, assessment.academic_year_id)
+    return key, grade_contribution(grade.score, assessment.coefficient, grade.is_active, grade.is_absent)
+
+
+def get_stored_grade_state(grade_id):
+    """
+    Lit en base la clé de cumul et l'apport d'une note avant sa modification.
+    
+    Args:
+        grade_id: ID de la note
+    
+    Returns:
+        tuple: Comme get_grade_state, ou None si la note n'existe pas
+    """
+    row = StudentGrade.objects.filter(pk=grade_id).values_list(
+        'student_id', 'assessment__subject_id', 'assessment__academic_year_id',
+        'score', 'assessment__coefficient', 'is_active', 'is_absent'
+    ).first()
+    if row is None:
+        return None
+    student_id, subject_id, year_id, score, coefficient, is_active, is_absent = row
+    return (student_id, subject_id, year_id), grade_contribution(score, coefficient, is_active, is_absent)
+
+
+def apply_subject_average_delta(key, weighted_sum, coefficient_sum, grade_count):
+    """
+    Ajoute (ou retire, avec des valeurs négatives) un apport à une ligne de cumul.
+    
+    La mise à jour est faite en base avec des expressions F() pour rester
+    correcte en cas d'écritures concurrentes. La ligne est créée au premier
+    ajout ; un retrait sans ligne existante est ignoré (élève supprimé).
+    
+    Args:
+        key: Tuple (student_id, subject_id, year_id)
+        weighted_sum: Variation de la somme pondérée
+        coefficient_sum: Variation de la somme des coefficients
+        grade_count: Variation du nombre de notes
+    """
+    student_id, subject_id, year_id = key
+    rows = SubjectAverage.objects.filter(
+        student_id=student_id,
+        subject_id=subject_id,
+        academic_year_id=year_id
+    )
+    values = {
+        'weighted_sum': F('weighted_sum') + weighted_sum,
+        'coefficient_sum': F('coefficient_sum') + coefficient_sum,
+        'grade_count': F('grade_count') + grade_count,
+    }
+    
+    if rows.update(**values) or grade_count <= 0:
+        return
+    
+    try:
+        with transaction.atomic():
+            SubjectAverage.objects.create(
+                student_id=student_id,
+                subject_id=subject_id,
+                academic_year_id=year_id,
+                weighted_sum=weighted_sum,
+                coefficient_sum=coefficient_sum,
+                grade_count=grade_count
+            )
+    except IntegrityError:
+        # Ligne créée entre-temps par une autre écriture
+        rows.update(**values)
+
+
+def apply_grade_change(previous, current):
+    """
+    Reporte la modification d'une note sur la table de cumul.
+    
+    Args:
+        previous: État avant modification (get_stored_grade_state) ou None
+        current: État après modification (get_grade_state) ou None
+    """
+    if previous == current:
+        return
+    
+    with transaction.atomic():
+        if previous is not None and previous[1] is not None:
+            weighted_sum, coefficient = previous[1]
+            apply_subject_average_delta(previous[0], -weighted_sum, -coefficient, -1)
+        if current is not None and current[1] is not None:
+            weighted_sum, coefficient = current[1]
+            apply_subject_average_delta(current[0], weighted_sum, coefficient, 1)
+
+
+def recompute_subject_averages(year_id=None, student_ids=None, subject_ids=None):
+    """
+    Recalcule les lignes de cumul depuis les notes, en une requête groupée.
+    
+    Les lignes du périmètre sont remplacées : celles qui n'ont plus de note
+    sont supprimées.
+    
+    Args:
+        year_id: ID de l'année scolaire (None : toutes les années)
+        student_ids: IDs des élèves à recalculer (None : tous)
+        subject_ids: IDs des matières à recalculer (None : toutes)
+    
+    Returns:
+        int: Nombre de lignes de cumul écrites
+    """
+    grades = StudentGrade.objects.filter(
+        is_active=True,
+        is_absent=False,
+        score__isnull=False
+    )
+    rows = SubjectAverage.objects.all()
+    if year_id is not None:
+        grades = grades.filter(assessment__academic_year_id=year_id)
+        rows = rows.filter(academic_year_id=year_id)
+    if student_ids is not None:
+        grades = grades.filter(student_id__in=student_ids)
+        rows = rows.filter(student_id__in=student_ids)
+    if subject_ids is not None:
+        grades = grades.filter(assessment__subject_id__in=subject_ids)
+        rows = rows.filter(subject_id__in=subject_ids)
+    
+    totals = grades.values(
+        'student_id', 'assessment__subject_id', 'assessment__academic_year_id'
+    ).annotate(
+        total_score=Sum(
+            F('score') * F('assessment__coefficient'),
+            output_field=DecimalField(max_digits=14, decimal_places=4)
+        ),
+        total_coefficient=Sum('assessment__coefficient'),
+        total_count=Count('id')
+    ).order_by()
+    
+    averages = [
+        SubjectAverage(
+            student_id=row['student_id'],
+            subject_id=row['assessment__subject_id'],
+            academic_year_id=row['assessment__academic_year_id'],
+            weighted_sum=Decimal(row['total_score']),
+            coefficient_sum=Decimal(row['total_coefficient']),
+            grade_count=row['total_count']
+        )
+        for row in totals
+    ]
+    
+    with transaction.atomic():
+        rows.delete()
+        SubjectAverage.objects.bulk_create(averages, batch_size=1000)
+    
+    return len(averages)
@@ -0,0 +1,302 @@
+"""
+Moteur de calcul des moyennes pondérées.
+
+Ce module calcule les moyennes directement en SQL, en un seul agrégat
+annoté, selon une stratégie choisie par barème (GradeScale.averaging_method).
+Le barème est celui de l'année scolaire (GradeScale.get_year_scale) :
+- coefficient : notes brutes pondérées par le coefficient de l'évaluation
+- normalized : notes ramenées au barème (note / note maximale de l'évaluation),
+  pondérées par le coefficient
+- weighted : notes ramenées au barème, pondérées par le coefficient et par le
+  poids de la catégorie d'évaluation
+
+D'autres stratégies peuvent être ajoutées avec register_strategy.
+
+Les calculs SQL se font en flottants ; les résultats sont convertis en
+Decimal, comme les moyennes lues dans la table de cumul SubjectAverage.
+"""
+
+from decimal import Decimal
+from django.db.models import Count, ExpressionWrapper, FloatField, Sum, Value
+from django.db.models.functions import Cast, NullIf
+from ..models import GradeScale, StudentGrade
+
+
+DEFAULT_SCALE_MAX = Decimal('20')
+
+AVERAGING_STRATEGIES = {}
+
+
+class AveragingStrategy:
+    """
+    Stratégie de calcul de moyenne.
+    
+    Une stratégie fournit deux expressions évaluées sur StudentGrade : la
+    note prise en compte et son poids, toutes deux en flottants. La moyenne
+    vaut Sum(note * poids) / Sum(poids).
+    """
+    
+    code = None
+    label = None
+    
+    def score_expression(self, scale):
+        """
+        Expression de la note prise en compte.
+        
+        Args:
+            scale: Instance de GradeScale (ou None)
+        
+        Returns:
+            Expression: Note de chaque ligne de StudentGrade
+        """
+        return Cast('score', FloatField())
+    
+    def weight_expression(self):
+        """
+        Expression du poids d'une note.
+        
+        Returns:
+            Expression: Poids de chaque ligne de StudentGrade
+        """
+        return Cast('assessment__coefficient', FloatField())
+
+
+def register_strategy(strategy_class):
+    """
+    Enregistre une stratégie de calcul sous son code.
+    
+    S'utilise comme décorateur de classe.
+    
+    Args:
+        strategy_class: Sous-classe de AveragingStrategy
+    
+    Returns:
+        type: La classe enregistrée
+    """
+    AVERAGING_STRATEGIES[strategy_class.code] = strategy_class()
+    return strategy_class
+
+
+def get_strategy(code):
+    """
+    Récupère une stratégie enregistrée.
+    
+    Args:
+        code: Code de la stratégie
+    
+    Returns:
+        AveragingStrategy: Stratégie correspondante
+    
+    Raises:
+        ValueError: Si la stratégie est inconnue
+    """
+    try:
+        return AVERAGING_STRATEGIES[code]
+    except KeyError:
+        raise ValueError(f"Unknown averaging method '{code}'")
+
+
+def get_scale_strategy(scale=None):
+    """
+    Récupère la stratégie choisie pour un barème.
+    
+    Args:
+        scale: Instance de GradeScale (None : stratégie par défaut)
+    
+    Returns:
+        AveragingStrategy: Stratégie du barème
+    """
+    if scale is None:
+        return get_strategy(GradeScale.AVERAGING_COEFFICIENT)
+    return get_strategy(scale.averaging_method)
+
+
+@register_strategy
+class CoefficientStrategy(AveragingStrategy):
+    """Notes brutes pondérées par le coefficient (calcul historique de SubjectAverage)."""
+    
+    code = GradeScale.AVERAGING_COEFFICIENT
+    label = 'Notes brutes pondérées par coefficient'
+
+
+@register_strategy
+class NormalizedStrategy(AveragingStrategy):
+    """Notes ramenées au barème puis pondérées par le coefficient."""
+    
+    code = GradeScale.AVERAGING_NORMALIZED
+    label = 'Notes ramenées au barème, pondérées par coefficient'
+    
+    def score_expression(self, scale):
+        scale_max = scale.max_score if scale is not None else DEFAULT_SCALE_MAX
+        return (
+            Cast('score', FloatField()) * Value(float(scale_max))
+            / Cast('assessment__max_score', FloatField())
+        )
+
+
+@register_strategy
+class WeightedStrategy(NormalizedStrategy):
+    """Notes ramenées au barème, pondérées par le coefficient et le poids de la catégorie."""
+    
+    code = GradeScale.AVERAGING_WEIGHTED
+    label = 'Notes ramenées au barème, pondérées par coefficient et catégorie'
+    
+    def weight_expression(self):
+        return Cast('assessment__coefficient', FloatField()) * Cast('assessment__category__weight', FloatField())
+
+
+def get_strategy_choices():
+    """
+    Liste les stratégies enregistrées pour un champ de formulaire.
+    
+    Returns:
+        list: Tuples (code, libellé) triés par code
+    """
+    return [
+        (code, strategy.label or code)
+        for code, strategy in sorted(AVERAGING_STRATEGIES.items())
+    ]
+
+
+def to_decimal(value):
+    """
+    Convertit un résultat flottant du calcul SQL en Decimal.
+    
+    Args:
+        value: Flottant ou None
+    
+    Returns:
+        Decimal: Valeur convertie ou None
+    """
+    if value is None:
+        return None
+    return Decimal(str(value))
+
+
+def annotate_averages(grades, scale=None, group_by=('student_id', 'assessment__subject_id')):
+    """
+    Calcule les moyennes d'un ensemble de notes en un seul agrégat SQL.
+    
+    Seules les notes actives, renseignées et sans absence sont prises en
+    compte.
+    
+    Args:
+        grades: QuerySet de StudentGrade à agréger
+        scale: Instance de GradeScale déterminant la formule (optionnel)
+        group_by: Champs de regroupement
+    
+    Returns:
+        QuerySet: Dictionnaires avec les champs de regroupement, weighted_sum,
+        weight_sum, grade_count et average (flottants)
+    """
+    strategy = get_scale_strategy(scale)
+    score = strategy.score_expression(scale)
+    weight = strategy.weight_expression()
+    weighted_sum = Sum(ExpressionWrapper(score * weight, output_field=FloatField()))
+    weight_sum = Sum(ExpressionWrapper(weight, output_field=FloatField()))
+    
+    return grades.filter(
+        is_active=True,
+        is_absent=False,
+        score__isnull=False
+    ).values(*group_by).annotate(
+        weighted_sum=weighted_sum,
+        weight_sum=weight_sum,
+        grade_count=Count('id'),
+        average=ExpressionWrapper(
+            weighted_sum / NullIf(weight_sum, Value(0.0)),
+            output_field=FloatField()
+        )
+    ).order_by()
+
+
+def subject_average_rows(grades, scale=None):
+    """
+    Calcule les cumuls par élève et par matière selon la formule du barème.
+    
+    Les lignes ont la forme de celles lues dans la table de cumul
+    SubjectAverage et peuvent être passées à compute_overall_average.
+    
+    Args:
+        grades: QuerySet de StudentGrade à agréger
+        scale: Instance de GradeScale (optionnel)
+    
+    Returns:
+        list: Tuples (student_id, subject_id, somme pondérée, somme des poids,
+        coefficient de la matière) pour les matières actives
+    """
+    rows = annotate_averages(
+        grades.filter(assessment__subject__is_active=True),
+        scale,
+        group_by=('student_id', 'assessment__subject_id', 'assessment__subject__coefficient')
+    ).order_by('student_id', 'assessment__subject_id')
+    
+    return [
+        (
+            row['student_id'],
+            row['assessment__subject_id'],
+            to_decimal(row['weighted_sum']),
+            to_decimal(row['weight_sum']),
+            row['assessment__subject__coefficient']
+        )
+        for row in rows
+    ]
+
+
+def class_grades(class_id, year_id):
+    """
+    Sélectionne les notes des élèves actifs d'une classe pour une année.
+    
+    Args:
+        class_id: ID de la classe
+        year_id: ID de l'année scolaire
+    
+    Returns:
+        QuerySet: Notes de la classe
+    """
+    return StudentGrade.objects.filter(
+        student__class_section_id=class_id,
+        student__is_active=True,
+        assessment__academic_year_id=year_id
+    )
+
+
+def calculate_subject_average(student_id, subject_id, year_id=None, scale=None):
+    """
+    Calcule la moyenne d'un élève pour une matière selon la formule du barème.
+    
+    Args:
+        student_id: ID de l'élève
+        subject_id: ID de la matière
+        year_id: ID de l'année scolaire (optionnel)
+        scale: Instance de GradeScale (optionnel)
+    
+    Returns:
+        Decimal: Moyenne calculée ou None
+    """
+    grades = StudentGrade.objects.filter(student_id=student_id, assessment__subject_id=subject_id)
+    if year_id:
+        grades = grades.filter(assessment__academic_year_id=year_id)
+    
+    for row in annotate_averages(grades, scale, group_by=('student_id',)):
+        return to_decimal(row['average'])
+    return None
+
+
+def calculate_class_subject_averages(class_id, year_id, scale=None):
+    """
+    Calcule les moyennes par matière de tous les élèves d'une classe.
+    
+    Args:
+        class_id: ID de la classe
+        year_id: ID de l'année scolaire
+        scale: Instance de GradeScale (optionnel)
+    
+    Returns:
+        dict: {student_id: {subject_id: Decimal}} pour les élèves notés
+    """
+    results = {}
+    for row in annotate_averages(class_grades(class_id, year_id), scale):
+        if row['average'] is not None:
+            results.setdefault(row['student_id'], {})[row['assessment__subject_id']] = to_decimal(row['average'])
+    return results
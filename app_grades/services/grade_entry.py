@@ -0,0 +1,174 @@
+"""
+Saisie groupée des notes d'une évaluation.
+
+Ce module valide en une fois toutes les notes envoyées pour une évaluation
+(la liste de la classe) puis les enregistre en un seul upsert sur la clé
+(élève, évaluation). L'upsert ne déclenchant pas les signaux, la table de
+cumul SubjectAverage et les statistiques en cache sont mises à jour
+explicitement.
+"""
+
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from ..models import StudentGrade
+from .analytics import invalidate_assessment_statistics
+from .averages import recompute_subject_averages
+
+
+def get_assessment_roster(assessment):
+    """
+    Retourne la liste de la classe d'une évaluation avec les notes saisies.
+    
+    Args:
+        assessment: Instance du modèle Assessment
+    
+    Returns:
+        list: Dictionnaires (student_id, full_name, score, is_absent, comment)
+        triés par nom
+    """
+    from app_profile.models import Student
+    
+    grades = {
+        grade['student_id']: grade
+        for grade in StudentGrade.objects.filter(assessment=assessment).values(
+            'student_id', 'score', 'is_absent', 'comment'
+        )
+    }
+    roster = []
+    for student_id, full_name in Student.objects.filter(
+        class_section_id=assessment.class_section_id,
+        is_active=True
+    ).order_by('profile__full_name', 'id').values_list('id', 'profile__full_name'):
+        grade = grades.get(student_id, {})
+        roster.append({
+            'student_id': student_id,
+            'full_name': full_name,
+            'score': grade.get('score'),
+            'is_absent': grade.get('is_absent', False),
+            'comment': grade.get('comment'),
+        })
+    return roster
+
+
+def _validate_entry(entry, roster_ids, seen, max_score):
+    """
+    Valide une ligne de saisie.
+    
+    Returns:
+        tuple: (valeurs nettoyées, liste d'erreurs)
+    """
+    if not isinstance(entry, dict):
+        return None, ['Row must be an object.']
+    
+    errors = []
+    student_id = entry.get('student_id')
+    if not isinstance(student_id, int) or isinstance(student_id, bool) or student_id not in roster_ids:
+        errors.append('Student is not enrolled in the assessment class.')
+    elif student_id in seen:
+        errors.append('Student appears more than once.')
+    
+    is_absent = entry.get('is_absent', False)
+    if is_absent is None:
+        is_absent = False
+    elif not isinstance(is_absent, bool):
+        errors.append('is_absent must be true or false.')
+        is_absent = False
+    score = entry.get('score')
+    if score in (None, ''):
+        score = None
+    else:
+        try:
+            score = Decimal(str(score))
+        except InvalidOperation:
+            errors.append('Score must be a number.')
+            score = None
+        else:
+            if not score.is_finite() or score < 0 or score > max_score:
+                errors.append(f'Score must be between 0 and {max_score}.')
+            elif score != score.quantize(Decimal('0.01')):
+                errors.append('Score must have at most two decimal places.')
+    if is_absent and score is not None:
+        errors.append('An absent student cannot have a score.')
+    
+    comment = entry.get('comment') or None
+    if comment is not None and not isinstance(comment, str):
+        errors.append('Comment must be a string.')
+    
+    return {'student_id': student_id, 'score': score, 'is_absent': is_absent, 'comment': comment}, errors
+
+
+def save_assessment_grades(assessment, entries, user=None):
+    """
+    Valide et enregistre toutes les notes d'une évaluation.
+    
+    Chaque ligne est contrôlée (élève de la classe, pas de doublon, note
+    entre 0 et la note maximale avec au plus deux décimales, is_absent
+    booléen, pas de note pour un absent). Si une ligne
+    est invalide, rien n'est écrit. Sinon toutes les notes sont écrites en
+    un seul upsert ; les notes existantes sont mises à jour.
+    
+    Args:
+        assessment: Instance du modèle Assessment
+        entries: Liste de dictionnaires (student_id, score, is_absent, comment)
+        user: Utilisateur à l'origine de la saisie (optionnel)
+    
+    Returns:
+        tuple: (nombre de notes écrites, liste des erreurs par ligne
+        {'row': index, 'student_id': id, 'errors': [...]})
+    """
+    from app_profile.models import Student
+    
+    roster_ids = set(Student.objects.filter(
+        class_section_id=assessment.class_section_id,
+        is_active=True
+    ).order_by().values_list('id', flat=True))
+    max_score = Decimal(str(assessment.max_score))
+    
+    cleaned = []
+    errors = []
+    seen = set()
+    for index, entry in enumerate(entries):
+        values, row_errors = _validate_entry(entry, roster_ids, seen, max_score)
+        if row_errors:
+            errors.append({
+                'row': index,
+                'student_id': values['student_id'] if values else None,
+                'errors': row_errors,
+            })
+            continue
+        seen.add(values['student_id'])
+        cleaned.append(values)
+    
+    if errors or not cleaned:
+        return 0, errors
+    
+    grades = [
+        StudentGrade(
+            student_id=values['student_id'],
+            assessment_id=assessment.id,
+            score=values['score'],
+            is_absent=values['is_absent'],
+            comment=values['comment'],
+            is_active=True,
+            created_by=user,
+            updated_by=user
+        )
+        for values in cleaned
+    ]
+    
+    with transaction.atomic():
+        StudentGrade.objects.bulk_create(
+            grades,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['student', 'assessment'],
+            update_fields=['score', 'is_absent', 'comment', 'is_active', 'updated_by', 'updated_at']
+        )
+        recompute_subject_averages(
+            year_id=assessment.academic_year_id,
+            student_ids=list(seen),
+            subject_ids=[assessment.subject_id]
+        )
+        invalidate_assessment_statistics(assessment.id, assessment.class_section_id)
+    
+    return len(grades), errors
@@ -0,0 +1,343 @@
+"""
+Rendu PDF des bulletins.
+
+Ce module construit la mise en page d'un bulletin une seule fois par
+classe (en-tête, matières, positions du tableau), puis produit les PDF des
+élèves un par un : un PDF par élève, ou une archive ZIP écrite dans
+MEDIA_ROOT. Les données des bulletins de la classe sont chargées en une
+fois ; seul le PDF en cours de rendu est gardé en mémoire. Le tableau
+reprend les matières des cours de la classe.
+
+Le rendu utilise reportlab (pur Python, hors ligne). Les polices standard
+PDF et le logo sont chargés une fois par processus et réutilisés d'un
+document à l'autre.
+"""
+
+import os
+import zipfile
+from functools import lru_cache
+from io import BytesIO
+from django.conf import settings
+from django.utils.text import slugify
+from ..models import ReportCard
+from .utils import calculate_class_averages, calculate_student_subject_averages
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+
+FONT = 'Helvetica'
+FONT_BOLD = 'Helvetica-Bold'
+TEMPLATE_FORM = 'report_card_template'
+REPORT_CARDS_DIR = 'report_cards'
+
+
+@lru_cache(maxsize=8)
+def _load_image(path):
+    """Charge une image une fois par processus (None si absente)."""
+    if not path or not os.path.exists(path):
+        return None
+    return ImageReader(str(path))
+
+
+def _format_average(value):
+    """Formate une moyenne sur deux décimales ('-' si absente)."""
+    return f'{value:.2f}' if value is not None else '-'
+
+
+class ReportCardLayout:
+    """
+    Mise en page des bulletins d'une classe pour une période.
+    
+    Les éléments communs à tous les élèves (en-tête, libellés, lignes du
+    tableau des matières) sont calculés à la construction et dessinés dans
+    un gabarit PDF (form XObject) défini une fois par document et réutilisé
+    sur chaque page.
+    """
+    
+    def __init__(self, class_obj, academic_year, term, subjects):
+        """
+        Args:
+            class_obj: Instance du modèle Class (ou None si l'élève n'a pas de classe)
+            academic_year: Instance du modèle AcademicYear
+            term: Trimestre/Semestre
+            subjects: Matières affichées, dans l'ordre du tableau
+        """
+        if not REPORTLAB_AVAILABLE:
+            raise ImportError('reportlab is required to render report cards')
+        
+        self.width, self.height = A4
+        self.margin = 18 * mm
+        self.school_name = getattr(settings, 'REPORT_CARD_SCHOOL_NAME', 'School Manager')
+        self.logo = _load_image(getattr(settings, 'REPORT_CARD_LOGO', None))
+        self.title = f'Bulletin de notes - {term}'
+        class_name = class_obj.name if class_obj is not None else '-'
+        self.subtitle = f'Classe : {class_name}    Année scolaire : {academic_year.name}'
+        self.subjects = [(subject.id, subject.name, f'{subject.coefficient:g}') for subject in subjects]
+        
+        # Colonnes et lignes du tableau des matières
+        self.columns = (self.margin, self.width - self.margin - 60 * mm, self.width - self.margin - 30 * mm)
+        self.table_top = self.height - 62 * mm
+        available = self.table_top - 75 * mm
+        self.row_height = min(8 * mm, available / max(len(self.subjects) + 1, 1))
+        self.rows_y = [
+            self.table_top - (index + 2) * self.row_height + 2.5 * mm
+            for index in range(len(self.subjects))
+        ]
+        self.table_bottom = self.table_top - (len(self.subjects) + 1) * self.row_height
+        self.summary_y = self.table_bottom - 14 * mm
+    
+    def start_document(self, output):
+        """
+        Ouvre un document PDF et y définit le gabarit commun.
+        
+        Args:
+            output: Fichier ou objet binaire où écrire le PDF
+        
+        Returns:
+            Canvas: Document prêt à recevoir des pages
+        """
+        pdf = canvas.Canvas(output, pagesize=A4, pageCompression=1)
+        pdf.setTitle(self.title)
+        pdf.setAuthor(self.school_name)
+        pdf.beginForm(TEMPLATE_FORM)
+        self.draw_template(pdf)
+        pdf.endForm()
+        return pdf
+    
+    def draw_template(self, pdf):
+        """Dessine les éléments communs à tous les bulletins de la classe."""
+        top = self.height - self.margin
+        if self.logo is not None:
+            pdf.drawImage(self.logo, self.margin, top - 14 * mm, 14 * mm, 14 * mm, mask='auto')
+        pdf.setFont(FONT_BOLD, 14)
+        pdf.drawCentredString(self.width / 2, top - 6 * mm, self.school_name)
+        pdf.setFont(FONT_BOLD, 12)
+        pdf.drawCentredString(self.width / 2, top - 14 * mm, self.title)
+        pdf.setFont(FONT, 10)
+        pdf.drawCentredString(self.width / 2, top - 21 * mm, self.subtitle)
+        pdf.line(self.margin, top - 25 * mm, self.width - self.margin, top - 25 * mm)
+        
+        pdf.drawString(self.margin, self.height - 52 * mm, 'Élève :')
+        
+        # Tableau des matières
+        right = self.width - self.margin
+        pdf.setFillGray(0.9)
+        pdf.rect(self.margin, self.table_top - self.row_height, right - self.margin, self.row_height, stroke=0, fill=1)
+        pdf.setFillGray(0)
+        pdf.setFont(FONT_BOLD, 10)
+        header_y = self.table_top - self.row_height + 2.5 * mm
+        pdf.drawString(self.columns[0] + 2 * mm, header_y, 'Matière')
+        pdf.drawString(self.columns[1] + 2 * mm, header_y, 'Coefficient')
+        pdf.drawString(self.columns[2] + 2 * mm, header_y, 'Moyenne')
+        pdf.setFont(FONT, 10)
+        for (subject_id, name, coefficient), y in zip(self.subjects, self.rows_y):
+            pdf.drawString(self.columns[0] + 2 * mm, y, name)
+            pdf.drawString(self.columns[1] + 2 * mm, y, coefficient)
+        for index in range(len(self.subjects) + 2):
+            y = self.table_top - index * self.row_height
+            pdf.line(self.margin, y, right, y)
+        for x in self.columns + (right,):
+            pdf.line(x, self.table_top, x, self.table_bottom)
+        
+        pdf.setFont(FONT_BOLD, 10)
+        pdf.drawString(self.margin, self.summary_y, 'Moyenne générale :')
+        pdf.drawString(self.margin, self.summary_y - 7 * mm, 'Classement :')
+        pdf.drawString(self.margin, self.summary_y - 14 * mm, 'Appréciation :')
+    
+    def draw_student(self, pdf, report_card, subject_averages):
+        """
+        Ajoute une page de bulletin pour un élève.
+        
+        Args:
+            pdf: Document ouvert par start_document
+            report_card: Bulletin (student.profile préchargé)
+            subject_averages: Dictionnaire {subject_id: moyenne}
+        """
+        pdf.doForm(TEMPLATE_FORM)
+        pdf.setFont(FONT_BOLD, 11)
+        pdf.drawString(self.margin + 15 * mm, self.height - 52 * mm, report_card.student.profile.full_name)
+        
+        pdf.setFont(FONT, 10)
+        for (subject_id, name, coefficient), y in zip(self.subjects, self.rows_y):
+            pdf.drawRightString(self.columns[2] + 25 * mm, y, _format_average(subject_averages.get(subject_id)))
+        
+        pdf.drawString(self.margin + 40 * mm, self.summary_y, _format_average(report_card.overall_average))
+        rank = '-'
+        if report_card.rank:
+            rank = f'{report_card.rank} / {report_card.total_students}' if report_card.total_students else str(report_card.rank)
+        pdf.drawString(self.margin + 40 * mm, self.summary_y - 7 * mm, rank)
+        text = pdf.beginText(self.margin + 40 * mm, self.summary_y - 14 * mm)
+        text.setFont(FONT, 10)
+        for line in (report_card.comments or '-').splitlines()[:6]:
+            text.textLine(line)
+        pdf.drawText(text)
+        pdf.showPage()
+    
+    def render(self, report_card, subject_averages, output):
+        """
+        Écrit le PDF d'un seul bulletin.
+        
+        Args:
+            report_card: Bulletin (student.profile préchargé)
+            subject_averages: Dictionnaire {subject_id: moyenne}
+            output: Fichier ou objet binaire où écrire le PDF
+        """
+        pdf = self.start_document(output)
+        self.draw_student(pdf, report_card, subject_averages)
+        pdf.save()
+
+
+def get_class_subjects(class_id):
+    """
+    Retourne les matières actives enseignées dans une classe.
+    
+    Args:
+        class_id: ID de la classe
+    
+    Returns:
+        QuerySet: Matières des cours actifs de la classe, triées par nom
+    """
+    from app_academic.models import Course, Subject
+    
+    return Subject.objects.filter(
+        id__in=Course.objects.filter(class_section_id=class_id, is_active=True).values('subject_id'),
+        is_active=True
+    ).order_by('name')
+
+
+def load_class_report_cards(class_id, year_id, term):
+    """
+    Charge la mise en page et les données des bulletins d'une classe.
+    
+    Le nombre de requêtes ne dépend ni du nombre d'élèves ni du nombre de
+    matières.
+    
+    Args:
+        class_id: ID de la classe
+        year_id: ID de l'année scolaire
+        term: Trimestre/Semestre
+    
+    Returns:
+        tuple: (ReportCardLayout, liste de (bulletin, moyennes par matière))
+    """
+    from app_academic.models import AcademicYear, Class
+    
+    class_obj = Class.objects.get(id=class_id)
+    academic_year = AcademicYear.objects.get(id=year_id)
+    layout = ReportCardLayout(class_obj, academic_year, term, get_class_subjects(class_id))
+    
+    averages = calculate_class_averages(class_id, year_id)
+    report_cards = ReportCard.objects.filter(
+        student_id__in=averages.keys(),
+        academic_year_id=year_id,
+        term=term,
+        is_active=True
+    ).select_related('student__profile').order_by('student__profile__full_name', 'student_id')
+    
+    return layout, [
+        (report_card, averages[report_card.student_id]['subject_averages'])
+        for report_card in report_cards
+    ]
+
+
+def iter_class_report_card_pdfs(class_id, year_id, term):
+    """
+    Produit les PDF des bulletins d'une classe, un élève à la fois.
+    
+    Args:
+        class_id: ID de la classe
+        year_id: ID de l'année scolaire
+        term: Trimestre/Semestre
+    
+    Yields:
+        tuple: (bulletin, contenu PDF en bytes)
+    """
+    layout, entries = load_class_report_cards(class_id, year_id, term)
+    for report_card, subject_averages in entries:
+        buffer = BytesIO()
+        layout.render(report_card, subject_averages, buffer)
+        yield report_card, buffer.getvalue()
+
+
+def render_report_card_pdf(report_card):
+    """
+    Génère le PDF d'un bulletin isolé.
+    
+    Le tableau reprend les matières de la classe de l'élève, ou celles où
+    il a des notes s'il n'a pas de classe.
+    
+    Args:
+        report_card: Instance du modèle ReportCard
+    
+    Returns:
+        bytes: Contenu du PDF
+    """
+    from app_academic.models import Subject
+    
+    student = report_card.student
+    subject_averages = calculate_student_subject_averages(student.id, report_card.academic_year_id)
+    
+    if student.class_section_id is not None:
+        subjects = get_class_subjects(student.class_section_id)
+    else:
+        subjects = Subject.objects.filter(id__in=list(subject_averages), is_active=True).order_by('name')
+    layout = ReportCardLayout(student.class_section, report_card.academic_year, report_card.term, subjects)
+    buffer = BytesIO()
+    layout.render(report_card, subject_averages, buffer)
+    return buffer.getvalue()
+
+
+def get_report_cards_zip_path(class_obj, year_id, term):
+    """
+    Retourne le chemin, relatif à MEDIA_ROOT, de l'archive d'une classe.
+    
+    Args:
+        class_obj: Instance du modèle Class
+        year_id: ID de l'année scolaire
+        term: Trimestre/Semestre
+    
+    Returns:
+        str: Chemin relatif de l'archive ZIP
+    """
+    return os.path.join(REPORT_CARDS_DIR, str(year_id), slugify(term), f'{slugify(class_obj.code)}.zip')
+
+
+def write_class_report_cards_zip(class_id, year_id, term):
+    """
+    Écrit une archive ZIP des bulletins d'une classe dans MEDIA_ROOT.
+    
+    Chaque PDF est ajouté à l'archive dès qu'il est produit. L'archive est
+    écrite dans un fichier temporaire puis renommée : une relance remplace
+    l'archive précédente sans laisser de fichier partiel.
+    
+    Args:
+        class_id: ID de la classe
+        year_id: ID de l'année scolaire
+        term: Trimestre/Semestre
+    
+    Returns:
+        tuple: (chemin relatif à MEDIA_ROOT, nombre de bulletins)
+    """
+    from app_academic.models import Class
+    
+    relative_path = get_report_cards_zip_path(Class.objects.get(id=class_id), year_id, term)
+    path = os.path.join(settings.MEDIA_ROOT, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    count = 0
+    temporary_path = f'{path}.tmp'
+    with zipfile.ZipFile(temporary_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for report_card, content in iter_class_report_card_pdfs(class_id, year_id, term):
+            name = f'{slugify(report_card.student.profile.full_name)}-{report_card.student_id}.pdf'
+            archive.writestr(name, content)
+            count += 1
+    os.replace(temporary_path, path)
+    
+    return relative_path, count
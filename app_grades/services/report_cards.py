@@ -0,0 +1,165 @@
+"""
+Génération groupée des bulletins.
+
+Ce module calcule les moyennes générales de toute une classe en une fois,
+classe les élèves et écrit tous les bulletins d'une classe en un seul
+upsert. Une année scolaire complète est traitée classe par classe,
+éventuellement dans plusieurs processus.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import connections
+from ..models import ReportCard
+from .utils import calculate_class_averages
+
+
+RANKING_COMPETITION = 'competition'
+RANKING_DENSE = 'dense'
+RANKING_METHODS = (RANKING_COMPETITION, RANKING_DENSE)
+
+AVERAGE_PRECISION = Decimal('0.01')
+
+
+def rank_averages(averages, method=RANKING_COMPETITION):
+    """
+    Classe des moyennes par ordre décroissant, avec gestion des ex aequo.
+    
+    - competition : les ex aequo partagent un rang et les suivants sont
+      décalés (1, 2, 2, 4)
+    - dense : les ex aequo partagent un rang sans trou (1, 2, 2, 3)
+    
+    Args:
+        averages: Dictionnaire {clé: moyenne} ; les moyennes None ne sont pas classées
+        method: Méthode de classement (competition ou dense)
+    
+    Returns:
+        dict: {clé: rang} pour les moyennes renseignées
+    
+    Raises:
+        ValueError: Si la méthode de classement est inconnue
+    """
+    if method not in RANKING_METHODS:
+        raise ValueError(f"Unknown ranking method '{method}'")
+    
+    ordered = sorted(
+        ((key, average) for key, average in averages.items() if average is not None),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    
+    ranks = {}
+    rank = 0
+    previous = None
+    for position, (key, average) in enumerate(ordered, start=1):
+        if average != previous:
+            rank = position if method == RANKING_COMPETITION else rank + 1
+            previous = average
+        ranks[key] = rank
+    return ranks
+
+
+def generate_report_cards(class_id, year_id, term, ranking=RANKING_COMPETITION):
+    """
+    Génère les bulletins de tous les élèves actifs d'une classe.
+    
+    Les moyennes générales sont calculées pour toute la classe, arrondies au
+    centième (précision stockée) puis classées. Tous les bulletins sont
+    écrits en un seul upsert sur la clé (élève, année, période) : relancer
+    la génération met à jour les bulletins existants sans les dupliquer et
+    sans toucher aux commentaires.
+    
+    Args:
+        class_id: ID de la classe
+        year_id: ID de l'année scolaire
+        term: Trimestre/Semestre
+        ranking: Méthode de classement (competition ou dense)
+    
+    Returns:
+        int: Nombre de bulletins écrits
+    """
+    if ranking not in RANKING_METHODS:
+        raise ValueError(f"Unknown ranking method '{ranking}'")
+    
+    results = calculate_class_averages(class_id, year_id)
+    averages = {
+        student_id: (
+            result['overall_average'].quantize(AVERAGE_PRECISION, rounding=ROUND_HALF_UP)
+            if result['overall_average'] is not None else None
+        )
+        for student_id, result in results.items()
+    }
+    ranks = rank_averages(averages, ranking)
+    total_students = len(averages)
+    
+    report_cards = [
+        ReportCard(
+            student_id=student_id,
+            academic_year_id=year_id,
+            term=term,
+            overall_average=average,
+            rank=ranks.get(student_id),
+            total_students=total_students,
+            is_active=True
+        )
+        for student_id, average in averages.items()
+    ]
+    
+    ReportCard.objects.bulk_create(
+        report_cards,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['student', 'academic_year', 'term'],
+        update_fields=['overall_average', 'rank', 'total_students', 'is_active', 'updated_at']
+    )
+    return len(report_cards)
+
+
+def _generate_class_report_cards(arguments):
+    """Point d'entrée des processus de travail : une classe par appel."""
+    class_id, year_id, term, ranking = arguments
+    try:
+        return class_id, generate_report_cards(class_id, year_id, term, ranking)
+    finally:
+        connections.close_all()
+
+
+def generate_year_report_cards(year_id, term, ranking=RANKING_COMPETITION, class_ids=None, workers=1):
+    """
+    Génère les bulletins de toutes les classes actives d'une année scolaire.
+    
+    Chaque classe est traitée indépendamment ; avec workers > 1, les classes
+    sont réparties entre plusieurs processus, chacun avec sa propre
+    connexion à la base.
+    
+    Args:
+        year_id: ID de l'année scolaire
+        term: Trimestre/Semestre
+        ranking: Méthode de classement (competition ou dense)
+        class_ids: IDs des classes à traiter (None : toutes les classes actives de l'année)
+        workers: Nombre de processus de travail
+    
+    Returns:
+        dict: {class_id: nombre de bulletins écrits}
+    """
+    from app_academic.models import Class
+    
+    if ranking not in RANKING_METHODS:
+        raise ValueError(f"Unknown ranking method '{ranking}'")
+    
+    classes = Class.objects.filter(academic_year_id=year_id, is_active=True)
+    if class_ids is not None:
+        classes = classes.filter(id__in=class_ids)
+    class_ids = list(classes.values_list('id', flat=True))
+    
+    if workers <= 1 or len(class_ids) <= 1:
+        return {
+            class_id: generate_report_cards(class_id, year_id, term, ranking)
+            for class_id in class_ids
+        }
+    
+    # Les connexions ouvertes ne doivent pas être partagées avec les processus fils
+    connections.close_all()
+    arguments = [(class_id, year_id, term, ranking) for class_id in class_ids]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(_generate_class_report_cards, arguments))
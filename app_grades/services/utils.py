@@ -4,23 +4,50 @@ Utilitaires pour l'application app_grades.
 Ce module contient les fonctions utilitaires pour les calculs de notes et moyennes.
 """
 
+from collections import defaultdict
 from decimal import Decimal
 from django.db.models import Avg, Sum, Count, Q
-from ..models import StudentGrade, Assessment, ReportCard
+from ..models import GradeScale, StudentGrade, Assessment, ReportCard, SubjectAverage
 
 
-def calculate_student_average(student_id, subject_id, year_id=None):
+def uses_rollup(scale):
+    """
+    Indique si les moyennes d'un barème peuvent être lues dans la table de cumul.
+    
+    La table SubjectAverage suit la formule par défaut (notes brutes
+    pondérées par coefficient) ; les autres formules sont calculées par le
+    moteur de moyennes.
+    
+    Args:
+        scale: Instance de GradeScale ou None
+        
+    Returns:
+        bool: True si la formule est celle de la table de cumul
+    """
+    return scale is None or scale.averaging_method == GradeScale.AVERAGING_COEFFICIENT
+
+
+def calculate_student_average(student_id, subject_id, year_id=None, scale=None):
     """
     Calcule la moyenne d'un élève pour une matière.
     
+    Sans barème explicite, la formule est celle du barème rattaché à
+    l'année scolaire.
+    
     Args:
         student_id: ID de l'élève
         subject_id: ID de la matière
         year_id: ID de l'année scolaire (optionnel)
+        scale: Instance de GradeScale (optionnel)
         
     Returns:
         Decimal: Moyenne calculée ou None
     """
+    if scale is None and year_id:
+        scale = GradeScale.get_year_scale(year_id)
+    if not uses_rollup(scale):
+        from .averaging import calculate_subject_average
+        return calculate_subject_average(student_id, subject_id, year_id, scale)
     return StudentGrade.calculate_average(student_id, subject_id, year_id)
 
 
@@ -28,6 +55,9 @@ def calculate_class_average(class_id, assessment_id):
     """
     Calcule la moyenne de classe pour une évaluation.
     
+    Toutes les notes d'une évaluation ont le même coefficient : la moyenne
+    pondérée est la moyenne simple, calculée par la base.
+    
     Args:
         class_id: ID de la classe
         assessment_id: ID de l'évaluation
@@ -35,55 +65,100 @@ def calculate_class_average(class_id, assessment_id):
     Returns:
         Decimal: Moyenne de classe ou None
     """
-    grades = StudentGrade.objects.filter(
+    return StudentGrade.objects.filter(
         assessment_id=assessment_id,
         student__class_section_id=class_id,
         is_active=True,
         is_absent=False,
         score__isnull=False
-    )
+    ).aggregate(average=Avg('score'))['average']
+
+
+def calculate_overall_average(student_id, year_id):
+    """
+    Calcule la moyenne générale d'un élève pour une année scolaire.
     
-    if not grades.exists():
-        return None
+    Les moyennes par matière sont lues en une requête dans la table de
+    cumul SubjectAverage, ou calculées selon la formule du barème de l'année.
     
-    # Calculer la moyenne pondérée
-    total_score = Decimal('0')
-    total_coefficient = Decimal('0')
-    
-    for grade in grades:
-        coefficient = grade.assessment.coefficient
-        total_score += grade.score * coefficient
-        total_coefficient += coefficient
+    Args:
+        student_id: ID de l'élève
+        year_id: ID de l'année scolaire
+        
+    Returns:
+        Decimal: Moyenne générale ou None
+    """
+    rows = [row[2:] for row in student_subject_rows(student_id, year_id)]
+    return compute_overall_average(rows)
+
+
+def student_subject_rows(student_id, year_id):
+    """
+    Récupère les cumuls par matière d'un élève pour une année scolaire.
     
-    if total_coefficient == 0:
-        return None
+    Args:
+        student_id: ID de l'élève
+        year_id: ID de l'année scolaire
+        
+    Returns:
+        list: Tuples (student_id, subject_id, somme pondérée, somme des
+        poids, coefficient de la matière)
+    """
+    scale = GradeScale.get_year_scale(year_id)
+    if not uses_rollup(scale):
+        from .averaging import subject_average_rows
+        return subject_average_rows(
+            StudentGrade.objects.filter(student_id=student_id, assessment__academic_year_id=year_id),
+            scale
+        )
     
-    return total_score / total_coefficient
+    return list(SubjectAverage.objects.filter(
+        student_id=student_id,
+        academic_year_id=year_id,
+        subject__is_active=True,
+        grade_count__gt=0
+    ).order_by('subject_id').values_list(
+        'student_id', 'subject_id', 'weighted_sum', 'coefficient_sum', 'subject__coefficient'
+    ))
 
 
-def calculate_overall_average(student_id, year_id):
+def calculate_student_subject_averages(student_id, year_id):
     """
-    Calcule la moyenne générale d'un élève pour une année scolaire.
+    Calcule les moyennes par matière d'un élève pour une année scolaire.
     
     Args:
         student_id: ID de l'élève
         year_id: ID de l'année scolaire
         
     Returns:
-        Decimal: Moyenne générale ou None
+        dict: {subject_id: Decimal} pour les matières notées
+    """
+    return {
+        subject_id: weighted_sum / weight_sum
+        for _, subject_id, weighted_sum, weight_sum, _ in student_subject_rows(student_id, year_id)
+        if weight_sum
+    }
+
+
+def compute_overall_average(rows):
     """
-    from app_academic.models import Subject
+    Calcule une moyenne générale à partir des cumuls par matière.
     
-    subjects = Subject.objects.filter(is_active=True)
+    Args:
+        rows: Itérable de tuples (somme pondérée, somme des coefficients,
+            coefficient de la matière)
+    
+    Returns:
+        Decimal: Moyenne générale ou None
+    """
     averages = []
     total_coefficient = Decimal('0')
     
-    for subject in subjects:
-        avg = calculate_student_average(student_id, subject.id, year_id)
-        if avg is not None:
-            coefficient = subject.coefficient
-            averages.append(avg * coefficient)
-            total_coefficient += coefficient
+    for weighted_sum, coefficient_sum, coefficient in rows:
+        if coefficient_sum == 0:
+            continue
+        averages.append(weighted_sum / coefficient_sum * coefficient)
+        total_coefficient += coefficient
     
     if not averages or total_coefficient == 0:
         return None
@@ -92,6 +167,63 @@ def calculate_overall_average(student_id, year_id):
     return total_score / total_coefficient
 
 
+def calculate_class_averages(class_id, year_id):
+    """
+    Calcule les moyennes par matière et générales de tous les élèves d'une classe.
+    
+    Les cumuls par matière de la classe sont lus en une seule requête et
+    regroupés par élève en mémoire : le coût ne dépend plus du nombre
+    d'élèves ni du nombre de matières. Si le barème de l'année utilise une
+    autre formule que celle de la table de cumul, ils sont calculés par le
+    moteur de moyennes, toujours en une requête. Les résultats sont
+    identiques à calculate_student_average et calculate_overall_average.
+    
+    Args:
+        class_id: ID de la classe
+        year_id: ID de l'année scolaire
+    
+    Returns:
+        dict: {student_id: {'subject_averages': {subject_id: Decimal},
+        'overall_average': Decimal ou None}} pour chaque élève actif
+    """
+    from app_profile.models import Student
+    
+    results = {
+        student_id: {'subject_averages': {}, 'overall_average': None}
+        for student_id in Student.objects.filter(
+            class_section_id=class_id,
+            is_active=True
+        ).values_list('id', flat=True)
+    }
+    
+    scale = GradeScale.get_year_scale(year_id)
+    if uses_rollup(scale):
+        rows = SubjectAverage.objects.filter(
+            student__class_section_id=class_id,
+            student__is_active=True,
+            academic_year_id=year_id,
+            subject__is_active=True,
+            grade_count__gt=0
+        ).order_by('student_id', 'subject_id').values_list(
+            'student_id', 'subject_id', 'weighted_sum', 'coefficient_sum', 'subject__coefficient'
+        )
+    else:
+        from .averaging import class_grades, subject_average_rows
+        rows = subject_average_rows(class_grades(class_id, year_id), scale)
+    
+    subject_rows = defaultdict(list)
+    for student_id, subject_id, weighted_sum, coefficient_sum, coefficient in rows:
+        if coefficient_sum == 0:
+            continue
+        results[student_id]['subject_averages'][subject_id] = weighted_sum / coefficient_sum
+        subject_rows[student_id].append((weighted_sum, coefficient_sum, coefficient))
+    
+    for student_id, student_rows in subject_rows.items():
+        results[student_id]['overall_average'] = compute_overall_average(student_rows)
+    
+    return results
+
+
 def generate_report_card_pdf(report_card_id):
     """
     Génère un PDF pour un bulletin de notes.
@@ -102,7 +234,16 @@ def generate_report_card_pdf(report_card_id):
     Returns:
         bytes: Contenu du PDF ou None
     """
-    # TODO: Implémenter la génération de PDF
-    # Utiliser reportlab ou weasyprint
-    return None
+    from .report_card_pdf import REPORTLAB_AVAILABLE, render_report_card_pdf
 
+    if not REPORTLAB_AVAILABLE:
+        return None
+    
+    report_card = ReportCard.objects.filter(
+        id=report_card_id,
+        is_active=True
+    ).select_related('student__profile', 'student__class_section', 'academic_year').first()
+    if report_card is None:
+        return None
+    
+    return render_report_card_pdf(report_card)
@@ -0,0 +1,95 @@
+"""
+Signals pour l'application app_grades.
+
+Ce module tient à jour la table de cumul SubjectAverage à chaque création,
+modification, désactivation ou suppression d'une note, et lorsque le
+coefficient, la matière ou l'année d'une évaluation change. Il invalide
+aussi les statistiques en cache des évaluations concernées.
+
+Les signaux s'exécutent dans la transaction de l'écriture : les vues de
+saisie, le service grade_entry et l'admin écrivent les notes dans
+transaction.atomic(), de sorte qu'une note et son cumul sont validés ou
+annulés ensemble. Les écritures qui contournent les signaux (update(),
+requêtes SQL) se rattrapent avec la commande recompute_subject_averages.
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Assessment, StudentGrade
+from .services.analytics import invalidate_assessment_statistics
+from .services.averages import (
+    apply_grade_change, get_grade_state, get_stored_grade_state, recompute_subject_averages,
+    to_decimal
+)
+
+
+@receiver(pre_save, sender=StudentGrade)
+def store_previous_grade_state(sender, instance, raw=False, **kwargs):
+    """Mémorise l'apport de la note avant sa modification."""
+    if raw:
+        return
+    instance._subject_average_previous = get_stored_grade_state(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=StudentGrade)
+def update_subject_average_on_save(sender, instance, raw=False, **kwargs):
+    """Reporte l'écart entre l'ancien et le nouvel apport de la note."""
+    if raw:
+        return
+    previous = getattr(instance, '_subject_average_previous', None)
+    apply_grade_change(previous, get_grade_state(instance))
+    instance._subject_average_previous = None
+    invalidate_assessment_statistics(instance.assessment_id, instance.assessment.class_section_id)
+
+
+@receiver(post_delete, sender=StudentGrade)
+def update_subject_average_on_delete(sender, instance, **kwargs):
+    """Retire l'apport d'une note supprimée."""
+    try:
+        previous = get_grade_state(instance)
+    except Assessment.DoesNotExist:
+        # Évaluation déjà supprimée : le cumul sera recalculé par la commande
+        return
+    apply_grade_change(previous, None)
+    invalidate_assessment_statistics(instance.assessment_id, instance.assessment.class_section_id)
+
+
+@receiver(pre_save, sender=Assessment)
+def store_previous_assessment_state(sender, instance, raw=False, **kwargs):
+    """Mémorise la matière, l'année, le coefficient et la classe avant modification."""
+    if raw or not instance.pk:
+        instance._subject_average_previous = None
+        return
+    instance._subject_average_previous = Assessment.objects.filter(pk=instance.pk).values_list(
+        'subject_id', 'academic_year_id', 'coefficient', 'class_section_id'
+    ).first()
+
+
+@receiver(post_save, sender=Assessment)
+def update_subject_averages_on_assessment_change(sender, instance, created, raw=False, **kwargs):
+    """
+    Recalcule les cumuls des élèves notés lorsque le coefficient, la matière
+    ou l'année de l'évaluation change, et invalide ses statistiques.
+    """
+    previous = getattr(instance, '_subject_average_previous', None)
+    instance._subject_average_previous = None
+    if raw or created or previous is None:
+        return
+    
+    subject_id, year_id, coefficient, class_id = previous
+    invalidate_assessment_statistics(instance.pk, instance.class_section_id)
+    if class_id != instance.class_section_id:
+        invalidate_assessment_statistics(instance.pk, class_id)
+    current = (instance.subject_id, instance.academic_year_id, to_decimal(instance.coefficient))
+    if (subject_id, year_id, coefficient) == current:
+        return
+    
+    student_ids = list(instance.grades.values_list('student_id', flat=True))
+    if not student_ids:
+        return
+    for recompute_year_id in {year_id, instance.academic_year_id}:
+        recompute_subject_averages(
+            year_id=recompute_year_id,
+            student_ids=student_ids,
+            subject_ids={subject_id, instance.subject_id}
+        )
@@ -0,0 +1,146 @@
+"""
+Tâches Celery pour l'application app_grades.
+
+Ce module répartit la génération des bulletins d'une année scolaire en une
+tâche par classe. Chaque tâche réécrit les bulletins de sa classe par un
+upsert : elle peut être relancée après l'arrêt d'un worker sans créer de
+doublon. L'avancement est suivi dans django_celery_results.
+
+Il contient aussi l'export des bulletins PDF d'une classe en archive ZIP.
+"""
+
+import json
+from celery import group, shared_task
+from celery.result import GroupResult
+from django.db import DatabaseError
+from .services.report_cards import RANKING_COMPETITION, generate_report_cards
+
+
+@shared_task(
+    name='app_grades.generate_class_report_cards',
+    acks_late=True,
+    autoretry_for=(DatabaseError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def generate_class_report_cards(class_id, year_id, term, ranking=RANKING_COMPETITION):
+    """
+    Génère les bulletins classés d'une classe.
+
+    La tâche n'est acquittée qu'une fois terminée : si le worker s'arrête,
+    elle est redistribuée et réécrit les mêmes bulletins.
+
+    Args:
+        class_id (int): ID de la classe
+        year_id (int): ID de l'année scolaire
+        term (str): Trimestre/Semestre
+        ranking (str): Méthode de classement (competition ou dense)
+
+    Returns:
+        dict: ID de la classe et nombre de bulletins écrits
+    """
+    written = generate_report_cards(class_id, year_id, term, ranking)
+    return {'class_id': class_id, 'written': written}
+
+
+@shared_task(
+    name='app_grades.export_class_report_cards',
+    acks_late=True,
+    autoretry_for=(DatabaseError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def export_class_report_cards(class_id, year_id, term):
+    """
+    Écrit l'archive ZIP des bulletins PDF d'une classe dans MEDIA_ROOT.
+
+    L'archive est remplacée à chaque exécution : la tâche peut être relancée.
+
+    Args:
+        class_id (int): ID de la classe
+        year_id (int): ID de l'année scolaire
+        term (str): Trimestre/Semestre
+
+    Returns:
+        dict: ID de la classe, chemin de l'archive relatif à MEDIA_ROOT et nombre de bulletins
+    """
+    from .services.report_card_pdf import write_class_report_cards_zip
+
+    path, count = write_class_report_cards_zip(class_id, year_id, term)
+    return {'class_id': class_id, 'path': path, 'count': count}
+
+
+def start_report_card_run(year_id, term, ranking=RANKING_COMPETITION, class_ids=None):
+    """
+    Lance la génération des bulletins d'une année, une tâche par classe.
+
+    Le groupe de tâches est enregistré dans django_celery_results pour que
+    son avancement puisse être suivi avec get_report_card_run_status.
+
+    Args:
+        year_id (int): ID de l'année scolaire
+        term (str): Trimestre/Semestre
+        ranking (str): Méthode de classement (competition ou dense)
+        class_ids (list): IDs des classes à traiter (None : toutes les classes actives de l'année)
+
+    Returns:
+        str: Identifiant du groupe de tâches
+    """
+    from app_academic.models import Class
+
+    classes = Class.objects.filter(academic_year_id=year_id, is_active=True)
+    if class_ids is not None:
+        classes = classes.filter(id__in=class_ids)
+
+    run = group(
+        generate_class_report_cards.s(class_id, year_id, term, ranking)
+        for class_id in classes.values_list('id', flat=True)
+    ).apply_async()
+    run.save()
+    return run.id
+
+
+def get_report_card_run_status(group_id):
+    """
+    Calcule l'avancement global d'une génération de bulletins.
+
+    Les états des tâches du groupe sont lus en une seule requête dans
+    django_celery_results.
+
+    Args:
+        group_id (str): Identifiant du groupe de tâches
+
+    Returns:
+        dict: Compteurs d'avancement, ou None si le groupe est inconnu
+    """
+    from django_celery_results.models import TaskResult
+
+    run = GroupResult.restore(group_id, app=generate_class_report_cards.app)
+    if run is None:
+        return None
+
+    task_ids = [result.id for result in run.results]
+    rows = TaskResult.objects.filter(task_id__in=task_ids).values_list('status', 'result')
+
+    completed = failed = running = written = 0
+    for status, result in rows:
+        if status == 'SUCCESS':
+            completed += 1
+            written += (json.loads(result) or {}).get('written', 0) if result else 0
+        elif status == 'FAILURE':
+            failed += 1
+        elif status in ('STARTED', 'RETRY'):
+            running += 1
+
+    total = len(task_ids)
+    return {
+        'group_id': group_id,
+        'total': total,
+        'completed': completed,
+        'failed': failed,
+        'running': running,
+        'pending': total - completed - failed - running,
+        'written': written,
+        'progress': round(completed * 100 / total) if total else 100,
+        'ready': completed + failed == total,
+    }
@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour les statistiques des évaluations.
+
+Ce module vérifie les indicateurs calculés par la base (moyenne, médiane,
+écart type, taux de réussite, histogramme), la mise en cache et son
+invalidation lors d'une modification de note.
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from decimal import Decimal
+from app_config.permissions import assign_permission
+from app_config.models import Permission
+from .models import GradeScale, StudentGrade
+from .services.analytics import get_assessment_statistics, get_class_statistics
+from .services.utils import calculate_class_average
+from .tests_report_cards import ReportCardTestBase
+
+
+class AssessmentStatisticsTestCase(ReportCardTestBase):
+    """Tests pour les statistiques d'une évaluation et d'une classe."""
+    
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.scale = GradeScale.objects.create(
+            name='0-20', min_score=Decimal('0'), max_score=Decimal('20.00'), passing_score=Decimal('10.00')
+        )
+    
+    def test_statistics(self):
+        """Test les indicateurs d'une évaluation notée 12, 14, 9.5 et 14."""
+        with self.assertNumQueries(1):
+            statistics = get_assessment_statistics(self.assessment.id, self.scale, bins=4)
+        
+        self.assertEqual(statistics['count'], 4)
+        self.assertEqual(statistics['mean'], Decimal('12.38'))
+        self.assertEqual(statistics['median'], Decimal('13.00'))
+        self.assertEqual(statistics['std_dev'], Decimal('1.85'))
+        self.assertEqual((statistics['min'], statistics['max']), (Decimal('9.50'), Decimal('14.00')))
+        self.assertEqual(statistics['pass_rate'], Decimal('75.00'))
+        self.assertEqual([bucket['count'] for bucket in statistics['histogram']], [0, 1, 3, 0])
+        self.assertEqual(statistics['histogram'][3]['start'], Decimal('15.00'))
+        
+        self.assertIsNone(get_assessment_statistics(self.assessment.id)['pass_rate'])
+        with self.assertRaises(ValueError):
+            get_assessment_statistics(self.assessment.id, bins=0)
+    
+    def test_cache_invalidated_by_grade_change(self):
+        """Test que le cache est réutilisé jusqu'à la modification d'une note."""
+        get_assessment_statistics(self.assessment.id, self.scale)
+        with self.assertNumQueries(0):
+            get_assessment_statistics(self.assessment.id, self.scale)
+        
+        self.create_student('top', self.class_section, '20.00')
+        
+        statistics = get_assessment_statistics(self.assessment.id, self.scale, bins=4)
+        self.assertEqual(statistics['count'], 5)
+        self.assertEqual(statistics['median'], Decimal('14.00'))
+        self.assertEqual(statistics['histogram'][3]['count'], 1)
+        
+        StudentGrade.objects.filter(score=Decimal('20.00')).get().delete()
+        self.assertEqual(get_assessment_statistics(self.assessment.id, self.scale)['count'], 4)
+    
+    def test_class_statistics(self):
+        """Test les statistiques de toutes les évaluations d'une classe en une requête."""
+        other = self.create_assessment(self.class_section)
+        StudentGrade.objects.create(student=self.students[0], assessment=other, score=Decimal('8.00'))
+        
+        with self.assertNumQueries(1):
+            statistics = get_class_statistics(self.class_section.id, self.academic_year.id, self.scale)
+        
+        self.assertEqual(set(statistics), {self.assessment.id, other.id})
+        self.assertEqual(statistics[other.id]['median'], Decimal('8.00'))
+        self.assertEqual(statistics[other.id]['pass_rate'], Decimal('0.00'))
+        self.assertEqual(calculate_class_average(self.class_section.id, self.assessment.id), Decimal('12.375'))
+    
+    def test_endpoints(self):
+        """Test les vues JSON des statistiques."""
+        user = User.objects.create_user(username='teacher', password='testpass123')
+        self.client.force_login(user)
+        url = reverse('app_grades:assessment_statistics', kwargs={'pk': self.assessment.id})
+        
+        self.assertEqual(self.client.get(url).status_code, 403)
+        
+        Permission.objects.create(name='view_assessment', codename='view_assessment', resource='app_grades', action='view')
+        assign_permission(user.profile, 'view_assessment')
+        
+        response = self.client.get(url, {'scale': self.scale.id, 'bins': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['statistics']['pass_rate'], '75.00')
+        self.assertEqual(self.client.get(url, {'bins': 50}).status_code, 400)
+        
+        response = self.client.get(reverse('app_grades:class_statistics', kwargs={'class_id': self.class_section.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['assessments']), 1)
@@ -0,0 +1,233 @@
+"""
+Tests unitaires pour la table de cumul SubjectAverage.
+
+Ce module vérifie que les cumuls par matière suivent les modifications des
+notes et des évaluations, et restent identiques à un recalcul complet.
+"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.urls import reverse
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from .models import Assessment, StudentGrade, GradeCategory, SubjectAverage
+from .services.averages import recompute_subject_averages
+from app_academic.models import AcademicYear, Grade, Class, Subject
+from app_config.models import Permission
+from app_config.permissions import assign_permission
+from app_profile.models import Profile, Student
+
+
+def raw_average(student, subject, year):
+    """Moyenne recalculée depuis les notes, comme avant la table de cumul."""
+    total_score = Decimal('0')
+    total_coefficient = Decimal('0')
+    for grade in StudentGrade.objects.filter(
+        student=student,
+        assessment__subject=subject,
+        assessment__academic_year=year,
+        is_active=True,
+        is_absent=False,
+        score__isnull=False
+    ).select_related('assessment'):
+        total_score += grade.score * grade.assessment.coefficient
+        total_coefficient += grade.assessment.coefficient
+    if total_coefficient == 0:
+        return None
+    return total_score / total_coefficient
+
+
+class SubjectAverageTestCase(TestCase):
+    """Tests pour la maintenance incrémentale de SubjectAverage."""
+    
+    def setUp(self):
+        """Préparation des données de test."""
+        self.academic_year = AcademicYear.objects.create(
+            name='2024-2025',
+            start_date=date(2024, 9, 1),
+            end_date=date(2025, 6, 30),
+            is_current=True,
+            is_active=True
+        )
+        self.grade = Grade.objects.create(name='6ème', code='6EME', order=6, is_active=True)
+        self.class_section = Class.objects.create(
+            name='6ème A',
+            code='6A-2024',
+            grade=self.grade,
+            academic_year=self.academic_year,
+            capacity=30,
+            is_active=True
+        )
+        self.category = GradeCategory.objects.create(
+            name='Contrôle',
+            code='CTRL',
+            weight=Decimal('1.0'),
+            is_active=True
+        )
+        self.math = Subject.objects.create(name='Mathématiques', code='MATH', coefficient=Decimal('3.0'))
+        self.french = Subject.objects.create(name='Français', code='FR', coefficient=Decimal('2.0'))
+        
+        user = User.objects.create_user(username='student1', password='testpass123')
+        profile = Profile.objects.get(user=user)
+        profile.full_name = 'Student 1'
+        profile.save()
+        self.student = Student.objects.create(
+            profile=profile,
+            class_section=self.class_section,
+            academic_year=self.academic_year,
+            is_active=True
+        )
+        
+        self.assessment1 = self.create_assessment(self.math, '1.5')
+        self.assessment2 = self.create_assessment(self.math, '2.0')
+    
+    def create_assessment(self, subject, coefficient):
+        """Crée une évaluation de la classe de test."""
+        return Assessment.objects.create(
+            name=f'Contrôle {subject.code}',
+            subject=subject,
+            class_section=self.class_section,
+            category=self.category,
+            date=date(2024, 10, 1),
+            coefficient=Decimal(coefficient),
+            max_score=Decimal('20.00'),
+            academic_year=self.academic_year
+        )
+    
+    def assertMatchesRaw(self, subject=None):
+        """Vérifie que le cumul correspond au recalcul depuis les notes."""
+        subject = subject or self.math
+        self.assertEqual(
+            StudentGrade.calculate_average(self.student.id, subject.id, self.academic_year.id),
+            raw_average(self.student, subject, self.academic_year)
+        )
+    
+    def get_row(self, subject=None):
+        """Retourne la ligne de cumul de l'élève de test."""
+        return SubjectAverage.objects.get(
+            student=self.student,
+            subject=subject or self.math,
+            academic_year=self.academic_year
+        )
+    
+    def test_grade_lifecycle(self):
+        """Test création, modification, absence, désactivation et suppression."""
+        grade = StudentGrade.objects.create(
+            student=self.student, assessment=self.assessment1, score=Decimal('13.33')
+        )
+        StudentGrade.objects.create(
+            student=self.student, assessment=self.assessment2, score=Decimal('16.00')
+        )
+        row = self.get_row()
+        self.assertEqual(row.grade_count, 2)
+        self.assertEqual(row.coefficient_sum, Decimal('3.50'))
+        self.assertEqual(row.weighted_sum, Decimal('51.9950'))
+        self.assertMatchesRaw()
+        
+        grade.score = Decimal('9.00')
+        grade.save()
+        self.assertMatchesRaw()
+        
+        grade.is_absent = True
+        grade.save()
+        self.assertEqual(self.get_row().grade_count, 1)
+        self.assertMatchesRaw()
+        
+        grade.is_absent = False
+        grade.is_active = False
+        grade.save()
+        self.assertMatchesRaw()
+        
+        grade.is_active = True
+        grade.save()
+        self.assertEqual(self.get_row().grade_count, 2)
+        
+        grade.delete()
+        self.assertEqual(self.get_row().grade_count, 1)
+        self.assertEqual(
+            StudentGrade.calculate_average(self.student.id, self.math.id, self.academic_year.id),
+            Decimal('16.00')
+        )
+    
+    def test_grade_moved_to_other_assessment(self):
+        """Test qu'une note déplacée vers une autre matière change de cumul."""
+        grade = StudentGrade.objects.create(
+            student=self.student, assessment=self.assessment1, score=Decimal('12.00')
+        )
+        grade.assessment = self.create_assessment(self.french, '1.0')
+        grade.save()
+        
+        self.assertEqual(self.get_row().grade_count, 0)
+        self.assertIsNone(StudentGrade.calculate_average(self.student.id, self.math.id, self.academic_year.id))
+        self.assertMatchesRaw(self.french)
+    
+    def test_assessment_coefficient_change(self):
+        """Test que le changement de coefficient d'une évaluation met à jour les cumuls."""
+        StudentGrade.objects.create(student=self.student, assessment=self.assessment1, score=Decimal('10.00'))
+        StudentGrade.objects.create(student=self.student, assessment=self.assessment2, score=Decimal('16.00'))
+        
+        self.assessment1.coefficient = Decimal('4.0')
+        self.assessment1.save()
+        self.assertEqual(self.get_row().coefficient_sum, Decimal('6.00'))
+        self.assertMatchesRaw()
+        
+        self.assessment2.subject = self.french
+        self.assessment2.save()
+        self.assertMatchesRaw()
+        self.assertMatchesRaw(self.french)
+    
+    def test_calculate_average_is_single_query(self):
+        """Test que la moyenne est lue sans parcourir les notes."""
+        for assessment in (self.assessment1, self.assessment2):
+            StudentGrade.objects.create(student=self.student, assessment=assessment, score=Decimal('14.00'))
+        
+        with self.assertNumQueries(1):
+            StudentGrade.calculate_average(self.student.id, self.math.id, self.academic_year.id)
+    
+    def test_view_rolls_back_grade_if_rollup_fails(self):
+        """Test que la note et son cumul sont écrits dans la même transaction."""
+        grade = StudentGrade.objects.create(student=self.student, assessment=self.assessment1, score=Decimal('12.00'))
+        user = User.objects.create_user(username='teacher', password='testpass123')
+        Permission.objects.create(name='edit_grade', codename='edit_grade', resource='app_grades', action='edit')
+        assign_permission(user.profile, 'edit_grade')
+        self.client.force_login(user)
+        
+        with mock.patch('app_grades.signals.apply_grade_change', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post(reverse('app_grades:student_grade_update', kwargs={'pk': grade.pk}), {
+                    'student': self.student.pk, 'assessment': self.assessment1.pk,
+                    'score': '18.00', 'is_active': 'on'
+                })
+        
+        grade.refresh_from_db()
+        self.assertEqual(grade.score, Decimal('12.00'))
+        self.assertMatchesRaw()
+    
+    def test_recompute_command(self):
+        """Test que la commande reconstruit les cumuls et supprime les lignes obsolètes."""
+        StudentGrade.objects.create(student=self.student, assessment=self.assessment1, score=Decimal('11.00'))
+        StudentGrade.objects.create(student=self.student, assessment=self.assessment2, score=Decimal('17.50'))
+        expected = self.get_row()
+        
+        # Modifications qui contournent les signaux
+        SubjectAverage.objects.all().delete()
+        SubjectAverage.objects.create(
+            student=self.student, subject=self.french, academic_year=self.academic_year,
+            weighted_sum=Decimal('10'), coefficient_sum=Decimal('1'), grade_count=1
+        )
+        
+        out = StringIO()
+        call_command('recompute_subject_averages', stdout=out)
+        
+        self.assertIn('1 subject average row(s) written', out.getvalue())
+        row = self.get_row()
+        self.assertEqual(
+            (row.weighted_sum, row.coefficient_sum, row.grade_count),
+            (expected.weighted_sum, expected.coefficient_sum, expected.grade_count)
+        )
+        self.assertFalse(SubjectAverage.objects.filter(subject=self.french).exists())
+        self.assertEqual(recompute_subject_averages(year_id=self.academic_year.id), 1)
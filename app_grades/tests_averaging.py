@@ -0,0 +1,146 @@
+"""
+Tests unitaires pour le moteur de calcul des moyennes.
+
+Ce module vérifie les formules par barème (notes brutes, notes ramenées au
+barème, pondération par catégorie), le calcul en une requête pour une
+classe, l'utilisation du barème de l'année pour les bulletins et
+l'enregistrement de stratégies personnalisées.
+"""
+
+from django.contrib.admin.sites import site
+from django.db.models import FloatField, Value
+from decimal import Decimal
+from .models import Assessment, GradeCategory, GradeScale, ReportCard, StudentGrade
+from .services.averaging import (
+    AVERAGING_STRATEGIES, AveragingStrategy, register_strategy, get_strategy,
+    calculate_subject_average, calculate_class_subject_averages
+)
+from .services.report_cards import generate_report_cards
+from .services.utils import (
+    calculate_class_averages, calculate_overall_average, calculate_student_average,
+    calculate_student_subject_averages
+)
+from .tests_report_cards import ReportCardTestBase
+
+
+class AveragingEngineTestCase(ReportCardTestBase):
+    """Tests pour les formules de moyenne par barème."""
+    
+    def setUp(self):
+        super().setUp()
+        self.exam = GradeCategory.objects.create(name='Examen', code='EXAM', weight=Decimal('2.0'))
+        exam_assessment = Assessment.objects.create(
+            name='Examen', subject=self.subject, class_section=self.class_section,
+            category=self.exam, date=self.assessment.date,
+            max_score=Decimal('60.00'), academic_year=self.academic_year
+        )
+        # 12/20 au contrôle (poids 1) et 45/60 à l'examen (poids 2)
+        StudentGrade.objects.create(student=self.students[0], assessment=exam_assessment, score=Decimal('45.00'))
+        self.student = self.students[0]
+    
+    def create_scale(self, name, method, academic_year=None):
+        """Crée un barème sur 20 avec la formule demandée."""
+        return GradeScale.objects.create(
+            name=name, min_score=Decimal('0'), max_score=Decimal('20.00'),
+            passing_score=Decimal('10.00'), averaging_method=method,
+            academic_year=academic_year
+        )
+    
+    def average(self, scale=None):
+        """Moyenne de l'élève de test en mathématiques, arrondie au centième."""
+        average = calculate_subject_average(self.student.id, self.subject.id, self.academic_year.id, scale)
+        return average.quantize(Decimal('0.01'))
+    
+    def test_formulas(self):
+        """Test les trois formules fournies."""
+        self.assertEqual(self.average(), Decimal('28.50'))
+        self.assertEqual(self.average(self.create_scale('brut', GradeScale.AVERAGING_COEFFICIENT)), Decimal('28.50'))
+        self.assertEqual(self.average(self.create_scale('normalisé', GradeScale.AVERAGING_NORMALIZED)), Decimal('13.50'))
+        self.assertEqual(self.average(self.create_scale('pondéré', GradeScale.AVERAGING_WEIGHTED)), Decimal('14.00'))
+    
+    def test_default_formula_matches_rollup(self):
+        """Test que la formule par défaut correspond à la table de cumul."""
+        self.assertEqual(
+            self.average(),
+            StudentGrade.calculate_average(self.student.id, self.subject.id, self.academic_year.id)
+        )
+        scale = self.create_scale('pondéré', GradeScale.AVERAGING_WEIGHTED)
+        self.assertEqual(
+            calculate_student_average(self.student.id, self.subject.id, self.academic_year.id, scale).quantize(Decimal('0.01')),
+            Decimal('14.00')
+        )
+    
+    def test_class_averages_in_one_query(self):
+        """Test les moyennes d'une classe en une seule requête."""
+        scale = self.create_scale('normalisé', GradeScale.AVERAGING_NORMALIZED)
+        
+        with self.assertNumQueries(1):
+            averages = calculate_class_subject_averages(self.class_section.id, self.academic_year.id, scale)
+        
+        self.assertEqual(len(averages), 4)
+        self.assertEqual(averages[self.student.id][self.subject.id].quantize(Decimal('0.01')), Decimal('13.50'))
+        self.assertEqual(averages[self.students[2].id][self.subject.id].quantize(Decimal('0.01')), Decimal('9.50'))
+        self.assertNotIn(self.students[4].id, averages)
+    
+    def test_year_scale(self):
+        """Test que les moyennes de l'année suivent le barème qui lui est rattaché."""
+        self.assertEqual(calculate_overall_average(self.student.id, self.academic_year.id), Decimal('28.50'))
+        
+        self.create_scale('pondéré', GradeScale.AVERAGING_WEIGHTED, self.academic_year)
+        
+        self.assertEqual(
+            calculate_student_average(self.student.id, self.subject.id, self.academic_year.id).quantize(Decimal('0.01')),
+            Decimal('14.00')
+        )
+        self.assertEqual(
+            calculate_student_subject_averages(self.student.id, self.academic_year.id)[self.subject.id].quantize(Decimal('0.01')),
+            Decimal('14.00')
+        )
+        self.assertEqual(
+            calculate_overall_average(self.student.id, self.academic_year.id).quantize(Decimal('0.01')),
+            Decimal('14.00')
+        )
+        results = calculate_class_averages(self.class_section.id, self.academic_year.id)
+        self.assertEqual(
+            results[self.student.id]['overall_average'].quantize(Decimal('0.01')),
+            Decimal('14.00')
+        )
+        self.assertIsNone(results[self.students[4].id]['overall_average'])
+        
+        generate_report_cards(self.class_section.id, self.academic_year.id, 'T1')
+        report_card = ReportCard.objects.get(student=self.student, academic_year=self.academic_year, term='T1')
+        self.assertEqual(report_card.overall_average, Decimal('14.00'))
+    
+    def test_inactive_year_scale_ignored(self):
+        """Test qu'un barème inactif de l'année n'est pas utilisé."""
+        scale = self.create_scale('pondéré', GradeScale.AVERAGING_WEIGHTED, self.academic_year)
+        scale.is_active = False
+        scale.save()
+        
+        self.assertIsNone(GradeScale.get_year_scale(self.academic_year.id))
+        self.assertEqual(calculate_overall_average(self.student.id, self.academic_year.id), Decimal('28.50'))
+    
+    def test_admin_offers_registered_strategies(self):
+        """Test que l'administration propose les formules du registre."""
+        field = site._registry[GradeScale].formfield_for_dbfield(
+            GradeScale._meta.get_field('averaging_method'), None
+        )
+        
+        self.assertEqual([code for code, _ in field.choices], sorted(AVERAGING_STRATEGIES))
+        self.assertEqual(field.initial, GradeScale.AVERAGING_COEFFICIENT)
+    
+    def test_strategy_registry(self):
+        """Test l'enregistrement d'une stratégie personnalisée."""
+        @register_strategy
+        class UnweightedStrategy(AveragingStrategy):
+            code = 'unweighted'
+            
+            def weight_expression(self):
+                return Value(1.0, output_field=FloatField())
+        
+        self.addCleanup(AVERAGING_STRATEGIES.pop, 'unweighted')
+        
+        self.assertIsInstance(get_strategy('unweighted'), UnweightedStrategy)
+        self.assertEqual(self.average(self.create_scale('simple', 'unweighted')), Decimal('28.50'))
+        with self.assertRaises(ValueError):
+            get_strategy('olympic')
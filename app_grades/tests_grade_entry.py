@@ -0,0 +1,118 @@
+"""
+Tests unitaires pour la saisie groupée des notes d'une évaluation.
+
+Ce module vérifie la validation ligne par ligne, l'upsert des notes, la
+mise à jour de la table de cumul et la vue JSON de saisie.
+"""
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from decimal import Decimal
+from app_config.permissions import assign_permission
+from app_config.models import Permission
+from .models import StudentGrade
+from .services.grade_entry import _validate_entry, get_assessment_roster, save_assessment_grades
+from .tests_report_cards import ReportCardTestBase
+
+
+class GradeEntryTestCase(ReportCardTestBase):
+    """Tests pour l'enregistrement groupé des notes."""
+    
+    def get_scores(self):
+        """Retourne les notes de l'évaluation par élève."""
+        return dict(StudentGrade.objects.filter(assessment=self.assessment).values_list('student_id', 'score'))
+    
+    def test_upsert(self):
+        """Test la création et la mise à jour des notes en une fois."""
+        ids = [student.id for student in self.students]
+        written, errors = save_assessment_grades(self.assessment, [
+            {'student_id': ids[0], 'score': '18'},
+            {'student_id': ids[3], 'is_absent': True},
+            {'student_id': ids[4], 'score': 11.5, 'comment': 'Progrès'},
+        ])
+        
+        self.assertEqual((written, errors), (3, []))
+        scores = self.get_scores()
+        self.assertEqual(len(scores), 5)
+        self.assertEqual(scores[ids[0]], Decimal('18.00'))
+        self.assertIsNone(scores[ids[3]])
+        self.assertEqual(scores[ids[4]], Decimal('11.50'))
+        self.assertEqual(
+            StudentGrade.calculate_average(ids[0], self.subject.id, self.academic_year.id), Decimal('18.00')
+        )
+        self.assertIsNone(StudentGrade.calculate_average(ids[3], self.subject.id, self.academic_year.id))
+        
+        roster = {row['student_id']: row for row in get_assessment_roster(self.assessment)}
+        self.assertEqual(roster[ids[4]]['comment'], 'Progrès')
+    
+    def test_validation_errors(self):
+        """Test les erreurs par ligne : rien n'est écrit si une ligne est invalide."""
+        outsider = self.create_student('outsider', self.create_class('6B'))
+        ids = [student.id for student in self.students]
+        written, errors = save_assessment_grades(self.assessment, [
+            {'student_id': ids[0], 'score': '15'},
+            {'student_id': ids[1], 'score': '21'},
+            {'student_id': ids[2], 'score': 'abc'},
+            {'student_id': ids[0], 'score': '12'},
+            {'student_id': outsider.id, 'score': '10'},
+            {'student_id': ids[3], 'score': '10', 'is_absent': True},
+            {'student_id': ids[4], 'score': '12.345'},
+            {'student_id': ids[1], 'is_absent': 'false'},
+        ])
+        
+        self.assertEqual(written, 0)
+        self.assertEqual([error['row'] for error in errors], [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(errors[0]['errors'], ['Score must be between 0 and 20.00.'])
+        self.assertEqual(errors[5]['errors'], ['Score must have at most two decimal places.'])
+        self.assertEqual(errors[6]['errors'], ['is_absent must be true or false.'])
+        self.assertEqual(self.get_scores()[ids[0]], Decimal('12.00'))
+        
+        # Un booléen n'est pas un identifiant, même si True vaut 1
+        _, row_errors = _validate_entry({'student_id': True, 'score': '10'}, {1}, set(), Decimal('20'))
+        self.assertEqual(row_errors, ['Student is not enrolled in the assessment class.'])
+    
+    def test_query_count_does_not_scale(self):
+        """Test que la saisie d'une classe de 40 élèves tient en quelques requêtes."""
+        for i in range(35):
+            self.create_student(f'extra{i}', self.class_section)
+        entries = [
+            {'student_id': row['student_id'], 'score': f'{8 + i % 12}.25'}
+            for i, row in enumerate(get_assessment_roster(self.assessment))
+        ]
+        self.assertEqual(len(entries), 40)
+        
+        # Liste de la classe, upsert, recalcul du cumul (3) et deux points de sauvegarde
+        with self.assertNumQueries(9):
+            written, errors = save_assessment_grades(self.assessment, entries)
+        
+        self.assertEqual((written, errors), (40, []))
+        self.assertEqual(StudentGrade.objects.filter(assessment=self.assessment).count(), 40)
+    
+    def test_endpoint(self):
+        """Test la vue JSON de saisie."""
+        user = User.objects.create_user(username='teacher', password='testpass123')
+        self.client.force_login(user)
+        url = reverse('app_grades:assessment_grade_entry', kwargs={'pk': self.assessment.id})
+        
+        self.assertEqual(self.client.get(url).status_code, 403)
+        
+        Permission.objects.create(name='create_grade', codename='create_grade', resource='app_grades', action='create')
+        assign_permission(user.profile, 'create_grade')
+        
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['grades']), 5)
+        
+        payload = {'grades': [{'student_id': self.students[4].id, 'score': '30'}]}
+        response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['student_id'], self.students[4].id)
+        
+        payload = {'grades': [{'student_id': self.students[4].id, 'score': '16'}]}
+        response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['written'], 1)
+        self.assertEqual(StudentGrade.objects.get(student=self.students[4]).created_by, user)
+        
+        response = self.client.post(url, {'grades': []}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,109 @@
+"""
+Tests unitaires pour le rendu PDF des bulletins.
+
+Ce module vérifie le PDF d'un bulletin isolé, le rendu groupé d'une classe
+(un PDF par élève) et l'export ZIP en tâche Celery.
+"""
+
+import os
+import re
+import tempfile
+import time
+import zipfile
+from unittest import skipUnless
+from django.contrib.auth.models import User
+from django.test import override_settings
+from app_academic.models import Course, Subject
+from app_profile.models import Teacher
+from .models import ReportCard
+from .services.report_cards import generate_report_cards
+from .services.report_card_pdf import (
+    REPORTLAB_AVAILABLE, load_class_report_cards, iter_class_report_card_pdfs
+)
+from .services.utils import generate_report_card_pdf
+from .tasks import export_class_report_cards
+from .tests_report_cards import ReportCardTestBase
+
+
+def count_pages(content):
+    """Compte les pages d'un PDF produit par reportlab."""
+    return len(re.findall(rb'/Type /Page\b(?!s)', content))
+
+
+@skipUnless(REPORTLAB_AVAILABLE, "reportlab n'est pas installé")
+class ReportCardPdfTestCase(ReportCardTestBase):
+    """Tests pour le rendu PDF des bulletins."""
+    
+    def setUp(self):
+        super().setUp()
+        teacher = Teacher.objects.create(
+            profile=User.objects.create_user(username='teacher', password='testpass123').profile
+        )
+        Course.objects.create(
+            subject=self.subject, class_section=self.class_section, teacher=teacher,
+            academic_year=self.academic_year
+        )
+        Subject.objects.create(name='Musique', code='MUS')
+        generate_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+    
+    def test_single_report_card(self):
+        """Test le PDF d'un bulletin isolé."""
+        report_card = ReportCard.objects.get(student=self.students[1], term='Trimestre 1')
+        
+        content = generate_report_card_pdf(report_card.id)
+        
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertEqual(count_pages(content), 1)
+        self.assertIsNone(generate_report_card_pdf(0))
+        
+        # Un élève sans classe garde un bulletin imprimable
+        report_card.student.class_section = None
+        report_card.student.save()
+        content = generate_report_card_pdf(report_card.id)
+        self.assertEqual(count_pages(content), 1)
+    
+    def test_class_rendering(self):
+        """Test un PDF par élève, avec les seules matières de la classe."""
+        with self.assertNumQueries(7):
+            layout, entries = load_class_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+        self.assertEqual(len(entries), 5)
+        self.assertEqual([name for subject_id, name, coefficient in layout.subjects], ['Mathématiques'])
+        
+        pdfs = list(iter_class_report_card_pdfs(self.class_section.id, self.academic_year.id, 'Trimestre 1'))
+        self.assertEqual(len(pdfs), 5)
+        self.assertTrue(all(count_pages(content) == 1 for report_card, content in pdfs))
+    
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
+    def test_zip_export_task(self):
+        """Test l'export ZIP des bulletins d'une classe dans MEDIA_ROOT."""
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            for _ in range(2):
+                result = export_class_report_cards.delay(self.class_section.id, self.academic_year.id, 'Trimestre 1').get()
+            
+            self.assertEqual(result['count'], 5)
+            self.assertEqual(result['path'], os.path.join('report_cards', str(self.academic_year.id), 'trimestre-1', '6a.zip'))
+            with zipfile.ZipFile(os.path.join(media_root, result['path'])) as archive:
+                names = archive.namelist()
+                self.assertEqual(len(names), 5)
+                self.assertTrue(archive.read(names[0]).startswith(b'%PDF'))
+            self.assertEqual(os.listdir(os.path.dirname(os.path.join(media_root, result['path']))), ['6a.zip'])
+
+
+@skipUnless(REPORTLAB_AVAILABLE and os.environ.get('RUN_BENCHMARKS'), "Benchmark : définir RUN_BENCHMARKS=1")
+class ReportCardPdfBenchmarkTestCase(ReportCardTestBase):
+    """Benchmark du rendu des bulletins (objectif : 20 bulletins par seconde)."""
+    
+    STUDENTS = 40
+    
+    def test_throughput(self):
+        """Mesure le nombre de bulletins produits par seconde."""
+        for i in range(self.STUDENTS):
+            self.create_student(f'bench{i}', self.class_section, f'{8 + i % 12}.50')
+        generate_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+        
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_class_report_card_pdfs(self.class_section.id, self.academic_year.id, 'Trimestre 1'))
+        elapsed = time.perf_counter() - start
+        
+        print(f'\n{count} bulletins en {elapsed:.2f}s ({count / elapsed:.0f}/s)')
+        self.assertGreaterEqual(count / elapsed, 20)
@@ -0,0 +1,162 @@
+"""
+Tests unitaires pour la génération groupée des bulletins.
+
+Ce module vérifie le classement avec ex aequo, l'upsert des bulletins
+d'une classe et la commande de génération pour une année.
+"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from .models import Assessment, StudentGrade, GradeCategory, ReportCard
+from .services.report_cards import (
+    RANKING_DENSE, rank_averages, generate_report_cards, generate_year_report_cards
+)
+from app_academic.models import AcademicYear, Grade, Class, Subject
+from app_profile.models import Profile, Student
+
+
+class RankAveragesTestCase(TestCase):
+    """Tests pour le classement des moyennes."""
+    
+    def test_competition_ranking(self):
+        """Test le classement avec rangs sautés après des ex aequo."""
+        ranks = rank_averages({1: Decimal('12'), 2: Decimal('15'), 3: Decimal('12'), 4: Decimal('9'), 5: None})
+        self.assertEqual(ranks, {2: 1, 1: 2, 3: 2, 4: 4})
+    
+    def test_dense_ranking(self):
+        """Test le classement sans trou après des ex aequo."""
+        ranks = rank_averages({1: Decimal('12'), 2: Decimal('15'), 3: Decimal('12'), 4: Decimal('9')}, RANKING_DENSE)
+        self.assertEqual(ranks, {2: 1, 1: 2, 3: 2, 4: 3})
+    
+    def test_unknown_method(self):
+        """Test qu'une méthode inconnue est refusée."""
+        with self.assertRaises(ValueError):
+            rank_averages({}, 'olympic')
+
+
+class ReportCardTestBase(TestCase):
+    """Données communes aux tests de génération des bulletins."""
+    
+    def setUp(self):
+        """Préparation des données de test."""
+        self.academic_year = AcademicYear.objects.create(
+            name='2024-2025',
+            start_date=date(2024, 9, 1),
+            end_date=date(2025, 6, 30),
+            is_current=True,
+            is_active=True
+        )
+        self.grade = Grade.objects.create(name='6ème', code='6EME', order=6, is_active=True)
+        self.class_section = self.create_class('6A')
+        self.category = GradeCategory.objects.create(name='Contrôle', code='CTRL', weight=Decimal('1.0'))
+        self.subject = Subject.objects.create(name='Mathématiques', code='MATH', coefficient=Decimal('2.0'))
+        self.assessment = self.create_assessment(self.class_section)
+        # Deux élèves ex aequo et un élève sans note
+        self.students = [
+            self.create_student(f'student{i}', self.class_section, score)
+            for i, score in enumerate(['12.00', '14.00', '9.50', '14.00', None])
+        ]
+    
+    def create_class(self, code):
+        """Crée une classe de l'année de test."""
+        return Class.objects.create(
+            name=code, code=code, grade=self.grade,
+            academic_year=self.academic_year, capacity=30, is_active=True
+        )
+    
+    def create_assessment(self, class_section):
+        """Crée une évaluation pour une classe."""
+        return Assessment.objects.create(
+            name='Contrôle', subject=self.subject, class_section=class_section,
+            category=self.category, date=date(2024, 10, 1),
+            max_score=Decimal('20.00'), academic_year=self.academic_year
+        )
+    
+    def create_student(self, username, class_section, score=None, assessment=None):
+        """Crée un élève actif, noté si un score est fourni."""
+        user = User.objects.create_user(username=username, password='testpass123')
+        student = Student.objects.create(
+            profile=Profile.objects.get(user=user),
+            class_section=class_section,
+            academic_year=self.academic_year,
+            is_active=True
+        )
+        if score is not None:
+            StudentGrade.objects.create(
+                student=student, assessment=assessment or self.assessment, score=Decimal(score)
+            )
+        return student
+    
+    def get_cards(self):
+        """Retourne les bulletins du trimestre 1 par élève."""
+        return {
+            card.student_id: (card.overall_average, card.rank, card.total_students)
+            for card in ReportCard.objects.filter(academic_year=self.academic_year, term='Trimestre 1')
+        }
+
+
+class GenerateReportCardsTestCase(ReportCardTestBase):
+    """Tests pour la génération des bulletins d'une classe."""
+    
+    def test_generate_report_cards(self):
+        """Test les moyennes, rangs et effectifs écrits dans les bulletins."""
+        written = generate_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+        
+        self.assertEqual(written, 5)
+        ids = [student.id for student in self.students]
+        self.assertEqual(self.get_cards(), {
+            ids[0]: (Decimal('12.00'), 3, 5),
+            ids[1]: (Decimal('14.00'), 1, 5),
+            ids[2]: (Decimal('9.50'), 4, 5),
+            ids[3]: (Decimal('14.00'), 1, 5),
+            ids[4]: (None, None, 5),
+        })
+        
+        generate_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1', RANKING_DENSE)
+        self.assertEqual(self.get_cards()[ids[2]], (Decimal('9.50'), 3, 5))
+    
+    def test_regeneration_updates_in_place(self):
+        """Test qu'une nouvelle génération met à jour les bulletins sans toucher aux commentaires."""
+        generate_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+        card = ReportCard.objects.get(student=self.students[0], term='Trimestre 1')
+        card.comments = 'Bon trimestre'
+        card.save()
+        
+        grade = StudentGrade.objects.get(student=self.students[0])
+        grade.score = Decimal('18.00')
+        grade.save()
+        generate_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+        
+        self.assertEqual(ReportCard.objects.count(), 5)
+        card.refresh_from_db()
+        self.assertEqual((card.overall_average, card.rank, card.comments), (Decimal('18.00'), 1, 'Bon trimestre'))
+    
+    def test_query_count_does_not_scale(self):
+        """Test que le coût ne dépend pas du nombre d'élèves."""
+        with self.assertNumQueries(4):
+            generate_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+        
+        for i in range(20):
+            self.create_student(f'extra{i}', self.class_section, f'{10 + i % 7}.25')
+        
+        with self.assertNumQueries(4):
+            generate_report_cards(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+    
+    def test_year_generation_and_command(self):
+        """Test la génération de toutes les classes d'une année, classe par classe."""
+        other_class = self.create_class('6B')
+        other_assessment = self.create_assessment(other_class)
+        other = self.create_student('other', other_class, '11.00', other_assessment)
+        
+        written = generate_year_report_cards(self.academic_year.id, 'Trimestre 1')
+        self.assertEqual(written, {self.class_section.id: 5, other_class.id: 1})
+        self.assertEqual(self.get_cards()[other.id], (Decimal('11.00'), 1, 1))
+        
+        out = StringIO()
+        call_command('generate_report_cards', '--term', 'Trimestre 2', '--class', str(other_class.id), stdout=out)
+        self.assertIn('1 report card(s) written for 1 class(es)', out.getvalue())
+        self.assertEqual(ReportCard.objects.filter(term='Trimestre 2').count(), 1)
@@ -16,7 +16,8 @@ from app_profile.models import Profile, Student
 from .services.utils import (
     calculate_student_average,
     calculate_class_average,
-    calculate_overall_average
+    calculate_overall_average,
+    calculate_class_averages
 )
 
 
@@ -187,4 +188,56 @@ class GradesServicesTestCase(TestCase):
         average = calculate_overall_average(self.student.id, self.academic_year.id)
         self.assertIsNotNone(average)
         self.assertEqual(average, Decimal('16.50'))
-
+    
+    def test_calculate_class_averages(self):
+        """Test les moyennes de toute une classe, identiques aux calculs par élève."""
+        subjects = [self.subject] + [
+            Subject.objects.create(
+                name=f'Matière {i}', code=f'MAT{i}', coefficient=Decimal(i), is_active=True
+            )
+            for i in range(1, 5)
+        ]
+        students = [self.student]
+        for i in range(3):
+            user = User.objects.create_user(username=f'classmate{i}', password='test')
+            students.append(Student.objects.create(
+                profile=Profile.objects.get(user=user),
+                class_section=self.class_section,
+                academic_year=self.academic_year,
+                is_active=True
+            ))
+        for i, subject in enumerate(subjects[1:]):
+            assessment = Assessment.objects.create(
+                name=f'Contrôle {i}',
+                subject=subject,
+                class_section=self.class_section,
+                category=self.category,
+                date=date.today(),
+                coefficient=Decimal('1.5'),
+                max_score=Decimal('20.00'),
+                academic_year=self.academic_year
+            )
+            # Le dernier élève n'a aucune note
+            for j, student in enumerate(students[:-1]):
+                StudentGrade.objects.create(
+                    student=student,
+                    assessment=assessment,
+                    score=Decimal('7.25') + i * 3 + j,
+                    is_absent=(i + j) % 4 == 3
+                )
+        
+        with self.assertNumQueries(3):
+            results = calculate_class_averages(self.class_section.id, self.academic_year.id)
+        
+        self.assertEqual(set(results), {student.id for student in students})
+        for student in students:
+            self.assertEqual(
+                results[student.id]['overall_average'],
+                calculate_overall_average(student.id, self.academic_year.id)
+            )
+            for subject in subjects:
+                self.assertEqual(
+                    results[student.id]['subject_averages'].get(subject.id),
+                    calculate_student_average(student.id, subject.id, self.academic_year.id)
+                )
+        self.assertEqual(results[students[-1].id], {'subject_averages': {}, 'overall_average': None})
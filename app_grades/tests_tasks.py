@@ -0,0 +1,92 @@
+"""
+Tests unitaires pour les tâches Celery de app_grades.
+
+Les tâches sont exécutées en mode eager (CELERY_TASK_ALWAYS_EAGER) et leurs
+résultats sont stockés dans django_celery_results.
+"""
+
+from django.test import override_settings
+from django.contrib.auth.models import User
+from django.urls import reverse
+from decimal import Decimal
+from unittest import mock
+from app_config.permissions import assign_permission
+from app_config.models import Permission
+from .models import ReportCard
+from .tasks import generate_class_report_cards, start_report_card_run, get_report_card_run_status
+from .tests_report_cards import ReportCardTestBase
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True,
+    CELERY_TASK_EAGER_PROPAGATES=True
+)
+class ReportCardTasksTestCase(ReportCardTestBase):
+    """Tests pour la génération des bulletins en tâches Celery."""
+    
+    def setUp(self):
+        super().setUp()
+        # L'option est figée sur la tâche lors de sa liaison à l'application
+        patcher = mock.patch.object(generate_class_report_cards, 'store_eager_result', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.other_class = self.create_class('6B')
+        self.create_student('other', self.other_class, '11.00', self.create_assessment(self.other_class))
+    
+    def test_run_progress(self):
+        """Test une tâche par classe et l'avancement agrégé du groupe."""
+        group_id = start_report_card_run(self.academic_year.id, 'Trimestre 1')
+        
+        with self.assertNumQueries(2):
+            run_status = get_report_card_run_status(group_id)
+        
+        self.assertEqual(run_status['total'], 2)
+        self.assertEqual(run_status['completed'], 2)
+        self.assertEqual(run_status['pending'], 0)
+        self.assertEqual(run_status['written'], 6)
+        self.assertEqual(run_status['progress'], 100)
+        self.assertTrue(run_status['ready'])
+        self.assertIsNone(get_report_card_run_status('unknown'))
+    
+    def test_chunk_is_idempotent(self):
+        """Test qu'une tâche relancée réécrit les bulletins sans doublon."""
+        for _ in range(2):
+            result = generate_class_report_cards.delay(self.class_section.id, self.academic_year.id, 'Trimestre 1')
+            self.assertEqual(result.get(), {'class_id': self.class_section.id, 'written': 5})
+        
+        self.assertEqual(ReportCard.objects.filter(term='Trimestre 1').count(), 5)
+        self.assertEqual(self.get_cards()[self.students[1].id], (Decimal('14.00'), 1, 5))
+    
+    def test_endpoints(self):
+        """Test le lancement et le suivi via les vues JSON."""
+        user = User.objects.create_user(username='secretary', password='testpass123')
+        self.client.force_login(user)
+        url = reverse('app_grades:report_card_run')
+        payload = {'term': 'Trimestre 1', 'ranking': 'dense'}
+        
+        response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+        
+        for codename in ('create_report_card', 'view_report_card'):
+            Permission.objects.create(name=codename, codename=codename, resource='app_grades', action='create')
+            assign_permission(user.profile, codename)
+        
+        response = self.client.post(url, {'ranking': 'dense'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        
+        for class_ids in ('4', ['4'], [True], [self.class_section.id, 999999]):
+            with mock.patch('app_grades.views.start_report_card_run') as start_run:
+                response = self.client.post(url, {**payload, 'class_ids': class_ids}, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            start_run.assert_not_called()
+        
+        response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        
+        response = self.client.get(response.json()['status_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['run']['written'], 6)
+        self.assertEqual(ReportCard.objects.filter(term='Trimestre 1').count(), 6)
+        
+        response = self.client.get(reverse('app_grades:report_card_run_status', kwargs={'group_id': 'unknown'}))
+        self.assertEqual(response.status_code, 404)
@@ -27,6 +27,9 @@ urlpatterns = [
     path('assessments/<int:pk>/', views.AssessmentDetailView.as_view(), name='assessment_detail'),
     path('assessments/create/', views.AssessmentCreateView.as_view(), name='assessment_create'),
     path('assessments/<int:pk>/update/', views.AssessmentUpdateView.as_view(), name='assessment_update'),
+    path('assessments/<int:pk>/grades/', views.AssessmentGradeEntryView.as_view(), name='assessment_grade_entry'),
+    path('assessments/<int:pk>/statistics/', views.AssessmentStatisticsView.as_view(), name='assessment_statistics'),
+    path('classes/<int:class_id>/statistics/', views.ClassStatisticsView.as_view(), name='class_statistics'),
     
     # Student Grade
     path('grades/', views.StudentGradeListView.as_view(), name='grade_list'),
@@ -39,4 +42,6 @@ urlpatterns = [
     path('report-cards/<int:pk>/', views.ReportCardDetailView.as_view(), name='report_card_detail'),
     path('report-cards/create/', views.ReportCardCreateView.as_view(), name='report_card_create'),
     path('report-cards/<int:pk>/update/', views.ReportCardUpdateView.as_view(), name='report_card_update'),
+    path('report-cards/generate/', views.ReportCardRunView.as_view(), name='report_card_run'),
+    path('report-cards/generate/<str:group_id>/', views.ReportCardRunStatusView.as_view(), name='report_card_run_status'),
 ]
@@ -9,12 +9,21 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q
 from django.contrib import messages
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.views import View
+from django.http import JsonResponse
+import json
 
 from .models import GradeScale, GradeCategory, Assessment, StudentGrade, ReportCard
 from app_config.permissions import PermissionRequiredMixin
+from app_academic.models import AcademicYear, Class
+from .services.analytics import DEFAULT_HISTOGRAM_BINS, MAX_HISTOGRAM_BINS, get_assessment_statistics, get_class_statistics
+from .services.grade_entry import get_assessment_roster, save_assessment_grades
+from .services.report_cards import RANKING_COMPETITION, RANKING_METHODS
+from .tasks import start_report_card_run, get_report_card_run_status
 
 
 # ==================== GRADE SCALE ====================
@@ -215,6 +224,7 @@ class AssessmentCreateView(PermissionRequiredMixin, CreateView):
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
     
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.created_by = self.request.user
         messages.success(self.request, 'Évaluation créée avec succès!')
@@ -238,6 +248,7 @@ class AssessmentUpdateView(PermissionRequiredMixin, UpdateView):
     def get_queryset(self):
         return Assessment.objects.filter(is_active=True)
     
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.updated_by = self.request.user
         messages.success(self.request, 'Évaluation modifiée avec succès!')
@@ -275,6 +286,7 @@ class StudentGradeCreateView(PermissionRequiredMixin, CreateView):
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
     
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.created_by = self.request.user
         messages.success(self.request, 'Note créée avec succès!')
@@ -298,6 +310,7 @@ class StudentGradeUpdateView(PermissionRequiredMixin, UpdateView):
     def get_queryset(self):
         return StudentGrade.objects.filter(is_active=True)
     
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.updated_by = self.request.user
         messages.success(self.request, 'Note modifiée avec succès!')
@@ -425,3 +438,256 @@ class GradeScaleUpdateView(PermissionRequiredMixin, UpdateView):
     
     def get_success_url(self):
         return reverse_lazy('app_grades:grade_scale_detail', kwargs={'pk': self.object.pk})
+
+
+# ==================== GRADE ENTRY ====================
+
+@method_decorator(login_required, name='dispatch')
+class AssessmentGradeEntryView(PermissionRequiredMixin, View):
+    """
+    Vue JSON de saisie groupée des notes d'une évaluation.
+    
+    GET renvoie la liste de la classe avec les notes déjà saisies ; POST
+    enregistre toutes les notes en une requête.
+    """
+    required_permission = 'create_grade'
+    required_resource = 'app_grades'
+    
+    def get_assessment(self, pk):
+        return Assessment.objects.filter(pk=pk, is_active=True).first()
+    
+    def get(self, request, pk):
+        assessment = self.get_assessment(pk)
+        if assessment is None:
+            return JsonResponse({'status': 'error', 'message': 'Assessment not found.'}, status=404)
+        
+        return JsonResponse({
+            'status': 'success',
+            'assessment_id': assessment.id,
+            'max_score': assessment.max_score,
+            'grades': get_assessment_roster(assessment)
+        })
+    
+    def post(self, request, pk):
+        """
+        Enregistre les notes de l'évaluation.
+        
+        Body JSON attendu:
+        {
+            "grades": [
+                {"student_id": 12, "score": "14.5", "comment": "Bien"},
+                {"student_id": 13, "is_absent": true}
+            ]
+        }
+        
+        Si une ligne est invalide, aucune note n'est enregistrée et les
+        erreurs sont renvoyées ligne par ligne.
+        """
+        assessment = self.get_assessment(pk)
+        if assessment is None:
+            return JsonResponse({'status': 'error', 'message': 'Assessment not found.'}, status=404)
+        
+        try:
+            data = json.loads(request.body or '{}')
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid JSON data.'
+            }, status=400)
+        
+        entries = data.get('grades') if isinstance(data, dict) else None
+        if not isinstance(entries, list) or not entries:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'A non-empty grades list is required.'
+            }, status=400)
+        
+        written, errors = save_assessment_grades(assessment, entries, request.user)
+        if errors:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Some grades are invalid.',
+                'errors': errors
+            }, status=400)
+        
+        return JsonResponse({
+            'status': 'success',
+            'written': written
+        })
+
+
+# ==================== REPORT CARD GENERATION ====================
+
+@method_decorator(login_required, name='dispatch')
+class ReportCardRunView(PermissionRequiredMixin, View):
+    """
+    Vue pour lancer la génération des bulletins d'une année en tâche de fond.
+    """
+    required_permission = 'create_report_card'
+    required_resource = 'app_grades'
+    
+    def post(self, request):
+        """
+        Lance une génération, une tâche Celery par classe.
+        
+        Body JSON attendu:
+        {
+            "term": "Trimestre 1",
+            "academic_year_id": 1,
+            "ranking": "competition",
+            "class_ids": [4, 7]
+        }
+        
+        Seul term est obligatoire ; l'année courante est utilisée par défaut.
+        """
+        try:
+            data = json.loads(request.body or '{}')
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid JSON data.'
+            }, status=400)
+        
+        term = data.get('term')
+        ranking = data.get('ranking', RANKING_COMPETITION)
+        if not term:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Term is required.'
+            }, status=400)
+        if ranking not in RANKING_METHODS:
+            return JsonResponse({
+                'status': 'error',
+                'message': f"Unknown ranking method '{ranking}'."
+            }, status=400)
+        
+        year_id = data.get('academic_year_id')
+        if year_id is None:
+            current_year = AcademicYear.get_current_year()
+            year_id = current_year.id if current_year else None
+        if year_id is None or not AcademicYear.objects.filter(id=year_id).exists():
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Academic year not found.'
+            }, status=400)
+        
+        class_ids = data.get('class_ids')
+        if class_ids is not None:
+            if not isinstance(class_ids, list) or not all(
+                isinstance(class_id, int) and not isinstance(class_id, bool) for class_id in class_ids
+            ):
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'class_ids must be a list of integers.'
+                }, status=400)
+            known_ids = set(
+                Class.objects.filter(id__in=class_ids, academic_year_id=year_id).values_list('id', flat=True)
+            )
+            unknown_ids = sorted(set(class_ids) - known_ids)
+            if unknown_ids:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': f'Classes not found in this academic year: {unknown_ids}.'
+                }, status=400)
+        
+        group_id = start_report_card_run(year_id, term, ranking, class_ids)
+        
+        return JsonResponse({
+            'status': 'success',
+            'group_id': group_id,
+            'status_url': reverse('app_grades:report_card_run_status', kwargs={'group_id': group_id})
+        }, status=202)
+
+
+@method_decorator(login_required, name='dispatch')
+class ReportCardRunStatusView(PermissionRequiredMixin, View):
+    """
+    Vue pour suivre l'avancement d'une génération de bulletins.
+    """
+    required_permission = 'view_report_card'
+    required_resource = 'app_grades'
+    
+    def get(self, request, group_id):
+        run_status = get_report_card_run_status(group_id)
+        if run_status is None:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Report card run not found.'
+            }, status=404)
+        
+        return JsonResponse({
+            'status': 'success',
+            'run': run_status
+        })
+
+
+# ==================== STATISTICS ====================
+
+def _get_statistics_options(request):
+    """
+    Lit le barème et le nombre de tranches demandés en paramètres GET.
+    
+    Returns:
+        tuple: (barème ou None, nombre de tranches, message d'erreur ou None)
+    """
+    try:
+        bins = int(request.GET.get('bins', DEFAULT_HISTOGRAM_BINS))
+    except ValueError:
+        bins = 0
+    if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+        return None, None, f'Histogram bins must be between 1 and {MAX_HISTOGRAM_BINS}.'
+    
+    scale = None
+    scale_id = request.GET.get('scale')
+    if scale_id:
+        scale = GradeScale.get_grade_scale(scale_id) if scale_id.isdigit() else None
+        if scale is None:
+            return None, None, 'Grade scale not found.'
+    return scale, bins, None
+
+
+@method_decorator(login_required, name='dispatch')
+class AssessmentStatisticsView(PermissionRequiredMixin, View):
+    """
+    Vue JSON des statistiques d'une évaluation.
+    
+    Paramètres GET optionnels : scale (ID du barème pour le taux de
+    réussite) et bins (nombre de tranches de l'histogramme).
+    """
+    required_permission = 'view_assessment'
+    required_resource = 'app_grades'
+    
+    def get(self, request, pk):
+        scale, bins, error = _get_statistics_options(request)
+        if error:
+            return JsonResponse({'status': 'error', 'message': error}, status=400)
+        if not Assessment.objects.filter(pk=pk, is_active=True).exists():
+            return JsonResponse({'status': 'error', 'message': 'Assessment not found.'}, status=404)
+        
+        return JsonResponse({
+            'status': 'success',
+            'statistics': get_assessment_statistics(pk, scale, bins)
+        })
+
+
+@method_decorator(login_required, name='dispatch')
+class ClassStatisticsView(PermissionRequiredMixin, View):
+    """
+    Vue JSON des statistiques de toutes les évaluations d'une classe.
+    
+    Paramètres GET optionnels : academic_year_id, scale et bins.
+    """
+    required_permission = 'view_assessment'
+    required_resource = 'app_grades'
+    
+    def get(self, request, class_id):
+        scale, bins, error = _get_statistics_options(request)
+        if error:
+            return JsonResponse({'status': 'error', 'message': error}, status=400)
+        
+        year_id = request.GET.get('academic_year_id')
+        statistics = get_class_statistics(class_id, int(year_id) if year_id and year_id.isdigit() else None, scale, bins)
+        return JsonResponse({
+            'status': 'success',
+            'assessments': list(statistics.values())
+        })
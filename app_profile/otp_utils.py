@@ -5,44 +5,62 @@ Ce module contient les fonctions pour envoyer des SMS via Twilio
 et gérer les codes OTP pour la vérification des numéros de téléphone.
 """
 
-import os
+import logging
 from django.conf import settings
 from app_config.models import PhoneOTP
-from twilio.rest import Client
 
+try:
+    from twilio.rest import Client
+    TWILIO_AVAILABLE = True
+except ImportError:
+    TWILIO_AVAILABLE = False
 
-def send_otp_via_twilio(phone_number, code):
+
+logger = logging.getLogger(__name__)
+
+
+def is_twilio_configured():
     """
-    Envoie un code OTP via SMS en utilisant Twilio.
+    Indique si l'envoi de SMS via Twilio est possible.
+    
+    Returns:
+        bool: True si les credentials Twilio et le module twilio sont disponibles
+    """
+    account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
+    auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
+    return TWILIO_AVAILABLE and bool(account_sid and auth_token)
+
+
+def send_sms_via_twilio(phone_number, message_body):
+    """
+    Envoie un SMS en utilisant Twilio.
+    
+    Sans credentials Twilio ou sans le module twilio, l'envoi échoue : seul
+    send_otp_via_twilio simule l'envoi en mode développement.
     
     Args:
         phone_number (str): Numéro de téléphone au format international (ex: 242061234567)
-        code (str): Code OTP à envoyer
+        message_body (str): Texte du SMS
     
     Returns:
         tuple: (success: bool, message_sid: str or None)
     """
+    if not is_twilio_configured():
+        logger.warning("Twilio is not configured, SMS to %s not sent", phone_number)
+        return False, None
+    
     try:
         # Récupérer les credentials Twilio depuis les settings
-        account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
-        auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
+        account_sid = settings.TWILIO_ACCOUNT_SID
+        auth_token = settings.TWILIO_AUTH_TOKEN
         from_number = getattr(settings, 'TWILIO_PHONE_NUMBER', None)
         
-        # Vérifier que les credentials sont configurés
-        if not all([account_sid, auth_token]):
-            print("[WARNING] Twilio non configure - Mode developpement")
-            print(f"[DEV] OTP pour {phone_number}: {code}")
-            return True, None  # En dev, on simule un succès
-        
         # Créer le client Twilio
         client = Client(account_sid, auth_token)
         
         # Formatter le numéro avec le '+'
         formatted_phone = f"+{phone_number}" if not phone_number.startswith('+') else phone_number
         
-        # Message à envoyer
-        message_body = f"Votre code de verification Monity World est: {code}. Valide pendant {settings.TIME_EXPIRE_OTP} minutes."
-        
         # Envoyer le SMS via Twilio
         # Si from_number est configuré, on l'utilise, sinon Twilio utilise le numéro par défaut
         message_params = {
@@ -55,27 +73,41 @@ def send_otp_via_twilio(phone_number, code):
         
         message = client.messages.create(**message_params)
         
-        print(f"[SUCCESS] SMS envoye a {formatted_phone} - SID: {message.sid}")
+        logger.info("SMS sent to %s (SID: %s)", formatted_phone, message.sid)
         return True, message.sid
         
-    except ImportError:
-        print("[WARNING] Module Twilio non installe - Mode developpement")
-        print(f"[DEV] OTP pour {phone_number}: {code}")
-        return True, None  # En dev, on simule un succès
-        
     except Exception as e:
-        error_msg = str(e)
-        print(f"[ERROR] Erreur lors de l'envoi du SMS: {error_msg}")
-        
-        # Afficher des détails supplémentaires en mode développement
-        if hasattr(e, 'msg'):
-            print(f"[ERROR] Message d'erreur: {e.msg}")
-        if hasattr(e, 'code'):
-            print(f"[ERROR] Code d'erreur: {e.code}")
-        
+        logger.error(
+            "SMS sending to %s failed: %s (code: %s)",
+            phone_number, getattr(e, 'msg', str(e)), getattr(e, 'code', None)
+        )
         return False, None
 
 
+def send_otp_via_twilio(phone_number, code):
+    """
+    Envoie un code OTP via SMS en utilisant Twilio.
+    
+    Sans credentials Twilio ou sans le module twilio, l'envoi est simulé
+    (mode développement) : le code n'est écrit que dans les logs de niveau
+    DEBUG.
+    
+    Args:
+        phone_number (str): Numéro de téléphone au format international (ex: 242061234567)
+        code (str): Code OTP à envoyer
+    
+    Returns:
+        tuple: (success: bool, message_sid: str or None)
+    """
+    if not is_twilio_configured():
+        logger.warning("Twilio is not configured - dev mode, OTP for %s not sent", phone_number)
+        logger.debug("Dev mode OTP for %s: %s", phone_number, code)
+        return True, None  # En dev, on simule un succès
+        
+    message_body = f"Votre code de verification Monity World est: {code}. Valide pendant {settings.TIME_EXPIRE_OTP} minutes."
+    return send_sms_via_twilio(phone_number, message_body)
+
+
 def generate_and_send_otp(phone_number):
     """
     Génère un OTP et l'envoie via SMS.
@@ -0,0 +1,330 @@
+"""
+Services de données pour le dashboard standard.
+
+Ce module regroupe les calculs du dashboard (moyennes, graphiques, taux de
+présence) en un nombre constant de requêtes : les lignes utiles sont lues
+une seule fois puis agrégées en mémoire.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db.models import Avg, Count, Exists, OuterRef, Q
+
+
+def get_dashboard_months(today, count=6):
+    """
+    Retourne les mois affichés dans le graphique de présence.
+    
+    Args:
+        today: Date du jour
+        count: Nombre de mois (6 par défaut)
+    
+    Returns:
+        list: Tuples (début, fin) du plus ancien au plus récent
+    """
+    months = []
+    for i in range(count):
+        month_date = today - timedelta(days=30 * i)
+        month_start = date(month_date.year, month_date.month, 1)
+        if month_start.month == 12:
+            month_end = date(month_start.year + 1, 1, 1) - timedelta(days=1)
+        else:
+            month_end = date(month_start.year, month_start.month + 1, 1) - timedelta(days=1)
+        months.append((month_start, month_end))
+    months.reverse()
+    return months
+
+
+def compute_attendance_rate(rows, start_date, end_date):
+    """
+    Calcule un taux de présence à partir de lignes déjà chargées.
+    
+    Même résultat que calculate_attendance_rate, sans requête.
+    
+    Args:
+        rows: Itérable de tuples (date, status)
+        start_date: Date de début
+        end_date: Date de fin
+    
+    Returns:
+        Decimal: Taux de présence (0-100) ou None
+    """
+    total = 0
+    present = 0
+    for day, status in rows:
+        if start_date <= day <= end_date:
+            total += 1
+            if status == 'present':
+                present += 1
+    
+    if total == 0:
+        return None
+    
+    return (Decimal(present) / Decimal(total)) * Decimal('100')
+
+
+def get_student_grades_data(student, current_year):
+    """
+    Calcule les moyennes et le graphique des notes d'un élève.
+    
+    Les notes de l'année sont lues en une seule requête, avec le coefficient
+    et la matière de leur évaluation, puis agrégées en mémoire.
+    
+    Args:
+        student: Instance du modèle Student
+        current_year: Année scolaire courante
+    
+    Returns:
+        dict: overall_average, subject_averages et grades_chart_data
+    """
+    from app_academic.models import Subject
+    from app_grades.models import StudentGrade
+    
+    subjects = list(Subject.objects.filter(is_active=True))
+    
+    # Notes de l'année, dans l'ordre chronologique des évaluations
+    rows = StudentGrade.objects.filter(
+        student=student,
+        is_active=True,
+        is_absent=False,
+        assessment__academic_year=current_year
+    ).order_by('assessment__date', 'pk').values_list(
+        'assessment__subject_id', 'score', 'assessment__coefficient'
+    )
+    
+    totals = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+    scores = defaultdict(list)
+    for subject_id, score, coefficient in rows:
+        if score is None:
+            continue
+        totals[subject_id][0] += score * coefficient
+        totals[subject_id][1] += coefficient
+        scores[subject_id].append(float(score))
+    
+    # Moyennes par matière et moyenne générale pondérée par matière
+    subject_averages = []
+    weighted_total = Decimal('0')
+    total_coefficient = Decimal('0')
+    for subject in subjects:
+        total_score, coefficient = totals.get(subject.id, (Decimal('0'), Decimal('0')))
+        if coefficient == 0:
+            continue
+        average = total_score / coefficient
+        subject_averages.append({'subject': subject, 'average': float(average)})
+        weighted_total += average * subject.coefficient
+        total_coefficient += subject.coefficient
+    
+    overall_average = None
+    if subject_averages and total_coefficient != 0:
+        overall_average = weighted_total / total_coefficient
+    
+    # Graphique d'évolution des notes (5 premières matières)
+    chart_data = [
+        {'subject': subject.name, 'grades': scores[subject.id]}
+        for subject in subjects[:5]
+        if scores.get(subject.id)
+    ]
+    
+    return {
+        'overall_average': float(overall_average) if overall_average else None,
+        'subject_averages': subject_averages,
+        'grades_chart_data': chart_data,
+    }
+
+
+def get_student_attendance_data(student, today):
+    """
+    Calcule le taux de présence du mois et le graphique mensuel d'un élève.
+    
+    Les présences des 6 derniers mois sont lues en une seule requête.
+    
+    Args:
+        student: Instance du modèle Student
+        today: Date du jour
+    
+    Returns:
+        dict: attendance_rate et monthly_attendance
+    """
+    from app_attendance.models import Attendance
+    
+    months = get_dashboard_months(today)
+    month_start = date(today.year, today.month, 1)
+    
+    rows = list(Attendance.objects.filter(
+        student=student,
+        date__gte=months[0][0],
+        date__lte=max(months[-1][1], today),
+        is_active=True
+    ).values_list('date', 'status'))
+    
+    attendance_rate = compute_attendance_rate(rows, month_start, today)
+    monthly_data = []
+    for start_date, end_date in months:
+        rate = compute_attendance_rate(rows, start_date, end_date)
+        monthly_data.append({
+            'month': start_date.strftime('%b %Y'),
+            'rate': float(rate) if rate else 0
+        })
+    
+    return {
+        'attendance_rate': float(attendance_rate) if attendance_rate else None,
+        'monthly_attendance': monthly_data,
+    }
+
+
+def annotate_class_stats(classes, current_year=None):
+    """
+    Annote des classes avec leurs statistiques en une seule requête groupée.
+    
+    Ajoute à chaque classe :
+    - students_count, seat_capacity, available_seats (voir
+      ClassQuerySet.with_student_counts)
+    - grades_average : moyenne des notes de l'année (si current_year)
+    - graded_count : nombre d'élèves notés dans l'année (si current_year)
+    
+    Args:
+        classes: QuerySet de classes
+        current_year: Année scolaire courante (optionnel)
+    
+    Returns:
+        QuerySet: Classes annotées
+    """
+    annotations = {}
+    if current_year is not None:
+        graded = Q(
+            students__grades__assessment__academic_year=current_year,
+            students__grades__is_active=True,
+            students__grades__is_absent=False,
+            students__grades__score__isnull=False
+        )
+        annotations['grades_average'] = Avg('students__grades__score', filter=graded)
+        annotations['graded_count'] = Count('students', filter=graded, distinct=True)
+    
+    return classes.with_student_counts().annotate(**annotations)
+
+
+def get_class_stats(classes):
+    """
+    Construit les statistiques de notes par classe du dashboard enseignant.
+    
+    Args:
+        classes: Classes annotées par annotate_class_stats avec une année
+    
+    Returns:
+        list: Statistiques des classes ayant au moins une note
+    """
+    return [
+        {
+            'class': {
+                'id': class_obj.id,
+                'name': class_obj.name,
+                'code': class_obj.code
+            },
+            'average': float(class_obj.grades_average) if class_obj.grades_average else None,
+            'total_students': class_obj.students_count,
+            'graded_count': class_obj.graded_count
+        }
+        for class_obj in classes
+        if class_obj.graded_count
+    ]
+
+
+def get_assessments_to_grade(teacher, current_year):
+    """
+    Retourne les évaluations d'un enseignant qui n'ont encore aucune note.
+    
+    Une évaluation appartient à l'enseignant s'il a un cours actif pour sa
+    matière et sa classe. Les notes sont recherchées par évaluation
+    (sous-requête corrélée) au lieu de parcourir toutes les notes.
+    
+    Args:
+        teacher: Instance du modèle Teacher
+        current_year: Année scolaire courante
+    
+    Returns:
+        QuerySet: Évaluations à corriger, par date
+    """
+    from app_academic.models import Course
+    from app_grades.models import Assessment, StudentGrade
+    
+    teacher_courses = Course.objects.filter(
+        teacher=teacher,
+        subject=OuterRef('subject'),
+        class_section=OuterRef('class_section'),
+        is_active=True
+    )
+    scored_grades = StudentGrade.objects.filter(
+        assessment=OuterRef('pk'),
+        is_active=True,
+        score__isnull=False
+    )
+    return Assessment.objects.filter(
+        Exists(teacher_courses),
+        academic_year=current_year,
+        is_active=True
+    ).exclude(
+        Exists(scored_grades)
+    ).select_related('subject', 'class_section').order_by('date')
+
+
+def get_children_attendance(children, start_date, end_date):
+    """
+    Calcule le taux de présence et les absences non justifiées de plusieurs enfants.
+    
+    Une requête groupée par élève pour les présences et une pour les
+    absences, quel que soit le nombre d'enfants.
+    
+    Args:
+        children: Liste des élèves (profile et profile.user préchargés)
+        start_date: Date de début de la période de présence
+        end_date: Date de fin de la période de présence
+    
+    Returns:
+        list: Entrées child / attendance_rate / unexcused_absences, une par enfant
+    """
+    from app_attendance.models import Attendance, Absence
+    
+    children = list(children)
+    child_ids = [child.id for child in children]
+    
+    attendance_counts = {
+        row['student']: row
+        for row in Attendance.objects.filter(
+            student_id__in=child_ids,
+            date__gte=start_date,
+            date__lte=end_date,
+            is_active=True
+        ).values('student').annotate(
+            total=Count('id'),
+            present=Count('id', filter=Q(status='present'))
+        ).order_by()
+    }
+    unexcused_counts = dict(
+        Absence.objects.filter(
+            student_id__in=child_ids,
+            is_justified=False,
+            is_active=True
+        ).values('student').annotate(count=Count('id')).order_by().values_list('student', 'count')
+    )
+    
+    children_attendance = []
+    for child in children:
+        counts = attendance_counts.get(child.id)
+        rate = None
+        if counts and counts['total']:
+            rate = (Decimal(counts['present']) / Decimal(counts['total'])) * Decimal('100')
+        children_attendance.append({
+            'child': {
+                'id': child.id,
+                'profile': {
+                    'full_name': child.profile.full_name,
+                    'user': {
+                        'username': child.profile.user.username
+                    }
+                }
+            },
+            'attendance_rate': float(rate) if rate else None,
+            'unexcused_absences': unexcused_counts.get(child.id, 0)
+        })
+    return children_attendance
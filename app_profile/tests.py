@@ -0,0 +1,27 @@
+"""
+Tests unitaires pour l'envoi des codes OTP.
+
+Ce module vérifie qu'en mode développement, sans Twilio, le code OTP
+n'apparaît pas dans les logs d'avertissement.
+"""
+
+import logging
+from django.test import SimpleTestCase
+from unittest import mock
+
+from .otp_utils import send_otp_via_twilio
+
+
+class OtpDevModeTestCase(SimpleTestCase):
+    """Tests pour l'envoi simulé des codes OTP."""
+    
+    @mock.patch('app_profile.otp_utils.is_twilio_configured', return_value=False)
+    def test_code_only_logged_at_debug(self, _):
+        """Test que le code n'est écrit qu'au niveau DEBUG."""
+        with self.assertLogs('app_profile.otp_utils', level='DEBUG') as logs:
+            self.assertEqual(send_otp_via_twilio('242060000001', '482913'), (True, None))
+        
+        warnings = [record.getMessage() for record in logs.records if record.levelno >= logging.WARNING]
+        self.assertEqual(len(warnings), 1)
+        self.assertNotIn('482913', warnings[0])
+        self.assertTrue(any('482913' in line for line in logs.output if line.startswith('DEBUG')))
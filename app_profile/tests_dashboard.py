@@ -0,0 +1,339 @@
+"""
+Tests unitaires pour les services de données du dashboard.
+
+Ce module vérifie que les services du dashboard produisent les mêmes
+résultats que les utilitaires unitaires, en un nombre constant de requêtes.
+"""
+
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+from datetime import date, timedelta
+from decimal import Decimal
+from .models import Profile, Student, Teacher, Parent
+from .services.dashboard import (
+    get_dashboard_months, get_student_grades_data, get_student_attendance_data,
+    annotate_class_stats, get_class_stats, get_assessments_to_grade, get_children_attendance
+)
+from app_academic.models import AcademicYear, Grade, Class, Subject, Course
+from app_grades.models import Assessment, StudentGrade, GradeCategory
+from app_grades.services.utils import calculate_student_average, calculate_overall_average
+from app_attendance.models import Attendance, Absence
+from app_attendance.services.utils import calculate_attendance_rate
+
+
+class DashboardTestBase(TestCase):
+    """Données communes aux tests du dashboard."""
+
+    def setUp(self):
+        """Préparation des données de test."""
+        self.today = date.today()
+        self.academic_year = AcademicYear.objects.create(
+            name='2024-2025',
+            start_date=self.today - timedelta(days=200),
+            end_date=self.today + timedelta(days=100),
+            is_current=True,
+            is_active=True
+        )
+        self.grade = Grade.objects.create(name='6ème', code='6EME', order=6, is_active=True)
+        self.class_section = Class.objects.create(
+            name='6ème A',
+            code='6A-2024',
+            grade=self.grade,
+            academic_year=self.academic_year,
+            capacity=30,
+            is_active=True
+        )
+        self.category = GradeCategory.objects.create(
+            name='Contrôle',
+            code='CTRL',
+            weight=Decimal('1.0'),
+            is_active=True
+        )
+        self.subjects = [
+            Subject.objects.create(
+                name=f'Matière {i}',
+                code=f'MAT{i}',
+                coefficient=Decimal(i + 1),
+                is_active=True
+            )
+            for i in range(6)
+        ]
+        self.student = self.create_student('student1')
+
+    def create_student(self, username, class_section=None):
+        """Crée un élève actif dans la classe de test."""
+        user = User.objects.create_user(username=username, password='testpass123')
+        profile = Profile.objects.get(user=user)
+        profile.full_name = username
+        profile.role = 'student'
+        profile.is_active = True
+        profile.save()
+        return Student.objects.create(
+            profile=profile,
+            class_section=class_section or self.class_section,
+            academic_year=self.academic_year,
+            is_active=True
+        )
+
+    def create_grades(self, student, scores):
+        """Crée une évaluation par note, réparties sur les matières."""
+        for i, score in enumerate(scores):
+            assessment = Assessment.objects.create(
+                name=f'Évaluation {i}',
+                subject=self.subjects[i % len(self.subjects)],
+                class_section=student.class_section,
+                category=self.category,
+                date=self.today - timedelta(days=i),
+                coefficient=Decimal(i % 3 + 1),
+                max_score=Decimal('20.00'),
+                academic_year=self.academic_year,
+                is_active=True
+            )
+            StudentGrade.objects.create(
+                student=student,
+                assessment=assessment,
+                score=score,
+                is_absent=score is None,
+                is_active=True
+            )
+
+
+class StudentDashboardDataTestCase(DashboardTestBase):
+    """Tests pour les données du dashboard élève."""
+
+    def test_grades_data_matches_utils(self):
+        """Test que les moyennes calculées en mémoire sont identiques."""
+        self.create_grades(self.student, [
+            Decimal('12.50'), Decimal('15.00'), None, Decimal('8.00'),
+            Decimal('17.00'), Decimal('11.00'), Decimal('14.00'), Decimal('9.50'),
+        ])
+
+        with self.assertNumQueries(2):
+            data = get_student_grades_data(self.student, self.academic_year)
+
+        overall = calculate_overall_average(self.student.id, self.academic_year.id)
+        self.assertEqual(data['overall_average'], float(overall))
+        self.assertEqual(
+            [(item['subject'].id, item['average']) for item in data['subject_averages']],
+            [
+                (subject.id, float(calculate_student_average(self.student.id, subject.id, self.academic_year.id)))
+                for subject in Subject.objects.filter(is_active=True)
+                if calculate_student_average(self.student.id, subject.id, self.academic_year.id) is not None
+            ]
+        )
+        self.assertEqual(data['grades_chart_data'][0]['subject'], 'Matière 0')
+        self.assertEqual(data['grades_chart_data'][0]['grades'], [14.0, 12.5])
+
+    def test_grades_data_without_grades(self):
+        """Test un élève sans note."""
+        data = get_student_grades_data(self.student, self.academic_year)
+        self.assertIsNone(data['overall_average'])
+        self.assertEqual(data['subject_averages'], [])
+        self.assertEqual(data['grades_chart_data'], [])
+
+    def test_attendance_data_matches_utils(self):
+        """Test que les taux mensuels sont identiques à calculate_attendance_rate."""
+        for i in range(0, 150, 3):
+            Attendance.objects.create(
+                student=self.student,
+                class_section=self.class_section,
+                date=self.today - timedelta(days=i),
+                status='present' if i % 2 else 'absent',
+                is_active=True
+            )
+
+        with self.assertNumQueries(1):
+            data = get_student_attendance_data(self.student, self.today)
+
+        month_start = date(self.today.year, self.today.month, 1)
+        rate = calculate_attendance_rate(self.student.id, month_start, self.today)
+        self.assertEqual(data['attendance_rate'], float(rate) if rate else None)
+        self.assertEqual(
+            [item['rate'] for item in data['monthly_attendance']],
+            [
+                float(calculate_attendance_rate(self.student.id, start, end) or 0)
+                for start, end in get_dashboard_months(self.today)
+            ]
+        )
+
+    def test_dashboard_queries_do_not_scale(self):
+        """Test que le dashboard élève coûte un nombre constant de requêtes."""
+        self.client.force_login(self.student.profile.user)
+        url = reverse('app_profile:standard_dashboard')
+        self.create_grades(self.student, [Decimal('12.00')] * 3)
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        for i in range(6, 20):
+            Subject.objects.create(name=f'Matière {i}', code=f'MAT{i}', is_active=True)
+        self.create_grades(self.student, [Decimal('14.00')] * 30)
+
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.assertEqual(len(few), len(many))
+
+
+class TeacherDashboardDataTestCase(DashboardTestBase):
+    """Tests pour les données du dashboard enseignant."""
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(username='teacher1', password='testpass123')
+        self.teacher = Teacher.objects.create(profile=Profile.objects.get(user=user), is_active=True)
+        self.teacher.classes.add(self.class_section)
+
+    def add_class(self, code):
+        """Crée une classe enseignée par l'enseignant, avec un élève noté."""
+        class_obj = Class.objects.create(
+            name=code, code=code, grade=self.grade,
+            academic_year=self.academic_year, capacity=30, is_active=True
+        )
+        self.teacher.classes.add(class_obj)
+        student = self.create_student(f'student_{code}', class_obj)
+        self.create_grades(student, [Decimal('10.00'), Decimal('14.00')])
+        return class_obj
+
+    def test_class_stats(self):
+        """Test les statistiques par classe en une seule requête."""
+        self.create_grades(self.student, [Decimal('12.00'), Decimal('16.00'), None])
+        self.create_student('student2')
+        empty_class = Class.objects.create(
+            name='Vide', code='VIDE', grade=self.grade,
+            academic_year=self.academic_year, capacity=30, is_active=True
+        )
+        self.teacher.classes.add(empty_class)
+
+        with self.assertNumQueries(1):
+            classes = list(annotate_class_stats(self.teacher.classes.all(), self.academic_year))
+            stats = get_class_stats(classes)
+
+        self.assertEqual(stats, [{
+            'class': {'id': self.class_section.id, 'name': '6ème A', 'code': '6A-2024'},
+            'average': 14.0,
+            'total_students': 2,
+            'graded_count': 1,
+        }])
+        self.assertEqual({c.code: c.students_count for c in classes}, {'6A-2024': 2, 'VIDE': 0})
+
+    def test_assessments_to_grade(self):
+        """Test que seules les évaluations non notées des cours de l'enseignant sont retenues."""
+        Course.objects.create(
+            subject=self.subjects[0], class_section=self.class_section,
+            teacher=self.teacher, academic_year=self.academic_year
+        )
+        self.create_grades(self.student, [Decimal('12.00'), Decimal('15.00')])
+        ungraded = Assessment.objects.create(
+            name='À corriger', subject=self.subjects[0], class_section=self.class_section,
+            category=self.category, date=self.today, max_score=Decimal('20.00'),
+            academic_year=self.academic_year
+        )
+        Assessment.objects.create(
+            name='Autre matière', subject=self.subjects[1], class_section=self.class_section,
+            category=self.category, date=self.today, max_score=Decimal('20.00'),
+            academic_year=self.academic_year
+        )
+
+        self.assertEqual(list(get_assessments_to_grade(self.teacher, self.academic_year)), [ungraded])
+
+    def test_dashboard_queries_do_not_scale(self):
+        """Test que le dashboard enseignant ne dépend pas du nombre de classes."""
+        self.client.force_login(self.teacher.profile.user)
+        url = reverse('app_profile:standard_dashboard')
+        self.add_class('C1')
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        for i in range(2, 12):
+            self.add_class(f'C{i}')
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['dashboard_data']['class_stats']), 11)
+        self.assertEqual(len(few), len(many))
+
+
+class ParentDashboardDataTestCase(DashboardTestBase):
+    """Tests pour les données du dashboard parent."""
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(username='parent1', password='testpass123')
+        self.parent = Parent.objects.create(profile=Profile.objects.get(user=user), is_active=True)
+        self.parent.children.add(self.student)
+        self.month_start = date(self.today.year, self.today.month, 1)
+
+    def add_child(self, username, absent_days=0, unexcused=0):
+        """Crée un enfant du parent avec des présences et des absences."""
+        child = self.create_student(username)
+        self.parent.children.add(child)
+        for i in range(4):
+            Attendance.objects.create(
+                student=child,
+                class_section=self.class_section,
+                date=self.today - timedelta(days=i),
+                status='absent' if i < absent_days else 'present',
+                is_active=True
+            )
+        for i in range(unexcused):
+            Absence.objects.create(
+                student=child,
+                start_date=self.today - timedelta(days=i),
+                end_date=self.today - timedelta(days=i),
+                is_justified=False,
+                is_active=True
+            )
+        return child
+
+    def test_children_attendance_matches_utils(self):
+        """Test que les taux et absences groupés sont identiques aux calculs unitaires."""
+        self.add_child('child2', absent_days=1, unexcused=2)
+        self.add_child('child3', absent_days=3)
+        Absence.objects.create(
+            student=self.student, start_date=self.today, end_date=self.today,
+            is_justified=True, is_active=True
+        )
+        children = list(self.parent.children.select_related('profile__user').order_by('pk'))
+
+        with self.assertNumQueries(2):
+            data = get_children_attendance(children, self.month_start, self.today)
+
+        for child, entry in zip(children, data):
+            rate = calculate_attendance_rate(child.id, self.month_start, self.today)
+            self.assertEqual(entry['child']['profile']['user']['username'], child.profile.user.username)
+            self.assertEqual(entry['attendance_rate'], float(rate) if rate else None)
+            self.assertEqual(
+                entry['unexcused_absences'],
+                Absence.objects.filter(student=child, is_justified=False, is_active=True).count()
+            )
+        self.assertEqual(
+            [(entry['attendance_rate'], entry['unexcused_absences']) for entry in data],
+            [(None, 0), (75.0, 2), (25.0, 0)]
+        )
+
+    def test_dashboard_queries_do_not_scale(self):
+        """Test que le dashboard parent ne dépend pas du nombre d'enfants."""
+        self.client.force_login(self.parent.profile.user)
+        url = reverse('app_profile:standard_dashboard')
+        self.add_child('child2', absent_days=1, unexcused=1)
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        for i in range(3, 10):
+            self.add_child(f'child{i}', absent_days=i % 4, unexcused=1)
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['dashboard_data']['children_attendance']), 9)
+        self.assertEqual(len(few), len(many))
@@ -22,7 +22,13 @@ import json
 
 from .models import Profile, DocumentVerification, UserSession, LoginHistory, TrustedDevice, UserPreferences, Student, Teacher, Parent
 from app_config.models import Country, UserRole, Role, Permission, UserPermission
-from app_config.permissions import has_permission, is_admin, PermissionRequiredMixin, get_user_permissions
+from app_config.permissions import (
+    has_permission, has_permissions, is_admin, PermissionRequiredMixin, get_user_permissions
+)
+from .services.dashboard import (
+    get_student_grades_data, get_student_attendance_data,
+    annotate_class_stats, get_class_stats, get_assessments_to_grade, get_children_attendance
+)
 from django.shortcuts import get_object_or_404
 
 # Imports pour les autres apps
@@ -34,14 +40,12 @@ except ImportError:
 
 try:
     from app_grades.models import StudentGrade, Assessment, ReportCard
-    from app_grades.services.utils import calculate_student_average, calculate_overall_average
     GRADES_AVAILABLE = True
 except ImportError:
     GRADES_AVAILABLE = False
 
 try:
     from app_attendance.models import Attendance, Absence
-    from app_attendance.services.utils import calculate_attendance_rate
     ATTENDANCE_AVAILABLE = True
 except ImportError:
     ATTENDANCE_AVAILABLE = False
@@ -52,6 +56,16 @@ except ImportError:
     PIL_AVAILABLE = False
 import io
 
+# Indicateurs de permissions du dashboard, vérifiés en une seule résolution
+DASHBOARD_PERMISSION_FLAGS = {
+    'can_view_profile': ('view_profile', 'app_profile'),
+    'can_edit_profile': ('edit_profile', 'app_profile'),
+    'can_verify_profile': ('verify_profile', 'app_profile'),
+    'can_view_all_users': ('view_all_profiles', 'app_profile'),
+    'can_manage_verifications': ('manage_verifications', 'app_profile'),
+    'can_assign_permissions': ('assign_role_permissions', 'app_config'),
+}
+
 
 # ==================== AUTHENTICATION VIEWS ====================
 
@@ -312,12 +326,9 @@ class StandardDashboardView(View):
                 context['permissions_list'] = [p.codename for p in all_permissions]
                 
                 # Vérifier les permissions spécifiques
-                context['can_view_profile'] = has_permission(profile, 'view_profile', 'app_profile')
-                context['can_edit_profile'] = has_permission(profile, 'edit_profile', 'app_profile')
-                context['can_verify_profile'] = has_permission(profile, 'verify_profile', 'app_profile')
-                context['can_view_all_users'] = has_permission(profile, 'view_all_profiles', 'app_profile')
-                context['can_manage_verifications'] = has_permission(profile, 'manage_verifications', 'app_profile')
-                context['can_assign_permissions'] = has_permission(profile, 'assign_role_permissions', 'app_config')
+                checks = has_permissions(profile, DASHBOARD_PERMISSION_FLAGS.values())
+                for flag, permission in DASHBOARD_PERMISSION_FLAGS.items():
+                    context[flag] = checks[permission]
                 context['is_admin'] = is_admin(profile)
                 
                 # Statistiques selon les permissions
@@ -339,22 +350,8 @@ class StandardDashboardView(View):
                         ).select_related('assessment', 'assessment__subject').order_by('-assessment__date')[:5]
                         dashboard_data['recent_grades'] = recent_grades
                         
-                        # Moyenne générale
-                        overall_avg = calculate_overall_average(student.id, current_year.id) if current_year else None
-                        dashboard_data['overall_average'] = float(overall_avg) if overall_avg else None
-                        
-                        # Moyennes par matière
-                        subject_averages = []
-                        if ACADEMIC_AVAILABLE:
-                            subjects = Subject.objects.filter(is_active=True)
-                            for subject in subjects:
-                                avg = calculate_student_average(student.id, subject.id, current_year.id) if current_year else None
-                                if avg is not None:
-                                    subject_averages.append({
-                                        'subject': subject,
-                                        'average': float(avg)
-                                    })
-                        dashboard_data['subject_averages'] = subject_averages
+                        # Moyennes et graphique calculés à partir d'une seule lecture des notes
+                        dashboard_data.update(get_student_grades_data(student, current_year))
                         
                         # Prochains examens (7 prochains jours)
                         today = timezone.now().date()
@@ -367,34 +364,11 @@ class StandardDashboardView(View):
                             is_active=True
                         ).select_related('subject', 'category').order_by('date')[:10]
                         dashboard_data['upcoming_assessments'] = upcoming_assessments
-                        
-                        # Données pour graphique d'évolution des notes
-                        chart_data = []
-                        if ACADEMIC_AVAILABLE:
-                            for subject in subjects[:5]:  # Top 5 matières
-                                grades = StudentGrade.objects.filter(
-                                    student=student,
-                                    assessment__subject=subject,
-                                    assessment__academic_year=current_year,
-                                    is_active=True,
-                                    is_absent=False,
-                                    score__isnull=False
-                                ).select_related('assessment').order_by('assessment__date')
-                                
-                                subject_grades = [float(g.score) for g in grades]
-                                if subject_grades:
-                                    chart_data.append({
-                                        'subject': subject.name,
-                                        'grades': subject_grades
-                                    })
-                        dashboard_data['grades_chart_data'] = chart_data
                     
                     if ATTENDANCE_AVAILABLE:
-                        # Taux de présence (mois en cours)
+                        # Taux de présence du mois et des 6 derniers mois (une seule lecture)
                         today = timezone.now().date()
-                        month_start = date(today.year, today.month, 1)
-                        attendance_rate = calculate_attendance_rate(student.id, month_start, today)
-                        dashboard_data['attendance_rate'] = float(attendance_rate) if attendance_rate else None
+                        dashboard_data.update(get_student_attendance_data(student, today))
                         
                         # Absences non justifiées
                         unexcused_absences = Absence.objects.filter(
@@ -403,33 +377,17 @@ class StandardDashboardView(View):
                             is_active=True
                         ).count()
                         dashboard_data['unexcused_absences'] = unexcused_absences
-                        
-                        # Présence mensuelle pour graphique
-                        monthly_data = []
-                        for i in range(6):  # 6 derniers mois
-                            month_date = today - timedelta(days=30*i)
-                            month_start = date(month_date.year, month_date.month, 1)
-                            if month_start.month == 12:
-                                month_end = date(month_start.year + 1, 1, 1) - timedelta(days=1)
-                            else:
-                                month_end = date(month_start.year, month_start.month + 1, 1) - timedelta(days=1)
-                            
-                            rate = calculate_attendance_rate(student.id, month_start, month_end)
-                            monthly_data.append({
-                                'month': month_start.strftime('%b %Y'),
-                                'rate': float(rate) if rate else 0
-                            })
-                        monthly_data.reverse()
-                        dashboard_data['monthly_attendance'] = monthly_data
                     
                     if ACADEMIC_AVAILABLE:
                         # Emploi du temps du jour
                         today_weekday = today.weekday()  # 0 = Monday, 6 = Sunday
                         today_schedule = Schedule.objects.filter(
-                            class_section=student.class_section,
+                            course__class_section=student.class_section,
                             day_of_week=today_weekday,
                             is_active=True
-                        ).select_related('subject', 'teacher').order_by('start_time')
+                        ).select_related(
+                            'course__subject', 'course__teacher__profile__user'
+                        ).order_by('start_time')
                         dashboard_data['today_schedule'] = today_schedule
                 
                 # ========== DASHBOARD ENSEIGNANT ==========
@@ -439,8 +397,11 @@ class StandardDashboardView(View):
                     stats['teacher_number'] = teacher.teacher_number
                     
                     if ACADEMIC_AVAILABLE:
-                        # Classes enseignées
-                        classes_taught = teacher.classes.filter(is_active=True).select_related('grade', 'academic_year')
+                        # Classes enseignées, annotées de leurs statistiques (une seule requête groupée)
+                        classes_taught = list(annotate_class_stats(
+                            teacher.classes.filter(is_active=True).select_related('grade', 'academic_year'),
+                            current_year if GRADES_AVAILABLE else None
+                        ))
                         dashboard_data['classes_taught'] = classes_taught
                         
                         # Matières enseignées
@@ -450,50 +411,20 @@ class StandardDashboardView(View):
                         # Prochains cours (aujourd'hui)
                         today_weekday = timezone.now().date().weekday()
                         today_courses = Schedule.objects.filter(
-                            teacher=teacher,
+                            course__teacher=teacher,
                             day_of_week=today_weekday,
                             is_active=True
-                        ).select_related('class_section', 'subject').order_by('start_time')
+                        ).select_related('course__class_section', 'course__subject').order_by('start_time')
                         dashboard_data['today_courses'] = today_courses
                     
                     if GRADES_AVAILABLE and current_year:
                         # Évaluations à corriger (non notées)
-                        assessments_to_grade = Assessment.objects.filter(
-                            teacher=teacher,
-                            academic_year=current_year,
-                            is_active=True
-                        ).exclude(
-                            id__in=StudentGrade.objects.filter(
-                                is_active=True,
-                                score__isnull=False
-                            ).values_list('assessment_id', flat=True)
-                        ).select_related('subject', 'class_section').order_by('date')[:10]
-                        dashboard_data['assessments_to_grade'] = assessments_to_grade
+                        dashboard_data['assessments_to_grade'] = get_assessments_to_grade(teacher, current_year)[:10]
                         
                         # Statistiques des notes par classe
                         class_stats = []
                         if ACADEMIC_AVAILABLE:
-                            for class_obj in classes_taught:
-                                grades = StudentGrade.objects.filter(
-                                    student__class_section=class_obj,
-                                    assessment__academic_year=current_year,
-                                    is_active=True,
-                                    is_absent=False,
-                                    score__isnull=False
-                                )
-                                
-                                if grades.exists():
-                                    avg = grades.aggregate(Avg('score'))['score__avg']
-                                    class_stats.append({
-                                        'class': {
-                                            'id': class_obj.id,
-                                            'name': class_obj.name,
-                                            'code': class_obj.code
-                                        },
-                                        'average': float(avg) if avg else None,
-                                        'total_students': Student.objects.filter(class_section=class_obj, is_active=True).count(),
-                                        'graded_count': grades.values('student').distinct().count()
-                                    })
+                            class_stats = get_class_stats(classes_taught)
                         dashboard_data['class_stats'] = class_stats
                     
                     if ATTENDANCE_AVAILABLE:
@@ -501,7 +432,9 @@ class StandardDashboardView(View):
                         recent_absences = Absence.objects.filter(
                             student__class_section__in=classes_taught if ACADEMIC_AVAILABLE else [],
                             is_active=True
-                        ).select_related('student', 'student__profile').order_by('-start_date')[:10]
+                        ).select_related(
+                            'student__profile__user', 'student__class_section'
+                        ).order_by('-start_date')[:10]
                         dashboard_data['recent_absences'] = recent_absences
                 
                 # ========== DASHBOARD PARENT ==========
@@ -511,7 +444,9 @@ class StandardDashboardView(View):
                     stats['parent_number'] = parent.parent_number
                     
                     # Enfants
-                    children = parent.children.filter(is_active=True).select_related('profile')
+                    children = list(parent.children.filter(is_active=True).select_related(
+                        'profile__user', 'class_section'
+                    ))
                     dashboard_data['children'] = children
                     
                     if GRADES_AVAILABLE and current_year:
@@ -520,7 +455,9 @@ class StandardDashboardView(View):
                             student__in=children,
                             is_active=True,
                             assessment__academic_year=current_year
-                        ).select_related('student', 'student__profile', 'assessment', 'assessment__subject').order_by('-assessment__date')[:10]
+                        ).select_related(
+                            'student__profile__user', 'assessment__subject'
+                        ).order_by('-assessment__date')[:10]
                         dashboard_data['children_recent_grades'] = recent_grades
                     
                     if ATTENDANCE_AVAILABLE:
@@ -528,33 +465,15 @@ class StandardDashboardView(View):
                         recent_absences = Absence.objects.filter(
                             student__in=children,
                             is_active=True
-                        ).select_related('student', 'student__profile').order_by('-start_date')[:10]
+                        ).select_related(
+                            'student__profile__user', 'student__class_section'
+                        ).order_by('-start_date')[:10]
                         dashboard_data['children_recent_absences'] = recent_absences
                         
-                        # Taux de présence par enfant
-                        children_attendance = []
+                        # Taux de présence et absences non justifiées par enfant (requêtes groupées)
                         today = timezone.now().date()
                         month_start = date(today.year, today.month, 1)
-                        for child in children:
-                            rate = calculate_attendance_rate(child.id, month_start, today)
-                            unexcused = Absence.objects.filter(
-                                student=child,
-                                is_justified=False,
-                                is_active=True
-                            ).count()
-                            children_attendance.append({
-                                'child': {
-                                    'id': child.id,
-                                    'profile': {
-                                        'full_name': child.profile.full_name,
-                                        'user': {
-                                            'username': child.profile.user.username
-                                        }
-                                    }
-                                },
-                                'attendance_rate': float(rate) if rate else None,
-                                'unexcused_absences': unexcused
-                            })
+                        children_attendance = get_children_attendance(children, month_start, today)
                         dashboard_data['children_attendance'] = children_attendance
                     
                     if GRADES_AVAILABLE and current_year:
@@ -562,12 +481,12 @@ class StandardDashboardView(View):
                         today = timezone.now().date()
                         next_week = today + timedelta(days=7)
                         upcoming_assessments = Assessment.objects.filter(
-                            class_section__student__in=children,
+                            class_section_id__in={child.class_section_id for child in children},
                             academic_year=current_year,
                             date__gte=today,
                             date__lte=next_week,
                             is_active=True
-                        ).select_related('subject', 'class_section').order_by('date')[:10]
+                        ).select_related('subject', 'class_section', 'category').order_by('date')[:10]
                         dashboard_data['children_upcoming_assessments'] = upcoming_assessments
                 
                 # ========== DASHBOARD ADMIN ==========
@@ -1096,8 +1015,12 @@ class ProfileRolesManagementView(View):
         
         # Vérifier si l'utilisateur est admin ou a la permission assign_role_permissions ou manage_permissions
         user_profile = request.user.profile
-        has_assign = has_permission(user_profile, 'assign_role_permissions', 'app_config')
-        has_manage = has_permission(user_profile, 'manage_permissions', 'app_config')
+        checks = has_permissions(user_profile, [
+            ('assign_role_permissions', 'app_config'),
+            ('manage_permissions', 'app_config'),
+        ])
+        has_assign = checks[('assign_role_permissions', 'app_config')]
+        has_manage = checks[('manage_permissions', 'app_config')]
         is_user_admin = is_admin(user_profile)
         
         if not (has_assign or has_manage or is_user_admin):
@@ -15,7 +15,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'school_manager.settings')
 app = Celery('school_manager')
 
 # Inclure les modules de tâches des apps
-app.conf.include = ['app_profile.tasks']
+app.conf.include = ['app_profile.tasks', 'app_grades.tasks', 'app_attendance.tasks', 'app_academic.tasks']
 
 # Charger la configuration depuis les settings Django avec le namespace 'CELERY'
 app.config_from_object('django.conf:settings', namespace='CELERY')
@@ -50,6 +50,15 @@ DATABASES = {
     }
 }
 
+# ===================== CACHE =====================
+# Cache partagé entre tous les workers gunicorn (permissions, menus)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}/1",
+    }
+}
+
 # ===================== STATIC & MEDIA =====================
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 import os
 from pathlib import Path
+from celery.schedules import crontab
 from . infos import *
 
 
@@ -112,6 +113,22 @@ DATABASES = {
     }
 }
 
+# ==================== Configuration du cache ====================
+# Cache local en mémoire pour le développement et les tests
+# (remplacé par Redis dans prod_settings pour être partagé entre workers)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'school_manager',
+    }
+}
+
+# Durée de conservation des permissions effectives en cache (en secondes)
+PERMISSIONS_CACHE_TIMEOUT = 60 * 60  # 1 heure
+
+# Durée de conservation des statistiques d'évaluations en cache (en secondes)
+GRADE_ANALYTICS_CACHE_TIMEOUT = 60 * 60  # 1 heure
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -157,6 +174,27 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = '/media/'
 
+# En-tête des bulletins PDF
+REPORT_CARD_SCHOOL_NAME = 'School Manager'
+REPORT_CARD_LOGO = BASE_DIR / 'static' / 'school_manager' / 'assets' / 'images' / 'logo-sm.png'
+
+# Alertes d'absences envoyées aux parents
+ABSENCE_ALERT_BACKENDS = [
+    'app_attendance.services.alerts.EmailAlertBackend',
+    'app_attendance.services.alerts.SmsAlertBackend',
+]
+ABSENCE_ALERT_BATCH_SIZE = 100  # Messages par lot
+ABSENCE_ALERT_MAX_ATTEMPTS = 3  # Tentatives par envoi
+
+# Générateur d'emploi du temps
+TIMETABLE_DAYS = [0, 1, 2, 3, 4]  # Lundi à vendredi
+TIMETABLE_PERIODS = [
+    ('08:00', '09:00'), ('09:00', '10:00'), ('10:00', '11:00'), ('11:00', '12:00'),
+    ('13:00', '14:00'), ('14:00', '15:00'), ('15:00', '16:00'), ('16:00', '17:00'),
+]
+TIMETABLE_MAX_DAILY_HOURS = 2  # Heures d'un même cours par jour
+TIMETABLE_TIME_BUDGET = 60  # Durée maximale de la recherche (secondes)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -203,3 +241,11 @@ CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
 # Mode eager (exécution synchrone) - False pour production, True pour tests
 CELERY_TASK_ALWAYS_EAGER = False
 
+# Tâches périodiques (Celery Beat)
+CELERY_BEAT_SCHEDULE = {
+    'sweep-absence-thresholds': {
+        'task': 'app_attendance.sweep_absence_thresholds',
+        'schedule': crontab(hour=6, minute=30),
+    },
+}
+